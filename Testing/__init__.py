@@ -1,8 +1,8 @@
 """
 Impedance analyzer testbench.
 
-Provides signal/noise/error generators and component simulators (DAC,
-impedance, op-amp, ADC) for testing the FPGA-based multi-frequency
+Provides signal/noise/error generators, component simulators (DAC,
+impedance, op-amp, ADC) and a streaming signal chain for testing the FPGA-based multi-frequency
 impedance analyzer per README specifications.
 """
 
@@ -10,34 +10,138 @@ from .generators import (
     sine_wave,
     cosine_wave,
     multifrequency_sine,
+    NCO,
     noise_time_domain,
     noise_frequency_domain,
     NoiseType,
     apply_phase_delay,
+    SinglePoleLPF,
+    dac_inl_profile,
+    adc_inl_profile,
     dac_errors,
     opamp_errors,
     adc_errors,
+    ScratchBuffers,
 )
 from .simulators import (
     DACSimulator,
     ImpedanceSimulator,
+    AdmittanceFilter,
     OpAmpSimulator,
     ADCSimulator,
+    save_inl_tables,
+    load_inl_tables,
+)
+from .demodulator import (
+    LockInDemodulator,
+    DemodulatorBank,
+    IQBlock,
+    butterworth_lpf_sos,
+)
+from .decimator import (
+    CICDecimator,
+    FIRDecimator,
+    Decimator,
+    cic_compensation_taps,
+)
+from .cordic import (
+    CordicConfig,
+    cordic_translate,
+    cordic_rotate,
+    cordic_magnitude_phase,
+    export_golden_vectors,
+)
+from .capture import (
+    Capture,
+    open_capture,
+    ingest_text_capture,
+    write_capture,
+)
+from .events import (
+    Events,
+    EventDetector,
+    detect_events,
+)
+from .multisine_design import (
+    MultisineDesign,
+    CrestReport,
+    design_multisine,
+    evaluate_designs,
+)
+from .impedance_models import SingleShell
+from .impedance_fit import FitResult, FitStats, SpectrumFitter, fit_spectra, z_from_polar
+from .resampler import RationalResampler, resample
+from .cell_transits import CellEvents, TransitImpedance, cell_events_from_size
+from .stage_cache import StageCache
+from .instrumentation import Profiler, StageRecord
+from .signal_chain import (
+    SignalChain,
+    iter_blocks,
+    excitation_blocks,
 )
 
 __all__ = [
     "sine_wave",
     "cosine_wave",
     "multifrequency_sine",
+    "NCO",
     "noise_time_domain",
     "noise_frequency_domain",
     "NoiseType",
     "apply_phase_delay",
+    "SinglePoleLPF",
+    "dac_inl_profile",
+    "adc_inl_profile",
     "dac_errors",
     "opamp_errors",
     "adc_errors",
+    "ScratchBuffers",
     "DACSimulator",
     "ImpedanceSimulator",
+    "AdmittanceFilter",
     "OpAmpSimulator",
     "ADCSimulator",
+    "save_inl_tables",
+    "load_inl_tables",
+    "LockInDemodulator",
+    "DemodulatorBank",
+    "IQBlock",
+    "butterworth_lpf_sos",
+    "CICDecimator",
+    "FIRDecimator",
+    "Decimator",
+    "cic_compensation_taps",
+    "CordicConfig",
+    "cordic_translate",
+    "cordic_rotate",
+    "cordic_magnitude_phase",
+    "export_golden_vectors",
+    "Capture",
+    "open_capture",
+    "ingest_text_capture",
+    "write_capture",
+    "Events",
+    "EventDetector",
+    "detect_events",
+    "MultisineDesign",
+    "CrestReport",
+    "design_multisine",
+    "evaluate_designs",
+    "SingleShell",
+    "FitResult",
+    "FitStats",
+    "SpectrumFitter",
+    "fit_spectra",
+    "z_from_polar",
+    "RationalResampler",
+    "resample",
+    "CellEvents",
+    "TransitImpedance",
+    "cell_events_from_size",
+    "StageCache",
+    "Profiler",
+    "StageRecord",
+    "SignalChain",
+    "iter_blocks",
+    "excitation_blocks",
 ]
@@ -0,0 +1,10 @@
+"""
+Throughput benchmarks for the impedance analyzer testbench.
+
+Each module is a standalone script, run from the repo root, e.g.:
+    python -m Testing.benchmarks.bench_tia_filter
+
+suite.py times every generator, simulator and the end-to-end chain and
+checks the results against a saved JSON baseline; bench_precision.py
+compares the float32 and float64 precision modes.
+"""
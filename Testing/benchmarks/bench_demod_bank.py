@@ -0,0 +1,57 @@
+"""
+Multi-carrier demodulation benchmark: N x demodulate_iq vs DemodulatorBank.
+
+For 1 .. 32 carriers, reports total time and time per carrier for calling
+the GUI's single-tone demodulate_iq once per carrier (re-reading the
+signal and redesigning the filter each time) and for one DemodulatorBank
+pass over the same ADC data.
+
+Run:  python -m Testing.benchmarks.bench_demod_bank  (from repo root)
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from ..demodulator import DemodulatorBank
+from ..dlia_chain import demodulate_iq
+
+SAMPLE_RATE_HZ = 10e6
+LPF_ENBW_HZ = 10e3
+CARRIER_COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=float, default=200_000)
+    parser.add_argument("--carriers", type=int, nargs="+", default=CARRIER_COUNTS)
+    args = parser.parse_args(argv)
+
+    n = int(args.samples)
+    t = np.arange(n) / SAMPLE_RATE_HZ
+    rng = np.random.default_rng(0)
+    print(f"{n:.0e} samples per carrier")
+    print(f"{'carriers':>8} | {'loop total (s)':>14} | {'loop/carrier':>12} | {'bank total (s)':>14} | {'bank/carrier':>12}")
+    print("-" * 74)
+    for n_car in args.carriers:
+        freqs = np.linspace(100e3, 4e6, n_car)
+        x = np.sin(2 * np.pi * freqs[:, None] * t).sum(axis=0) + 0.01 * rng.standard_normal(n)
+
+        t0 = time.perf_counter()
+        for f in freqs:
+            demodulate_iq(x, t, f, SAMPLE_RATE_HZ, LPF_ENBW_HZ)
+        t_loop = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        DemodulatorBank(freqs, SAMPLE_RATE_HZ, LPF_ENBW_HZ).process(x)
+        t_bank = time.perf_counter() - t0
+
+        print(f"{n_car:8d} | {t_loop:14.4f} | {t_loop / n_car * 1e3:10.2f}ms | "
+              f"{t_bank:14.4f} | {t_bank / n_car * 1e3:10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
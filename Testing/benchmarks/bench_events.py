@@ -0,0 +1,74 @@
+"""
+Event detection benchmark: vectorized EventDetector on a synthetic capture.
+
+Builds a 14 kHz-style capture with Gaussian cell-transit pulses on a noisy
+baseline, then reports events/sec and samples/sec for detect_events at
+several block sizes (block-wise, as used on memory-mapped recordings), plus
+the old single-pulse while-loop search for comparison.
+
+Run:  python -m Testing.benchmarks.bench_events  (from repo root)
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from ..events import detect_events
+
+N_SAMPLES = 10_000_000
+EVENTS_PER_MSAMPLE = 2_000
+BLOCKS = (1 << 14, 1 << 18, 1 << 22)
+
+
+def synthetic_capture(n: int, n_events: int, rng: np.random.Generator) -> np.ndarray:
+    """Noisy baseline plus n_events Gaussian pulses (sigma 8 samples)."""
+    x = 0.02 * rng.standard_normal(n)
+    centers = rng.integers(40, n - 40, n_events)
+    k = np.arange(-40, 41)
+    pulse = np.exp(-0.5 * (k / 8.0) ** 2)
+    amps = rng.uniform(0.3, 1.0, n_events)
+    np.add.at(x, centers[:, None] + k, amps[:, None] * pulse)
+    return x
+
+
+def _loop_single_pulse(x: np.ndarray, margin: float) -> tuple[int, int]:
+    """The original find_largest_envelope while-loops (one pulse only)."""
+    peak = int(np.argmax(np.abs(x)))
+    left = right = peak
+    while left > 0 and abs(x[left]) > margin:
+        left -= 1
+    while right < len(x) - 1 and abs(x[right]) > margin:
+        right += 1
+    return left, right
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=float, default=N_SAMPLES)
+    parser.add_argument("--rate", type=float, default=EVENTS_PER_MSAMPLE, help="events per 1e6 samples")
+    parser.add_argument("--blocks", type=int, nargs="+", default=BLOCKS)
+    args = parser.parse_args(argv)
+
+    n = int(args.samples)
+    rng = np.random.default_rng(0)
+    x = synthetic_capture(n, int(args.rate * n / 1e6), rng)
+
+    t0 = time.perf_counter()
+    _loop_single_pulse(x, 0.1)
+    t_loop = time.perf_counter() - t0
+    print(f"while-loop (largest pulse only): {t_loop * 1e3:.2f} ms")
+
+    print(f"{'block':>10} | {'events':>8} | {'time (s)':>9} | {'events/s':>10} | {'samples/s':>10}")
+    print("-" * 60)
+    for block in args.blocks:
+        t0 = time.perf_counter()
+        ev = detect_events(x, 0.15, release=0.08, min_width=4, min_gap=8, block_size=block)
+        dt = time.perf_counter() - t0
+        print(f"{block:10d} | {ev.start.size:8d} | {dt:9.3f} | {ev.start.size / dt:10.3e} | {n / dt:10.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Equivalent-circuit fitting benchmark: batch Levenberg-Marquardt throughput.
+
+Simulates --events cell spectra per model at a few tones (random R/C/L
+around a population mean, complex Gaussian noise of --noise relative to
+|Z|), fits them in batches with SpectrumFitter (warm starts on), and
+reports fits/sec, the converged fraction, iteration counts and the median
+relative parameter error.
+
+Run:  python -m Testing.benchmarks.bench_fit  (from repo root)
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..impedance_fit import FIT_MODELS, FIT_PARAMS, SpectrumFitter, model_z, z_from_polar
+
+TONES_HZ = np.array([1e5, 5e5, 2e6, 1e7])
+EVENTS = 100_000
+BATCH = 10_000
+POPULATION = {"resistance": 5e3, "capacitance": 5e-12, "inductance": 5e-6}
+
+
+def random_spectra(model: str, n: int, noise: float, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """(true params, measured |Z| and phase as z) for n cells, +/-30 % around POPULATION."""
+    params = np.stack([POPULATION[name] * rng.uniform(0.7, 1.3, n) for name in FIT_PARAMS[model]], axis=-1)
+    z = model_z(model, TONES_HZ, params)
+    z = z * (1.0 + noise * (rng.standard_normal(z.shape) + 1j * rng.standard_normal(z.shape)) / np.sqrt(2))
+    return params, z_from_polar(np.abs(z), np.angle(z))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=EVENTS)
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.0, 0.01])
+    parser.add_argument("--models", nargs="+", default=list(FIT_MODELS), choices=FIT_MODELS)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{args.events} events, {TONES_HZ.size} tones, batches of {args.batch}")
+    print(f"{'model':>11} | {'noise':>6} | {'fits/s':>10} | {'converged':>9} | {'mean it':>7} | {'max it':>6} | {'median err':>10}")
+    print("-" * 78)
+    for model in args.models:
+        for noise in args.noise:
+            truth, z = random_spectra(model, args.events, noise, rng)
+            fitter = SpectrumFitter(TONES_HZ, model)
+            fitted = np.concatenate([fitter.fit(b).params for b in np.array_split(z, -(-args.events // args.batch))])
+            stats = fitter.stats
+            err = np.median(np.abs(fitted / truth - 1.0))
+            print(
+                f"{model:>11} | {noise:6.3f} | {stats.fits_per_sec:10.3e} | {stats.converged_fraction:9.2%} | "
+                f"{stats.mean_iterations:7.2f} | {stats.max_iterations:6d} | {err:10.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+float32 vs float64 precision benchmark: throughput and peak memory per case.
+
+Runs the suite cases that take a precision argument at both dtypes and
+prints, per case and size, the float64/float32 time ratio (speedup) and
+peak traced memory ratio. Recursive filters stay float64 internally, so
+filter-bound cases gain less than the generators and error models.
+
+Run:  python -m Testing.benchmarks.bench_precision  (from repo root)
+      python -m Testing.benchmarks.bench_precision --sizes 1e6 1e7
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Dict, Sequence
+
+from .suite import CASES, SIZES, result_key, run_suite
+
+PRECISION_CASES = (
+    "sine_wave",
+    "cosine_wave",
+    "multifrequency_sine_8",
+    "noise_time_domain_white",
+    "noise_time_domain_pink",
+    "dac_errors",
+    "opamp_errors",
+    "adc_errors",
+    "DACSimulator.run",
+    "OpAmpSimulator.run",
+    "ADCSimulator.run",
+    "LockInDemodulator.process",
+    "SignalChain.process",
+)
+
+
+def compare_precisions(
+    cases: Sequence[str] = PRECISION_CASES,
+    sizes: Sequence[int] = SIZES,
+    measure_memory: bool = True,
+) -> Dict[str, dict]:
+    """
+    Time every case at float64 and float32.
+
+    Returns {"case|n": {"case", "n", "speedup", "memory_ratio", "float64",
+    "float32"}} where speedup and memory_ratio are float64 / float32 (None
+    when memory was not measured).
+    """
+    results = run_suite(cases, sizes, ("float64", "float32"), measure_memory=measure_memory)
+    table: Dict[str, dict] = {}
+    for name in cases:
+        for n in sizes:
+            r64 = results.get(result_key(name, n, "float64"))
+            r32 = results.get(result_key(name, n, "float32"))
+            if r64 is None or r32 is None:
+                continue
+            mem = None
+            if r64["peak_bytes"] and r32["peak_bytes"]:
+                mem = r64["peak_bytes"] / r32["peak_bytes"]
+            table[f"{name}|{n}"] = {
+                "case": name,
+                "n": n,
+                "speedup": r64["seconds"] / r32["seconds"],
+                "memory_ratio": mem,
+                "float64": r64,
+                "float32": r32,
+            }
+    return table
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", nargs="+", default=list(PRECISION_CASES),
+                        help=f"subset of: {', '.join(c for c in CASES)}")
+    parser.add_argument("--sizes", type=float, nargs="+", default=SIZES)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args(argv)
+
+    table = compare_precisions(args.cases, [int(s) for s in args.sizes], not args.no_memory)
+    print(f"{'case':<28} {'samples':>9} | {'f64 (s)':>10} {'f32 (s)':>10} {'speedup':>8} | "
+          f"{'f64 MiB':>8} {'f32 MiB':>8} {'mem x':>6}")
+    print("-" * 100)
+    for row in table.values():
+        r64, r32 = row["float64"], row["float32"]
+        if row["memory_ratio"] is None:
+            mem = f"{'-':>8} {'-':>8} {'-':>6}"
+        else:
+            mem = (f"{r64['peak_bytes'] / 2**20:8.2f} {r32['peak_bytes'] / 2**20:8.2f} "
+                   f"{row['memory_ratio']:6.2f}")
+        print(f"{row['case']:<28} {row['n']:>9.0e} | {r64['seconds']:10.3e} {r32['seconds']:10.3e} "
+              f"{row['speedup']:8.2f} | {mem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+TIA bandwidth filter benchmark: per-sample Python loop vs SinglePoleLPF.
+
+Reports samples/sec at 1e5 .. 1e8 samples. Large sizes are streamed through
+the stateful filter in chunks so memory stays bounded; the Python loop is
+only timed up to --max-loop-samples (it takes minutes beyond that).
+
+Run:  python -m Testing.benchmarks.bench_tia_filter  (from repo root)
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from ..generators import SinglePoleLPF, _single_pole_alpha
+
+SAMPLE_RATE_HZ = 250e6
+BANDWIDTH_HZ = 50e6
+SIZES = (100_000, 1_000_000, 10_000_000, 100_000_000)
+CHUNK_SAMPLES = 1 << 20
+
+
+def _iir_loop_reference(x: np.ndarray, alpha: float) -> np.ndarray:
+    """The original per-sample implementation, kept here as the baseline."""
+    y = np.empty_like(x)
+    y[0] = alpha * x[0]
+    for i in range(1, len(x)):
+        y[i] = alpha * x[i] + (1.0 - alpha) * y[i - 1]
+    return y
+
+
+def time_loop(n: int, alpha: float, rng: np.random.Generator) -> float:
+    """Seconds for the Python loop over n samples."""
+    x = rng.standard_normal(n)
+    t0 = time.perf_counter()
+    _iir_loop_reference(x, alpha)
+    return time.perf_counter() - t0
+
+
+def time_vectorized(n: int, alpha: float, rng: np.random.Generator) -> float:
+    """Seconds for SinglePoleLPF over n samples, fed in CHUNK_SAMPLES chunks."""
+    lpf = SinglePoleLPF(alpha)
+    chunk = rng.standard_normal(min(n, CHUNK_SAMPLES))
+    elapsed = 0.0
+    remaining = n
+    while remaining > 0:
+        x = chunk[: min(remaining, chunk.size)]
+        t0 = time.perf_counter()
+        lpf.process(x)
+        elapsed += time.perf_counter() - t0
+        remaining -= x.size
+    return elapsed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=SIZES)
+    parser.add_argument("--max-loop-samples", type=float, default=1e6)
+    args = parser.parse_args(argv)
+
+    alpha = _single_pole_alpha(BANDWIDTH_HZ, SAMPLE_RATE_HZ)
+    rng = np.random.default_rng(0)
+    print(f"{'samples':>12} | {'loop (S/s)':>12} | {'lfilter (S/s)':>14} | {'speedup':>8}")
+    print("-" * 56)
+    for n in (int(s) for s in args.sizes):
+        t_vec = time_vectorized(n, alpha, rng)
+        vec_rate = n / t_vec
+        if n <= args.max_loop_samples:
+            loop_rate = n / time_loop(n, alpha, rng)
+            loop_col = f"{loop_rate:12.3e}"
+            speedup_col = f"{vec_rate / loop_rate:7.0f}x"
+        else:
+            loop_col = f"{'-':>12}"
+            speedup_col = f"{'-':>8}"
+        print(f"{n:12.0e} | {loop_col} | {vec_rate:14.3e} | {speedup_col}")
+
+
+if __name__ == "__main__":
+    main()
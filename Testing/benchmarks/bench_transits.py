@@ -0,0 +1,84 @@
+"""
+Cell-transit benchmark: TransitImpedance at cytometry event rates.
+
+Draws Poisson arrivals at --rate events per minute with random transit
+times and cell diameters, then streams the sensor current block by block
+and reports samples/sec, the real-time factor, and the cost of the events
+on top of an empty channel. Peak traced memory shows that it depends on
+the block size, not the capture length.
+
+Run:  python -m Testing.benchmarks.bench_transits  (from repo root)
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from ..cell_transits import CellEvents, TransitImpedance, cell_events_from_size
+from ..simulators import ImpedanceSimulator
+
+SAMPLE_RATE_HZ = 10e6
+DURATION_S = 2.0
+EVENTS_PER_MINUTE = 1e6
+BLOCK = 1 << 18
+
+
+def random_events(rate_per_min: float, duration_s: float, rng: np.random.Generator) -> CellEvents:
+    """Poisson arrivals, 10-30 us transits, 7 +/- 1 um cells in a (40 um)^3 sensing volume."""
+    rate = rate_per_min / 60.0
+    arrival = np.cumsum(rng.exponential(1.0 / rate, int(rate * duration_s * 1.2) + 10))
+    arrival = arrival[arrival < duration_s]
+    return cell_events_from_size(
+        arrival,
+        rng.uniform(10e-6, 30e-6, arrival.size),
+        np.clip(rng.normal(7e-6, 1e-6, arrival.size), 3e-6, None),
+        channel_resistance_ohm=2e3,
+        sensing_volume_m3=(40e-6) ** 3,
+    )
+
+
+def _stream(transits: TransitImpedance, n: int, block: int, tones: np.ndarray) -> tuple[float, float]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in transits.current_blocks(n, block, tones, np.full(tones.size, 0.1), dc_offset=0.5):
+        pass
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dt, peak
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=DURATION_S, help="capture length (s)")
+    parser.add_argument("--rate", type=float, default=EVENTS_PER_MINUTE, help="events per minute")
+    parser.add_argument("--block", type=int, default=BLOCK)
+    parser.add_argument("--tones", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args(argv)
+
+    n = int(args.duration * SAMPLE_RATE_HZ)
+    events = random_events(args.rate, args.duration, np.random.default_rng(0))
+    channel = ImpedanceSimulator(resistance=2e3, capacitance=2e-12)
+    transits = TransitImpedance(channel, events, SAMPLE_RATE_HZ)
+    empty = TransitImpedance(channel, CellEvents(*(field[:0] for field in events)), SAMPLE_RATE_HZ)
+    touched = int(np.sum(events.transit_s) * SAMPLE_RATE_HZ)
+    print(f"{events.count} events, {touched / n:.1%} of {n} samples inside a transit")
+
+    print(f"{'tones':>5} | {'time (s)':>9} | {'samples/s':>10} | {'x realtime':>10} | {'events (s)':>10} | {'peak MB':>8}")
+    print("-" * 68)
+    for k in args.tones:
+        tones = 5e5 * np.arange(1, k + 1)
+        dt, peak = _stream(transits, n, args.block, tones)
+        dt_empty, _ = _stream(empty, n, args.block, tones)
+        print(
+            f"{k:5d} | {dt:9.3f} | {n / dt:10.3e} | {args.duration / dt:10.2f} | "
+            f"{dt - dt_empty:10.3f} | {peak / 1e6:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
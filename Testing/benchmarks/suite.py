@@ -0,0 +1,452 @@
+"""
+Benchmark suite: every public generator, every simulator run, the chain.
+
+Times each case over a grid of sizes and dtypes, reporting best-of-N
+wall time, samples/sec and peak traced memory (tracemalloc, which also
+sees NumPy buffers). Results can be saved as a JSON baseline; comparing
+against a baseline exits non-zero when any case is slower than the stored
+time by more than --margin.
+
+Run:  python -m Testing.benchmarks.suite  (from repo root)
+      python -m Testing.benchmarks.suite --save baseline.json
+      python -m Testing.benchmarks.suite --compare baseline.json --margin 0.25
+      python -m Testing.benchmarks.suite --full --cases dac_errors adc_errors
+
+A float dtype is both the input dtype and the working precision passed to
+the code under test (dtype=...); "uint16" feeds integer codes to the DAC.
+bench_precision.py tabulates the float32 vs float64 gains.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .. import generators as gen
+from ..generators import NCO, NoiseType, SinglePoleLPF
+from ..simulators import DACSimulator, ImpedanceSimulator, OpAmpSimulator, ADCSimulator
+from ..cell_transits import TransitImpedance, cell_events_from_size
+from ..impedance_models import SingleShell
+from ..signal_chain import SignalChain
+from ..demodulator import LockInDemodulator
+
+SAMPLE_RATE_HZ = 250e6
+F_HZ = 1e6
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SIZES_FULL = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+DTYPES = ("float64", "float32")
+MIN_TIME_S = 0.2   # keep repeating a case until this much time has been spent
+MAX_REPEATS = 7
+
+
+class Case(NamedTuple):
+    """setup(n, dtype) -> zero-argument callable that does the timed work."""
+    setup: Callable[[int, np.dtype], Callable[[], object]]
+    dtypes: Tuple[str, ...]
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, dtypes: Sequence[str] = DTYPES):
+    """Register a benchmark case under name."""
+    def register(setup):
+        CASES[name] = Case(setup, tuple(dtypes))
+        return setup
+    return register
+
+
+def _t(n: int, dtype: np.dtype) -> np.ndarray:
+    return (np.arange(n) / SAMPLE_RATE_HZ).astype(dtype)
+
+
+def _unit_sine(n: int, dtype: np.dtype) -> np.ndarray:
+    return (0.5 + 0.4 * np.sin(2 * np.pi * F_HZ * np.arange(n) / SAMPLE_RATE_HZ)).astype(dtype)
+
+
+def _precision(dtype: np.dtype) -> np.dtype:
+    """Working precision for a case dtype (integer inputs compute in float64)."""
+    return dtype if dtype.kind == "f" else np.dtype(np.float64)
+
+
+def _code_dtype(dtype: np.dtype) -> np.dtype:
+    """ADC code type: the float32 rows use the compact uint16 configuration."""
+    return np.dtype(np.uint16) if dtype == np.float32 else np.dtype(np.int32)
+
+
+# -----------------------------------------------------------------------------
+# 1. Generators
+# -----------------------------------------------------------------------------
+
+@case("sine_wave")
+def _sine_wave(n, dtype):
+    t = _t(n, dtype)
+    return lambda: gen.sine_wave(t, F_HZ, amplitude=0.4, dc_offset=0.5, dtype=dtype)
+
+
+@case("cosine_wave")
+def _cosine_wave(n, dtype):
+    t = _t(n, dtype)
+    return lambda: gen.cosine_wave(t, F_HZ, dtype=dtype)
+
+
+@case("multifrequency_sine_8")
+def _multifrequency_sine(n, dtype):
+    t = _t(n, dtype)
+    freqs = F_HZ * np.arange(1, 9)
+    amps = np.full(8, 0.1)
+    return lambda: gen.multifrequency_sine(t, freqs, amps, dtype=dtype)
+
+
+@case("multifrequency_sine_128")
+def _multifrequency_sine_dense(n, dtype):
+    # Log-spaced, not on a common period: the rotation path
+    t = _t(n, dtype)
+    freqs = np.geomspace(1e4, 1e8, 128)
+    amps = np.full(128, 0.01)
+    return lambda: gen.multifrequency_sine(t, freqs, amps, dtype=dtype)
+
+
+@case("multifrequency_sine_128_on_bin")
+def _multifrequency_sine_on_bin(n, dtype):
+    # 250 kHz grid: one 1000-sample period, synthesized by inverse FFT and tiled
+    t = _t(n, dtype)
+    freqs = 250e3 * np.arange(1, 129)
+    amps = np.full(128, 0.01)
+    return lambda: gen.multifrequency_sine(t, freqs, amps, dtype=dtype)
+
+
+@case("nco_sincos", dtypes=("float64",))
+def _nco(n, dtype):
+    nco = NCO(F_HZ, SAMPLE_RATE_HZ)
+    return lambda: nco.sincos(n)
+
+
+@case("noise_time_domain_white")
+def _noise_white(n, dtype):
+    rng = np.random.default_rng(0)
+    return lambda: gen.noise_time_domain(n, NoiseType.WHITE, rng=rng, dtype=dtype)
+
+
+@case("noise_time_domain_pink")
+def _noise_pink(n, dtype):
+    rng = np.random.default_rng(0)
+    return lambda: gen.noise_time_domain(n, NoiseType.PINK, rng=rng, dtype=dtype)
+
+
+@case("noise_frequency_domain")
+def _noise_freq(n, dtype):
+    rng = np.random.default_rng(0)
+    return lambda: gen.noise_frequency_domain(n, NoiseType.PINK, rng=rng, dtype=dtype)
+
+
+@case("apply_phase_delay")
+def _phase_delay(n, dtype):
+    x = _unit_sine(n, dtype)
+    return lambda: gen.apply_phase_delay(x, 0.3, SAMPLE_RATE_HZ, F_HZ)
+
+
+@case("dac_errors", dtypes=("float64", "float32", "uint16"))
+def _dac_errors(n, dtype):
+    x = _unit_sine(n, np.float64)
+    codes = np.round(x * 65535).astype(dtype) if dtype.kind == "u" else x.astype(dtype)
+    rng = np.random.default_rng(0)
+    table = gen.dac_inl_profile(16, 4.0, rng)
+    return lambda: gen.dac_errors(codes, inl_profile=table, rng=rng, dtype=_precision(dtype))
+
+
+@case("opamp_errors")
+def _opamp_errors(n, dtype):
+    x = _unit_sine(n, dtype)
+    rng = np.random.default_rng(0)
+    return lambda: gen.opamp_errors(x, SAMPLE_RATE_HZ, bandwidth_hz=50e6, noise_rms=1e-4, rng=rng,
+                                    dtype=dtype)
+
+
+@case("adc_errors")
+def _adc_errors(n, dtype):
+    x = _unit_sine(n, dtype)
+    rng = np.random.default_rng(0)
+    table = gen.adc_inl_profile(16, 2.0, rng)
+    return lambda: gen.adc_errors(x, aperture_jitter_sec=1e-13, sample_rate_hz=SAMPLE_RATE_HZ,
+                                  rng=rng, inl_profile=table, dtype=dtype, code_dtype=_code_dtype(dtype))
+
+
+@case("single_pole_lpf")
+def _lpf(n, dtype):
+    x = _unit_sine(n, dtype)
+    lpf = SinglePoleLPF.from_bandwidth(50e6, SAMPLE_RATE_HZ)
+    return lambda: lpf.process(x)
+
+
+# -----------------------------------------------------------------------------
+# 2. Simulators
+# -----------------------------------------------------------------------------
+
+@case("DACSimulator.run", dtypes=("float64", "float32", "uint16"))
+def _dac_run(n, dtype):
+    x = _unit_sine(n, np.float64)
+    codes = np.round(x * 65535).astype(dtype) if dtype.kind == "u" else x.astype(dtype)
+    dac = DACSimulator(SAMPLE_RATE_HZ, seed=0, dtype=_precision(dtype))
+    return lambda: dac.run(codes)
+
+
+@case("ImpedanceSimulator.current_from_voltage")
+def _impedance(n, dtype):
+    v = _unit_sine(n, dtype)
+    t = _t(n, dtype)
+    z = ImpedanceSimulator()
+    return lambda: z.current_from_voltage(v, t, F_HZ)
+
+
+@case("ImpedanceSimulator.current_from_voltage[broadband]")
+def _impedance_broadband(n, dtype):
+    v = _unit_sine(n, dtype)
+    t = _t(n, np.float64)
+    z = ImpedanceSimulator()
+    return lambda: z.current_from_voltage(v, t, F_HZ, method="broadband")
+
+
+@case("ImpedanceSimulator.z_complex[single_shell batch]", dtypes=("float64",))
+def _impedance_batch(n, dtype):
+    # n = models x 32 frequencies; uncached, so every call evaluates
+    radius = np.linspace(2e-6, 8e-6, max(1, n // 32))
+    z = ImpedanceSimulator(model="single_shell", shell=SingleShell(cell_radius_m=radius), cache_bytes=0)
+    f = np.geomspace(1e5, 5e7, 32)
+    return lambda: z.z_complex(f)
+
+
+@case("TransitImpedance.current")
+def _transits(n, dtype):
+    # 1e6 cells per minute, 20 us transits
+    rng = np.random.default_rng(0)
+    duration_s = n / SAMPLE_RATE_HZ
+    arrival = np.sort(rng.uniform(0.0, duration_s, max(1, round(duration_s * 1e6 / 60))))
+    events = cell_events_from_size(arrival, 20e-6, 7e-6, channel_resistance_ohm=2e3, sensing_volume_m3=(40e-6) ** 3)
+    transits = TransitImpedance(ImpedanceSimulator(resistance=2e3), events, SAMPLE_RATE_HZ, dtype=dtype)
+    return lambda: transits.current(0, n, [F_HZ], [0.5], dc_offset=0.5)
+
+
+@case("OpAmpSimulator.run")
+def _opamp_run(n, dtype):
+    i = (_unit_sine(n, np.float64) * 1e-5).astype(dtype)
+    tia = OpAmpSimulator(sample_rate_hz=SAMPLE_RATE_HZ, noise_rms_voltage=1e-4, seed=0, dtype=dtype)
+    return lambda: tia.run(i)
+
+
+@case("ADCSimulator.run")
+def _adc_run(n, dtype):
+    x = _unit_sine(n, dtype)
+    adc = ADCSimulator(SAMPLE_RATE_HZ, seed=0, dtype=dtype, code_dtype=_code_dtype(dtype))
+    return lambda: adc.run(x)
+
+
+# -----------------------------------------------------------------------------
+# 3. Demodulation and end-to-end chain
+# -----------------------------------------------------------------------------
+
+@case("LockInDemodulator.process")
+def _lockin(n, dtype):
+    x = _unit_sine(n, dtype)
+    demod = LockInDemodulator(F_HZ, SAMPLE_RATE_HZ, dtype=dtype)
+    return lambda: demod.process(x)
+
+
+@case("demodulate_iq", dtypes=("float64",))
+def _demodulate_iq(n, dtype):
+    from ..dlia_chain import demodulate_iq
+    x = _unit_sine(n, dtype)
+    t = _t(n, dtype)
+    return lambda: demodulate_iq(x, t, F_HZ, SAMPLE_RATE_HZ, 10e3)
+
+
+@case("SignalChain.process")
+def _signal_chain(n, dtype):
+    x = _unit_sine(n, dtype)
+    chain = SignalChain.from_simulators(
+        DACSimulator(SAMPLE_RATE_HZ, seed=0, dtype=dtype),
+        ImpedanceSimulator(),
+        OpAmpSimulator(sample_rate_hz=SAMPLE_RATE_HZ, seed=1, dtype=dtype),
+        ADCSimulator(SAMPLE_RATE_HZ, seed=2, dtype=dtype, code_dtype=_code_dtype(dtype)),
+        f_excitation_hz=F_HZ,
+    )
+    return lambda: chain.process(x, keep=("adc_codes",))
+
+
+@case("run_signal_chain", dtypes=("float64",))
+def _run_signal_chain(n, dtype):
+    from ..dlia_chain import DAC_SAMPLE_RATE_HZ, run_signal_chain
+    from ..sweep import DEFAULT_CHAIN_PARAMS
+    t = np.arange(n) / DAC_SAMPLE_RATE_HZ
+    t_env = np.linspace(0.0, t[-1], 64)
+    env = 5e-3 * np.exp(-0.5 * ((t_env - t[-1] / 2) / (t[-1] / 8 + 1e-12)) ** 2)
+    p = DEFAULT_CHAIN_PARAMS
+    # 0.9 Vpp leaves AM headroom, so the chain does not rescale (and print) every call
+    return lambda: run_signal_chain(t, env, t_env, 0.9, p["dac"], p["adc"], p["opamp"])
+
+
+# -----------------------------------------------------------------------------
+# 4. Runner, baseline and comparison
+# -----------------------------------------------------------------------------
+
+def result_key(name: str, n: int, dtype: str) -> str:
+    return f"{name}|{n}|{dtype}"
+
+
+def _time_best(fn: Callable[[], object]) -> Tuple[float, int]:
+    """Best wall time over up to MAX_REPEATS calls (stops after MIN_TIME_S)."""
+    best, spent, repeats = np.inf, 0.0, 0
+    while repeats < MAX_REPEATS and (repeats == 0 or spent < MIN_TIME_S):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best, spent, repeats = min(best, dt), spent + dt, repeats + 1
+    return best, repeats
+
+
+def _peak_bytes(fn: Callable[[], object]) -> int:
+    """Peak traced allocation of one call, relative to the start of the call."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - base)
+
+
+def run_suite(
+    cases: Optional[Iterable[str]] = None,
+    sizes: Sequence[int] = SIZES,
+    dtypes: Sequence[str] = DTYPES,
+    measure_memory: bool = True,
+    report: Optional[Callable[[str, dict], None]] = None,
+) -> Dict[str, dict]:
+    """
+    Run the selected cases (default all) for every size and supported dtype.
+
+    Returns {result_key: {"case", "n", "dtype", "seconds", "samples_per_sec",
+    "peak_bytes", "repeats"}}; report(key, row) is called as rows finish.
+    """
+    names = list(CASES) if cases is None else list(cases)
+    unknown = [c for c in names if c not in CASES]
+    if unknown:
+        raise ValueError(f"unknown benchmark cases: {unknown}")
+    results: Dict[str, dict] = {}
+    for name in names:
+        spec = CASES[name]
+        for dtype in dtypes:
+            if dtype not in spec.dtypes:
+                continue
+            for n in (int(s) for s in sizes):
+                fn = spec.setup(n, np.dtype(dtype))
+                fn()  # warm-up (imports, caches, first-touch pages)
+                seconds, repeats = _time_best(fn)
+                row = {
+                    "case": name,
+                    "n": n,
+                    "dtype": dtype,
+                    "seconds": seconds,
+                    "samples_per_sec": n / seconds if seconds > 0 else float("inf"),
+                    "peak_bytes": _peak_bytes(fn) if measure_memory else None,
+                    "repeats": repeats,
+                }
+                key = result_key(name, n, dtype)
+                results[key] = row
+                if report is not None:
+                    report(key, row)
+                del fn
+    return results
+
+
+def save_baseline(path: str, results: Dict[str, dict]) -> None:
+    """Write results plus machine/library metadata as a JSON baseline."""
+    doc = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=1, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    margin: float = 0.25,
+) -> List[Tuple[str, float, float]]:
+    """
+    Cases slower than baseline by more than margin (fractional).
+
+    Returns [(key, baseline_seconds, seconds)] for every regression; keys
+    missing from either side are ignored.
+    """
+    regressions = []
+    for key, row in results.items():
+        ref = baseline.get(key)
+        if ref is None:
+            continue
+        if row["seconds"] > ref["seconds"] * (1.0 + margin):
+            regressions.append((key, ref["seconds"], row["seconds"]))
+    return regressions
+
+
+def _print_row(key: str, row: dict) -> None:
+    peak = "-" if row["peak_bytes"] is None else f"{row['peak_bytes'] / 2**20:9.2f}"
+    print(f"{row['case']:<40} {row['n']:>11.0e} {row['dtype']:>8} | "
+          f"{row['seconds']:10.3e} | {row['samples_per_sec']:10.3e} | {peak:>9}", flush=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", nargs="+", default=None, help=f"subset of: {', '.join(CASES)}")
+    parser.add_argument("--sizes", type=float, nargs="+", default=None)
+    parser.add_argument("--full", action="store_true", help="sizes 1e3 .. 1e8 (needs several GB)")
+    parser.add_argument("--dtypes", nargs="+", default=list(DTYPES) + ["uint16"])
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save", metavar="JSON", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="baseline to check against")
+    parser.add_argument("--margin", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes if args.sizes is not None else (SIZES_FULL if args.full else SIZES)
+    print(f"{'case':<40} {'samples':>11} {'dtype':>8} | {'best (s)':>10} | {'S/s':>10} | {'peak MiB':>9}")
+    print("-" * 100)
+    results = run_suite(args.cases, [int(s) for s in sizes], args.dtypes,
+                        measure_memory=not args.no_memory, report=_print_row)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        regressions = compare_results(results, load_baseline(args.compare), args.margin)
+        for key, ref, now in regressions:
+            print(f"REGRESSION {key}: {ref:.3e} s -> {now:.3e} s ({now / ref - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.margin:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
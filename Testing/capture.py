@@ -0,0 +1,197 @@
+"""
+Binary, memory-mapped storage for recorded captures (e.g. Test_Signal.txt).
+
+A text capture (one sample per line) is parsed once, in chunks, into a
+binary file: a fixed-size header with metadata (sample rate, dtype, length,
+units, source) followed by the raw little-endian samples. Later loads
+memory-map the binary file, so any region of a multi-gigabyte recording can
+be sliced without parsing or copying it.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import itertools
+import numpy as np
+from typing import Optional, Union
+
+CAPTURE_MAGIC = b"IACAPT01"
+CAPTURE_HEADER_SIZE = 512  # bytes; data starts here (64-byte aligned)
+CAPTURE_SUFFIX = ".bin"
+
+PathLike = Union[str, os.PathLike]
+
+
+def _write_header(f, meta: dict) -> None:
+    text = json.dumps(meta, sort_keys=True).encode("ascii")
+    room = CAPTURE_HEADER_SIZE - len(CAPTURE_MAGIC) - 1
+    if len(text) > room:
+        raise ValueError("capture metadata does not fit in the header")
+    f.seek(0)
+    f.write(CAPTURE_MAGIC + text.ljust(room) + b"\n")
+
+
+def _read_header(path: PathLike) -> dict:
+    with open(path, "rb") as f:
+        head = f.read(CAPTURE_HEADER_SIZE)
+    if len(head) < CAPTURE_HEADER_SIZE or not head.startswith(CAPTURE_MAGIC):
+        raise ValueError(f"{path} is not a binary capture file")
+    return json.loads(head[len(CAPTURE_MAGIC):].decode("ascii"))
+
+
+class Capture:
+    """
+    Memory-mapped recording with its metadata.
+
+    data is a read-only np.memmap; slicing it (or calling segment())
+    touches only the pages that are read.
+    """
+
+    def __init__(self, path: PathLike):
+        meta = _read_header(path)
+        self.path = os.fspath(path)
+        self.sample_rate_hz = float(meta["sample_rate_hz"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.units = meta.get("units", "")
+        self.source = meta.get("source", "")
+        length = int(meta["length"])
+        if length:
+            self.data = np.memmap(self.path, dtype=self.dtype, mode="r", offset=CAPTURE_HEADER_SIZE, shape=(length,))
+        else:
+            self.data = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return self.data.size
+
+    @property
+    def duration_s(self) -> float:
+        return len(self) / self.sample_rate_hz
+
+    def time(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Time base (s) for samples [start, stop)."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return np.arange(start, stop, dtype=float) / self.sample_rate_hz
+
+    def segment(self, start: int = 0, stop: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """(samples, t) for [start, stop); samples are a view of the memmap."""
+        return self.data[start:stop], self.time(start, stop)
+
+
+def write_capture(
+    path: PathLike,
+    samples: np.ndarray,
+    sample_rate_hz: float,
+    units: str = "V",
+    source: str = "",
+) -> Capture:
+    """Write an in-memory array as a binary capture and return it memory-mapped."""
+    samples = np.asarray(samples)
+    dtype = samples.dtype.newbyteorder("<")
+    meta = {
+        "sample_rate_hz": float(sample_rate_hz),
+        "dtype": dtype.str,
+        "length": int(samples.size),
+        "units": units,
+        "source": source,
+    }
+    with open(path, "wb") as f:
+        _write_header(f, meta)
+        samples.astype(dtype, copy=False).tofile(f)
+    return Capture(path)
+
+
+def ingest_text_capture(
+    text_path: PathLike,
+    sample_rate_hz: float,
+    binary_path: Optional[PathLike] = None,
+    dtype: Union[str, np.dtype] = "float64",
+    units: str = "V",
+    chunk_rows: int = 1_000_000,
+) -> Capture:
+    """
+    Convert a one-sample-per-line text capture into a binary capture.
+
+    The text is parsed chunk_rows lines at a time, so memory use does not
+    grow with the file size. binary_path defaults to text_path with the
+    suffix replaced by ".bin".
+
+    Returns:
+        The new Capture, memory-mapped.
+    """
+    if binary_path is None:
+        binary_path = os.path.splitext(os.fspath(text_path))[0] + CAPTURE_SUFFIX
+    dtype = np.dtype(dtype).newbyteorder("<")
+    meta = {
+        "sample_rate_hz": float(sample_rate_hz),
+        "dtype": dtype.str,
+        "length": 0,
+        "units": units,
+        "source": os.path.basename(os.fspath(text_path)),
+    }
+    tmp_path = os.fspath(binary_path) + ".tmp"
+    try:
+        with open(text_path, "r") as src, open(tmp_path, "wb") as dst:
+            _write_header(dst, meta)
+            while True:
+                lines = list(itertools.islice(src, chunk_rows))
+                if not lines:
+                    break
+                chunk = np.loadtxt(lines, dtype=dtype, ndmin=1)
+                chunk.tofile(dst)
+                meta["length"] += chunk.size
+            _write_header(dst, meta)
+        os.replace(tmp_path, binary_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return Capture(binary_path)
+
+
+def _matches(cap: Capture, sample_rate_hz: Optional[float], units: Optional[str], dtype) -> bool:
+    """True if cap agrees with every requested (non-None) ingest parameter."""
+    return (
+        (sample_rate_hz is None or cap.sample_rate_hz == float(sample_rate_hz))
+        and (units is None or cap.units == units)
+        and (dtype is None or cap.dtype == np.dtype(dtype).newbyteorder("<"))
+    )
+
+
+def open_capture(
+    path: PathLike,
+    sample_rate_hz: Optional[float] = None,
+    units: Optional[str] = None,
+    dtype: Optional[Union[str, np.dtype]] = None,
+) -> Capture:
+    """
+    Open a capture, ingesting text files on first use.
+
+    Binary captures are memory-mapped directly. For a text capture the
+    sibling ".bin" cache is used if it is newer than the text file and its
+    header agrees with every parameter given here; otherwise the text is
+    (re-)ingested with sample_rate_hz, dtype (default float64) and units
+    (default "V"). Parameters left as None accept whatever the cache holds.
+    """
+    path = os.fspath(path)
+    try:
+        return Capture(path)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    cache = os.path.splitext(path)[0] + CAPTURE_SUFFIX
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        try:
+            cap = Capture(cache)
+        except ValueError:
+            cap = None
+        if cap is not None and _matches(cap, sample_rate_hz, units, dtype):
+            return cap
+    if sample_rate_hz is None:
+        raise ValueError("sample_rate_hz is required to ingest a text capture")
+    return ingest_text_capture(
+        path,
+        sample_rate_hz,
+        cache,
+        dtype="float64" if dtype is None else dtype,
+        units="V" if units is None else units,
+    )
@@ -0,0 +1,302 @@
+"""
+Time-varying sensor impedance for simulated cell transits.
+
+A cell passing between the electrodes briefly adds its own impedance to the
+channel. Each transit is an equivalent circuit, a resistance delta_r_ohm
+(the medium the cell displaces) shunted by c_cell_f (its membrane), in
+series with the channel's Z(f) and weighted by a smooth bump profile over
+the transit. TransitImpedance turns an event list into the sensor current
+for a multitone excitation: the empty-channel current is synthesized for
+every sample, and each event then adds its exact admittance change only on
+the samples it covers. Cost and memory therefore scale with the number of
+transit samples, not with events x capture length, and captures are
+produced block by block.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import DTypeLike
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+try:
+    from .generators import ScratchBuffers, _float_dtype, _out_buffer, multifrequency_sine
+    from .impedance_models import CYTOPLASM_S_PER_M, MEDIUM_S_PER_M, MEMBRANE_F_PER_M2
+    from .simulators import ImpedanceSimulator
+except ImportError:
+    from generators import ScratchBuffers, _float_dtype, _out_buffer, multifrequency_sine
+    from impedance_models import CYTOPLASM_S_PER_M, MEDIUM_S_PER_M, MEMBRANE_F_PER_M2
+    from simulators import ImpedanceSimulator
+
+
+class CellEvents(NamedTuple):
+    """
+    Cell transits as parallel arrays (one entry per cell).
+
+    arrival_s is when the cell is centred over the electrodes and transit_s
+    the full duration of its impedance change. The cell's equivalent
+    circuit is delta_r_ohm in parallel with c_cell_f.
+    """
+    arrival_s: np.ndarray
+    transit_s: np.ndarray
+    delta_r_ohm: np.ndarray
+    c_cell_f: np.ndarray
+
+    @property
+    def count(self) -> int:
+        return self.arrival_s.size
+
+    def delta_z(self, f_hz: float) -> np.ndarray:
+        """Impedance each cell adds at the centre of its transit, at f_hz."""
+        w = 2.0 * np.pi * f_hz
+        return self.delta_r_ohm / (1.0 + 1j * w * self.delta_r_ohm * self.c_cell_f)
+
+
+def cell_events_from_size(
+    arrival_s: np.ndarray,
+    transit_s: np.ndarray,
+    diameter_m: np.ndarray,
+    channel_resistance_ohm: float,
+    sensing_volume_m3: float,
+    membrane_f_per_m2: float = MEMBRANE_F_PER_M2,
+    cytoplasm_s_per_m: float = CYTOPLASM_S_PER_M,
+    medium_s_per_m: float = MEDIUM_S_PER_M,
+) -> CellEvents:
+    """
+    Equivalent circuits of spherical cells from their diameters.
+
+    delta_r_ohm is Maxwell's low-frequency result for an insulating sphere
+    at volume fraction phi of the sensing volume, 1.5 * phi * R_channel.
+    c_cell_f puts the circuit's corner at the single-shell beta-dispersion
+    frequency 1 / (2 pi r c_m (1/sigma_i + 1/(2 sigma_m))), above which the
+    membrane shorts and the cell becomes nearly transparent.
+    """
+    arrival_s = np.atleast_1d(np.asarray(arrival_s, dtype=float))
+    transit_s = np.broadcast_to(np.asarray(transit_s, dtype=float), arrival_s.shape).copy()
+    diameter_m = np.broadcast_to(np.asarray(diameter_m, dtype=float), arrival_s.shape)
+    if np.any(diameter_m <= 0) or np.any(transit_s <= 0) or sensing_volume_m3 <= 0:
+        raise ValueError("diameters, transit times and sensing_volume_m3 must be positive")
+    radius = diameter_m / 2.0
+    phi = (4.0 / 3.0) * np.pi * radius ** 3 / sensing_volume_m3
+    delta_r = 1.5 * phi * channel_resistance_ohm
+    tau = radius * membrane_f_per_m2 * (1.0 / cytoplasm_s_per_m + 0.5 / medium_s_per_m)
+    return CellEvents(arrival_s, transit_s, delta_r, tau / delta_r)
+
+
+def transit_profile(x: np.ndarray) -> np.ndarray:
+    """
+    Transit weight at x = (t - arrival) / transit: (1 - 4 x^2)^2 on |x| < 1/2.
+
+    A smooth bump (zero value and slope at the ends, peak 1), so an event
+    rendered only over its own samples has no truncation step.
+    """
+    u = 1.0 - 4.0 * np.square(x)
+    np.maximum(u, 0.0, out=u)
+    return np.square(u, out=u)
+
+
+class TransitImpedance:
+    """
+    Channel impedance modulated by a list of cell transits.
+
+    While cells are in the channel, Z(t, f) = Z_channel(f) +
+    sum_e p_e(t) dZ_e(f), with p_e the transit_profile of event e. The
+    current for V = dc_offset + sum_k a_k sin(2 pi f_k t + phi_k) is
+    computed quasi-statically (each transit lasts many carrier periods):
+    I = Im(Y(t, f_k) a_k exp(j(2 pi f_k t + phi_k))) per tone. Overlapping
+    transits add their admittance changes, which is exact whenever they do
+    not overlap.
+
+    Events are sorted by first sample once. A block only looks up the
+    events that overlap it and evaluates them on their own samples, with
+    per-event phasors rotated from a table instead of recomputing sin/cos.
+    """
+
+    def __init__(
+        self,
+        channel: ImpedanceSimulator,
+        events: CellEvents,
+        sample_rate_hz: float,
+        dtype: DTypeLike = np.float64,
+    ):
+        """
+        Args:
+            channel: Impedance of the empty channel.
+            events: Cell transits (any order).
+            sample_rate_hz: Output sample rate (Hz).
+            dtype: Output precision, float64 or float32.
+        """
+        if sample_rate_hz <= 0:
+            raise ValueError("sample_rate_hz must be positive")
+        channel._require_single("TransitImpedance")
+        self.channel = channel
+        self.sample_rate_hz = sample_rate_hz
+        self.dtype = _float_dtype(dtype)
+        self._scratch = ScratchBuffers()
+        half = 0.5 * np.asarray(events.transit_s, dtype=float) * sample_rate_hz
+        centre = np.asarray(events.arrival_s, dtype=float) * sample_rate_hz
+        # Samples strictly inside the bump; the end points have zero weight
+        first = np.maximum(np.floor(centre - half).astype(np.int64) + 1, 0)
+        end = np.maximum(np.ceil(centre + half).astype(np.int64), first)
+        order = np.argsort(first, kind="stable")
+        self.events = CellEvents(*(np.asarray(field)[order] for field in events))
+        self._first = first[order]
+        self._end = end[order]
+        self._centre = centre[order]
+        self._inv_width = 1.0 / (2.0 * half[order])
+        self._max_width = int(np.max(self._end - self._first, initial=0))
+
+    def _channel_y(self, f_hz: np.ndarray) -> np.ndarray:
+        f = np.asarray(f_hz, dtype=float).copy()
+        # f -> 0 limit at DC, as for AdmittanceFilter
+        f[f == 0.0] = 1e-9
+        return 1.0 / self.channel.z_complex(f)
+
+    def _touched(self, start: int, n: int):
+        """Absolute sample indices, event numbers and profile weights of one block."""
+        lo = np.searchsorted(self._first, start - self._max_width, side="right")
+        hi = np.searchsorted(self._first, start + n, side="left")
+        ev = np.arange(lo, hi)
+        ev = ev[self._end[lo:hi] > start]
+        a = np.maximum(self._first[ev], start)
+        widths = np.minimum(self._end[ev], start + n) - a
+        total = int(widths.sum())
+        owner = np.repeat(np.arange(ev.size), widths)
+        idx = np.arange(total, dtype=np.int64)
+        idx -= np.repeat(np.cumsum(widths) - widths, widths)
+        local = idx + np.repeat(a - self._first[ev], widths)
+        idx += np.repeat(a, widths)
+        x = (idx - self._centre[ev][owner]) * self._inv_width[ev][owner]
+        return idx, ev, owner, local, transit_profile(x)
+
+    def current(
+        self,
+        start: int,
+        n: int,
+        frequencies_hz: np.ndarray,
+        amplitudes: np.ndarray,
+        phases: Optional[np.ndarray] = None,
+        dc_offset: float = 0.0,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Sensor current (A) for samples start .. start + n - 1.
+
+        Args:
+            start: Index of the first sample (t = start / sample_rate_hz).
+            n: Number of samples.
+            frequencies_hz: Excitation tone frequencies (Hz).
+            amplitudes: Tone amplitudes (V).
+            phases: Tone phases (rad); default zero.
+            dc_offset: DC part of the excitation (V).
+            out: Optional output array (shape (n,), dtype self.dtype).
+        """
+        f = np.atleast_1d(np.asarray(frequencies_hz, dtype=float))
+        a = np.broadcast_to(np.asarray(amplitudes, dtype=float), f.shape)
+        ph = np.zeros_like(f) if phases is None else np.broadcast_to(np.asarray(phases, dtype=float), f.shape)
+        y0 = self._channel_y(f)
+        y0_dc = self._channel_y(np.zeros(1))[0]
+        out = _out_buffer(out, (n,), self.dtype)
+        t = (start + np.arange(n, dtype=np.float64)) / self.sample_rate_hz
+        multifrequency_sine(
+            t, f, a * np.abs(y0), ph + np.angle(y0), dc_offset=dc_offset * y0_dc.real,
+            dtype=self.dtype, out=out, scratch=self._scratch,
+        )
+        if self.events.count == 0 or n == 0:
+            return out
+        idx, ev, owner, local, p = self._touched(start, n)
+        if idx.size == 0:
+            return out
+        m = idx.size
+        delta = self._scratch.get("delta", m, np.float64)
+        delta.fill(0.0)
+        if dc_offset != 0.0:
+            dc_re, _ = self._delta_y(0.0, y0_dc, ev, owner, p)
+            dc_re *= dc_offset
+            delta += dc_re
+        steps = np.arange(self._max_width)
+        rot = self._scratch.get("rotation", m, np.float64)
+        for fk, ak, phk, yk in zip(f, a, ph, y0):
+            cycles = fk / self.sample_rate_hz
+            # Carrier phasor at each event's first sample, rotated along the event
+            first_cycles = np.mod(self._first[ev] * cycles, 1.0)
+            phasor = ak * np.exp(1j * (2.0 * np.pi * first_cycles + phk))
+            rotation = np.exp(2j * np.pi * np.mod(steps * cycles, 1.0))
+            dy_re, dy_im = self._delta_y(fk, yk, ev, owner, p, phasor)
+            # Im(dY * phasor * rotation)
+            dy_re *= np.take(rotation.imag, local, out=rot)
+            dy_im *= np.take(rotation.real, local, out=rot)
+            delta += dy_re
+            delta += dy_im
+        out += np.bincount(idx - start, weights=delta, minlength=n).astype(self.dtype, copy=False)
+        return out
+
+    def _delta_y(
+        self,
+        f_hz: float,
+        y0: complex,
+        ev: np.ndarray,
+        owner: np.ndarray,
+        p: np.ndarray,
+        scale: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Real and imaginary parts of (Y(t) - Y_channel) * scale[event] at f_hz
+        on the touched samples, in reused scratch arrays.
+        """
+        z0 = 1.0 / y0
+        dz = self.events.delta_z(f_hz)[ev] if f_hz else self.events.delta_r_ohm[ev] + 0j
+        # 1/(z0 + p dz) - 1/z0 = -p (dz/z0) conj(q) / |q|^2, q = z0 + p dz,
+        # which avoids the cancellation of the difference
+        g = -dz / z0
+        if scale is not None:
+            g *= scale
+        m = p.size
+        get = self._scratch.get
+        q_re = np.take(dz.real, owner, out=get("q_re", m, np.float64))
+        q_re *= p
+        q_re += z0.real
+        q_im = np.take(dz.imag, owner, out=get("q_im", m, np.float64))
+        q_im *= p
+        q_im += z0.imag
+        w = np.square(q_re, out=get("w", m, np.float64))
+        tmp = np.square(q_im, out=get("tmp", m, np.float64))
+        w += tmp
+        np.divide(p, w, out=w)
+        g_re = np.take(g.real, owner, out=get("g_re", m, np.float64))
+        g_im = np.take(g.imag, owner, out=get("g_im", m, np.float64))
+        re = np.multiply(g_re, q_re, out=get("re", m, np.float64))
+        re += np.multiply(g_im, q_im, out=tmp)
+        re *= w
+        im = np.multiply(g_im, q_re, out=get("im", m, np.float64))
+        im -= np.multiply(g_re, q_im, out=tmp)
+        im *= w
+        return re, im
+
+    def admittance(self, f_hz: float, start: int, n: int) -> np.ndarray:
+        """Complex Y(t) at f_hz for samples start .. start + n - 1."""
+        y0 = self._channel_y(np.array([f_hz]))[0]
+        y = np.full(n, y0, dtype=complex)
+        if self.events.count and n:
+            idx, ev, owner, _, p = self._touched(start, n)
+            dy_re, dy_im = self._delta_y(f_hz, y0, ev, owner, p)
+            y += np.bincount(idx - start, weights=dy_re, minlength=n)
+            y += 1j * np.bincount(idx - start, weights=dy_im, minlength=n)
+        return y
+
+    def current_blocks(
+        self,
+        n_samples: int,
+        block_size: int,
+        frequencies_hz: np.ndarray,
+        amplitudes: np.ndarray,
+        phases: Optional[np.ndarray] = None,
+        dc_offset: float = 0.0,
+    ) -> Iterator[np.ndarray]:
+        """Sensor current for samples 0 .. n_samples - 1, block_size at a time."""
+        if block_size < 1:
+            raise ValueError("block_size must be >= 1")
+        for start in range(0, n_samples, block_size):
+            yield self.current(
+                start, min(block_size, n_samples - start), frequencies_hz, amplitudes, phases, dc_offset
+            )
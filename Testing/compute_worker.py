@@ -0,0 +1,152 @@
+"""
+Background computation with debounced, superseding requests.
+
+ComputeWorker runs a function on a worker thread for the most recent
+request only: requests arriving within the debounce window collapse into
+one, and a request submitted while a computation is running marks that
+computation as stale. The function receives an is_cancelled() callable it
+can poll between steps (raising Cancelled to stop early); stale results are
+dropped. The GUI thread collects finished results with poll(), e.g. from a
+timer, so the event loop never blocks on a computation.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+
+class Cancelled(Exception):
+    """Raised by a computation that noticed it has been superseded."""
+
+
+class WorkerResult(NamedTuple):
+    """A finished computation: its request, and a result or an exception."""
+    generation: int
+    request: Any
+    result: Any
+    error: Optional[BaseException]
+
+
+class ComputeWorker:
+    """
+    Single background thread running fn(request, is_cancelled) -> result.
+
+    submit() never blocks; poll() returns the newest finished, non-stale
+    result once (or None).
+    """
+
+    def __init__(self, fn: Callable[[Any, Callable[[], bool]], Any], debounce_s: float = 0.2):
+        """
+        Args:
+            fn: Computation; called on the worker thread.
+            debounce_s: Quiet time after the last submit() before computing.
+        """
+        if debounce_s < 0:
+            raise ValueError("debounce_s must be >= 0")
+        self.fn = fn
+        self.debounce_s = float(debounce_s)
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._request: Any = None
+        self._pending = False
+        self._submitted_at = 0.0
+        self._running: Optional[int] = None
+        self._result: Optional[WorkerResult] = None
+        self._closed = False
+        self.completed = 0
+        self.superseded = 0
+        self._thread = threading.Thread(target=self._loop, name="ComputeWorker", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """True while a request is waiting or being computed."""
+        with self._cond:
+            return self._pending or self._running is not None
+
+    def submit(self, request: Any) -> int:
+        """Queue request, superseding any waiting or running one; returns its generation."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("worker is closed")
+            self._generation += 1
+            self._request = request
+            self._pending = True
+            self._submitted_at = time.monotonic()
+            # wait() blocks on the same condition: wake everyone so the
+            # worker cannot lose its wakeup to a waiter
+            self._cond.notify_all()
+            return self._generation
+
+    def cancel(self) -> None:
+        """Drop the waiting request and mark the running one stale."""
+        with self._cond:
+            self._generation += 1
+            self._pending = False
+            self._request = None
+            self._cond.notify_all()
+
+    def poll(self) -> Optional[WorkerResult]:
+        """Take the newest finished result, if any."""
+        with self._cond:
+            result, self._result = self._result, None
+            return result
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until idle (nothing waiting or running); False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self) -> None:
+        """Stop the worker thread (a running computation is marked stale)."""
+        with self._cond:
+            self._closed = True
+            self._generation += 1
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                # Wait for a request, then for debounce_s without a newer one
+                while not self._closed:
+                    if self._pending:
+                        quiet = time.monotonic() - self._submitted_at
+                        if quiet >= self.debounce_s:
+                            break
+                        self._cond.wait(self.debounce_s - quiet)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                generation, request = self._generation, self._request
+                self._pending = False
+                self._running = generation
+
+            result, error = None, None
+            try:
+                result = self.fn(request, lambda: self._is_stale(generation))
+            except Cancelled:
+                error = Cancelled()
+            except Exception as e:  # delivered to the caller via poll()
+                error = e
+
+            with self._cond:
+                self._running = None
+                if isinstance(error, Cancelled) or self._is_stale(generation):
+                    self.superseded += 1
+                else:
+                    self.completed += 1
+                    self._result = WorkerResult(generation, request, result, error)
+                self._cond.notify_all()
@@ -0,0 +1,47 @@
+"""
+Shared pytest fixtures for the testbench.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+import numpy as np
+import pytest
+
+from .simulators import DACSimulator, ImpedanceSimulator, OpAmpSimulator, ADCSimulator
+from .signal_chain import SignalChain
+
+
+@pytest.fixture
+def analog_chain() -> Callable[..., SignalChain]:
+    """
+    Factory for the streaming DAC -> impedance -> TIA -> ADC test chain.
+
+    The TIA (2 kOhm into a ~2 kOhm cell, +1 V output offset) maps the
+    excitation_blocks() sine at 0.1-0.9 V from the DAC to 0.9-0.1 V, so
+    the ADC codes span most of the 16-bit range instead of clipping at 0.
+    dac_kwargs, tia_kwargs and adc_kwargs override the simulator settings.
+    """
+
+    def build(
+        sample_rate_hz: float = 250e6,
+        adc_sample_rate_hz: Optional[float] = None,
+        f_excitation_hz: float = 1e6,
+        dtype=np.float64,
+        demodulator=None,
+        dac_kwargs: Optional[dict] = None,
+        tia_kwargs: Optional[dict] = None,
+        adc_kwargs: Optional[dict] = None,
+    ) -> SignalChain:
+        tia = dict(transimpedance_ohms=2e3, bandwidth_hz=30e6, offset_voltage=1.0, noise_rms_voltage=1e-6, seed=20)
+        return SignalChain.from_simulators(
+            dac=DACSimulator(sample_rate_hz, dtype=dtype, **{"seed": 10, **(dac_kwargs or {})}),
+            impedance=ImpedanceSimulator(resistance=2e3, capacitance=2e-12),
+            tia=OpAmpSimulator(sample_rate_hz=sample_rate_hz, dtype=dtype, **{**tia, **(tia_kwargs or {})}),
+            adc=ADCSimulator(adc_sample_rate_hz or sample_rate_hz, dtype=dtype, **{"seed": 30, **(adc_kwargs or {})}),
+            demodulator=demodulator,
+            f_excitation_hz=f_excitation_hz,
+        )
+
+    return build
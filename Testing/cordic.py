@@ -0,0 +1,311 @@
+"""
+Fixed-point CORDIC model configured like the Xilinx CORDIC IP (FPGA/.../ip/cordic_0).
+
+Vectorized over whole arrays: each CORDIC iteration is one NumPy pass over
+all samples, so millions of X/Y pairs run through the fixed-point model in
+a fraction of a second. Supports translate mode (README step 9: magnitude
+and phase from X/Y) and rotate mode (Sin_and_Cos, as cordic_0 is currently
+configured), with configurable iterations, word widths, coarse rotation and
+output rounding, plus an exporter for golden input/output vectors.
+
+Number formats follow the IP's SignedFraction setting: X, Y, magnitude,
+sin and cos are 1QN (2 integer bits incl. sign, width-2 fraction bits);
+phase is 2QN radians (3 integer bits, width-3 fraction bits).
+
+The model is exact integer arithmetic (tests compare it bit for bit with a
+scalar reference of the same iteration), but its internal choices (guard
+bits, atan table rounding, the start vector in rotate mode) follow the IP
+documentation, not Xilinx's cordic_v6_0 bitacc C model, which is not part of
+this repository. Until the exported golden vectors have been checked against
+the IP in simulation, expect LSB-level differences from the hardware.
+"""
+
+from __future__ import annotations
+
+import os
+import numpy as np
+from typing import Optional, Tuple
+
+# CORDIC gain for an infinite number of iterations
+CORDIC_GAIN = float(np.prod(np.sqrt(1.0 + 2.0 ** (-2.0 * np.arange(64)))))
+
+ROUND_MODES = ("truncate", "round_pos_inf", "round_pos_neg_inf", "nearest_even")
+
+
+def _round_shift(x: np.ndarray, shift: int, round_mode: str) -> np.ndarray:
+    """Drop `shift` LSBs of signed integers with the IP's rounding modes."""
+    if shift <= 0:
+        return x << -shift
+    if round_mode == "truncate":
+        return x >> shift
+    half = 1 << (shift - 1)
+    if round_mode == "round_pos_inf":
+        return (x + half) >> shift
+    if round_mode == "round_pos_neg_inf":
+        return np.where(x >= 0, (x + half) >> shift, -((-x + half) >> shift))
+    if round_mode == "nearest_even":
+        q = x >> shift
+        rem = x - (q << shift)
+        up = (rem > half) | ((rem == half) & ((q & 1) == 1))
+        return q + up
+    raise ValueError(f"round_mode must be one of {ROUND_MODES}")
+
+
+def _atan_table(n_iterations: int, frac_bits: int) -> np.ndarray:
+    return np.round(np.arctan(2.0 ** -np.arange(n_iterations)) * (1 << frac_bits)).astype(np.int64)
+
+
+def _check_width(codes: np.ndarray, width: int, name: str) -> np.ndarray:
+    codes = np.asarray(codes)
+    if not np.issubdtype(codes.dtype, np.integer):
+        raise ValueError(f"{name} must be integer codes")
+    lo, hi = -(1 << (width - 1)), (1 << (width - 1)) - 1
+    if codes.size and (codes.min() < lo or codes.max() > hi):
+        raise ValueError(f"{name} does not fit in {width} bits")
+    return codes.astype(np.int64)
+
+
+class CordicConfig:
+    """
+    CORDIC IP settings. Defaults mirror cordic_0: 16-bit input/output,
+    coarse rotation on, truncation, automatic iterations/precision.
+    """
+
+    def __init__(
+        self,
+        input_width: int = 16,
+        output_width: int = 16,
+        phase_width: Optional[int] = None,
+        n_iterations: Optional[int] = None,
+        guard_bits: Optional[int] = None,
+        coarse_rotation: bool = True,
+        round_mode: str = "truncate",
+        scale_compensation: bool = False,
+    ):
+        """
+        Args:
+            input_width: Width of X/Y (translate) or phase (rotate) inputs.
+            output_width: Width of magnitude/sin/cos outputs.
+            phase_width: Width of phase words; default output_width
+                (translate) or input_width (rotate).
+            n_iterations: Micro-rotations; None = output_width (IP "0" = auto).
+            guard_bits: Extra internal LSBs; None = ceil(log2(n_iterations)) + 1.
+            coarse_rotation: Pre-rotate by +/-pi/2 for full-circle range.
+            round_mode: One of ROUND_MODES.
+            scale_compensation: Divide translate magnitude by the CORDIC gain.
+        """
+        if round_mode not in ROUND_MODES:
+            raise ValueError(f"round_mode must be one of {ROUND_MODES}")
+        self.input_width = input_width
+        self.output_width = output_width
+        self.phase_width = phase_width
+        self.n_iterations = output_width if n_iterations is None else int(n_iterations)
+        self.guard_bits = (
+            int(np.ceil(np.log2(self.n_iterations))) + 1 if guard_bits is None else int(guard_bits)
+        )
+        self.coarse_rotation = coarse_rotation
+        self.round_mode = round_mode
+        self.scale_compensation = scale_compensation
+
+    @property
+    def gain(self) -> float:
+        """CORDIC gain for the configured number of iterations."""
+        i = np.arange(self.n_iterations)
+        return float(np.prod(np.sqrt(1.0 + 2.0 ** (-2.0 * i))))
+
+
+def cordic_translate(
+    x: np.ndarray,
+    y: np.ndarray,
+    config: Optional[CordicConfig] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Translate (vectoring) mode: integer X/Y codes -> magnitude and phase codes.
+
+    x, y: 1QN codes of config.input_width bits. Returns (magnitude, phase):
+    magnitude in 1QN at output_width (includes the CORDIC gain unless
+    scale_compensation), phase in 2QN radians at phase_width.
+    """
+    cfg = config or CordicConfig()
+    phase_width = cfg.phase_width or cfg.output_width
+    x = _check_width(x, cfg.input_width, "x")
+    y = _check_width(y, cfg.input_width, "y")
+    g = cfg.guard_bits
+    frac_in = cfg.input_width - 2
+    frac_int = max(frac_in, cfg.output_width - 2) + g
+    x = x << (frac_int - frac_in)
+    y = y << (frac_int - frac_in)
+    zfrac = phase_width - 3 + g
+    z = np.zeros_like(x)
+
+    if cfg.coarse_rotation:
+        # Rotate the left half-plane by -/+pi/2 into the right half-plane
+        half_pi = int(round(np.pi / 2 * (1 << zfrac)))
+        left = x < 0
+        up = left & (y >= 0)
+        down = left & (y < 0)
+        x, y = np.where(up, y, np.where(down, -y, x)), np.where(up, -x, np.where(down, x, y))
+        z = np.where(up, half_pi, np.where(down, -half_pi, 0))
+
+    atan = _atan_table(cfg.n_iterations, zfrac)
+    for i in range(cfg.n_iterations):
+        pos = y >= 0
+        dx, dy = y >> i, x >> i
+        x = np.where(pos, x + dx, x - dx)
+        y = np.where(pos, y - dy, y + dy)
+        z = np.where(pos, z + atan[i], z - atan[i])
+
+    if cfg.scale_compensation:
+        comp_bits = 18
+        comp = int(round((1 << comp_bits) / cfg.gain))
+        x = _round_shift(x * comp, comp_bits, cfg.round_mode)
+    magnitude = _round_shift(x, frac_int - (cfg.output_width - 2), cfg.round_mode)
+    phase = _round_shift(z, g, cfg.round_mode)
+    return magnitude, phase
+
+
+def cordic_rotate(
+    phase: np.ndarray,
+    config: Optional[CordicConfig] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rotate mode with unit input vector (IP "Sin_and_Cos", as cordic_0).
+
+    phase: 2QN radian codes of phase_width (default input_width) bits.
+    Returns (cos, sin) as 1QN codes at output_width; the start vector is
+    pre-scaled by 1/gain so the outputs have unit amplitude.
+    """
+    cfg = config or CordicConfig()
+    phase_width = cfg.phase_width or cfg.input_width
+    z = _check_width(phase, phase_width, "phase")
+    g = cfg.guard_bits
+    zfrac = phase_width - 3 + g
+    z = z << g
+    frac_int = cfg.output_width - 2 + g
+    x = np.full(z.shape, int(round((1 << frac_int) / cfg.gain)), dtype=np.int64)
+    y = np.zeros_like(x)
+
+    flip = np.zeros(z.shape, dtype=bool)
+    if cfg.coarse_rotation:
+        # Fold |phase| > pi/2 by pi and negate the result
+        half_pi = int(round(np.pi / 2 * (1 << zfrac)))
+        pi = int(round(np.pi * (1 << zfrac)))
+        hi, lo = z > half_pi, z < -half_pi
+        z = np.where(hi, z - pi, np.where(lo, z + pi, z))
+        flip = hi | lo
+
+    atan = _atan_table(cfg.n_iterations, zfrac)
+    for i in range(cfg.n_iterations):
+        pos = z >= 0
+        dx, dy = y >> i, x >> i
+        x = np.where(pos, x - dx, x + dx)
+        y = np.where(pos, y + dy, y - dy)
+        z = np.where(pos, z - atan[i], z + atan[i])
+
+    x = np.where(flip, -x, x)
+    y = np.where(flip, -y, y)
+    shift = frac_int - (cfg.output_width - 2)
+    return _round_shift(x, shift, cfg.round_mode), _round_shift(y, shift, cfg.round_mode)
+
+
+def cordic_magnitude_phase(
+    X: np.ndarray,
+    Y: np.ndarray,
+    config: Optional[CordicConfig] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Float convenience wrapper: quantize X/Y in [-1, 1), run the fixed-point
+    translate model, and return (R, phi) in volts-equivalent and radians.
+
+    R is divided by the CORDIC gain (unless the IP compensates it) so it is
+    directly comparable to sqrt(X^2 + Y^2).
+    """
+    cfg = config or CordicConfig()
+    frac_in = cfg.input_width - 2
+    hi = (1 << (cfg.input_width - 1)) - 1
+    xq = np.clip(np.floor(np.asarray(X, dtype=float) * (1 << frac_in)), -hi - 1, hi).astype(np.int64)
+    yq = np.clip(np.floor(np.asarray(Y, dtype=float) * (1 << frac_in)), -hi - 1, hi).astype(np.int64)
+    mag, ph = cordic_translate(xq, yq, cfg)
+    R = mag / float(1 << (cfg.output_width - 2))
+    if not cfg.scale_compensation:
+        R = R / cfg.gain
+    phase_width = cfg.phase_width or cfg.output_width
+    return R, ph / float(1 << (phase_width - 3))
+
+
+# -----------------------------------------------------------------------------
+# Golden vector export
+# -----------------------------------------------------------------------------
+
+def _field_bits(width: int) -> int:
+    """AXI4-Stream fields are sign-extended to a whole number of bytes."""
+    return 8 * ((width + 7) // 8)
+
+
+def _pack(fields: list[tuple[np.ndarray, int]]) -> list[int]:
+    """Pack signed fields (first = LSBs) into unsigned TDATA words."""
+    words = np.zeros(fields[0][0].shape, dtype=object)
+    offset = 0
+    for values, width in fields:
+        bits = _field_bits(width)
+        words = words + ((values.astype(object) & ((1 << bits) - 1)) << offset)
+        offset += bits
+    return [int(w) for w in words]
+
+
+def export_golden_vectors(
+    directory: str | os.PathLike,
+    mode: str = "rotate",
+    inputs: Optional[Tuple[np.ndarray, ...]] = None,
+    config: Optional[CordicConfig] = None,
+    prefix: str = "cordic_0",
+) -> Tuple[str, str]:
+    """
+    Write golden stimulus/response files for the cordic_0 simulation.
+
+    One hex TDATA word per line (readable by $readmemh in Verilog/SV or
+    hread in VHDL), packed like the IP's AXI4-Stream ports:
+      rotate:    s_axis_phase_tdata = phase;      m_axis_dout_tdata = {sin, cos}
+      translate: s_axis_cartesian_tdata = {y, x}; m_axis_dout_tdata = {phase, magnitude}
+
+    inputs: (phase,) for rotate or (x, y) for translate, as integer codes.
+    Default: a full sweep of all phase codes / a circle of 4096 X/Y points.
+    Returns (stimulus_path, response_path).
+    """
+    cfg = config or CordicConfig()
+    if mode == "rotate":
+        phase_width = cfg.phase_width or cfg.input_width
+        if inputs is None:
+            half = 1 << (phase_width - 1)
+            limit = int(np.floor(np.pi * (1 << (phase_width - 3))))
+            inputs = (np.arange(-min(half, limit), min(half - 1, limit) + 1),)
+        (phase,) = inputs
+        phase = np.asarray(phase, dtype=np.int64)
+        cos, sin = cordic_rotate(phase, cfg)
+        stimulus = _pack([(phase, phase_width)])
+        response = _pack([(cos, cfg.output_width), (sin, cfg.output_width)])
+        in_bits = _field_bits(phase_width)
+        out_bits = 2 * _field_bits(cfg.output_width)
+    elif mode == "translate":
+        phase_width = cfg.phase_width or cfg.output_width
+        if inputs is None:
+            theta = np.linspace(-np.pi, np.pi, 4096, endpoint=False)
+            amp = 0.9 * (1 << (cfg.input_width - 2))
+            inputs = (np.round(amp * np.cos(theta)), np.round(amp * np.sin(theta)))
+        x, y = (np.asarray(v).astype(np.int64) for v in inputs)
+        magnitude, phase = cordic_translate(x, y, cfg)
+        stimulus = _pack([(x, cfg.input_width), (y, cfg.input_width)])
+        response = _pack([(magnitude, cfg.output_width), (phase, phase_width)])
+        in_bits = 2 * _field_bits(cfg.input_width)
+        out_bits = _field_bits(cfg.output_width) + _field_bits(phase_width)
+    else:
+        raise ValueError("mode must be 'rotate' or 'translate'")
+
+    os.makedirs(directory, exist_ok=True)
+    stim_path = os.path.join(directory, f"{prefix}_{mode}_stimulus.hex")
+    resp_path = os.path.join(directory, f"{prefix}_{mode}_response.hex")
+    for path, words, bits in ((stim_path, stimulus, in_bits), (resp_path, response, out_bits)):
+        digits = bits // 4
+        with open(path, "w") as f:
+            f.writelines(f"{w:0{digits}X}\n" for w in words)
+    return stim_path, resp_path
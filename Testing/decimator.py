@@ -0,0 +1,283 @@
+"""
+Decimator stage for the impedance analyzer testbench (README DSP step 8).
+
+CIC decimator followed by a CIC-compensating FIR decimator. Both support
+float arithmetic (unity DC gain) and bit-true fixed-point arithmetic
+(integer samples, full-precision accumulators, truncated/rounded outputs)
+and keep their state between process() calls, so a stream can be
+decimated block by block with the same result as one call.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin2
+
+
+def _as_samples(x: np.ndarray, fixed_point: bool) -> np.ndarray:
+    """Validate/convert a block to int64 (fixed point) or float64."""
+    x = np.asarray(x)
+    if not fixed_point:
+        return x.astype(float, copy=False)
+    if not np.issubdtype(x.dtype, np.integer):
+        raise ValueError("fixed-point decimators take integer samples")
+    return x.astype(np.int64, copy=False)
+
+
+def _saturate(x: np.ndarray, n_bits: int) -> np.ndarray:
+    """Clip signed integers to the n_bits two's complement range."""
+    hi = (1 << (n_bits - 1)) - 1
+    return np.clip(x, -hi - 1, hi)
+
+
+class CICDecimator:
+    """
+    N-stage CIC decimator: rate R, differential delay M.
+
+    Implemented as N cascaded length-R*M moving sums (the CIC transfer
+    function (sum_{k<RM} z^-k)^N) followed by keeping every R-th sample.
+    Moving sums are formed from block-local cumulative sums, so float mode
+    does not drift on long streams and fixed-point mode is exact in int64.
+
+    Fixed point: integer input of input_bits, register growth
+    N*ceil(log2(R*M)) bits; the output is truncated (LSBs discarded, as in
+    the FPGA CIC IP) to output_bits. Float: output divided by (R*M)^N.
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        order: int = 4,
+        diff_delay: int = 1,
+        fixed_point: bool = False,
+        input_bits: int = 16,
+        output_bits: Optional[int] = None,
+        sample_rate_hz: Optional[float] = None,
+    ):
+        if rate < 1 or order < 1 or diff_delay < 1:
+            raise ValueError("rate, order and diff_delay must be >= 1")
+        self.rate = int(rate)
+        self.order = int(order)
+        self.diff_delay = int(diff_delay)
+        self.fixed_point = fixed_point
+        self.input_bits = input_bits
+        self.sample_rate_hz = sample_rate_hz
+        self.gain = (self.rate * self.diff_delay) ** self.order
+        self.full_output_bits = input_bits + int(np.ceil(self.order * np.log2(self.rate * self.diff_delay)))
+        if fixed_point and self.full_output_bits > 63:
+            raise ValueError(f"register width {self.full_output_bits} bits exceeds int64")
+        self.output_bits = self.full_output_bits if output_bits is None else int(output_bits)
+        if self.output_bits > self.full_output_bits:
+            raise ValueError("output_bits cannot exceed the full register width")
+        self._shift = self.full_output_bits - self.output_bits
+        self.reset()
+
+    @property
+    def output_rate_hz(self) -> Optional[float]:
+        return None if self.sample_rate_hz is None else self.sample_rate_hz / self.rate
+
+    @property
+    def dc_gain(self) -> float:
+        """Output units per input unit at DC."""
+        if not self.fixed_point:
+            return 1.0
+        return self.gain / float(1 << self._shift)
+
+    def reset(self) -> None:
+        """Clear the moving-sum histories and decimation phase."""
+        dtype = np.int64 if self.fixed_point else float
+        span = self.rate * self.diff_delay
+        self._hist = [np.zeros(span - 1, dtype=dtype) for _ in range(self.order)]
+        self._skip = 0
+
+    def frequency_response(self, f_hz: np.ndarray) -> np.ndarray:
+        """Magnitude response at input-rate frequencies f_hz (needs sample_rate_hz)."""
+        if self.sample_rate_hz is None:
+            raise ValueError("sample_rate_hz is required for frequency_response")
+        f = np.asarray(f_hz, dtype=float) / self.sample_rate_hz
+        span = self.rate * self.diff_delay
+        num = np.sin(np.pi * f * span)
+        den = span * np.sin(np.pi * f)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            h = np.where(np.abs(den) < 1e-300, 1.0, num / den)
+        return np.abs(h) ** self.order
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Decimate one block, continuing from the previous block's state."""
+        y = _as_samples(x, self.fixed_point)
+        n = y.size
+        span = self.rate * self.diff_delay
+        for k in range(self.order):
+            buf = np.concatenate((self._hist[k], y))
+            csum = np.concatenate((np.zeros(1, dtype=buf.dtype), np.cumsum(buf)))
+            y = csum[span:] - csum[:-span]
+            self._hist[k] = buf[buf.size - (span - 1):]
+
+        y = y[self._skip :: self.rate]
+        self._skip = (self._skip - n) % self.rate
+        if not self.fixed_point:
+            return y / self.gain
+        return y >> self._shift
+
+
+def cic_compensation_taps(
+    cic_order: int,
+    cic_rate: int,
+    diff_delay: int = 1,
+    n_taps: int = 63,
+    passband_frac: float = 0.4,
+    decimation: int = 2,
+) -> np.ndarray:
+    """
+    FIR taps that flatten the CIC passband droop and band-limit for decimation.
+
+    Frequencies are relative to the CIC output rate. The response is
+    1/|H_cic| up to passband_frac of the post-FIR Nyquist (i.e. of
+    0.5/decimation), then rolls off to zero at the post-FIR Nyquist.
+    """
+    if n_taps % 2 == 0:
+        raise ValueError("n_taps must be odd")
+    nyq_out = 0.5 / decimation  # in cycles per CIC-output sample
+    f_pass = passband_frac * nyq_out * 2.0  # firwin2 grid: 1.0 = Nyquist
+    f_stop = min(1.0, 2.0 * nyq_out)
+    grid = np.linspace(0.0, f_pass, 64)
+    # CIC droop at CIC-output frequency f (cycles/sample): f/R at the input rate
+    f_in = grid / 2.0 / cic_rate
+    span = cic_rate * diff_delay
+    with np.errstate(invalid="ignore", divide="ignore"):
+        droop = np.where(f_in == 0, 1.0, np.sin(np.pi * f_in * span) / (span * np.sin(np.pi * f_in)))
+    gains = 1.0 / np.abs(droop) ** cic_order
+    freqs = np.concatenate((grid, [f_stop, 1.0] if f_stop < 1.0 else [1.0]))
+    gains = np.concatenate((gains, [0.0, 0.0] if f_stop < 1.0 else [0.0]))
+    return firwin2(n_taps, freqs, gains)
+
+
+class FIRDecimator:
+    """
+    Streaming FIR decimator (compensation / half-band stage).
+
+    Only the kept output samples are computed. Fixed point: taps quantized
+    to coef_bits (signed), integer accumulation, output rounded back to the
+    input scale and saturated to output_bits.
+    """
+
+    def __init__(
+        self,
+        taps: np.ndarray,
+        decimation: int = 2,
+        fixed_point: bool = False,
+        coef_bits: int = 18,
+        output_bits: int = 24,
+        sample_rate_hz: Optional[float] = None,
+    ):
+        if decimation < 1:
+            raise ValueError("decimation must be >= 1")
+        self.taps = np.asarray(taps, dtype=float)
+        self.decimation = int(decimation)
+        self.fixed_point = fixed_point
+        self.coef_bits = coef_bits
+        self.output_bits = output_bits
+        self.sample_rate_hz = sample_rate_hz
+        self._frac_bits = coef_bits - 1
+        if fixed_point:
+            self._kernel = np.round(self.taps[::-1] * (1 << self._frac_bits)).astype(np.int64)
+        else:
+            self._kernel = self.taps[::-1].copy()
+        self.reset()
+
+    @property
+    def output_rate_hz(self) -> Optional[float]:
+        return None if self.sample_rate_hz is None else self.sample_rate_hz / self.decimation
+
+    def reset(self) -> None:
+        """Clear the delay line and decimation phase."""
+        dtype = np.int64 if self.fixed_point else float
+        self._hist = np.zeros(self.taps.size - 1, dtype=dtype)
+        self._skip = 0
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Filter and decimate one block, continuing from the previous block."""
+        x = _as_samples(x, self.fixed_point)
+        n = x.size
+        buf = np.concatenate((self._hist, x))
+        if self._hist.size:
+            self._hist = buf[buf.size - self._hist.size:]
+        windows = sliding_window_view(buf, self.taps.size)[self._skip :: self.decimation]
+        self._skip = (self._skip - n) % self.decimation
+        acc = windows @ self._kernel
+        if not self.fixed_point:
+            return acc
+        # Round half up back to the input scale, then saturate
+        y = (acc + (1 << (self._frac_bits - 1))) >> self._frac_bits
+        return _saturate(y, self.output_bits)
+
+
+class Decimator:
+    """
+    README decimator: CIC followed by a compensating FIR decimator.
+
+    Total decimation is cic_rate * fir_decimation; output_rate_hz reports
+    the rate the rest of the chain runs at. In fixed-point mode the CIC
+    output word (cic_output_bits) feeds the FIR, whose output is saturated
+    to output_bits.
+    """
+
+    def __init__(
+        self,
+        sample_rate_hz: float,
+        cic_rate: int,
+        cic_order: int = 4,
+        diff_delay: int = 1,
+        fir_decimation: int = 2,
+        fir_taps: int = 63,
+        passband_frac: float = 0.4,
+        fixed_point: bool = False,
+        input_bits: int = 16,
+        cic_output_bits: Optional[int] = None,
+        coef_bits: int = 18,
+        output_bits: Optional[int] = None,
+    ):
+        self.sample_rate_hz = sample_rate_hz
+        self.cic = CICDecimator(
+            cic_rate, cic_order, diff_delay,
+            fixed_point=fixed_point,
+            input_bits=input_bits,
+            output_bits=cic_output_bits,
+            sample_rate_hz=sample_rate_hz,
+        )
+        taps = cic_compensation_taps(cic_order, cic_rate, diff_delay, fir_taps, passband_frac, fir_decimation)
+        self.fir = FIRDecimator(
+            taps,
+            fir_decimation,
+            fixed_point=fixed_point,
+            coef_bits=coef_bits,
+            output_bits=self.cic.output_bits if output_bits is None else output_bits,
+            sample_rate_hz=self.cic.output_rate_hz,
+        )
+
+    @property
+    def decimation(self) -> int:
+        return self.cic.rate * self.fir.decimation
+
+    @property
+    def output_rate_hz(self) -> float:
+        return self.sample_rate_hz / self.decimation
+
+    @property
+    def dc_gain(self) -> float:
+        """Output units per input unit at DC (1.0 in float mode, ignoring FIR ripple)."""
+        return self.cic.dc_gain * float(np.sum(self.fir.taps))
+
+    def reset(self) -> None:
+        self.cic.reset()
+        self.fir.reset()
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Decimate one block by cic_rate * fir_decimation."""
+        return self.fir.process(self.cic.process(x))
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        """Stage interface for SignalChain."""
+        return self.process(x)
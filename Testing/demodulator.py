@@ -0,0 +1,268 @@
+"""
+Lock-in (IQ) demodulation for the impedance analyzer testbench.
+
+Causal, stateful counterpart of the zero-phase sosfiltfilt path in
+dlia_signal_chain_gui.py. Models the FPGA DSP chain (README steps 6-9):
+mix with sin/cos references, 4th order Butterworth LPF, magnitude/phase,
+for one reference (LockInDemodulator) or N references (DemodulatorBank).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import NamedTuple, Optional, Union
+from numpy.typing import DTypeLike
+from scipy.signal import butter, sosfilt
+
+try:
+    from .generators import NCO, _float_dtype
+except ImportError:
+    from generators import NCO, _float_dtype
+
+
+# ENBW of an n-th order Butterworth LPF relative to its -3 dB cutoff (order 4)
+BUTTERWORTH_ENBW_RATIO = 1.026
+
+
+def butterworth_lpf_sos(
+    sample_rate_hz: float,
+    enbw_hz: float,
+    order: int = 4,
+) -> np.ndarray:
+    """
+    Butterworth lowpass as second-order sections for a given ENBW.
+
+    f_cutoff = enbw_hz / 1.026; the normalized cutoff is clamped to
+    [1e-6, 0.9999] of Nyquist.
+    """
+    f_cutoff = enbw_hz / BUTTERWORTH_ENBW_RATIO
+    wn = f_cutoff / (sample_rate_hz / 2.0)
+    wn = max(1e-6, min(wn, 0.9999))
+    return butter(order, wn, btype="low", output="sos")
+
+
+def _make_reference(
+    reference: Union[str, NCO],
+    f_hz: np.ndarray,
+    sample_rate_hz: float,
+    phase: np.ndarray,
+) -> Optional[NCO]:
+    """NCO for reference="nco" (or a caller-supplied NCO); None for float references."""
+    if isinstance(reference, NCO):
+        if reference.tuning_word.shape != np.shape(f_hz):
+            raise ValueError("reference NCO must have one tone per reference frequency")
+        if np.any(np.abs(reference.frequency_hz - np.mod(f_hz, sample_rate_hz)) > reference.resolution_hz):
+            raise ValueError("reference NCO is not tuned to the reference frequencies")
+        return reference
+    if reference == "nco":
+        return NCO(f_hz, sample_rate_hz, phase=phase)
+    if reference != "float":
+        raise ValueError("reference must be 'float', 'nco' or an NCO instance")
+    return None
+
+
+def _float_references(phase: np.ndarray, dtype: np.dtype) -> tuple[np.ndarray, np.ndarray]:
+    """sin/cos of a float64 phase array in the working precision."""
+    if dtype == np.float64:
+        return np.sin(phase), np.cos(phase)
+    # Reduce to [0, 2*pi) before narrowing so float32 sin/cos stay accurate
+    phase = phase - 2.0 * np.pi * np.floor(phase * (0.5 / np.pi))
+    phase = phase.astype(dtype)
+    return np.sin(phase), np.cos(phase, out=phase)
+
+
+class IQBlock(NamedTuple):
+    """
+    Demodulator output for one block: in-phase, quadrature, magnitude, phase.
+
+    Fields are 1-D for LockInDemodulator and (N, samples) for DemodulatorBank.
+    """
+    X: np.ndarray
+    Y: np.ndarray
+    R: np.ndarray
+    phase: np.ndarray
+
+
+class LockInDemodulator:
+    """
+    Causal lock-in demodulator with persistent reference phase and LPF state.
+
+    X = LPF(signal * sin(w_ref*t)), Y = LPF(signal * cos(w_ref*t)),
+    R = sqrt(X^2 + Y^2), phase = atan2(Y, X). The reference phase and the
+    SOS filter state (zi) carry over between process() calls, so feeding a
+    capture in blocks gives the same output as one call on the whole capture.
+
+    reference="float" evaluates sin/cos of a float phase; reference="nco"
+    (or an NCO instance) uses the FPGA-style phase accumulator + sine LUT.
+
+    dtype="float32" runs the references and mixers and returns the outputs
+    in single precision; the Butterworth LPF always filters in float64
+    because its poles sit too close to z = 1 for float32 state.
+    """
+
+    def __init__(
+        self,
+        f_ref_hz: float,
+        sample_rate_hz: float,
+        lpf_enbw_hz: float = 10e3,
+        order: int = 4,
+        phase: float = 0.0,
+        reference: Union[str, NCO] = "float",
+        dtype: DTypeLike = np.float64,
+    ):
+        """
+        Args:
+            f_ref_hz: Reference (excitation) frequency in Hz.
+            sample_rate_hz: Input sample rate in Hz.
+            lpf_enbw_hz: Equivalent noise bandwidth of the Butterworth LPF.
+            order: Butterworth filter order.
+            phase: Reference phase at the first sample, in radians.
+            reference: "float", "nco", or an NCO tuned to f_ref_hz.
+            dtype: Working/output precision, float64 or float32.
+        """
+        self.f_ref_hz = f_ref_hz
+        self.dtype = _float_dtype(dtype)
+        self.sample_rate_hz = sample_rate_hz
+        self.lpf_enbw_hz = lpf_enbw_hz
+        self.sos = butterworth_lpf_sos(sample_rate_hz, lpf_enbw_hz, order)
+        self._phase0 = float(phase)
+        self._dphi = 2.0 * np.pi * f_ref_hz / sample_rate_hz
+        self._nco = _make_reference(reference, np.float64(f_ref_hz), sample_rate_hz, np.float64(phase))
+        self.reset()
+
+    def reset(self) -> None:
+        """Restart at the initial reference phase with a zeroed filter."""
+        self._phase = self._phase0
+        if self._nco is not None:
+            self._nco.reset()
+        # One state per section for the stacked (X, Y) channels
+        self._zi = np.zeros((self.sos.shape[0], 2, 2))
+
+    def process(self, signal: np.ndarray) -> IQBlock:
+        """Demodulate one block, continuing from the previous block's state."""
+        dt = self.dtype
+        signal = np.asarray(signal, dtype=dt)
+        n = signal.size
+        if self._nco is not None:
+            ref_sin, ref_cos = self._nco.sincos(n)
+        else:
+            ref_phase = self._phase + self._dphi * np.arange(n, dtype=float)
+            self._phase = float(np.mod(self._phase + self._dphi * n, 2.0 * np.pi))
+            ref_sin, ref_cos = _float_references(ref_phase, dt)
+
+        mixed = np.empty((2, n), dtype=dt)
+        np.multiply(signal, ref_sin, out=mixed[0], casting="same_kind")
+        np.multiply(signal, ref_cos, out=mixed[1], casting="same_kind")
+        if n:
+            mixed, self._zi = sosfilt(self.sos, mixed, axis=-1, zi=self._zi)
+            mixed = mixed.astype(dt, copy=False)
+        X, Y = mixed[0], mixed[1]
+        return IQBlock(X=X, Y=Y, R=np.hypot(X, Y), phase=np.arctan2(Y, X))
+
+    def run(self, signal: np.ndarray) -> np.ndarray:
+        """Stage interface for SignalChain: demodulated magnitude R."""
+        return self.process(signal).R
+
+
+class DemodulatorBank:
+    """
+    Multi-carrier lock-in: demodulate N reference tones in one pass.
+
+    Mixes the input with all N sin/cos references at once and filters the
+    2N mixer outputs with a single batched sosfilt call. Output arrays have
+    shape (N, samples_out). Like LockInDemodulator, the reference phases,
+    filter state and decimation phase carry over between process() calls.
+    dtype works as for LockInDemodulator.
+    """
+
+    def __init__(
+        self,
+        f_refs_hz: np.ndarray,
+        sample_rate_hz: float,
+        lpf_enbw_hz: float = 10e3,
+        order: int = 4,
+        phases: Optional[np.ndarray] = None,
+        decimation: int = 1,
+        reference: Union[str, NCO] = "float",
+        dtype: DTypeLike = np.float64,
+    ):
+        """
+        Args:
+            f_refs_hz: Reference frequencies in Hz, shape (N,).
+            sample_rate_hz: Input sample rate in Hz.
+            lpf_enbw_hz: Equivalent noise bandwidth of the Butterworth LPF.
+            order: Butterworth filter order.
+            phases: Reference phases at the first sample (radians); default zero.
+            decimation: Keep every decimation-th filtered sample.
+            reference: "float", "nco", or a multi-tone NCO tuned to f_refs_hz.
+            dtype: Working/output precision, float64 or float32.
+        """
+        self.dtype = _float_dtype(dtype)
+        self.f_refs_hz = np.atleast_1d(np.asarray(f_refs_hz, dtype=float))
+        n_carriers = self.f_refs_hz.size
+        if phases is None:
+            phases = np.zeros(n_carriers)
+        phases = np.asarray(phases, dtype=float)
+        if phases.shape != (n_carriers,):
+            raise ValueError("phases must match length of f_refs_hz")
+        if decimation < 1:
+            raise ValueError("decimation must be >= 1")
+        self.sample_rate_hz = sample_rate_hz
+        self.lpf_enbw_hz = lpf_enbw_hz
+        self.decimation = int(decimation)
+        self.sos = butterworth_lpf_sos(sample_rate_hz, lpf_enbw_hz, order)
+        self._phase0 = phases.copy()
+        self._dphi = 2.0 * np.pi * self.f_refs_hz / sample_rate_hz
+        self._nco = _make_reference(reference, self.f_refs_hz, sample_rate_hz, phases)
+        self.reset()
+
+    @property
+    def n_carriers(self) -> int:
+        return self.f_refs_hz.size
+
+    @property
+    def output_rate_hz(self) -> float:
+        return self.sample_rate_hz / self.decimation
+
+    def reset(self) -> None:
+        """Restart at the initial reference phases with zeroed filters."""
+        self._phase = self._phase0.copy()
+        if self._nco is not None:
+            self._nco.reset()
+        self._zi = np.zeros((self.sos.shape[0], 2 * self.n_carriers, 2))
+        self._skip = 0  # input samples to drop before the next kept output
+
+    def process(self, signal: np.ndarray) -> IQBlock:
+        """Demodulate one block for all carriers; fields have shape (N, samples_out)."""
+        dt = self.dtype
+        signal = np.asarray(signal, dtype=dt)
+        n = signal.size
+        n_car = self.n_carriers
+        mixed = np.empty((2 * n_car, n), dtype=dt)
+        if self._nco is not None:
+            ref_sin, ref_cos = self._nco.sincos(n)
+            np.multiply(ref_sin, signal, out=mixed[:n_car], casting="same_kind")
+            np.multiply(ref_cos, signal, out=mixed[n_car:], casting="same_kind")
+        else:
+            ref_phase = self._phase[:, None] + self._dphi[:, None] * np.arange(n, dtype=float)
+            self._phase = np.mod(self._phase + self._dphi * n, 2.0 * np.pi)
+            if dt == np.float64:
+                np.multiply(np.sin(ref_phase), signal, out=mixed[:n_car])
+                np.multiply(np.cos(ref_phase, out=ref_phase), signal, out=mixed[n_car:])
+            else:
+                ref_sin, ref_cos = _float_references(ref_phase, dt)
+                np.multiply(ref_sin, signal, out=mixed[:n_car])
+                np.multiply(ref_cos, signal, out=mixed[n_car:])
+        if n:
+            mixed, self._zi = sosfilt(self.sos, mixed, axis=-1, zi=self._zi)
+            mixed = mixed.astype(dt, copy=False)
+
+        if self.decimation > 1:
+            mixed = mixed[:, self._skip :: self.decimation]
+            self._skip = (self._skip - n) % self.decimation
+        X, Y = mixed[:n_car], mixed[n_car:]
+        return IQBlock(X=X, Y=Y, R=np.hypot(X, Y), phase=np.arctan2(Y, X))
+
+    def run(self, signal: np.ndarray) -> np.ndarray:
+        """Stage interface for SignalChain: magnitudes R, shape (N, samples_out)."""
+        return self.process(signal).R
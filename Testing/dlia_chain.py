@@ -0,0 +1,337 @@
+"""
+The DLIA signal chain without the GUI: DDS carrier -> DAC -> AM modulation
+by the envelope -> op-amp buffer -> ADC (resampled to its own rate) ->
+lock-in demodulation.
+
+run_signal_chain is what dlia_signal_chain_gui.py plots and what sweep.py
+runs headless; keeping it here lets batch runs, tests and benchmarks use
+the chain without importing matplotlib.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+from scipy.signal import sosfiltfilt
+
+try:
+    from .simulators import DACSimulator, ADCSimulator
+    from .demodulator import LockInDemodulator, butterworth_lpf_sos
+    from .stage_cache import StageCache, array_key, params_key
+    from .compute_worker import Cancelled
+    from .instrumentation import Profiler
+    from .resampler import resample
+except ImportError:
+    from simulators import DACSimulator, ADCSimulator
+    from demodulator import LockInDemodulator, butterworth_lpf_sos
+    from stage_cache import StageCache, array_key, params_key
+    from compute_worker import Cancelled
+    from instrumentation import Profiler
+    from resampler import resample
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Constants
+# ──────────────────────────────────────────────────────────────────────────────
+SEED = 42
+DAC_SAMPLE_RATE_HZ = 10e6          # 10 MSPS (per user spec; real DAC is 250 MSPS+)
+ADC_SAMPLE_RATE_HZ = 4e6           # Keeps the hardware's 250:100 MSPS DAC:ADC ratio
+CARRIER_FREQ_HZ = 500e3            # 500 kHz reference
+
+# 4th order LPF parameters
+# ENBW for 4th order Butterworth ≈ 1.026 × f_cutoff, so f_cutoff = ENBW / 1.026
+LPF_ENBW_HZ = 10e3                 # 10 kHz ENBW
+LPF_ORDER = 4
+LPF_CUTOFF_HZ = LPF_ENBW_HZ / 1.026  # ~9746 Hz for ENBW = 10 kHz
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Signal chain functions
+# ──────────────────────────────────────────────────────────────────────────────
+def interpolate_to_rate(signal: np.ndarray, t_signal: np.ndarray, t_target: np.ndarray) -> np.ndarray:
+    """Interpolate signal from its time base to target time base."""
+    return np.interp(t_target, t_signal, signal)
+
+
+def butterworth_lpf_4th_order(signal: np.ndarray, fs_hz: float, enbw_hz: float) -> np.ndarray:
+    """
+    Apply a 4th order Butterworth lowpass filter with specified ENBW.
+    ENBW for 4th order Butterworth ≈ 1.026 × f_cutoff.
+    """
+    # Design filter as second-order sections for numerical stability
+    sos = butterworth_lpf_sos(fs_hz, enbw_hz, LPF_ORDER)
+    # Apply filter forward-backward for zero phase delay
+    return sosfiltfilt(sos, signal)
+
+
+def demodulate_iq(signal: np.ndarray, t: np.ndarray, f_ref_hz: float, fs_hz: float, 
+                  lpf_enbw_hz: float = LPF_ENBW_HZ, causal: bool = False) -> np.ndarray:
+    """
+    Demodulation per README:
+      X = signal × sin(ω_ref·t)   (in-phase)
+      Y = signal × cos(ω_ref·t)   (quadrature, 90° shifted)
+      4th order Butterworth LPF
+      R = √(X² + Y²)
+
+    causal=True filters forward only (LockInDemodulator), as the FPGA does,
+    instead of the zero-phase forward-backward sosfiltfilt.
+    """
+    if causal:
+        omega_t0 = 2.0 * np.pi * f_ref_hz * t[0] if len(t) else 0.0
+        demod = LockInDemodulator(f_ref_hz, fs_hz, lpf_enbw_hz, LPF_ORDER, phase=omega_t0)
+        return demod.process(signal).R
+    omega = 2.0 * np.pi * f_ref_hz
+    ref_sin = np.sin(omega * t)
+    ref_cos = np.cos(omega * t)
+    X_raw = signal * ref_sin
+    Y_raw = signal * ref_cos
+    # 4th order Butterworth LPF with configurable ENBW
+    X_lpf = butterworth_lpf_4th_order(X_raw, fs_hz, lpf_enbw_hz)
+    Y_lpf = butterworth_lpf_4th_order(Y_raw, fs_hz, lpf_enbw_hz)
+    R = np.sqrt(X_lpf**2 + Y_lpf**2)
+    return R
+
+
+def _carrier_stage(
+    t: np.ndarray,
+    envelope: np.ndarray,
+    t_envelope: np.ndarray,
+    carrier_vpp: float,
+    dac_v_ref: float,
+) -> dict:
+    """DDS reference (DAC input) with AM headroom, and the envelope at the DAC rate."""
+    omega = 2.0 * np.pi * CARRIER_FREQ_HZ
+
+    # ── Step 1: DDS generates reference sine (DAC input) ──
+    # Carrier: centered at Vpp/2 with amplitude Vpp/2, ranging from 0 to Vpp
+    # carrier_vpp is the peak-to-peak voltage (e.g., 1V means 0 to 1V)
+    # Normalize to [0, 1] for DAC input, then scale by v_ref
+
+    # First, check envelope peak to leave headroom for AM modulation
+    # The modulated signal = carrier × (1 + envelope), so max = carrier_peak × (1 + env_max)
+    # To prevent clipping: carrier_peak × (1 + env_max) <= v_ref
+    # So: carrier_peak <= v_ref / (1 + env_max)
+    # Test_Signal.txt contains actual voltages (in volts); interpolate to DAC sample rate
+    envelope_interp = interpolate_to_rate(envelope, t_envelope, t)
+    env_max = np.max(envelope_interp)
+
+    # Calculate max allowable carrier peak (leave 1% extra headroom)
+    headroom_factor = 1.01
+    max_carrier_peak = dac_v_ref / (headroom_factor * (1 + max(env_max, 0)))
+
+    # Also ensure carrier doesn't go negative: carrier_min × (1 + env_min) >= 0
+    # For unipolar carrier (0 to Vpp), minimum is 0, so this is always satisfied
+
+    carrier_center = carrier_vpp / 2.0 / dac_v_ref  # Normalized center
+    carrier_amp = carrier_vpp / 2.0 / dac_v_ref     # Normalized amplitude
+    carrier_peak_volts = (carrier_center + carrier_amp) * dac_v_ref
+
+    # Scale down if needed to prevent clipping
+    if carrier_peak_volts > max_carrier_peak:
+        scale = max_carrier_peak / carrier_peak_volts
+        carrier_center *= scale
+        carrier_amp *= scale
+        print(f"Carrier scaled by {scale:.4f} to prevent clipping (env_max={env_max*1e3:.2f}mV)")
+
+    dac_input_digital = carrier_center + carrier_amp * np.sin(omega * t)
+    dac_input_digital = np.clip(dac_input_digital, 0.0, 1.0)
+    return {
+        "envelope_interp": envelope_interp,
+        "carrier_amp": carrier_amp,
+        "dac_input": dac_input_digital,
+    }
+
+
+def _dac_stage(dac_input_digital: np.ndarray, dac_params: dict, seed: int) -> np.ndarray:
+    """Step 2: DAC with errors."""
+    dac = DACSimulator(
+        sample_rate_hz=DAC_SAMPLE_RATE_HZ,
+        n_bits=int(dac_params.get("n_bits", 16)),
+        v_ref=dac_params.get("v_ref", 1.0),
+        inl_lsb=dac_params["inl_lsb"],
+        dnl_lsb=dac_params["dnl_lsb"],
+        gain_error=dac_params["gain_error"],
+        offset_error=dac_params["offset_error"],
+        glitch_energy_frac=dac_params.get("glitch_energy_frac", 0.0),
+        seed=seed,
+    )
+    return dac.digital_to_analog(dac_input_digital)
+
+
+def _modulation_stage(dac_output: np.ndarray, envelope_interp: np.ndarray) -> np.ndarray:
+    """Step 3: AM modulation with actual envelope voltage."""
+    # Use envelope values directly as voltages (NO normalization)
+    # Modulation: carrier × (1 + envelope_voltage)
+    # For ~11mV peak envelope and 0.5V carrier center, this is ~2% modulation
+    return dac_output * (1.0 + envelope_interp)
+
+
+def _opamp_stage(modulated: np.ndarray, opamp_params: dict, seed: int) -> np.ndarray:
+    """Step 4: the unity-gain op-amp buffer."""
+    # ── Step 4: Op-amp in unity gain configuration (voltage follower) ──
+    # Buffers the signal with bandwidth limitation and adds noise
+    opamp_bandwidth = opamp_params.get("bandwidth_hz", 50e6)
+    opamp_noise = opamp_params.get("noise_rms", 0.0)
+    opamp_offset = opamp_params.get("offset_voltage", 0.0)
+    opamp_gain_error = opamp_params.get("gain_error", 0.0)
+
+    # Unity gain: V_out = V_in × (1 + gain_error) + offset
+    opamp_output = modulated * (1.0 + opamp_gain_error) + opamp_offset
+
+    # Add noise
+    if opamp_noise > 0:
+        rng = np.random.default_rng(seed + 1)
+        opamp_output = opamp_output + rng.normal(0, opamp_noise, len(opamp_output))
+
+    # Apply bandwidth limitation (simple 1st order LPF if bandwidth < Nyquist/2)
+    if opamp_bandwidth < DAC_SAMPLE_RATE_HZ / 4:
+        from scipy.signal import butter, sosfilt
+        nyq = DAC_SAMPLE_RATE_HZ / 2
+        wn = min(opamp_bandwidth / nyq, 0.99)
+        sos = butter(1, wn, btype='low', output='sos')
+        opamp_output = sosfilt(sos, opamp_output)
+    return opamp_output
+
+
+def _adc_stage(opamp_output: np.ndarray, adc_params: dict, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Step 5: ADC with errors, sampling at ADC_SAMPLE_RATE_HZ.
+    Returns (adc_input, adc_output in volts), both at the ADC rate.
+    """
+    adc_v_ref = adc_params.get("v_ref", 1.0)
+    adc_n_bits = int(adc_params.get("n_bits", 16))
+    if ADC_SAMPLE_RATE_HZ != DAC_SAMPLE_RATE_HZ:
+        opamp_output = resample(opamp_output, DAC_SAMPLE_RATE_HZ, ADC_SAMPLE_RATE_HZ)
+    adc_input = np.clip(opamp_output, 0.0, adc_v_ref)
+
+    adc = ADCSimulator(
+        sample_rate_hz=ADC_SAMPLE_RATE_HZ,
+        n_bits=adc_n_bits,
+        v_ref=adc_v_ref,
+        gain_error=adc_params["gain_error"],
+        offset_error=adc_params["offset_error"],
+        inl_lsb=adc_params["inl_lsb"],
+        dnl_lsb=adc_params["dnl_lsb"],
+        aperture_jitter_sec=adc_params["aperture_jitter_sec"],
+        seed=seed,
+    )
+    adc_codes = adc.analog_to_digital(adc_input)
+    # Reconstruct voltage from ADC codes (use actual bit depth)
+    max_code = (1 << adc_n_bits) - 1
+    adc_output = (adc_codes.astype(float) / max_code) * adc_v_ref
+    return adc_input, adc_output
+
+
+def run_signal_chain(
+    t: np.ndarray,
+    envelope: np.ndarray,
+    t_envelope: np.ndarray,
+    carrier_vpp: float,
+    dac_params: dict,
+    adc_params: dict,
+    opamp_params: dict,
+    lpf_enbw_hz: float = LPF_ENBW_HZ,
+    seed: int = SEED,
+    cache: StageCache | None = None,
+    cancelled: Callable[[], bool] | None = None,
+    profiler: Profiler | None = None,
+) -> dict:
+    """
+    Run the full DLIA signal chain:
+      1. DDS: Vpp sine wave as reference (DAC input)
+      2. DAC: digital → analog with errors
+      3. AM modulation: carrier × (1 + envelope_voltage)
+         - envelope_voltage is actual voltage from Test_Signal.txt
+         - For ~11mV peak signal, this gives ~1% modulation depth
+      4. Op-amp (unity gain buffer): buffers signal with bandwidth/noise
+      5. ADC: resample to ADC_SAMPLE_RATE_HZ, analog → digital with errors
+      6. Demodulate ADC output (at the ADC rate; t_adc is its time base)
+
+    seed sets the DAC/ADC error draws (and op-amp noise, seed + 1).
+    With a StageCache, each stage is memoized under the parameters it
+    depends on plus its upstream stage's key, so e.g. an ADC change reuses
+    the cached DAC and op-amp outputs and an LPF change only re-demodulates.
+    cancelled() is polled before each stage; if it returns True the run
+    stops with compute_worker.Cancelled (used by the GUI's background worker).
+    With a Profiler, every stage call (cache hits included, flagged cached)
+    is recorded with its wall/CPU time, samples and real-time factor.
+    Returns dict with all intermediate signals for plotting.
+    """
+    if cache is None:
+        cache = StageCache(max_bytes=0)  # compute everything, keep nothing
+    dac_v_ref = dac_params.get("v_ref", 1.0)
+
+    def stage(name, key, compute, samples=len(t), sample_rate_hz=DAC_SAMPLE_RATE_HZ):
+        if cancelled is not None and cancelled():
+            raise Cancelled()
+        if profiler is None:
+            return cache.get(name, key, compute)
+        misses = cache.misses.get(name, 0)
+        with profiler.stage(name, samples, sample_rate_hz) as timer:
+            value = cache.get(name, key, compute)
+            timer.cached = cache.misses.get(name, 0) == misses
+        return value
+
+    k_carrier = (array_key(t), array_key(envelope), array_key(t_envelope), carrier_vpp, dac_v_ref)
+    carrier = stage("carrier", k_carrier, lambda: _carrier_stage(t, envelope, t_envelope, carrier_vpp, dac_v_ref))
+    envelope_interp = carrier["envelope_interp"]
+    carrier_amp = carrier["carrier_amp"]
+    dac_input_digital = carrier["dac_input"]
+
+    k_dac = (k_carrier, params_key(dac_params), seed)
+    dac_output = stage("dac", k_dac, lambda: _dac_stage(dac_input_digital, dac_params, seed))
+    # Ideal DAC output (no errors) for comparison
+    dac_output_ideal = dac_input_digital * dac_v_ref
+
+    # Store envelope info for comparison
+    envelope_peak = np.max(np.abs(envelope_interp))
+    carrier_amplitude_volts = carrier_amp * dac_v_ref
+    modulation_depth_pct = (envelope_peak / 1.0) * 100  # As percentage of unity
+
+    k_mod = (k_dac,)
+    modulated = stage("modulation", k_mod, lambda: _modulation_stage(dac_output, envelope_interp))
+
+    k_opamp = (k_mod, params_key(opamp_params))
+    opamp_output = stage("opamp", k_opamp, lambda: _opamp_stage(modulated, opamp_params, seed))
+
+    k_adc = (k_opamp, params_key(adc_params))
+    adc_input, adc_output = stage("adc", k_adc, lambda: _adc_stage(opamp_output, adc_params, seed))
+    t_adc = np.arange(len(adc_output)) / ADC_SAMPLE_RATE_HZ
+
+    # ── Step 6: Demodulate ADC output to recover envelope ──
+    R_demod = stage(
+        "demod_adc", (k_adc, lpf_enbw_hz),
+        lambda: demodulate_iq(adc_output, t_adc, CARRIER_FREQ_HZ, ADC_SAMPLE_RATE_HZ, lpf_enbw_hz),
+        samples=len(t_adc), sample_rate_hz=ADC_SAMPLE_RATE_HZ,
+    )
+
+    # Also demodulate DAC output (before adding envelope) to see DAC error effect
+    R_dac = stage(
+        "demod_dac", (k_dac, lpf_enbw_hz),
+        lambda: demodulate_iq(dac_output, t, CARRIER_FREQ_HZ, DAC_SAMPLE_RATE_HZ, lpf_enbw_hz),
+    )
+    R_dac_ideal = stage(
+        "demod_dac_ideal", (k_carrier, lpf_enbw_hz),
+        lambda: demodulate_iq(dac_output_ideal, t, CARRIER_FREQ_HZ, DAC_SAMPLE_RATE_HZ, lpf_enbw_hz),
+    )
+
+    return {
+        "t": t,
+        "envelope_voltage": envelope_interp,       # Actual voltage from Test_Signal.txt
+        "envelope_peak": envelope_peak,            # Peak envelope voltage
+        "modulation_depth_pct": modulation_depth_pct,
+        "carrier_amp": carrier_amp,                # Carrier amplitude (normalized 0-1)
+        "carrier_amp_volts": carrier_amplitude_volts,
+        "dac_input": dac_input_digital,
+        "dac_output": dac_output,
+        "dac_output_ideal": dac_output_ideal,
+        "dac_demod": R_dac,
+        "dac_demod_ideal": R_dac_ideal,
+        "opamp_output": opamp_output,              # Output after op-amp buffer
+        "t_adc": t_adc,                            # ADC-rate time base of the adc_* signals
+        "envelope_voltage_adc": interpolate_to_rate(envelope_interp, t, t_adc),
+        "adc_input": adc_input,
+        "adc_output": adc_output,
+        "adc_demod": R_demod,
+    }
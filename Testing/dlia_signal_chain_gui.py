@@ -6,7 +6,8 @@ Simulates the Digital Lock-In Amplifier signal chain for impedance cytometry:
   2. DAC converts digital to analog (with errors: INL, DNL, gain, offset, glitch)
   3. Impedance sensor: TRUE AM modulation: ADC_in = DAC_out × (1 + m × envelope)
      This models how impedance changes modulate the carrier amplitude (I = V/Z)
-  4. ADC digitizes (with errors: INL, DNL, gain, offset, jitter)
+  4. ADC digitizes at its own rate (polyphase resampling from the DAC rate;
+     errors: INL, DNL, gain, offset, jitter)
   5. Demodulation: X = signal × sin(ω_ref·t), Y = signal × cos(ω_ref·t), 
      4th order Butterworth LPF (ENBW=10 kHz), R = √(X² + Y²)
 
@@ -34,295 +35,106 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button, TextBox
 from matplotlib.gridspec import GridSpec
-from scipy.signal import butter, sosfiltfilt
 
-from generators import sine_wave
-from simulators import DACSimulator, ADCSimulator
+from capture import open_capture
+from events import detect_events
+from stage_cache import StageCache
+from lod_plot import lod_plot
+from compute_worker import ComputeWorker
+from instrumentation import Profiler
+from dlia_chain import (
+    SEED,
+    DAC_SAMPLE_RATE_HZ,
+    ADC_SAMPLE_RATE_HZ,
+    CARRIER_FREQ_HZ,
+    LPF_ENBW_HZ,
+    LPF_ORDER,
+    LPF_CUTOFF_HZ,
+    interpolate_to_rate,
+    butterworth_lpf_4th_order,
+    demodulate_iq,
+    run_signal_chain,
+)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Constants
 # ──────────────────────────────────────────────────────────────────────────────
-SEED = 42
-DAC_SAMPLE_RATE_HZ = 10e6          # 10 MSPS (per user spec; real DAC is 250 MSPS+)
-ADC_SAMPLE_RATE_HZ = 10e6          # Match DAC for this sim (real ADC is 100 MSPS+)
-CARRIER_FREQ_HZ = 500e3            # 500 kHz reference
 TEST_SIGNAL_SAMPLE_RATE_HZ = 14e3  # Test_Signal.txt sample rate
 TEST_SIGNAL_FILENAME = "Test_Signal.txt"
-MAX_LOAD_FOR_ENVELOPE = 800_000    # Max samples to scan when finding envelope
-
-# 4th order LPF parameters
-# ENBW for 4th order Butterworth ≈ 1.026 × f_cutoff, so f_cutoff = ENBW / 1.026
-LPF_ENBW_HZ = 10e3                 # 10 kHz ENBW
-LPF_ORDER = 4
-LPF_CUTOFF_HZ = LPF_ENBW_HZ / 1.026  # ~9746 Hz for ENBW = 10 kHz
+ENVELOPE_STATS_SAMPLES = 1 << 18   # Strided subsample for the envelope baseline/span
+ENVELOPE_BLOCK_SAMPLES = 1 << 16   # detect_events block size when scanning a recording
+STAGE_CACHE_MAX_BYTES = 512 * 2**20  # LRU budget for memoized chain stages
+RECOMPUTE_DEBOUNCE_S = 0.25         # Quiet time after a slider move before recomputing
+WORKER_POLL_MS = 50                # GUI timer interval for collecting worker results
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Envelope extraction from Test_Signal.txt
 # ──────────────────────────────────────────────────────────────────────────────
-def load_full_signal(filepath: str, max_samples: int) -> tuple[np.ndarray | None, np.ndarray | None]:
-    """Load one float per line. Returns (signal, t) or (None, None)."""
+def load_full_signal(filepath: str, max_samples: int | None = None) -> np.ndarray | None:
+    """
+    Samples [0, max_samples) (None = all) of a text or binary capture, as a
+    view of its memory map. Text is ingested once into a .bin cache next
+    to it. Returns None if the file cannot be read.
+    """
     try:
-        data = np.loadtxt(filepath, dtype=float, ndmin=1, max_rows=int(max_samples))
-        signal = np.asarray(data, dtype=float)
-        t = np.arange(len(signal), dtype=float) / TEST_SIGNAL_SAMPLE_RATE_HZ
-        return signal, t
+        capture = open_capture(filepath, sample_rate_hz=TEST_SIGNAL_SAMPLE_RATE_HZ, units="V")
+        return capture.data[:max_samples]
     except Exception:
-        return None, None
+        return None
 
 
 def find_largest_envelope(
     signal: np.ndarray,
-    t: np.ndarray,
+    sample_rate_hz: float = TEST_SIGNAL_SAMPLE_RATE_HZ,
     baseline_frac: float = 0.1,
 ) -> tuple[np.ndarray, np.ndarray, int, int]:
     """
     Find the largest envelope: nothing → large increase → large decrease → nothing.
+
+    signal may be a memory-mapped recording of any length: baseline and
+    span come from a strided subsample of at most ENVELOPE_STATS_SAMPLES
+    points, and detect_events reads the recording in blocks of
+    ENVELOPE_BLOCK_SAMPLES, so only the returned segment is copied into
+    memory.
     Returns (signal_slice, t_slice, start_idx, end_idx).
     """
-    baseline = np.median(signal)
-    span = np.percentile(signal, 95) - np.percentile(signal, 5)
+    n = len(signal)
+    stats = np.asarray(signal[:: max(1, -(-n // ENVELOPE_STATS_SAMPLES))])
+    low, baseline, high = np.percentile(stats, [5, 50, 95])
+    span = high - low
     if span < 1e-30:
-        return signal.copy(), t.copy(), 0, len(signal) - 1
-    margin = baseline_frac * span
-    # Largest deviation from baseline (peak or trough)
-    peak_idx = int(np.argmax(np.abs(signal - baseline)))
-    # Expand left until we're at baseline (within margin)
-    left = peak_idx
-    while left > 0 and abs(signal[left] - baseline) > margin:
-        left -= 1
-    # Expand right until we're at baseline
-    right = peak_idx
-    while right < len(signal) - 1 and abs(signal[right] - baseline) > margin:
-        right += 1
-    # Extend to include flat baseline at ends
-    extend_samples = int(0.002 * TEST_SIGNAL_SAMPLE_RATE_HZ)  # ~2 ms padding
-    left = max(0, left - extend_samples)
-    right = min(len(signal) - 1, right + extend_samples)
-    return signal[left : right + 1].copy(), t[left : right + 1].copy(), left, right
+        left, right = 0, n - 1
+    else:
+        margin = baseline_frac * span
+        # Every excursion beyond the margin; keep the one with the largest deviation
+        events = detect_events(
+            signal, np.nextafter(margin, np.inf), baseline=baseline, block_size=ENVELOPE_BLOCK_SAMPLES
+        )
+        k = int(np.argmax(np.abs(events.amplitude)))
+        # Include the last/first baseline sample on either side of the event
+        left = max(0, int(events.start[k]) - 1)
+        right = min(n - 1, int(events.end[k]))
+        # Extend to include flat baseline at ends
+        extend_samples = int(0.002 * sample_rate_hz)  # ~2 ms padding
+        left = max(0, left - extend_samples)
+        right = min(n - 1, right + extend_samples)
+    t_slice = np.arange(left, right + 1, dtype=float) / sample_rate_hz
+    return np.array(signal[left : right + 1]), t_slice, left, right
 
 
 def load_and_isolate_envelope(filepath: str) -> tuple[np.ndarray | None, np.ndarray | None]:
     """Load file, find largest envelope, return (signal_segment, t_segment) or (None, None)."""
-    sig, t = load_full_signal(filepath, MAX_LOAD_FOR_ENVELOPE)
+    sig = load_full_signal(filepath)
     if sig is None or len(sig) < 10:
         return None, None
-    seg, t_seg, _, _ = find_largest_envelope(sig, t)
+    seg, t_seg, _, _ = find_largest_envelope(sig)
     # Re-zero time
     t_seg = t_seg - t_seg[0]
     return seg, t_seg
 
 
-# ──────────────────────────────────────────────────────────────────────────────
-# Signal chain functions
-# ──────────────────────────────────────────────────────────────────────────────
-def interpolate_to_rate(signal: np.ndarray, t_signal: np.ndarray, t_target: np.ndarray) -> np.ndarray:
-    """Interpolate signal from its time base to target time base."""
-    return np.interp(t_target, t_signal, signal)
-
-
-def butterworth_lpf_4th_order(signal: np.ndarray, fs_hz: float, enbw_hz: float) -> np.ndarray:
-    """
-    Apply a 4th order Butterworth lowpass filter with specified ENBW.
-    ENBW for 4th order Butterworth ≈ 1.026 × f_cutoff.
-    """
-    f_cutoff = enbw_hz / 1.026
-    # Normalized frequency (0 to 1, where 1 = Nyquist = fs/2)
-    nyquist = fs_hz / 2.0
-    wn = f_cutoff / nyquist
-    # Clamp to valid range
-    wn = max(1e-6, min(wn, 0.9999))
-    # Design filter as second-order sections for numerical stability
-    sos = butter(LPF_ORDER, wn, btype='low', output='sos')
-    # Apply filter forward-backward for zero phase delay
-    return sosfiltfilt(sos, signal)
-
-
-def demodulate_iq(signal: np.ndarray, t: np.ndarray, f_ref_hz: float, fs_hz: float, 
-                  lpf_enbw_hz: float = LPF_ENBW_HZ) -> np.ndarray:
-    """
-    Demodulation per README:
-      X = signal × sin(ω_ref·t)   (in-phase)
-      Y = signal × cos(ω_ref·t)   (quadrature, 90° shifted)
-      4th order Butterworth LPF
-      R = √(X² + Y²)
-    """
-    omega = 2.0 * np.pi * f_ref_hz
-    ref_sin = np.sin(omega * t)
-    ref_cos = np.cos(omega * t)
-    X_raw = signal * ref_sin
-    Y_raw = signal * ref_cos
-    # 4th order Butterworth LPF with configurable ENBW
-    X_lpf = butterworth_lpf_4th_order(X_raw, fs_hz, lpf_enbw_hz)
-    Y_lpf = butterworth_lpf_4th_order(Y_raw, fs_hz, lpf_enbw_hz)
-    R = np.sqrt(X_lpf**2 + Y_lpf**2)
-    return R
-
-
-def run_signal_chain(
-    t: np.ndarray,
-    envelope: np.ndarray,
-    t_envelope: np.ndarray,
-    carrier_vpp: float,
-    dac_params: dict,
-    adc_params: dict,
-    opamp_params: dict,
-    lpf_enbw_hz: float = LPF_ENBW_HZ,
-) -> dict:
-    """
-    Run the full DLIA signal chain:
-      1. DDS: Vpp sine wave as reference (DAC input)
-      2. DAC: digital → analog with errors
-      3. AM modulation: carrier × (1 + envelope_voltage)
-         - envelope_voltage is actual voltage from Test_Signal.txt
-         - For ~11mV peak signal, this gives ~1% modulation depth
-      4. Op-amp (unity gain buffer): buffers signal with bandwidth/noise
-      5. ADC: analog → digital with errors
-      6. Demodulate ADC output
-
-    Returns dict with all intermediate signals for plotting.
-    """
-    omega = 2.0 * np.pi * CARRIER_FREQ_HZ
-    dac_v_ref = dac_params.get("v_ref", 1.0)
-
-    # ── Step 1: DDS generates reference sine (DAC input) ──
-    # Carrier: centered at Vpp/2 with amplitude Vpp/2, ranging from 0 to Vpp
-    # carrier_vpp is the peak-to-peak voltage (e.g., 1V means 0 to 1V)
-    # Normalize to [0, 1] for DAC input, then scale by v_ref
-    
-    # First, check envelope peak to leave headroom for AM modulation
-    # The modulated signal = carrier × (1 + envelope), so max = carrier_peak × (1 + env_max)
-    # To prevent clipping: carrier_peak × (1 + env_max) <= v_ref
-    # So: carrier_peak <= v_ref / (1 + env_max)
-    envelope_interp_preview = interpolate_to_rate(envelope, t_envelope, t)
-    env_max = np.max(envelope_interp_preview)
-    env_min = np.min(envelope_interp_preview)
-    
-    # Calculate max allowable carrier peak (leave 1% extra headroom)
-    headroom_factor = 1.01
-    max_carrier_peak = dac_v_ref / (headroom_factor * (1 + max(env_max, 0)))
-    
-    # Also ensure carrier doesn't go negative: carrier_min × (1 + env_min) >= 0
-    # For unipolar carrier (0 to Vpp), minimum is 0, so this is always satisfied
-    
-    carrier_center = carrier_vpp / 2.0 / dac_v_ref  # Normalized center
-    carrier_amp = carrier_vpp / 2.0 / dac_v_ref     # Normalized amplitude
-    carrier_peak_volts = (carrier_center + carrier_amp) * dac_v_ref
-    
-    # Scale down if needed to prevent clipping
-    if carrier_peak_volts > max_carrier_peak:
-        scale = max_carrier_peak / carrier_peak_volts
-        carrier_center *= scale
-        carrier_amp *= scale
-        print(f"Carrier scaled by {scale:.4f} to prevent clipping (env_max={env_max*1e3:.2f}mV)")
-    
-    dac_input_digital = carrier_center + carrier_amp * np.sin(omega * t)
-    dac_input_digital = np.clip(dac_input_digital, 0.0, 1.0)
-
-    # ── Step 2: DAC with errors ──
-    dac_n_bits = int(dac_params.get("n_bits", 16))
-    dac = DACSimulator(
-        sample_rate_hz=DAC_SAMPLE_RATE_HZ,
-        n_bits=dac_n_bits,
-        v_ref=dac_v_ref,
-        inl_lsb=dac_params["inl_lsb"],
-        dnl_lsb=dac_params["dnl_lsb"],
-        gain_error=dac_params["gain_error"],
-        offset_error=dac_params["offset_error"],
-        glitch_energy_frac=dac_params.get("glitch_energy_frac", 0.0),
-        seed=SEED,
-    )
-    dac_output = dac.digital_to_analog(dac_input_digital)
-
-    # Ideal DAC output (no errors) for comparison
-    dac_output_ideal = dac_input_digital * dac_v_ref
-
-    # ── Step 3: AM modulation with actual envelope voltage ──
-    # Test_Signal.txt contains actual voltages (in volts)
-    # Interpolate to DAC sample rate
-    envelope_interp = interpolate_to_rate(envelope, t_envelope, t)
-    
-    # Use envelope values directly as voltages (NO normalization)
-    # Modulation: carrier × (1 + envelope_voltage)
-    # For ~11mV peak envelope and 0.5V carrier center, this is ~2% modulation
-    modulated = dac_output * (1.0 + envelope_interp)
-    
-    # Store envelope info for comparison
-    envelope_peak = np.max(np.abs(envelope_interp))
-    carrier_amplitude_volts = carrier_amp * dac_v_ref
-    modulation_depth_pct = (envelope_peak / 1.0) * 100  # As percentage of unity
-
-    # ── Step 4: Op-amp in unity gain configuration (voltage follower) ──
-    # Buffers the signal with bandwidth limitation and adds noise
-    opamp_bandwidth = opamp_params.get("bandwidth_hz", 50e6)
-    opamp_noise = opamp_params.get("noise_rms", 0.0)
-    opamp_offset = opamp_params.get("offset_voltage", 0.0)
-    opamp_gain_error = opamp_params.get("gain_error", 0.0)
-    
-    # Unity gain: V_out = V_in × (1 + gain_error) + offset
-    opamp_output = modulated * (1.0 + opamp_gain_error) + opamp_offset
-    
-    # Add noise
-    if opamp_noise > 0:
-        rng = np.random.default_rng(SEED + 1)
-        opamp_output = opamp_output + rng.normal(0, opamp_noise, len(opamp_output))
-    
-    # Apply bandwidth limitation (simple 1st order LPF if bandwidth < Nyquist/2)
-    if opamp_bandwidth < DAC_SAMPLE_RATE_HZ / 4:
-        from scipy.signal import butter, sosfilt
-        nyq = DAC_SAMPLE_RATE_HZ / 2
-        wn = min(opamp_bandwidth / nyq, 0.99)
-        sos = butter(1, wn, btype='low', output='sos')
-        opamp_output = sosfilt(sos, opamp_output)
-
-    # ── Step 5: ADC with errors ──
-    adc_v_ref = adc_params.get("v_ref", 1.0)
-    adc_n_bits = int(adc_params.get("n_bits", 16))
-    adc_input = np.clip(opamp_output, 0.0, adc_v_ref)
-    
-    adc = ADCSimulator(
-        sample_rate_hz=ADC_SAMPLE_RATE_HZ,
-        n_bits=adc_n_bits,
-        v_ref=adc_v_ref,
-        gain_error=adc_params["gain_error"],
-        offset_error=adc_params["offset_error"],
-        inl_lsb=adc_params["inl_lsb"],
-        dnl_lsb=adc_params["dnl_lsb"],
-        aperture_jitter_sec=adc_params["aperture_jitter_sec"],
-        seed=SEED,
-    )
-    adc_codes = adc.analog_to_digital(adc_input)
-    # Reconstruct voltage from ADC codes (use actual bit depth)
-    max_code = (1 << adc_n_bits) - 1
-    adc_output = (adc_codes.astype(float) / max_code) * adc_v_ref
-
-    # ── Step 6: Demodulate ADC output to recover envelope ──
-    R_demod = demodulate_iq(adc_output, t, CARRIER_FREQ_HZ, DAC_SAMPLE_RATE_HZ, lpf_enbw_hz)
-
-    # Also demodulate DAC output (before adding envelope) to see DAC error effect
-    R_dac = demodulate_iq(dac_output, t, CARRIER_FREQ_HZ, DAC_SAMPLE_RATE_HZ, lpf_enbw_hz)
-    R_dac_ideal = demodulate_iq(dac_output_ideal, t, CARRIER_FREQ_HZ, DAC_SAMPLE_RATE_HZ, lpf_enbw_hz)
-
-    return {
-        "t": t,
-        "envelope_voltage": envelope_interp,       # Actual voltage from Test_Signal.txt
-        "envelope_peak": envelope_peak,            # Peak envelope voltage
-        "modulation_depth_pct": modulation_depth_pct,
-        "carrier_amp": carrier_amp,                # Carrier amplitude (normalized 0-1)
-        "carrier_amp_volts": carrier_amplitude_volts,
-        "dac_input": dac_input_digital,
-        "dac_output": dac_output,
-        "dac_output_ideal": dac_output_ideal,
-        "dac_demod": R_dac,
-        "dac_demod_ideal": R_dac_ideal,
-        "opamp_output": opamp_output,              # Output after op-amp buffer
-        "adc_input": adc_input,
-        "adc_output": adc_output,
-        "adc_demod": R_demod,
-    }
-
-
 # ──────────────────────────────────────────────────────────────────────────────
 # GUI
 # ──────────────────────────────────────────────────────────────────────────────
@@ -339,6 +151,9 @@ def main():
     print(f"Loaded envelope: {len(envelope_seg)} samples, "
           f"duration = {t_envelope_seg[-1]*1e3:.2f} ms")
 
+    # Memoized chain stages: a slider only recomputes the stages downstream of it
+    stage_cache = StageCache(max_bytes=STAGE_CACHE_MAX_BYTES)
+
     # Default parameters
     p = {
         "carrier_vpp": 1.0,          # Carrier peak-to-peak voltage
@@ -487,6 +302,7 @@ def main():
             widget = slider_widgets[idx]
             widget["val_text"].set_text(format_val(val))
             widget["val_ax"].figure.canvas.draw_idle()
+            update()
         return handler
 
     # Connect slider callbacks
@@ -496,14 +312,13 @@ def main():
     def get_params():
         return {w["key"]: w["slider"].val for w in slider_widgets}
 
-    def update(_=None):
-        par = get_params()
-
+    def compute_chain(par, cancelled):
+        """Worker thread: run the (memoized) chain for one parameter set."""
         # Compute DAC time array based on envelope duration
         duration = t_envelope_seg[-1]
         n_samples = int(duration * DAC_SAMPLE_RATE_HZ)
         if n_samples < 100:
-            return
+            return None
         t_dac = np.arange(n_samples, dtype=float) / DAC_SAMPLE_RATE_HZ
 
         dac_params = {
@@ -531,36 +346,41 @@ def main():
             "gain_error": 0.0,  # Unity gain
         }
 
-        try:
-            lpf_enbw_hz = par["lpf_enbw_khz"] * 1e3  # Convert kHz to Hz
-            result = run_signal_chain(
-                t_dac, envelope_seg, t_envelope_seg,
-                par["carrier_vpp"], dac_params, adc_params, opamp_params,
-                lpf_enbw_hz=lpf_enbw_hz
-            )
-        except Exception as e:
-            print(f"Error in signal chain: {e}")
-            return
+        lpf_enbw_hz = par["lpf_enbw_khz"] * 1e3  # Convert kHz to Hz
+        profiler = Profiler()
+        result = run_signal_chain(
+            t_dac, envelope_seg, t_envelope_seg,
+            par["carrier_vpp"], dac_params, adc_params, opamp_params,
+            lpf_enbw_hz=lpf_enbw_hz, cache=stage_cache, cancelled=cancelled,
+            profiler=profiler,
+        )
+        result["profiler"] = profiler
+        # StageCache is not thread-safe: take its stats here, on the worker thread
+        result["cache_stats"] = stage_cache.stats()
+        return result
 
+    def render(par, result):
+        """GUI thread: redraw all panels from a finished chain result."""
         t = result["t"]
         n = len(t)
-        t_ms = t * 1e3  # Full time array in ms (ALL samples)
+        t_ms = t * 1e3  # Full time array in ms; lod_plot draws per-pixel min/max of it
 
         # FFT setup
-        n_fft = min(16384, n)
-        freqs_hz = np.fft.rfftfreq(n_fft, 1.0 / DAC_SAMPLE_RATE_HZ)
-        freqs_khz = freqs_hz / 1e3
+        t_adc_ms = result["t_adc"] * 1e3
 
-        def plot_fft(ax, sig, color, label=None):
-            spec = np.fft.rfft(sig[:n_fft] - np.mean(sig[:n_fft]))
-            ax.semilogy(freqs_khz, np.maximum(np.abs(spec), 1e-20), color=color, label=label, alpha=0.8)
+        def plot_fft(ax, sig, color, label=None, adc_rate=False):
+            n_pts = min(16384, len(sig))
+            rate_hz = ADC_SAMPLE_RATE_HZ if adc_rate else DAC_SAMPLE_RATE_HZ
+            f_khz = np.fft.rfftfreq(n_pts, 1.0 / rate_hz) / 1e3
+            spec = np.fft.rfft(sig[:n_pts] - np.mean(sig[:n_pts]))
+            ax.semilogy(f_khz, np.maximum(np.abs(spec), 1e-20), color=color, label=label, alpha=0.8)
 
         # ── Row 1: Original envelope (full duration, ALL samples) ──
         ax_env_t.clear()
         env_voltage = result["envelope_voltage"]  # Actual voltage from Test_Signal.txt
         env_peak = result["envelope_peak"]
         mod_depth = result["modulation_depth_pct"]
-        ax_env_t.plot(t_ms, env_voltage * 1e3, color="C0", linewidth=0.5)  # Show in mV
+        lod_plot(ax_env_t, t_ms, env_voltage * 1e3, color="C0", linewidth=0.5)  # Show in mV
         ax_env_t.set_ylabel("Voltage (mV)")
         ax_env_t.set_title(f"Original Envelope (peak={env_peak*1e3:.2f} mV, mod={mod_depth:.2f}%)", fontsize=9)
         ax_env_t.grid(True, alpha=0.3)
@@ -579,7 +399,7 @@ def main():
         dac_error_pct = (dac_out - dac_in) / dac_amplitude * 100.0
         dac_rms_err = np.sqrt(np.mean(dac_error_pct**2))
         dac_max_err = np.max(np.abs(dac_error_pct))
-        ax_dac_t.plot(t_ms, dac_error_pct, color="C1", linewidth=0.5)
+        lod_plot(ax_dac_t, t_ms, dac_error_pct, color="C1", linewidth=0.5)
         ax_dac_t.set_ylabel("Error (%)")
         ax_dac_t.set_title(f"DAC Error (RMS={dac_rms_err:.2e}%, Max={dac_max_err:.2e}%)", fontsize=9)
         ax_dac_t.grid(True, alpha=0.3)
@@ -602,14 +422,14 @@ def main():
         adc_error_pct = (adc_out - adc_in) / adc_amplitude * 100.0
         adc_rms_err = np.sqrt(np.mean(adc_error_pct**2))
         adc_max_err = np.max(np.abs(adc_error_pct))
-        ax_adc_t.plot(t_ms, adc_error_pct, color="C2", linewidth=0.5)
+        lod_plot(ax_adc_t, t_adc_ms, adc_error_pct, color="C2", linewidth=0.5)
         ax_adc_t.set_ylabel("Error (%)")
         ax_adc_t.set_title(f"ADC Error (RMS={adc_rms_err:.2e}%, Max={adc_max_err:.2e}%)", fontsize=9)
         ax_adc_t.grid(True, alpha=0.3)
         ax_adc_t.axhline(0, color="gray", linestyle="--", alpha=0.5)
 
         ax_adc_f.clear()
-        plot_fft(ax_adc_f, adc_out - adc_in, "C2", "Error")
+        plot_fft(ax_adc_f, adc_out - adc_in, "C2", "Error", adc_rate=True)
         ax_adc_f.set_ylabel("|FFT|")
         ax_adc_f.set_title("FFT: ADC Error", fontsize=9)
         ax_adc_f.grid(True, alpha=0.3)
@@ -621,8 +441,8 @@ def main():
         carrier_amp = result["carrier_amp"]  # Normalized carrier amplitude (0-1)
         carrier_amp_volts = result["carrier_amp_volts"]
         
-        # Skip first 10% of samples (filter transient)
-        skip_samples = max(1, n // 10)
+        # Skip first 10% of samples (filter transient); row 4 onwards is at the ADC rate
+        skip_samples = max(1, len(adc_demod) // 10)
         
         # AM modulation: signal = carrier × (1 + envelope_voltage)
         # After IQ demod: R ≈ (carrier_amp_volts/2) × (1 + envelope_voltage)
@@ -640,7 +460,7 @@ def main():
         demod_recovered = (adc_demod - baseline) / baseline
         
         # The ACTUAL modulation applied was the envelope voltage directly
-        original_modulation = env_voltage  # Actual voltage from Test_Signal.txt
+        original_modulation = result["envelope_voltage_adc"]  # Test_Signal.txt envelope at the ADC rate
         
         # Calculate what scale factor SHOULD be (for diagnostics)
         # If envelope peak is X mV, and recovered peak is Y, scale = X/Y
@@ -669,12 +489,16 @@ def main():
         print(f"Carrier: Vpp={par['carrier_vpp']:.6f}V, amp_normalized={carrier_amp:.6f}, amp_volts={carrier_amp*dac_vref:.6f}V")
         print(f"Baseline: theoretical={theoretical_baseline:.6f}V, median={median_baseline:.6f}V, used={baseline:.6f}V")
         print(f"Demod R: min={np.min(adc_demod[skip_samples:]):.6f}, max={np.max(adc_demod[skip_samples:]):.6f}, mean={np.mean(adc_demod[skip_samples:]):.6f}")
-        print(f"Expected R range: {baseline*(1+np.min(env_voltage[skip_samples:])):.6f} to {baseline*(1+np.max(env_voltage[skip_samples:])):.6f}")
+        print(f"Expected R range: {baseline*(1+np.min(original_modulation[skip_samples:])):.6f} to {baseline*(1+np.max(original_modulation[skip_samples:])):.6f}")
         print(f"Envelope: min={np.min(env_voltage)*1e3:.6f}mV, max={np.max(env_voltage)*1e3:.6f}mV")
         print(f"Recovered: min={np.min(demod_recovered[skip_samples:])*1e3:.6f}mV, max={np.max(demod_recovered[skip_samples:])*1e3:.6f}mV")
         print(f"Peaks: original={orig_peak*1e3:.6f}mV, demod_raw={demod_peak*1e3:.6f}mV")
         print(f"Suggested scale={suggested_scale:.6f} (should be ~1.0 with no errors)")
         print(f"DC bias: current={par['dc_bias_uv']:.6f}µV, optimal={optimal_dc_bias_uv:.6f}µV")
+        cs = result["cache_stats"]
+        print(f"Stage cache: hit rate={cs['hit_rate']*100:.1f}%, entries={cs['entries']}, "
+              f"{cs['nbytes']/2**20:.1f} MiB, evictions={cs['evictions']}")
+        print(result["profiler"].summary())
         
         # Error = scaled recovered with DC bias - original
         error = demod_scaled - original_modulation
@@ -683,15 +507,15 @@ def main():
         max_error = np.max(np.abs(error_region))
         
         # Trim data to exclude transient for plotting (show in mV)
-        t_ms_trim = t_ms[skip_samples:]
+        t_ms_trim = t_adc_ms[skip_samples:]
         orig_trim = original_modulation[skip_samples:] * 1e3  # Convert to mV
         demod_trim = demod_scaled[skip_samples:] * 1e3
         error_trim = error[skip_samples:] * 1e3
         
         # Plot original and recovered (without transient, in mV)
-        ax_cmp_t.plot(t_ms_trim, orig_trim, color="C0", alpha=0.8, linewidth=0.6, label="Original")
+        lod_plot(ax_cmp_t, t_ms_trim, orig_trim, color="C0", alpha=0.8, linewidth=0.6, label="Original")
         bias_label = f"Recovered ×{graph_scale:.2f}" + (f" +{par['dc_bias_uv']:.1f}µV" if par['dc_bias_uv'] != 0 else "")
-        ax_cmp_t.plot(t_ms_trim, demod_trim, color="C4", alpha=0.7, linewidth=0.5, label=bias_label)
+        lod_plot(ax_cmp_t, t_ms_trim, demod_trim, color="C4", alpha=0.7, linewidth=0.5, label=bias_label)
         ax_cmp_t.set_ylabel("Voltage (mV)")
         ax_cmp_t.set_xlabel("Time (ms)")
         lpf_enbw_khz = par["lpf_enbw_khz"]
@@ -701,8 +525,8 @@ def main():
         ax_cmp_t.axhline(0, color="gray", linestyle="--", alpha=0.3)
 
         ax_cmp_f.clear()
-        plot_fft(ax_cmp_f, orig_trim, "C0", "Original")
-        plot_fft(ax_cmp_f, demod_trim, "C4", "Recovered")
+        plot_fft(ax_cmp_f, orig_trim, "C0", "Original", adc_rate=True)
+        plot_fft(ax_cmp_f, demod_trim, "C4", "Recovered", adc_rate=True)
         ax_cmp_f.set_ylabel("|FFT|")
         ax_cmp_f.set_xlabel("Frequency (kHz)")
         ax_cmp_f.set_title("FFT: Original vs Recovered", fontsize=9)
@@ -749,7 +573,7 @@ def main():
         
         # Plot error (in µV for better scale)
         error_uv = error_trim * 1e3  # mV to µV
-        ax_err_t.plot(t_ms_trim, error_uv, color="C3", linewidth=0.6)
+        lod_plot(ax_err_t, t_ms_trim, error_uv, color="C3", linewidth=0.6)
         ax_err_t.set_ylabel("Error (µV)")
         ax_err_t.set_xlabel("Time (ms)")
         ax_err_t.set_title(f"Recovery Error (RMS={rms_error*1e6:.2f} µV, Max={max_abs_error*1e6:.2f} µV)", fontsize=9)
@@ -758,7 +582,7 @@ def main():
         
         # FFT of error
         ax_err_f.clear()
-        plot_fft(ax_err_f, error_uv, "C3", "Error")
+        plot_fft(ax_err_f, error_uv, "C3", "Error", adc_rate=True)
         ax_err_f.set_ylabel("|FFT| (µV)")
         ax_err_f.set_xlabel("Frequency (kHz)")
         ax_err_f.set_title("FFT of Recovery Error", fontsize=9)
@@ -807,6 +631,29 @@ def main():
 
         fig.canvas.draw_idle()
 
+    # ── Background computation ──
+    # Slider moves only submit a request; the worker thread runs the chain
+    # after RECOMPUTE_DEBOUNCE_S of quiet, newer requests supersede stale
+    # ones, and a timer on the GUI thread draws results as they arrive.
+    worker = ComputeWorker(compute_chain, debounce_s=RECOMPUTE_DEBOUNCE_S)
+
+    def update(_=None):
+        worker.submit(get_params())
+
+    def on_worker_poll():
+        done = worker.poll()
+        if done is None:
+            return
+        if done.error is not None:
+            print(f"Error in signal chain: {done.error}")
+        elif done.result is not None:
+            render(done.request, done.result)
+
+    poll_timer = fig.canvas.new_timer(interval=WORKER_POLL_MS)
+    poll_timer.add_callback(on_worker_poll)
+    poll_timer.start()
+    fig.canvas.mpl_connect("close_event", lambda _: (poll_timer.stop(), worker.close()))
+
     # ── Buttons ──
     update_ax = fig.add_axes([0.03, 0.02, 0.08, 0.035])
     btn_update = Button(update_ax, "UPDATE", color='lightgreen', hovercolor='green')
@@ -881,6 +728,7 @@ def main():
                 status_text.set_text(f"✓ {param_name} = {format_val(new_val)}")
                 status_text.set_color('green')
                 fig.canvas.draw_idle()
+                update()
                 return
         status_text.set_text(f"Unknown: {param_name}")
         status_text.set_color('red')
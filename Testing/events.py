@@ -0,0 +1,197 @@
+"""
+Vectorized pulse (cell transit) detection for recorded captures.
+
+Events are runs where the deviation from a baseline crosses a threshold,
+with hysteresis (an event ends only when the deviation drops below a lower
+release level), gap merging and a minimum width. EventDetector works block
+by block with absolute sample indices, so long or memory-mapped recordings
+can be scanned without loading them; events spanning block boundaries are
+reported once, exactly as if the whole recording had been processed at once.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import NamedTuple, Optional
+
+POLARITIES = ("abs", "positive", "negative")
+
+
+class Events(NamedTuple):
+    """
+    Detected events as parallel arrays (one entry per event).
+
+    start/end are absolute sample indices, end exclusive; peak is the index
+    of the largest deviation and amplitude the signed deviation there.
+    """
+    start: np.ndarray
+    end: np.ndarray
+    peak: np.ndarray
+    amplitude: np.ndarray
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.end - self.start
+
+
+def _empty_events() -> Events:
+    idx = np.zeros(0, dtype=np.int64)
+    return Events(idx, idx.copy(), idx.copy(), np.zeros(0))
+
+
+def _concat_events(parts: list[Events]) -> Events:
+    if not parts:
+        return _empty_events()
+    return Events(*(np.concatenate(field) for field in zip(*parts)))
+
+
+class EventDetector:
+    """
+    Streaming threshold/hysteresis event detector.
+
+    An event starts at a sample whose deviation (x - baseline, or its
+    absolute value / negation per polarity) is >= threshold, and ends at the
+    first later sample whose deviation is < release. Events separated by
+    fewer than min_gap samples are merged; merged events shorter than
+    min_width samples are dropped.
+
+    process() returns only events that can no longer change; samples of an
+    event still open (or close enough to the block end to merge with a
+    later one) are carried into the next call. flush() closes the stream.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        release: Optional[float] = None,
+        baseline: float = 0.0,
+        polarity: str = "abs",
+        min_width: int = 1,
+        min_gap: int = 0,
+    ):
+        """
+        Args:
+            threshold: Deviation that starts an event.
+            release: Deviation below which an event ends (default threshold).
+            baseline: Level deviations are measured from.
+            polarity: "abs", "positive" (x above baseline) or "negative".
+            min_width: Minimum event length in samples.
+            min_gap: Events closer than this many samples are merged.
+        """
+        if polarity not in POLARITIES:
+            raise ValueError(f"polarity must be one of {POLARITIES}")
+        release = threshold if release is None else release
+        if release > threshold:
+            raise ValueError("release must not exceed threshold")
+        if min_width < 1 or min_gap < 0:
+            raise ValueError("min_width must be >= 1 and min_gap >= 0")
+        self.threshold = float(threshold)
+        self.release = float(release)
+        self.baseline = float(baseline)
+        self.polarity = polarity
+        self.min_width = int(min_width)
+        self.min_gap = int(min_gap)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget carried samples and restart at sample index 0."""
+        self._carry = np.zeros(0)
+        self._offset = 0  # absolute index of the first carried sample
+
+    def _deviation(self, x: np.ndarray) -> np.ndarray:
+        d = x - self.baseline
+        if self.polarity == "abs":
+            return np.abs(d)
+        return d if self.polarity == "positive" else -d
+
+    def _detect(self, x: np.ndarray, final: bool) -> Events:
+        n = x.size
+        d = self._deviation(x)
+        # Hysteresis: state follows the most recent sample that was above
+        # threshold (on) or below release (off); the carry starts "off".
+        mark = np.where(d >= self.threshold, 1, np.where(d < self.release, 0, -1)).astype(np.int8)
+        last = np.where(mark >= 0, np.arange(n), -1)
+        np.maximum.accumulate(last, out=last)
+        active = np.where(last >= 0, mark[last], 0).astype(bool)
+
+        edges = np.diff(active.view(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if self.min_gap > 0 and starts.size > 1:
+            keep = np.ones(starts.size, dtype=bool)
+            keep[1:] = starts[1:] - ends[:-1] >= self.min_gap
+            starts = starts[keep]
+            ends = ends[np.append(keep[1:], True)]
+
+        # Settled events: closed, and far enough from the end not to merge
+        if final:
+            n_done = starts.size
+        else:
+            n_done = int(np.searchsorted(ends, n - max(self.min_gap, 1), side="right"))
+        cut = starts[n_done] if n_done < starts.size else n
+        starts, ends = starts[:n_done], ends[:n_done]
+
+        self._carry = x[cut:].copy()
+        offset = self._offset
+        self._offset += cut
+
+        wide = ends - starts >= self.min_width
+        starts, ends = starts[wide], ends[wide]
+        if not starts.size:
+            return _empty_events()
+
+        # Peak per event: max over each [start, end) via reduceat, then the
+        # first sample in the event reaching it
+        # (events are disjoint and separated, so start/end indices never collide)
+        inside = np.zeros(n + 1, dtype=np.int8)
+        inside[starts] = 1
+        inside[ends] = -1
+        idx = np.flatnonzero(np.cumsum(inside[:n]))
+        seg = np.cumsum(inside[:n] == 1)[idx] - 1
+        seg_start = np.flatnonzero(np.diff(seg, prepend=-1))
+        seg_max = np.maximum.reduceat(d[idx], seg_start)
+        hit = d[idx] == seg_max[seg]
+        _, first = np.unique(seg[hit], return_index=True)
+        peak = idx[hit][first]
+        return Events(
+            start=starts + offset,
+            end=ends + offset,
+            peak=peak + offset,
+            amplitude=x[peak] - self.baseline,
+        )
+
+    def process(self, block: np.ndarray) -> Events:
+        """Detect events in one block; returns the events settled so far."""
+        block = np.asarray(block, dtype=float)
+        x = np.concatenate((self._carry, block)) if self._carry.size else block
+        return self._detect(x, final=False)
+
+    def flush(self) -> Events:
+        """End of stream: report carried events (an open event ends at the last sample)."""
+        events = self._detect(self._carry, final=True)
+        self._carry = np.zeros(0)
+        return events
+
+
+def detect_events(
+    signal: np.ndarray,
+    threshold: float,
+    release: Optional[float] = None,
+    baseline: float = 0.0,
+    polarity: str = "abs",
+    min_width: int = 1,
+    min_gap: int = 0,
+    block_size: int = 1 << 20,
+) -> Events:
+    """
+    Detect all events in a (possibly memory-mapped) recording, block by block.
+
+    See EventDetector for the parameters; returns the events of the whole
+    recording with absolute sample indices.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be >= 1")
+    detector = EventDetector(threshold, release, baseline, polarity, min_width, min_gap)
+    parts = [detector.process(signal[i : i + block_size]) for i in range(0, len(signal), block_size)]
+    parts.append(detector.flush())
+    return _concat_events(parts)
@@ -7,9 +7,108 @@ and error models for DAC, op-amp, and ADC simulation.
 
 from __future__ import annotations
 
+import math
+from fractions import Fraction
+
 import numpy as np
 from typing import Literal, Optional
 from enum import Enum
+from numpy.typing import DTypeLike
+from scipy.signal import lfilter
+
+# Sample precisions supported by the generators, error models and simulators.
+# float32 halves memory traffic and is ample for 16-bit data; recursive
+# filters (LPF state) always run in float64 and only their output is cast.
+FLOAT_DTYPES = ("float32", "float64")
+_PHASE_CHUNK = 1 << 13  # samples per float64 phase-reduction chunk
+_LPF_CHUNK = 1 << 12    # samples per lfilter call when filtering into out=
+
+
+def _float_dtype(dtype: DTypeLike) -> np.dtype:
+    """Validate a precision argument (float32 or float64)."""
+    dt = np.dtype(dtype)
+    if dt.name not in FLOAT_DTYPES:
+        raise ValueError(f"dtype must be one of {FLOAT_DTYPES}, got {dt}")
+    return dt
+
+
+class ScratchBuffers:
+    """
+    Named work arrays reused across calls of the out=/scratch= hot paths.
+
+    get() hands out a view of a cached buffer, growing it only when a larger
+    or differently typed array is requested, so streaming same-size (or
+    shrinking) blocks through a function allocates its temporaries once.
+    One instance belongs to one caller; views are overwritten by the next
+    call that asks for the same name.
+    """
+
+    def __init__(self):
+        self._buffers: dict[str, np.ndarray] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(b.nbytes for b in self._buffers.values())
+
+    def get(self, name: str, shape: int | tuple, dtype: DTypeLike) -> np.ndarray:
+        """Uninitialized array of shape and dtype backed by buffer name."""
+        shape = (shape,) if np.ndim(shape) == 0 else tuple(shape)
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        buf = self._buffers.get(name)
+        if buf is None or buf.dtype != dtype or buf.size < size:
+            buf = np.empty(size, dtype=dtype)
+            self._buffers[name] = buf
+        return buf[:size].reshape(shape)
+
+    def clear(self) -> None:
+        self._buffers.clear()
+
+
+def _out_buffer(out: Optional[np.ndarray], shape: tuple, dtype: np.dtype) -> np.ndarray:
+    """Validate a caller-supplied out= array, or allocate one."""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype:
+        raise ValueError(f"out must have shape {shape} and dtype {dtype}, got {out.shape} {out.dtype}")
+    return out
+
+
+def _wrapped_phase(
+    t: np.ndarray,
+    frequency: float,
+    phase: float,
+    dtype: np.dtype,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    2*pi*frequency*t + phase reduced to [0, 2*pi) in float64, then cast.
+
+    Used by the float32 paths: the reduction keeps the argument small so
+    single-precision sin/cos stay accurate on long time bases. Works in
+    chunks so the float64 temporaries stay small.
+    """
+    t = np.asarray(t)
+    if out is None:
+        out = np.empty(t.shape, dtype=dtype)
+    flat_t, flat_out = t.reshape(-1), out.reshape(-1)
+    for i in range(0, flat_t.size, _PHASE_CHUNK):
+        cycles = np.multiply(flat_t[i : i + _PHASE_CHUNK], frequency, dtype=np.float64)
+        cycles += phase / (2.0 * np.pi)
+        cycles -= np.floor(cycles)
+        cycles *= 2.0 * np.pi
+        flat_out[i : i + _PHASE_CHUNK] = cycles
+    return out
+
+
+def _tone_into(out: np.ndarray, t: np.ndarray, frequency: float, phase: float, fn) -> np.ndarray:
+    """out[:] = fn(2*pi*frequency*t + phase), computed in out's precision."""
+    if out.dtype == np.float64:
+        np.multiply(t, 2.0 * np.pi * frequency, out=out)
+        out += phase
+    else:
+        _wrapped_phase(t, frequency, phase, out.dtype, out=out)
+    return fn(out, out=out)
 
 
 # -----------------------------------------------------------------------------
@@ -22,6 +121,9 @@ def sine_wave(
     amplitude: float = 1.0,
     phase: float = 0.0,
     dc_offset: float = 0.0,
+    nco: Optional["NCO"] = None,
+    dtype: DTypeLike = np.float64,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Generate a sine wave in the time domain.
@@ -32,11 +134,27 @@ def sine_wave(
         amplitude: Peak amplitude.
         phase: Phase in radians.
         dc_offset: DC offset.
+        nco: Optional NCO to use as the reference source instead of
+            evaluating np.sin on t. It supplies the next t.size samples (t
+            is assumed uniform at the NCO's sample rate) and must be tuned
+            to `frequency`.
+        dtype: Output precision, float64 (default) or float32.
+        out: Optional output array (shape of t, dtype `dtype`) to fill
+            instead of allocating one.
 
     Returns:
         Array of shape (t.size,) with sine values.
     """
-    return dc_offset + amplitude * np.sin(2.0 * np.pi * frequency * t + phase)
+    dt = _float_dtype(dtype)
+    out = _out_buffer(out, np.shape(t), dt)
+    if nco is not None:
+        _check_nco_frequency(nco, frequency)
+        out[...] = nco.sin(np.size(t), phase)
+    else:
+        _tone_into(out, t, frequency, phase, np.sin)
+    out *= dt.type(amplitude)
+    out += dt.type(dc_offset)
+    return out
 
 
 def cosine_wave(
@@ -45,6 +163,9 @@ def cosine_wave(
     amplitude: float = 1.0,
     phase: float = 0.0,
     dc_offset: float = 0.0,
+    nco: Optional["NCO"] = None,
+    dtype: DTypeLike = np.float64,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Generate a cosine wave in the time domain.
@@ -55,11 +176,162 @@ def cosine_wave(
         amplitude: Peak amplitude.
         phase: Phase in radians.
         dc_offset: DC offset.
+        nco: Optional NCO to use as the reference source instead of
+            evaluating np.cos on t. It supplies the next t.size samples (t
+            is assumed uniform at the NCO's sample rate) and must be tuned
+            to `frequency`.
+        dtype: Output precision, float64 (default) or float32.
+        out: Optional output array (shape of t, dtype `dtype`) to fill
+            instead of allocating one.
 
     Returns:
         Array of shape (t.size,) with cosine values.
     """
-    return dc_offset + amplitude * np.cos(2.0 * np.pi * frequency * t + phase)
+    dt = _float_dtype(dtype)
+    out = _out_buffer(out, np.shape(t), dt)
+    if nco is not None:
+        _check_nco_frequency(nco, frequency)
+        out[...] = nco.cos(np.size(t), phase)
+    else:
+        _tone_into(out, t, frequency, phase, np.cos)
+    out *= dt.type(amplitude)
+    out += dt.type(dc_offset)
+    return out
+
+
+# Synthesis methods of multifrequency_sine. The fast ones need a uniformly
+# sampled 1-D t; "auto" picks one from the tone count and periodicity.
+MULTISINE_METHODS = ("auto", "direct", "rotation", "ifft", "tile")
+_MULTISINE_BLOCK = 1 << 10   # max samples per rotation block (rotation table width)
+_MULTISINE_GROUP = 64        # rotation blocks per matrix product
+_MULTISINE_MIN_TONES = 2     # below this "auto" keeps the direct sum
+_MULTISINE_DRIFT = 1e-9      # max phase drift (cycles over t) of a tone taken as periodic
+
+
+def _uniform_step(t: np.ndarray) -> Optional[float]:
+    """Sample spacing of 1-D t if it is a uniform grid to within rounding, else None."""
+    if t.ndim != 1 or t.size < 2 or not np.issubdtype(t.dtype, np.floating):
+        return None
+    t0, t1 = float(t[0]), float(t[-1])
+    step = (t1 - t0) / (t.size - 1)
+    if not np.isfinite(step) or step <= 0.0:
+        return None
+    tol = 8.0 * np.finfo(t.dtype).eps * max(abs(t0), abs(t1))
+    for i in range(0, t.size, _PHASE_CHUNK):
+        chunk = t[i : i + _PHASE_CHUNK]
+        dev = np.arange(i, i + chunk.size, dtype=np.float64)
+        dev *= step
+        dev += t0
+        dev -= chunk
+        if np.max(np.abs(dev)) > tol:
+            return None
+    return step
+
+
+def _common_period(cycles_per_sample: np.ndarray, n: int) -> Optional[int]:
+    """
+    Smallest P <= n after which every tone repeats exactly, or None.
+
+    A tone counts as periodic when its rational approximation p/q (q <= n)
+    drifts by less than _MULTISINE_DRIFT cycles over n samples.
+    """
+    period = 1
+    for x in cycles_per_sample:
+        x = float(x) % 1.0
+        frac = Fraction(x).limit_denominator(n)
+        if abs(x - float(frac)) * n > _MULTISINE_DRIFT:
+            return None
+        period = math.lcm(period, frac.denominator)
+        if period > n:
+            return None
+    return period
+
+
+def _start_cycles(t_start: np.ndarray | float, frequencies: np.ndarray, phases: np.ndarray) -> np.ndarray:
+    """Tone phases at t_start in cycles, reduced to [0, 1); shape t_start.shape + (K,)."""
+    cycles = np.multiply.outer(t_start, frequencies)
+    cycles += phases / (2.0 * np.pi)
+    cycles -= np.floor(cycles)
+    return cycles
+
+
+def _multisine_rotation(
+    out: np.ndarray,
+    t: np.ndarray,
+    step: float,
+    frequencies: np.ndarray,
+    amplitudes: np.ndarray,
+    phases: np.ndarray,
+    scratch: ScratchBuffers,
+) -> None:
+    """
+    out[:] = sum_k a_k sin(2 pi f_k t + phi_k) by block-wise phasor rotation.
+
+    Every block of _MULTISINE_BLOCK samples starts from exact tone phasors
+    a_k exp(i theta_k) taken at the block's first t (the renormalization
+    step), which are advanced through the block by a precomputed table of
+    rotation powers exp(i 2 pi f_k j step). Using sin(theta + w) =
+    sin(theta) cos(w) + cos(theta) sin(w), _MULTISINE_GROUP blocks are one
+    real matrix product (G, 2K) @ (2K, B), so there are only O(K) sin/cos
+    evaluations per block and rounding does not accumulate across blocks.
+    """
+    n, k = t.size, frequencies.size
+    # The table costs 2K B sin/cos and the anchors 2K n / B: balance at sqrt(n)
+    block = min(_MULTISINE_BLOCK, max(1, math.isqrt(n)))
+    table = scratch.get("multisine_table", (2 * k, block), out.dtype)
+    arg = _start_cycles(np.arange(block) * step, frequencies, np.zeros(k)).T
+    arg *= 2.0 * np.pi
+    np.cos(arg, out=table[:k])
+    np.sin(arg, out=table[k:])
+    coef = scratch.get("multisine_coef", (_MULTISINE_GROUP, 2 * k), out.dtype)
+
+    def rotate(start: int, stop: int, width: int) -> None:
+        g = (stop - start) // width
+        theta = _start_cycles(t[start:stop:width], frequencies, phases)
+        theta *= 2.0 * np.pi
+        np.multiply(np.sin(theta), amplitudes, out=coef[:g, :k])
+        np.multiply(np.cos(theta), amplitudes, out=coef[:g, k:])
+        np.matmul(coef[:g], table[:, :width], out=out[start:stop].reshape(g, width))
+
+    n_full = n - n % block
+    for start in range(0, n_full, _MULTISINE_GROUP * block):
+        rotate(start, min(start + _MULTISINE_GROUP * block, n_full), block)
+    if n_full < n:
+        rotate(n_full, n, n - n_full)
+
+
+def _multisine_period_ifft(
+    period: int,
+    t0: float,
+    cycles_per_sample: np.ndarray,
+    frequencies: np.ndarray,
+    amplitudes: np.ndarray,
+    phases: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """One period of the multisine (all tones on bins of `period`) by inverse real FFT."""
+    bins = np.rint(cycles_per_sample * period).astype(np.int64) % period
+    theta = 2.0 * np.pi * _start_cycles(t0, frequencies, phases)
+    amps = np.asarray(amplitudes, dtype=np.float64).copy()
+    # sin(2 pi m j / P + theta) = -sin(2 pi (P - m) j / P - theta)
+    upper = bins > period // 2
+    bins[upper] = period - bins[upper]
+    amps[upper] = -amps[upper]
+    theta[upper] = -theta[upper]
+    spec = np.zeros(period // 2 + 1, dtype=np.complex128)
+    real = (bins == 0) | (2 * bins == period)
+    np.add.at(spec, bins[real], period * amps[real] * np.sin(theta[real]))
+    np.add.at(spec, bins[~real], 0.5 * period * amps[~real] * np.exp(1j * (theta[~real] - 0.5 * np.pi)))
+    out[:] = np.fft.irfft(spec, n=period)
+
+
+def _tile_period(out: np.ndarray, period: int) -> None:
+    """Repeat out[:period] over the whole of out by doubling copies."""
+    filled = period
+    while filled < out.size:
+        count = min(filled, out.size - filled)
+        out[filled : filled + count] = out[:count]
+        filled += count
 
 
 def multifrequency_sine(
@@ -68,20 +340,46 @@ def multifrequency_sine(
     amplitudes: np.ndarray,
     phases: Optional[np.ndarray] = None,
     dc_offset: float = 0.0,
+    dtype: DTypeLike = np.float64,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[ScratchBuffers] = None,
+    method: str = "auto",
 ) -> np.ndarray:
     """
     Sum of sinusoids (multifrequency excitation as in README).
 
+    Methods (see MULTISINE_METHODS):
+        direct: one sin() over t per tone; any t, O(K N) transcendentals.
+        rotation: block-wise phasor rotation as a matrix product; uniform t.
+        ifft: one common period of all tones by inverse FFT, then tiled;
+            uniform t and every tone periodic within len(t) samples.
+        tile: the first period by rotation, then tiled; same conditions.
+        auto: direct for a single tone or non-uniform t, else ifft or
+            tile when the tones share a period, else rotation.
+    A fast method whose conditions do not hold falls back to direct.
+
+    Error bound: the fast methods treat t as the uniform grid it
+    approximates and agree with direct to within
+    (1e-9 + 2 pi f_max ulp(max|t|)) * sum|a_k| in float64, the second term
+    being the rounding already present in t; float32 output adds its own
+    rounding on top.
+
     Args:
         t: Time samples (seconds).
         frequencies: Array of frequencies (Hz).
         amplitudes: Array of amplitudes (same length as frequencies).
         phases: Optional phases in radians; default zero.
         dc_offset: DC offset.
+        dtype: Output precision, float64 (default) or float32.
+        out: Optional output array (shape of t, dtype `dtype`).
+        scratch: Optional ScratchBuffers for work arrays.
+        method: Synthesis method, one of MULTISINE_METHODS.
 
     Returns:
         Composite waveform, shape (t.size,).
     """
+    if method not in MULTISINE_METHODS:
+        raise ValueError(f"method must be one of {MULTISINE_METHODS}, got {method!r}")
     n = len(frequencies)
     if len(amplitudes) != n:
         raise ValueError("amplitudes must match length of frequencies")
@@ -90,10 +388,179 @@ def multifrequency_sine(
     elif len(phases) != n:
         raise ValueError("phases must match length of frequencies")
 
-    out = np.zeros_like(t, dtype=float)
-    for k in range(n):
-        out += amplitudes[k] * np.sin(2.0 * np.pi * frequencies[k] * t + phases[k])
-    return out + dc_offset
+    dt = _float_dtype(dtype)
+    t = np.asarray(t)
+    out = _out_buffer(out, t.shape, dt)
+    if scratch is None:
+        scratch = ScratchBuffers()
+
+    step = None
+    if method != "direct" and not (method == "auto" and n < _MULTISINE_MIN_TONES):
+        step = _uniform_step(t)
+    if step is None:
+        method = "direct"
+    else:
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        amplitudes = np.asarray(amplitudes, dtype=np.float64)
+        phases = np.asarray(phases, dtype=np.float64)
+        cycles_per_sample = frequencies * step
+        period = None
+        if method != "rotation":
+            period = _common_period(cycles_per_sample, t.size)
+        if period is not None and method == "auto":
+            # An FFT period costs O(P log P), rotating it O(P K)
+            method = "ifft" if 2 * n >= math.log2(max(period, 2)) else "tile"
+        elif period is None and method in ("ifft", "tile"):
+            method = "direct"
+        elif method == "auto":
+            method = "rotation"
+
+    if method == "direct":
+        out.fill(0.0)
+        tone = scratch.get("tone", t.shape, dt)
+        for k in range(n):
+            _tone_into(tone, t, frequencies[k], phases[k], np.sin)
+            tone *= dt.type(amplitudes[k])
+            out += tone
+    elif method == "rotation":
+        _multisine_rotation(out, t, step, frequencies, amplitudes, phases, scratch)
+    elif method == "tile":
+        _multisine_rotation(out[:period], t[:period], step, frequencies, amplitudes, phases, scratch)
+        _tile_period(out, period)
+    else:
+        buf = scratch.get("multisine_period", period, np.float64)
+        _multisine_period_ifft(period, float(t[0]), cycles_per_sample, frequencies, amplitudes, phases, buf)
+        out[:period] = buf
+        _tile_period(out, period)
+    out += dt.type(dc_offset)
+    return out
+
+
+def _check_nco_frequency(nco: "NCO", frequency: float) -> None:
+    """Reject an NCO whose tuning word does not give the requested frequency."""
+    if np.ndim(nco.frequency_hz) != 0:
+        raise ValueError("sine_wave/cosine_wave need a single-tone NCO")
+    if abs(nco.frequency_hz - np.mod(frequency, nco.sample_rate_hz)) > nco.resolution_hz:
+        raise ValueError(f"NCO is tuned to {nco.frequency_hz} Hz, not {frequency} Hz")
+
+
+class NCO:
+    """
+    Phase-accumulator NCO / DDS modeled on the FPGA phase_accumulator.
+
+    An N-bit accumulator advances by an integer tuning word every sample;
+    its top phase_out_bits address a quarter-wave sine LUT (2 quadrant bits
+    + LUT address). Samples are produced by integer arithmetic and table
+    lookup only, the phase never loses precision on long captures, and
+    consecutive calls continue seamlessly. frequency_hz may be an array of
+    N tones, in which case outputs have shape (N, n).
+    """
+
+    def __init__(
+        self,
+        frequency_hz: float | np.ndarray,
+        sample_rate_hz: float,
+        phase_bits: int = 48,
+        phase_out_bits: int = 16,
+        amplitude_bits: Optional[int] = 16,
+        phase: float | np.ndarray = 0.0,
+        dither: bool = False,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            frequency_hz: Output frequency (or array of frequencies) in Hz.
+            sample_rate_hz: Clock / sample rate in Hz.
+            phase_bits: Accumulator width (FPGA: 48).
+            phase_out_bits: Truncated phase width feeding the LUT (FPGA: 16).
+            amplitude_bits: Signed LUT word width; None for unquantized samples.
+            phase: Start phase in radians.
+            dither: Add uniform phase dither below the truncation point.
+            seed: Seed for the dither generator.
+        """
+        if not 3 <= phase_out_bits <= phase_bits <= 63:
+            raise ValueError("need 3 <= phase_out_bits <= phase_bits <= 63")
+        self.sample_rate_hz = sample_rate_hz
+        self.phase_bits = phase_bits
+        self.phase_out_bits = phase_out_bits
+        self.amplitude_bits = amplitude_bits
+        self.dither = dither
+        self._mask = np.uint64((1 << phase_bits) - 1)
+        self._shift = np.uint64(phase_bits - phase_out_bits)
+        f = np.asarray(frequency_hz, dtype=float)
+        self.tuning_word = np.round(np.mod(f / sample_rate_hz, 1.0) * (1 << phase_bits)).astype(np.uint64)
+        start = np.mod(np.asarray(phase, dtype=float) / (2.0 * np.pi), 1.0)
+        self._phase0 = np.broadcast_to(
+            np.round(start * (1 << phase_bits)).astype(np.uint64) & self._mask, f.shape
+        ).copy()
+        self._rng = np.random.default_rng(seed)
+
+        # Quarter-wave table, sampled at LUT bin centres (symmetric mirroring)
+        n_lut = 1 << (phase_out_bits - 2)
+        lut = np.sin(0.5 * np.pi * (np.arange(n_lut) + 0.5) / n_lut)
+        if amplitude_bits is not None:
+            full_scale = (1 << (amplitude_bits - 1)) - 1
+            lut = np.round(lut * full_scale) / full_scale
+        self._lut = lut
+        self.reset()
+
+    @property
+    def frequency_hz(self) -> float | np.ndarray:
+        """Actual output frequency set by the integer tuning word."""
+        f = self.tuning_word.astype(float) * self.sample_rate_hz / float(1 << self.phase_bits)
+        return f if f.ndim else float(f)
+
+    @property
+    def resolution_hz(self) -> float:
+        """Frequency step of one tuning-word LSB."""
+        return self.sample_rate_hz / float(1 << self.phase_bits)
+
+    def reset(self) -> None:
+        """Return the accumulator to the start phase."""
+        self._acc = self._phase0.copy()
+
+    def phase_words(self, n: int) -> np.ndarray:
+        """Next n truncated phase words (phase_out_bits wide); advances the NCO."""
+        k = np.arange(n, dtype=np.uint64)
+        acc0 = self._acc[..., None]
+        fcw = self.tuning_word[..., None]
+        # uint64 products wrap mod 2^64, which preserves the value mod 2^phase_bits
+        with np.errstate(over="ignore"):
+            acc = (acc0 + k * fcw) & self._mask
+            self._acc = (self._acc + np.uint64(n) * self.tuning_word) & self._mask
+        if self.dither:
+            span = 1 << int(self._shift)
+            acc = (acc + self._rng.integers(0, span, size=acc.shape, dtype=np.uint64)) & self._mask
+        return acc >> self._shift
+
+    def _lookup(self, words: np.ndarray) -> np.ndarray:
+        """Quarter-wave LUT lookup of phase_out_bits phase words."""
+        addr_bits = self.phase_out_bits - 2
+        quadrant = words >> np.uint64(addr_bits)
+        addr = (words & np.uint64((1 << addr_bits) - 1)).astype(np.intp)
+        mirrored = (quadrant & np.uint64(1)).astype(bool)
+        addr = np.where(mirrored, self._lut.size - 1 - addr, addr)
+        out = self._lut[addr]
+        return np.where(quadrant >= np.uint64(2), -out, out)
+
+    def _offset_word(self, phase: float) -> np.uint64:
+        return np.uint64(int(round((phase / (2.0 * np.pi)) % 1.0 * (1 << self.phase_out_bits))) % (1 << self.phase_out_bits))
+
+    def sincos(self, n: int, phase: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+        """Next n samples of (sin, cos), with an optional extra phase offset (rad)."""
+        out_mask = np.uint64((1 << self.phase_out_bits) - 1)
+        words = (self.phase_words(n) + self._offset_word(phase)) & out_mask
+        quarter = np.uint64(1 << (self.phase_out_bits - 2))
+        return self._lookup(words), self._lookup((words + quarter) & out_mask)
+
+    def sin(self, n: int, phase: float = 0.0) -> np.ndarray:
+        """Next n sine samples."""
+        out_mask = np.uint64((1 << self.phase_out_bits) - 1)
+        return self._lookup((self.phase_words(n) + self._offset_word(phase)) & out_mask)
+
+    def cos(self, n: int, phase: float = 0.0) -> np.ndarray:
+        """Next n cosine samples."""
+        return self.sin(n, phase + 0.5 * np.pi)
 
 
 # -----------------------------------------------------------------------------
@@ -146,6 +613,7 @@ def noise_time_domain(
     noise_type: NoiseType | str = NoiseType.WHITE,
     scale: float = 1.0,
     rng: Optional[np.random.Generator] = None,
+    dtype: DTypeLike = np.float64,
 ) -> np.ndarray:
     """
     Generate noise in the time domain.
@@ -158,19 +626,23 @@ def noise_time_domain(
         noise_type: One of white, pink, brownian, blue, violet, bandlimited_white.
         scale: RMS scale factor for output.
         rng: Optional NumPy random generator for reproducibility.
+        dtype: Output precision, float64 (default) or float32. White noise
+            is drawn directly in float32; colored noise is shaped in float64
+            and cast.
 
     Returns:
         Real-valued noise array of shape (n_samples,).
     """
+    dt = _float_dtype(dtype)
     if rng is None:
         rng = np.random.default_rng()
     if isinstance(noise_type, str):
         noise_type = NoiseType(noise_type)
 
     if noise_type == NoiseType.WHITE:
-        x = rng.standard_normal(n_samples)
+        x = rng.standard_normal(n_samples, dtype=dt)
         if scale != 1.0:
-            x = x * scale
+            x = x * dt.type(scale)
         return x
 
     if noise_type == NoiseType.BANDLIMITED_WHITE:
@@ -190,7 +662,7 @@ def noise_time_domain(
         rms = np.sqrt(np.mean(x ** 2))
         if rms > 0:
             x = x * (scale / rms)
-        return x
+        return x.astype(dt, copy=False)
 
     # Colored: generate white in freq domain, apply filter, IFFT
     n_fft = n_samples
@@ -220,7 +692,7 @@ def noise_time_domain(
     rms = np.sqrt(np.mean(x ** 2))
     if rms > 0:
         x = x * (scale / rms)
-    return x
+    return x.astype(dt, copy=False)
 
 
 def noise_frequency_domain(
@@ -228,6 +700,7 @@ def noise_frequency_domain(
     noise_type: NoiseType | str = NoiseType.WHITE,
     scale: float = 1.0,
     rng: Optional[np.random.Generator] = None,
+    dtype: DTypeLike = np.float64,
 ) -> np.ndarray:
     """
     Generate noise directly in the frequency domain (complex spectrum).
@@ -241,10 +714,12 @@ def noise_frequency_domain(
         noise_type: White, pink, brownian, etc. (shapes magnitude).
         scale: Scale for magnitude.
         rng: Optional random generator.
+        dtype: Real precision of the spectrum; float32 gives complex64.
 
     Returns:
         Complex array of shape (n_bins,).
     """
+    dt = _float_dtype(dtype)
     if rng is None:
         rng = np.random.default_rng()
     if isinstance(noise_type, str):
@@ -270,7 +745,7 @@ def noise_frequency_domain(
         mag = np.ones(n_bins)
 
     mag[0] = 0.0
-    return scale * mag * np.exp(1j * phase)
+    return (scale * mag * np.exp(1j * phase)).astype(np.result_type(dt, np.complex64), copy=False)
 
 
 # -----------------------------------------------------------------------------
@@ -300,6 +775,54 @@ def apply_phase_delay(
     return np.roll(signal, -shift)
 
 
+def _random_walk_inl(n_levels: int, peak: float, rng: np.random.Generator) -> np.ndarray:
+    """Zero-mean random-walk profile over n_levels codes, scaled to |max| = peak."""
+    profile = np.cumsum(rng.standard_normal(n_levels))
+    profile = profile - profile.mean()
+    return profile / (np.abs(profile).max() + 1e-12) * peak
+
+
+def dac_inl_profile(
+    n_bits: int = 16,
+    inl_lsb: float = 4.0,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Per-code DAC INL table (random walk), in normalized output units.
+
+    Returns array of shape (2^n_bits,); entry k is the INL error added to
+    the ideal output of code k. Generate once per simulated device.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    max_code = (1 << n_bits) - 1
+    return _random_walk_inl(1 << n_bits, inl_lsb / max_code, rng)
+
+
+def adc_inl_profile(
+    n_bits: int = 16,
+    inl_lsb: float = 2.0,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Per-code ADC INL table (random walk), in code units.
+
+    Returns array of shape (2^n_bits,); entry k is added to the
+    continuous code of any input that falls in code k.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    n_levels = 1 << n_bits
+    return _random_walk_inl(n_levels, inl_lsb / n_levels, rng)
+
+
+def _check_inl_profile(inl_profile: np.ndarray, n_levels: int, dtype: DTypeLike = np.float64) -> np.ndarray:
+    inl_profile = np.asarray(inl_profile, dtype=dtype)
+    if inl_profile.shape != (n_levels,):
+        raise ValueError(f"inl_profile must have shape ({n_levels},), got {inl_profile.shape}")
+    return inl_profile
+
+
 def dac_errors(
     digital_codes: np.ndarray,
     n_bits: int = 16,
@@ -309,58 +832,147 @@ def dac_errors(
     offset_error: float = 0.0,
     glitch_energy_frac: float = 0.0,
     rng: Optional[np.random.Generator] = None,
+    inl_profile: Optional[np.ndarray] = None,
+    dtype: DTypeLike = np.float64,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[ScratchBuffers] = None,
+    normalized: Optional[bool] = None,
 ) -> np.ndarray:
     """
     Simulate common DAC errors: INL, DNL, gain, offset, and optional glitch.
 
     Models typical high-speed 16-bit DAC (e.g. 250+ MSPS class).
     digital_codes: integer codes in [0, 2^n_bits - 1], or float in [0,1] normalized.
+    normalized: whether digital_codes are normalized to [0, 1]; None
+        decides from the dtype (floating point means normalized), never
+        from the values, so every block of a stream is read the same way.
+    inl_profile: optional per-code INL table from dac_inl_profile(); when
+        omitted a new random profile is drawn on every call.
+    dtype: working and output precision, float64 (default) or float32.
+    out, scratch: optional output array (shape of digital_codes, dtype
+        `dtype`) and ScratchBuffers for the temporaries. With both, the
+        INL/DNL/gain path makes no full-length allocations (the glitch
+        model still does).
     """
+    dt = _float_dtype(dtype)
     if rng is None:
         rng = np.random.default_rng()
+    if scratch is None:
+        scratch = ScratchBuffers()
 
-    codes = np.asarray(digital_codes, dtype=float)
+    shape = np.shape(digital_codes)
+    codes = scratch.get("codes", shape, dt)
+    np.copyto(codes, digital_codes, casting="unsafe")
     max_code = (1 << n_bits) - 1
-    if codes.max() <= 1.0 and codes.min() >= 0.0:
-        codes = codes * max_code
-    codes = np.clip(codes, 0, max_code)
+    if normalized is None:
+        normalized = np.issubdtype(np.asarray(digital_codes).dtype, np.floating)
+    if normalized:
+        codes *= max_code
+    np.clip(codes, 0, max_code, out=codes)
 
     # Ideal output normalized to [0, 1]
-    ideal = codes / max_code
+    dac_out = _out_buffer(out, shape, dt)
+    np.divide(codes, max_code, out=dac_out)
 
     # INL: integral nonlinearity (cumulative deviation from ideal)
     # Simplified: random walk per code, scaled by inl_lsb
     n_levels = 1 << n_bits
-    inl_profile = np.cumsum(rng.standard_normal(n_levels))
-    inl_profile = inl_profile - inl_profile.mean()
-    inl_profile = inl_profile / (np.abs(inl_profile).max() + 1e-12) * (inl_lsb / max_code)
-    code_int = np.clip(codes.astype(int), 0, n_levels - 1)
-    inl_error = inl_profile[code_int]
+    if inl_profile is None:
+        inl_profile = dac_inl_profile(n_bits, inl_lsb, rng)
+    inl_profile = _check_inl_profile(inl_profile, n_levels, dt)
+    code_int = scratch.get("code_int", shape, np.intp)
+    np.copyto(code_int, codes, casting="unsafe")
+    np.clip(code_int, 0, n_levels - 1, out=code_int)
+    err = scratch.get("err", shape, dt)
+    dac_out += np.take(inl_profile, code_int, out=err, mode="clip")
 
     # DNL: differential nonlinearity (per-step error)
-    dnl_random = rng.standard_normal(codes.shape) * (dnl_lsb / max_code)
-    dac_out = ideal + inl_error + dnl_random
+    rng.standard_normal(dtype=dt, out=err)
+    err *= dt.type(dnl_lsb / max_code)
+    dac_out += err
 
     # Gain and offset (applied to normalized output)
-    dac_out = dac_out * (1.0 + gain_error) + offset_error
+    dac_out *= dt.type(1.0 + gain_error)
+    dac_out += dt.type(offset_error)
 
     # Optional glitch: add small random spikes on large code transitions
     if glitch_energy_frac > 0:
         diff = np.diff(dac_out, prepend=dac_out[0])
         transition = np.abs(diff) > np.percentile(np.abs(diff), 99)
-        glitch = rng.standard_normal(dac_out.shape) * glitch_energy_frac
-        dac_out = dac_out + glitch * transition
+        glitch = rng.standard_normal(dac_out.shape, dtype=dt) * dt.type(glitch_energy_frac)
+        dac_out += glitch * transition
 
     return dac_out
 
 
+def _single_pole_alpha(bandwidth_hz: float, sample_rate_hz: float) -> Optional[float]:
+    """
+    Smoothing factor for a single-pole LPF, or None if no filtering applies.
+
+    alpha = 1 - exp(-2*pi*fb/fs); bandwidths at or above fs/2 (or non-finite)
+    leave the signal unfiltered.
+    """
+    if not (0 < bandwidth_hz < np.inf):
+        return None
+    fc_norm = bandwidth_hz / sample_rate_hz
+    if fc_norm >= 0.5:
+        return None
+    return 1.0 - np.exp(-2.0 * np.pi * fc_norm)
+
+
+class SinglePoleLPF:
+    """
+    Stateful first-order IIR LPF: y[n] = alpha*x[n] + (1-alpha)*y[n-1].
+
+    Vectorized via scipy.signal.lfilter. The filter state is kept between
+    calls to process(), so a long signal can be filtered as consecutive
+    chunks with exactly the same output as one call on the whole signal.
+    """
+
+    def __init__(self, alpha: float):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = float(alpha)
+        self._b = np.array([self.alpha])
+        self._a = np.array([1.0, self.alpha - 1.0])
+        self._zi = np.zeros(1)
+
+    @classmethod
+    def from_bandwidth(
+        cls, bandwidth_hz: float, sample_rate_hz: float
+    ) -> Optional["SinglePoleLPF"]:
+        """Build the filter for a -3 dB bandwidth; None if no filtering applies."""
+        alpha = _single_pole_alpha(bandwidth_hz, sample_rate_hz)
+        return None if alpha is None else cls(alpha)
+
+    def process(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Filter one chunk, continuing from the state left by the previous chunk.
+
+        With out (same shape as x, any float dtype; may be x itself) the
+        chunk is filtered in pieces of _LPF_CHUNK samples written into out,
+        so only small float64 temporaries are allocated.
+        """
+        if out is not None:
+            if out.shape != np.shape(x):
+                raise ValueError("out must have the same shape as x")
+            for i in range(0, out.size, _LPF_CHUNK):
+                out[i : i + _LPF_CHUNK] = self.process(x[i : i + _LPF_CHUNK])
+            return out
+        x = np.asarray(x, dtype=float)
+        if x.size == 0:
+            return x.copy()
+        y, self._zi = lfilter(self._b, self._a, x, zi=self._zi)
+        return y
+
+    def reset(self) -> None:
+        """Clear the filter state (next chunk starts from y[-1] = 0)."""
+        self._zi = np.zeros(1)
+
+
 def _iir_first_order_lpf(x: np.ndarray, alpha: float) -> np.ndarray:
     """First-order IIR LPF: y[n] = alpha*x[n] + (1-alpha)*y[n-1]."""
-    y = np.empty_like(x)
-    y[0] = alpha * x[0]
-    for i in range(1, len(x)):
-        y[i] = alpha * x[i] + (1.0 - alpha) * y[i - 1]
-    return y
+    return SinglePoleLPF(alpha).process(x)
 
 
 def opamp_errors(
@@ -371,27 +983,44 @@ def opamp_errors(
     bandwidth_hz: float = np.inf,
     noise_rms: float = 0.0,
     rng: Optional[np.random.Generator] = None,
+    lpf: Optional[SinglePoleLPF] = None,
+    dtype: DTypeLike = np.float64,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[ScratchBuffers] = None,
 ) -> np.ndarray:
     """
     Simulate op-amp / TIA errors: gain error, offset, bandwidth limit, noise.
 
-    First-order single-pole rolloff for bandwidth.
+    First-order single-pole rolloff for bandwidth. Pass a SinglePoleLPF as
+    `lpf` to carry the filter state across calls (chunked processing); it
+    then replaces the filter that would be built from bandwidth_hz.
+    dtype sets the output precision (the filter itself runs in float64).
+    out (shape of signal, dtype `dtype`; may be signal itself) and scratch
+    (ScratchBuffers for the noise draw) avoid full-length allocations.
     """
-    out = signal * (1.0 + gain_error) + offset_voltage
+    dt = _float_dtype(dtype)
+    y = _out_buffer(out, np.shape(signal), dt)
+    np.multiply(signal, dt.type(1.0 + gain_error), out=y)
+    y += dt.type(offset_voltage)
 
-    if bandwidth_hz < np.inf and bandwidth_hz > 0:
+    if lpf is None:
         # Single-pole LPF in discrete time: alpha = 1 - exp(-2*pi*fb/fs)
-        fc_norm = bandwidth_hz / sample_rate_hz
-        if fc_norm < 0.5:
-            alpha = 1.0 - np.exp(-2.0 * np.pi * fc_norm)
-            out = _iir_first_order_lpf(out, alpha)
+        lpf = SinglePoleLPF.from_bandwidth(bandwidth_hz, sample_rate_hz)
+    if lpf is not None:
+        if out is None:
+            y = lpf.process(y).astype(dt, copy=False)
+        else:
+            lpf.process(y, out=y)
 
     if noise_rms > 0:
         if rng is None:
             rng = np.random.default_rng()
-        out = out + rng.standard_normal(out.shape) * noise_rms
+        noise = (ScratchBuffers() if scratch is None else scratch).get("noise", y.shape, dt)
+        rng.standard_normal(dtype=dt, out=noise)
+        noise *= dt.type(noise_rms)
+        y += noise
 
-    return out
+    return y
 
 
 def adc_errors(
@@ -405,43 +1034,105 @@ def adc_errors(
     aperture_jitter_sec: float = 0.0,
     sample_rate_hz: Optional[float] = None,
     rng: Optional[np.random.Generator] = None,
+    inl_profile: Optional[np.ndarray] = None,
+    prev_sample: Optional[float] = None,
+    dtype: DTypeLike = np.float64,
+    code_dtype: DTypeLike = np.int32,
+    out: Optional[np.ndarray] = None,
+    scratch: Optional[ScratchBuffers] = None,
+    jitter_rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
     """
     Simulate ADC errors: quantization, INL, DNL, gain, offset, aperture jitter.
 
     High-speed 16-bit 100+ MSPS class. Output is integer codes in [0, 2^n_bits - 1].
+    inl_profile: optional per-code INL table from adc_inl_profile(); when
+        omitted a new random profile is drawn on every call.
+    prev_sample: last analog sample of the preceding chunk when converting a
+        stream chunk by chunk. The jitter slope is a backward difference,
+        so with prev_sample the chunk start gets the slope a single call
+        would have given it; without, the first sample has slope 0.
+    jitter_rng: separate generator for the jitter draws (default: rng).
+        With one stream for jitter and another for DNL, the draws do not
+        interleave per chunk and chunked conversion matches a single call.
+    dtype: working precision, float64 (default) or float32 (exact for codes
+        up to 2^24; rounding error below 0.01 LSB at 16 bits).
+    code_dtype: integer type of the returned codes; np.uint16 halves the
+        output size for converters of up to 16 bits.
+    out, scratch: optional code array (shape of analog_signal, code_dtype)
+        and ScratchBuffers for the temporaries; with both, a conversion
+        makes no full-length allocations.
     """
+    dt = _float_dtype(dtype)
     if rng is None:
         rng = np.random.default_rng()
+    if scratch is None:
+        scratch = ScratchBuffers()
 
-    x = np.asarray(analog_signal, dtype=float)
+    shape = np.shape(analog_signal)
+    x = scratch.get("x", shape, dt)
+    np.copyto(x, analog_signal, casting="unsafe")
     n_levels = 1 << n_bits
     max_code = n_levels - 1
+    err = scratch.get("err", shape, dt)
 
     # Aperture jitter: slight time uncertainty -> voltage error for fast signals
-    if aperture_jitter_sec > 0 and sample_rate_hz is not None and len(x) > 1:
-        dt = 1.0 / sample_rate_hz
-        jitter = rng.standard_normal(x.shape) * aperture_jitter_sec
-        # dV/dt approximated by central difference
-        dx = np.gradient(x, dt)
-        x = x + dx * jitter
+    if aperture_jitter_sec > 0 and sample_rate_hz is not None:
+        jitter = scratch.get("jitter", shape, dt)
+        (rng if jitter_rng is None else jitter_rng).standard_normal(dtype=dt, out=jitter)
+        jitter *= dt.type(aperture_jitter_sec)
+        # dV/dt approximated by a (causal) backward difference
+        dx = _backward_difference_into(x, 1.0 / sample_rate_hz, prev_sample, err)
+        dx *= jitter
+        x += dx
 
     # Normalize to [0, 1] by Vref, then gain/offset
-    x = x / v_ref * (1.0 + gain_error) + offset_error / v_ref
+    x /= dt.type(v_ref)
+    x *= dt.type(1.0 + gain_error)
+    x += dt.type(offset_error / v_ref)
 
     # INL profile (per-code error)
-    inl_profile = np.cumsum(rng.standard_normal(n_levels))
-    inl_profile = inl_profile - inl_profile.mean()
-    inl_profile = inl_profile / (np.abs(inl_profile).max() + 1e-12) * (inl_lsb / n_levels)
+    if inl_profile is None:
+        inl_profile = adc_inl_profile(n_bits, inl_lsb, rng)
+    inl_profile = _check_inl_profile(inl_profile, n_levels, dt)
 
     # Map voltage to code (0 .. max_code)
-    code_float = x * max_code
-    code_int = np.clip(code_float.astype(int), 0, max_code)
+    code_float = x
+    code_float *= max_code
+    code_int = scratch.get("code_int", shape, np.intp)
+    np.copyto(code_int, code_float, casting="unsafe")
+    np.clip(code_int, 0, max_code, out=code_int)
     # Add INL at that code
-    code_float = code_float + inl_profile[np.minimum(code_int, n_levels - 1)]
+    code_float += np.take(inl_profile, code_int, out=err, mode="clip")
     # DNL
-    code_float = code_float + rng.standard_normal(code_float.shape) * (dnl_lsb)
+    rng.standard_normal(dtype=dt, out=err)
+    err *= dt.type(dnl_lsb)
+    code_float += err
 
     # Quantize
-    codes = np.clip(np.round(code_float), 0, max_code).astype(np.int32)
+    np.round(code_float, out=code_float)
+    np.clip(code_float, 0, max_code, out=code_float)
+    codes = _out_buffer(out, shape, np.dtype(code_dtype))
+    np.copyto(codes, code_float, casting="unsafe")
     return codes
+
+
+def _backward_difference_into(
+    x: np.ndarray,
+    spacing: float,
+    prev_sample: Optional[float],
+    out: np.ndarray,
+) -> np.ndarray:
+    """
+    (x[n] - x[n-1]) / spacing written into out (1-D).
+
+    x[-1] is prev_sample, the last sample of the preceding chunk; without
+    it the first point gets slope 0. Being causal, a stream differenced
+    chunk by chunk gives exactly the result of one call on the whole stream.
+    """
+    if x.size == 0:
+        return out
+    np.subtract(x[1:], x[:-1], out=out[1:])
+    out[0] = 0.0 if prev_sample is None else x[0] - x.dtype.type(prev_sample)
+    out /= spacing
+    return out
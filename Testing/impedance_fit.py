@@ -0,0 +1,372 @@
+"""
+Vectorized equivalent-circuit fitting of measured impedance spectra.
+
+Each cell event gives Z at a few excitation tones (magnitude and phase per
+tone); fit_spectra turns a batch of them into R/C(/L) values by solving
+every small least-squares problem at once. Levenberg-Marquardt runs on
+arrays of shape (n_events, ...) with the analytic Jacobians of the
+parallel_rc, series_rc and series_rlc models; a problem drops out of the
+working set as soon as it converges, so late iterations only touch the
+stragglers.
+
+Parameters are fitted as logarithms (always positive, comparable scales)
+and residuals are relative, (Z_model - Z_meas) / |Z_meas| split into real
+and imaginary parts, so every tone counts equally however |Z| varies
+across the band. Starting points are the models' algebraic estimates
+(each model is linear in some transform of its parameters) and, with a
+SpectrumFitter, the previous event's fit (warm start), whichever is
+closer per event.
+"""
+
+from __future__ import annotations
+
+import time
+import numpy as np
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    from .impedance_models import parallel_rc, series_rc, series_rlc
+except ImportError:
+    from impedance_models import parallel_rc, series_rc, series_rlc
+
+FIT_MODELS = ("parallel_rc", "series_rc", "series_rlc")
+FIT_PARAMS = {
+    "parallel_rc": ("resistance", "capacitance"),
+    "series_rc": ("resistance", "capacitance"),
+    "series_rlc": ("resistance", "capacitance", "inductance"),
+}
+
+_LAMBDA_MIN = 1e-12
+_LAMBDA_MAX = 1e12
+_MAX_LOG_STEP = 5.0
+_NEGLIGIBLE = 1e-9
+_ROUNDING = 8 * np.finfo(float).eps
+_TINY = 1e-300
+
+
+class FitResult(NamedTuple):
+    """
+    Batch fit output, one row per spectrum.
+
+    params columns follow FIT_PARAMS[model]; cost is 0.5 * sum of squared
+    relative residuals, so sqrt(2 cost / n_f) is the RMS relative error.
+    """
+    params: np.ndarray
+    cost: np.ndarray
+    iterations: np.ndarray
+    converged: np.ndarray
+    model: str
+
+    def param(self, name: str) -> np.ndarray:
+        """Column of params by name, e.g. "resistance"."""
+        return self.params[:, FIT_PARAMS[self.model].index(name)]
+
+
+class FitStats(NamedTuple):
+    """Throughput and convergence summary of one or more batch fits."""
+    fits: int
+    seconds: float
+    converged: int
+    mean_iterations: float
+    max_iterations: int
+
+    @property
+    def fits_per_sec(self) -> float:
+        return self.fits / self.seconds if self.seconds > 0 else float("inf")
+
+    @property
+    def converged_fraction(self) -> float:
+        return self.converged / self.fits if self.fits else 1.0
+
+
+def z_from_polar(magnitude: np.ndarray, phase_rad: np.ndarray) -> np.ndarray:
+    """Complex Z from per-tone magnitude (ohms) and phase (radians)."""
+    return np.asarray(magnitude, dtype=float) * np.exp(1j * np.asarray(phase_rad, dtype=float))
+
+
+def model_z(model: str, f_hz: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """Z (n, n_f) of n circuits with params (n, n_params) columns as FIT_PARAMS."""
+    p = np.asarray(params, dtype=float)
+    if model == "parallel_rc":
+        return parallel_rc(f_hz, p[:, 0], p[:, 1])
+    if model == "series_rc":
+        return series_rc(f_hz, p[:, 0], p[:, 1])
+    if model == "series_rlc":
+        return series_rlc(f_hz, p[:, 0], p[:, 1], p[:, 2])
+    raise ValueError(f"model must be one of {FIT_MODELS}, got {model!r}")
+
+
+def model_jacobian(model: str, f_hz: np.ndarray, params: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Z and its analytic derivatives with respect to the log parameters.
+
+    Returns (z, dz) with z (n, n_f) and dz (n, n_f, n_params), where
+    dz[..., i] = p_i dZ/dp_i = dZ/d(ln p_i).
+    """
+    p = np.asarray(params, dtype=float)
+    w = 2.0 * np.pi * np.asarray(f_hz, dtype=float)
+    r = p[:, 0:1]
+    if model == "parallel_rc":
+        # Z = R / D, D = 1 + j w R C: dZ/dlnR = Z / D, dZ/dlnC = -Z (1 - 1/D)
+        d = 1.0 + 1j * w * r * p[:, 1:2]
+        z = r / d
+        dz_r = z / d
+        return z, np.stack((dz_r, dz_r - z), axis=-1)
+    if model == "series_rc":
+        zc = 1.0 / (1j * w * p[:, 1:2])
+        return r + zc, np.stack((np.broadcast_to(r + 0j, zc.shape), -zc), axis=-1)
+    if model == "series_rlc":
+        zc = 1.0 / (1j * w * p[:, 1:2])
+        zl = 1j * w * p[:, 2:3]
+        return r + zc + zl, np.stack((np.broadcast_to(r + 0j, zc.shape), -zc, zl), axis=-1)
+    raise ValueError(f"model must be one of {FIT_MODELS}, got {model!r}")
+
+
+def initial_guess(model: str, f_hz: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    Algebraic estimates (n, n_params), exact for noise-free data.
+
+    Each model is linear in a transform of its parameters:
+        parallel_rc: Y = 1/R + j w C (means of Re Y and Im Y / w),
+        series_rc: Z = R - j (1/C) / w (means of Re Z and -w Im Z),
+        series_rlc: Im Z = w L - (1/C) / w (2x2 normal equations in L, 1/C).
+    The means and normal equations are weighted by 1/|Z|^2 (1/|Y|^2 for
+    parallel_rc), i.e. by the relative error fit_spectra minimizes, so the
+    estimate is that fit's unconstrained optimum. Where noise makes a term
+    non-physical (e.g. L < 0 for a barely inductive cell), the positive
+    optimum has the term at zero: the others are re-solved without it and
+    it is set to a negligible positive value (1e-9 of |Z|).
+    """
+    w = 2.0 * np.pi * np.asarray(f_hz, dtype=float)
+    z = np.atleast_2d(np.asarray(z, dtype=complex))
+    scale = np.abs(z).mean(axis=-1)
+
+    def physical(linear, negligible):
+        return np.where(np.isfinite(linear) & (linear > 0), linear, negligible)
+
+    if model == "parallel_rc":
+        y = 1.0 / z
+        wt = 1.0 / np.maximum(np.abs(y) ** 2, _TINY)
+        wt /= wt.sum(axis=-1, keepdims=True)
+        g = physical(np.sum(wt * y.real, axis=-1), _NEGLIGIBLE / scale)
+        c = physical(np.sum(wt * y.imag / w, axis=-1), _NEGLIGIBLE / (scale * w.max()))
+        return np.stack((1.0 / g, c), axis=-1)
+
+    wt = 1.0 / np.maximum(np.abs(z) ** 2, _TINY)
+    r = physical(np.sum(wt * z.real, axis=-1) / np.sum(wt, axis=-1), _NEGLIGIBLE * scale)
+    inv_c_negligible = _NEGLIGIBLE * scale * w.min()
+    if model == "series_rc":
+        inv_c = np.sum(wt * -z.imag * w, axis=-1) / np.sum(wt, axis=-1)
+        return np.stack((r, 1.0 / physical(inv_c, inv_c_negligible)), axis=-1)
+    if model != "series_rlc":
+        raise ValueError(f"model must be one of {FIT_MODELS}, got {model!r}")
+    if np.unique(w).size < 2:
+        raise ValueError("series_rlc needs at least two distinct frequencies")
+
+    # Im Z = a L + b (1/C) with a = w, b = -1/w
+    a, b = w, -1.0 / w
+    aa, ab, bb = wt @ (a * a), wt @ (a * b), wt @ (b * b)
+    x_a, x_b = np.sum(wt * z.imag * a, axis=-1), np.sum(wt * z.imag * b, axis=-1)
+    det = aa * bb - ab * ab
+    inv_c = (aa * x_b - ab * x_a) / det
+    ind = (bb * x_a - ab * x_b) / det
+    ind_negligible = _NEGLIGIBLE * scale / w.max()
+    no_l, no_c = ~(ind > 0), ~(inv_c > 0)
+    inv_c = np.where(no_l, x_b / bb, inv_c)
+    ind = np.where(no_c, x_a / aa, ind)
+    inv_c = physical(np.where(no_c, 0.0, inv_c), inv_c_negligible)
+    ind = physical(np.where(no_l, 0.0, ind), ind_negligible)
+    return np.stack((r, 1.0 / inv_c, ind), axis=-1)
+
+
+def _residuals(z_model: np.ndarray, z: np.ndarray, inv_mag: np.ndarray) -> np.ndarray:
+    """Relative residuals (n, 2 n_f), real parts then imaginary parts."""
+    d = (z_model - z) * inv_mag
+    return np.concatenate((d.real, d.imag), axis=-1)
+
+
+def _cost(model: str, f_hz: np.ndarray, theta: np.ndarray, z: np.ndarray, inv_mag: np.ndarray) -> np.ndarray:
+    r = _residuals(model_z(model, f_hz, np.exp(theta)), z, inv_mag)
+    return 0.5 * np.einsum("ij,ij->i", r, r)
+
+
+def _solve(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Batched solve of small symmetric systems a x = b, (n, k, k) and (n, k)."""
+    if a.shape[-1] == 2:
+        det = a[:, 0, 0] * a[:, 1, 1] - a[:, 0, 1] * a[:, 1, 0]
+        det = np.where(np.abs(det) > _TINY, det, _TINY)
+        return np.stack(
+            ((a[:, 1, 1] * b[:, 0] - a[:, 0, 1] * b[:, 1]) / det, (a[:, 0, 0] * b[:, 1] - a[:, 1, 0] * b[:, 0]) / det),
+            axis=-1,
+        )
+    return np.linalg.solve(a, b[..., None])[..., 0]
+
+
+def fit_spectra(
+    f_hz: np.ndarray,
+    z: np.ndarray,
+    model: str = "parallel_rc",
+    x0: Optional[np.ndarray] = None,
+    max_iter: int = 50,
+    ftol: float = 1e-10,
+    xtol: float = 1e-10,
+    gtol: float = 1e-10,
+    lambda0: float = 1e-3,
+) -> FitResult:
+    """
+    Fit one circuit per spectrum with batched Levenberg-Marquardt.
+
+    Args:
+        f_hz: Tone frequencies (n_f,), all > 0.
+        z: Measured complex impedance (n, n_f) or (n_f,); see z_from_polar.
+        model: One of FIT_MODELS.
+        x0: Starting parameters (n, n_params) or (n_params,); default
+            initial_guess(). Where both are available the better of x0 and
+            the algebraic estimate is used per spectrum.
+        max_iter: Iteration limit per spectrum.
+        ftol: Converged when an accepted step lowers the cost by less than
+            ftol x cost (or any step changes it only by rounding).
+        xtol: ... or changes every log parameter by less than xtol.
+        gtol: Converged when the cosine between the residual vector and
+            every Jacobian column is below gtol (MINPACK's test; catches
+            optima where rounding defeats every step), or the residuals are
+            at the rounding floor.
+        lambda0: Initial damping.
+
+    Returns:
+        FitResult; rows of a single (n_f,) spectrum come back as (1, ...).
+    """
+    if model not in FIT_MODELS:
+        raise ValueError(f"model must be one of {FIT_MODELS}, got {model!r}")
+    f = np.asarray(f_hz, dtype=float)
+    if f.ndim != 1 or np.any(f <= 0):
+        raise ValueError("f_hz must be a 1-D array of positive frequencies")
+    z = np.atleast_2d(np.asarray(z, dtype=complex))
+    if z.shape[-1] != f.size:
+        raise ValueError(f"z must have {f.size} tones per spectrum, got shape {z.shape}")
+    n_params = len(FIT_PARAMS[model])
+    if 2 * f.size < n_params:
+        raise ValueError(f"{model} needs at least {(n_params + 1) // 2} tones")
+    n = z.shape[0]
+    inv_mag = 1.0 / np.maximum(np.abs(z), _TINY)
+
+    theta = np.log(initial_guess(model, f, z))
+    cost = _cost(model, f, theta, z, inv_mag)
+    if x0 is not None:
+        theta_x0 = np.log(np.broadcast_to(np.asarray(x0, dtype=float), (n, n_params)))
+        cost_x0 = _cost(model, f, theta_x0, z, inv_mag)
+        better = cost_x0 < cost
+        theta[better], cost[better] = theta_x0[better], cost_x0[better]
+
+    lam = np.full(n, float(lambda0))
+    iterations = np.zeros(n, dtype=np.int64)
+    floor = f.size * (16 * np.finfo(float).eps) ** 2
+    converged = cost <= floor
+    active = np.flatnonzero(~converged)
+    im2 = np.concatenate((inv_mag, inv_mag), axis=1)[..., None]
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        th, zz, im, c, lm = theta[active], z[active], inv_mag[active], cost[active], lam[active]
+        z_model, dz = model_jacobian(model, f, np.exp(th))
+        r = _residuals(z_model, zz, im)
+        jac = np.concatenate((dz.real, dz.imag), axis=1) * im2[active]
+        grad = np.einsum("nki,nk->ni", jac, r)
+        col_norm = np.sqrt(np.einsum("nki,nki->ni", jac, jac))
+        cosine = np.abs(grad) / np.maximum(col_norm * np.sqrt(2.0 * c)[:, None], _TINY)
+        flat = np.max(cosine, axis=-1) <= gtol
+        if flat.any():
+            converged[active[flat]] = True
+            active, th, zz, im, c, lm = (a[~flat] for a in (active, th, zz, im, c, lm))
+            jac, grad = jac[~flat], grad[~flat]
+            if active.size == 0:
+                break
+        jtj = np.einsum("nki,nkj->nij", jac, jac)
+        diag = np.einsum("nii->ni", jtj)
+        damped = jtj.copy()
+        damped[:, np.arange(n_params), np.arange(n_params)] += lm[:, None] * np.maximum(diag, _TINY)
+        step = np.clip(-_solve(damped, grad), -_MAX_LOG_STEP, _MAX_LOG_STEP)
+        th_new = th + step
+        with np.errstate(over="ignore", invalid="ignore"):
+            c_new = _cost(model, f, th_new, zz, im)
+
+        accept = np.isfinite(c_new) & (c_new < c)
+        iterations[active] += 1
+        theta[active[accept]] = th_new[accept]
+        cost[active[accept]] = c_new[accept]
+        lam[active] = np.where(accept, np.maximum(lm / 3.0, _LAMBDA_MIN), lm * 4.0)
+        done = accept & (
+            (c - c_new <= ftol * c) | (np.max(np.abs(step), axis=-1) <= xtol) | (c_new <= floor)
+        )
+        # A step that changes the cost only by rounding: nothing left to gain
+        done |= np.abs(c_new - c) <= _ROUNDING * c
+        converged[active[done]] = True
+        stalled = ~accept & (lm * 4.0 > _LAMBDA_MAX)
+        active = active[~(done | stalled)]
+
+    return FitResult(np.exp(theta), cost, iterations, converged, model)
+
+
+class SpectrumFitter:
+    """
+    Streaming batch fitter with warm starts and running statistics.
+
+    Each fit() call fits a batch of events at once, so events within a
+    batch cannot wait for each other's result; instead every spectrum
+    starts from the better of its own algebraic estimate and the last
+    event fitted so far (the final event of the previous batch). Cells of
+    one population sit close together, so that warm start is usually
+    already near the optimum when noise spoils the algebraic estimate.
+    stats accumulates fits, wall time and convergence across calls.
+    """
+
+    def __init__(
+        self,
+        f_hz: np.ndarray,
+        model: str = "parallel_rc",
+        warm_start: bool = True,
+        **fit_kwargs,
+    ):
+        if model not in FIT_MODELS:
+            raise ValueError(f"model must be one of {FIT_MODELS}, got {model!r}")
+        self.f_hz = np.asarray(f_hz, dtype=float)
+        self.model = model
+        self.warm_start = warm_start
+        self.fit_kwargs = fit_kwargs
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the warm start and the statistics."""
+        self._last: Optional[np.ndarray] = None
+        self._fits = 0
+        self._seconds = 0.0
+        self._converged = 0
+        self._iterations = 0
+        self._max_iterations = 0
+
+    def fit(self, z: np.ndarray) -> FitResult:
+        """Fit a batch of spectra (n, n_f)."""
+        t0 = time.perf_counter()
+        z = np.atleast_2d(np.asarray(z, dtype=complex))
+        x0 = None
+        if self.warm_start and self._last is not None:
+            x0 = self._last
+        result = fit_spectra(self.f_hz, z, self.model, x0=x0, **self.fit_kwargs)
+        self._seconds += time.perf_counter() - t0
+        if result.params.shape[0]:
+            self._last = result.params[-1]
+        self._fits += result.params.shape[0]
+        self._converged += int(np.count_nonzero(result.converged))
+        self._iterations += int(result.iterations.sum())
+        self._max_iterations = max(self._max_iterations, int(result.iterations.max(initial=0)))
+        return result
+
+    @property
+    def stats(self) -> FitStats:
+        return FitStats(
+            self._fits,
+            self._seconds,
+            self._converged,
+            self._iterations / self._fits if self._fits else 0.0,
+            self._max_iterations,
+        )
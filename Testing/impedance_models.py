@@ -0,0 +1,140 @@
+"""
+Vectorized impedance models Z(f) over arrays of circuit parameters.
+
+Every model takes the frequency grid plus its parameters, each a scalar or
+an array. Parameters broadcast against each other to a batch shape, and
+the result has shape batch_shape + f.shape. A single call therefore
+evaluates, say, 100k candidate cells over 32 frequencies as one
+(100000, 32) array, with no Python loop over cells.
+
+Besides the lumped R/C/L circuits, two standard impedance cytometry
+models are provided:
+    single_shell: a suspension of shelled cells (membrane + cytoplasm) in
+        a conducting medium between electrodes, via the Maxwell mixture of
+        the single-shell Clausius-Mossotti factor.
+    cpe: the electrode double layer as a constant phase element,
+        Z = 1 / (Q (j w)^alpha), to be added in series with any model.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import Callable, Dict, NamedTuple
+
+EPSILON_0 = 8.8541878128e-12  # F/m
+
+# Single-shell cell defaults (S/m and F/m^2): cytoplasm, PBS-like medium,
+# specific membrane capacitance
+CYTOPLASM_S_PER_M = 0.5
+MEDIUM_S_PER_M = 1.6
+MEMBRANE_F_PER_M2 = 1e-2
+
+
+def _omega(f_hz: np.ndarray) -> np.ndarray:
+    """Flattened angular frequencies, with f = 0 nudged off zero."""
+    f = np.asarray(f_hz, dtype=float).reshape(-1)
+    return 2.0 * np.pi * np.where(np.abs(f) < 1e-30, 1e-30, f)
+
+
+def _at_dc(f_hz: np.ndarray) -> np.ndarray:
+    return np.abs(np.asarray(f_hz, dtype=float).reshape(-1)) < 1e-30
+
+
+def _param(value) -> np.ndarray:
+    """Parameter with a trailing axis to broadcast against the frequencies."""
+    return np.asarray(value, dtype=float)[..., None]
+
+
+def _shaped(f_hz: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """batch_shape + (n_f,) -> batch_shape + f.shape."""
+    return z.reshape(z.shape[:-1] + np.shape(f_hz))
+
+
+def resistor(f_hz: np.ndarray, resistance) -> np.ndarray:
+    """Z = R at every frequency."""
+    return _shaped(f_hz, _param(resistance) + np.zeros_like(_omega(f_hz), dtype=complex))
+
+
+def parallel_rc(f_hz: np.ndarray, resistance, capacitance) -> np.ndarray:
+    """Z = R || (1/(j*w*C)) = R / (1 + j*w*R*C)."""
+    w = _omega(f_hz)
+    r, c = _param(resistance), _param(capacitance)
+    return _shaped(f_hz, r / (1.0 + 1j * w * r * c))
+
+
+def series_rc(f_hz: np.ndarray, resistance, capacitance) -> np.ndarray:
+    """Z = R + 1/(j*w*C); at DC (f=0) C is open -> R only."""
+    w = _omega(f_hz)
+    r, c = _param(resistance), _param(capacitance)
+    return _shaped(f_hz, np.where(_at_dc(f_hz), r + 0j, r + 1.0 / (1j * w * c)))
+
+
+def series_rlc(f_hz: np.ndarray, resistance, capacitance, inductance) -> np.ndarray:
+    """Z = R + j*w*L + 1/(j*w*C); at DC C open, L short."""
+    w = _omega(f_hz)
+    r, c, l = _param(resistance), _param(capacitance), _param(inductance)
+    return _shaped(f_hz, np.where(_at_dc(f_hz), r + 0j, r + 1j * w * l + 1.0 / (1j * w * c)))
+
+
+def cpe(f_hz: np.ndarray, q, alpha) -> np.ndarray:
+    """
+    Constant phase element Z = 1 / (Q (j w)^alpha).
+
+    q in F s^(alpha - 1); alpha = 1 is a capacitor Q, alpha = 0 a resistor
+    1/Q. Electrode double layers typically have alpha 0.8-0.95.
+    """
+    w = _omega(f_hz)
+    return _shaped(f_hz, 1.0 / (_param(q) * (1j * w) ** _param(alpha)))
+
+
+class SingleShell(NamedTuple):
+    """
+    Single-shell cell suspension between measurement electrodes.
+
+    Any field may be an array (one entry per cell or candidate); fields
+    broadcast against each other. Permittivities are relative.
+    """
+    volume_fraction: float = 0.01
+    cell_radius_m: float = 3.5e-6
+    cell_constant_per_m: float = 2.5e4
+    membrane_f_per_m2: float = MEMBRANE_F_PER_M2
+    cytoplasm_s_per_m: float = CYTOPLASM_S_PER_M
+    medium_s_per_m: float = MEDIUM_S_PER_M
+    cytoplasm_permittivity: float = 60.0
+    medium_permittivity: float = 80.0
+
+
+def single_shell(f_hz: np.ndarray, shell: SingleShell) -> np.ndarray:
+    """
+    Z of a single-shell cell suspension (Maxwell mixture theory).
+
+    With complex permittivities e* = e + sigma / (j w), a cell with a thin
+    membrane of specific capacitance C_m is a sphere of
+        e_p* = r C_m e_i* / (r C_m + e_i*),
+    its Clausius-Mossotti factor is f_CM = (e_p* - e_m*) / (e_p* + 2 e_m*),
+    and the mixture at volume fraction phi is
+        e_mix* = e_m* (1 + 2 phi f_CM) / (1 - phi f_CM).
+    The electrodes' cell constant kappa (length / area) then gives
+    Z = kappa / (j w e_mix*), i.e. the cell-free medium's impedance times
+    (1 - phi f_CM) / (1 + 2 phi f_CM).
+    """
+    w = _omega(f_hz)
+    phi, r, kappa, c_m, sig_i, sig_m, eps_i, eps_m = (_param(v) for v in shell)
+    e_i = EPSILON_0 * eps_i + sig_i / (1j * w)
+    e_m = EPSILON_0 * eps_m + sig_m / (1j * w)
+    rc = r * c_m
+    e_p = rc * e_i / (rc + e_i)
+    f_cm = (e_p - e_m) / (e_p + 2.0 * e_m)
+    f_cm *= phi
+    z = (1.0 - f_cm) / (1.0 + 2.0 * f_cm)
+    z *= kappa / (1j * w * e_m)
+    return _shaped(f_hz, z)
+
+
+MODELS: Dict[str, Callable[..., np.ndarray]] = {
+    "resistor": resistor,
+    "parallel_rc": parallel_rc,
+    "series_rc": series_rc,
+    "series_rlc": series_rlc,
+    "single_shell": single_shell,
+}
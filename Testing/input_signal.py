@@ -1,18 +1,16 @@
 import matplotlib.pyplot as plt
-import numpy as np
+
+from capture import open_capture
 
 # Load the voltage data from the file
-# Assuming the file contains one voltage value per line
+# Assuming the file contains one voltage value per line; the first run
+# converts it to a memory-mapped binary cache (Test_Signal.bin)
 file_path = './Testing/Test_Signal.txt'
-voltage = np.loadtxt(file_path)
-
-# Signal parameters provided
 sampling_rate = 14000  # 14 kHz
-num_samples = len(voltage)
+capture = open_capture(file_path, sample_rate_hz=sampling_rate, units='V')
 
-# Create the time axis
 # Time = Index / Sampling Rate
-time = np.arange(num_samples) / sampling_rate
+voltage, time = capture.segment()
 
 # Plotting
 plt.figure(figsize=(12, 6))
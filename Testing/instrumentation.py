@@ -0,0 +1,128 @@
+"""
+Per-stage instrumentation for the signal chains.
+
+A Profiler records, for every stage call, wall time, CPU time, peak bytes
+allocated (optional, via tracemalloc), samples processed and the real-time
+factor (simulated duration / wall time; > 1 means faster than real time).
+Chains take profiler=None by default and then skip all bookkeeping, so
+instrumentation costs nothing unless it is switched on.
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional
+
+
+class StageRecord(NamedTuple):
+    """One timed stage call."""
+    stage: str
+    wall_s: float
+    cpu_s: float
+    peak_bytes: Optional[int]
+    samples: int
+    sample_rate_hz: Optional[float]
+    cached: bool
+
+    @property
+    def realtime_factor(self) -> Optional[float]:
+        """Simulated seconds per wall-clock second (None without a sample rate)."""
+        if not self.sample_rate_hz or self.wall_s <= 0:
+            return None
+        return self.samples / self.sample_rate_hz / self.wall_s
+
+
+class _StageTimer:
+    """Context manager returned by Profiler.stage(); set .cached inside the block."""
+
+    def __init__(self, profiler: "Profiler", stage: str, samples: int, sample_rate_hz: Optional[float]):
+        self._profiler = profiler
+        self.stage = stage
+        self.samples = int(samples)
+        self.sample_rate_hz = sample_rate_hz
+        self.cached = False
+
+    def __enter__(self) -> "_StageTimer":
+        self._started_tracing = False
+        if self._profiler.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+        self._cpu0 = time.process_time()
+        self._wall0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        wall = time.perf_counter() - self._wall0
+        cpu = time.process_time() - self._cpu0
+        peak = None
+        if self._profiler.track_memory:
+            peak = max(0, tracemalloc.get_traced_memory()[1] - self._mem0)
+            if self._started_tracing:
+                tracemalloc.stop()
+        if exc_type is None:
+            self._profiler.records.append(
+                StageRecord(self.stage, wall, cpu, peak, self.samples, self.sample_rate_hz, self.cached)
+            )
+
+
+class Profiler:
+    """
+    Collects StageRecords from instrumented chains.
+
+    track_memory=True measures each stage's peak allocation with tracemalloc
+    (which slows Python-level allocation noticeably; timings are then
+    somewhat pessimistic).
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.records: List[StageRecord] = []
+
+    def reset(self) -> None:
+        self.records = []
+
+    def stage(self, name: str, samples: int, sample_rate_hz: Optional[float] = None) -> _StageTimer:
+        """Time one stage call: `with profiler.stage("dac", n, fs): ...`."""
+        return _StageTimer(self, name, samples, sample_rate_hz)
+
+    def totals(self) -> Dict[str, dict]:
+        """Per-stage aggregates in first-seen order."""
+        out: Dict[str, dict] = {}
+        for r in self.records:
+            agg = out.setdefault(r.stage, {
+                "calls": 0, "cached": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                "peak_bytes": None, "samples": 0, "sample_rate_hz": r.sample_rate_hz,
+            })
+            agg["calls"] += 1
+            agg["cached"] += int(r.cached)
+            agg["wall_s"] += r.wall_s
+            agg["cpu_s"] += r.cpu_s
+            agg["samples"] += r.samples
+            if r.peak_bytes is not None:
+                agg["peak_bytes"] = max(agg["peak_bytes"] or 0, r.peak_bytes)
+        for agg in out.values():
+            fs = agg["sample_rate_hz"]
+            wall = agg["wall_s"]
+            agg["realtime_factor"] = agg["samples"] / fs / wall if fs and wall > 0 else None
+        return out
+
+    def summary(self) -> str:
+        """Fixed-width table of totals(), slowest stage first."""
+        rows = sorted(self.totals().items(), key=lambda kv: -kv[1]["wall_s"])
+        lines = [
+            f"{'stage':<18} {'calls':>5} {'cached':>6} {'wall ms':>9} {'cpu ms':>9} "
+            f"{'peak MiB':>9} {'samples':>11} {'RT factor':>10}",
+            "-" * 84,
+        ]
+        for name, a in rows:
+            peak = "-" if a["peak_bytes"] is None else f"{a['peak_bytes'] / 2**20:.2f}"
+            rtf = "-" if a["realtime_factor"] is None else f"{a['realtime_factor']:.3g}"
+            lines.append(
+                f"{name:<18} {a['calls']:>5} {a['cached']:>6} {a['wall_s'] * 1e3:>9.2f} "
+                f"{a['cpu_s'] * 1e3:>9.2f} {peak:>9} {a['samples']:>11} {rtf:>10}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,108 @@
+"""
+Level-of-detail waveform rendering for matplotlib.
+
+Long traces are reduced to per-pixel min/max pairs for the visible x range
+before they reach matplotlib, so redraw time depends on the axes width in
+pixels rather than the number of samples, while single-sample spikes and
+glitches stay visible. Zooming or panning re-fetches the detail for the new
+range from the full-resolution data.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import Optional, Tuple
+
+DEFAULT_BINS = 2000  # used before the axes has a size on screen
+
+
+def minmax_decimate(
+    x: np.ndarray,
+    y: np.ndarray,
+    n_bins: int,
+    x_range: Optional[Tuple[float, float]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce (x, y) to at most 2*n_bins points covering x_range.
+
+    x must be sorted. Samples in range are split into n_bins equal-count
+    bins; each bin contributes its minimum (at the bin's first x) and its
+    maximum (at the bin's last x). Ranges with at most 2*n_bins samples are
+    returned as-is, plus one sample either side so lines reach the edges.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if n_bins < 1:
+        raise ValueError("n_bins must be >= 1")
+    lo, hi = 0, x.size
+    if x_range is not None:
+        lo = max(int(np.searchsorted(x, x_range[0], side="left")) - 1, 0)
+        hi = min(int(np.searchsorted(x, x_range[1], side="right")) + 1, x.size)
+    m = hi - lo
+    if m <= 2 * n_bins:
+        return x[lo:hi], y[lo:hi]
+    step = -(-m // n_bins)
+    starts = np.arange(0, m, step)
+    ys = y[lo:hi]
+    out_y = np.empty(2 * starts.size, dtype=ys.dtype)
+    out_y[0::2] = np.minimum.reduceat(ys, starts)
+    out_y[1::2] = np.maximum.reduceat(ys, starts)
+    out_x = np.empty(2 * starts.size, dtype=x.dtype)
+    out_x[0::2] = x[lo + starts]
+    out_x[1::2] = x[lo + np.minimum(starts + step, m) - 1]
+    return out_x, out_y
+
+
+class LODLine:
+    """
+    A Line2D that shows a min/max reduced view of a long trace.
+
+    The full-resolution data stays here; on every xlim change the line is
+    refilled with the reduced view of the new range (one bin per pixel of
+    axes width by default).
+    """
+
+    def __init__(self, ax, x: np.ndarray, y: np.ndarray, n_bins: Optional[int] = None, **line_kwargs):
+        """
+        Args:
+            ax: Matplotlib Axes to draw on.
+            x, y: Full-resolution trace (x sorted).
+            n_bins: Bins per view; default the axes width in pixels.
+            **line_kwargs: Passed to ax.plot.
+        """
+        self.ax = ax
+        self.n_bins = n_bins
+        self._x = np.asarray(x)
+        self._y = np.asarray(y)
+        (self.line,) = ax.plot(*self._view(None), **line_kwargs)
+        # Axes callbacks hold weak references; the line keeps this object alive
+        self.line._lod = self
+        self._cid = ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    def _bins(self) -> int:
+        if self.n_bins is not None:
+            return self.n_bins
+        width = self.ax.get_window_extent().width
+        return int(width) if width >= 1 else DEFAULT_BINS
+
+    def _view(self, x_range: Optional[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        return minmax_decimate(self._x, self._y, self._bins(), x_range)
+
+    def _on_xlim_changed(self, ax) -> None:
+        self.line.set_data(*self._view(ax.get_xlim()))
+
+    def set_data(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Replace the full-resolution trace and refresh the current view."""
+        self._x = np.asarray(x)
+        self._y = np.asarray(y)
+        self.line.set_data(*self._view(self.ax.get_xlim()))
+
+    def remove(self) -> None:
+        """Remove the line and stop tracking the axes limits."""
+        self.ax.callbacks.disconnect(self._cid)
+        self.line.remove()
+
+
+def lod_plot(ax, x: np.ndarray, y: np.ndarray, **line_kwargs) -> LODLine:
+    """Drop-in for ax.plot(x, y, ...) on long, sorted-x traces."""
+    return LODLine(ax, x, y, **line_kwargs)
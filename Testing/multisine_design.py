@@ -0,0 +1,305 @@
+"""
+Crest-factor optimized multisine design.
+
+Zero phases line every tone up at t = 0 and give the worst-case crest
+factor (peak / rms), so the DAC has to be backed off and SNR per unit of
+measurement time drops. This module returns tone phases that keep the
+peak low:
+
+    schroeder: closed form from the tone power fractions (Schroeder 1970).
+    newman:    closed form phi_k = pi (k - 1)^2 / K for K tones.
+    clipping:  iterative clipping (Van der Ouderaa et al.): clip the peaks,
+               keep the phases of the clipped signal's tone bins, restore
+               the amplitudes and repeat; a batch of starts (Schroeder,
+               Newman, zero, random) is optimized at once and the best
+               kept, so it never does worse than a closed form.
+
+Designs are evaluated on one period of the tone set. The tones must lie on
+a common frequency grid (bins m_k of f_res). evaluate_designs() reports
+crest factor and DAC headroom for a whole batch of phase sets in one
+vectorized pass. Optimized designs can be cached to .npz files keyed by the
+tone set, so the optimization runs once per tone set.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from fractions import Fraction
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .generators import multifrequency_sine
+except ImportError:
+    from generators import multifrequency_sine
+
+DESIGN_METHODS = ("zero", "schroeder", "newman", "clipping")
+DESIGN_CACHE_PREFIX = "multisine_"
+_MAX_BINS = 1 << 20        # largest tone bin on the common grid
+_GRID_DENOMINATOR = 1000   # frequencies are resolved to 1 mHz when finding the grid
+
+
+class CrestReport(NamedTuple):
+    """Per-design figures from evaluate_designs(); arrays of shape (D,) (or scalars)."""
+    crest_factor: np.ndarray
+    peak: np.ndarray
+    rms: np.ndarray
+    headroom_db: np.ndarray   # 20 log10(full_scale / peak); < 0 means the design clips
+    scale: np.ndarray         # amplitude multiplier that makes the peak exactly full_scale
+
+
+class MultisineDesign(NamedTuple):
+    """Phases for a tone set and the crest factor they achieve."""
+    frequencies: np.ndarray
+    amplitudes: np.ndarray
+    phases: np.ndarray
+    method: str
+    crest_factor: float
+
+    @property
+    def crest_factor_db(self) -> float:
+        return 20.0 * math.log10(self.crest_factor)
+
+    def headroom_db(self, full_scale: float = 0.5) -> float:
+        """DAC headroom of the design at its current amplitudes (see CrestReport)."""
+        return float(evaluate_designs(self.frequencies, self.amplitudes, self.phases, full_scale).headroom_db)
+
+    def waveform(self, t: np.ndarray, dc_offset: float = 0.0, **kwargs) -> np.ndarray:
+        """multifrequency_sine() of the design; kwargs are passed through."""
+        return multifrequency_sine(t, self.frequencies, self.amplitudes, self.phases, dc_offset, **kwargs)
+
+
+# -----------------------------------------------------------------------------
+# 1. Tone grid and vectorized evaluation
+# -----------------------------------------------------------------------------
+
+def tone_grid(frequencies: Sequence[float], resolution_hz: Optional[float] = None) -> tuple[np.ndarray, float]:
+    """
+    Integer bins and grid spacing of a tone set: f_k = bins[k] * f_res.
+
+    f_res is the largest common divisor of the frequencies (resolved to
+    1 mHz) unless resolution_hz is given.
+    """
+    f = np.asarray(frequencies, dtype=float)
+    if f.ndim != 1 or f.size == 0:
+        raise ValueError("frequencies must be a non-empty 1-D sequence")
+    if np.any(f <= 0) or np.unique(f).size != f.size:
+        raise ValueError("frequencies must be positive and distinct")
+    if resolution_hz is None:
+        fracs = [Fraction(float(x)).limit_denominator(_GRID_DENOMINATOR) for x in f]
+        den = math.lcm(*(q.denominator for q in fracs))
+        ints = [int(q * den) for q in fracs]
+        resolution_hz = math.gcd(*ints) / den
+    bins = np.rint(f / resolution_hz).astype(np.int64)
+    if np.any(np.abs(bins * resolution_hz - f) > 1e-9 * f) or np.any(bins < 1):
+        raise ValueError(f"frequencies are not on a {resolution_hz} Hz grid")
+    if bins.max() > _MAX_BINS:
+        raise ValueError(f"tone grid too fine: highest bin {bins.max()} exceeds {_MAX_BINS}")
+    return bins, float(resolution_hz)
+
+
+def _period_samples(bins: np.ndarray, oversample: int) -> int:
+    """Power-of-two period length sampling the highest bin oversample times per cycle."""
+    return 1 << max(3, math.ceil(math.log2(oversample * (int(bins.max()) + 1))))
+
+
+def _waveforms(bins: np.ndarray, amplitudes: np.ndarray, phases: np.ndarray, n: int) -> np.ndarray:
+    """One period, x[j] = sum_k a_k sin(2 pi m_k j / n + phi_k), for each row of phases."""
+    spec = np.zeros(phases.shape[:-1] + (n // 2 + 1,), dtype=np.complex128)
+    spec[..., bins] = 0.5 * n * amplitudes * np.exp(1j * (phases - 0.5 * np.pi))
+    return np.fft.irfft(spec, n=n, axis=-1)
+
+
+def _crest(x: np.ndarray, amplitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    peak = np.max(np.abs(x), axis=-1)
+    rms = math.sqrt(0.5 * float(np.sum(amplitudes ** 2)))
+    return peak / rms, peak, rms
+
+
+def evaluate_designs(
+    frequencies: Sequence[float],
+    amplitudes: Sequence[float],
+    phases: np.ndarray,
+    full_scale: float = 0.5,
+    oversample: int = 8,
+) -> CrestReport:
+    """
+    Crest factor and DAC headroom of one or many phase sets.
+
+    Args:
+        frequencies: Tone frequencies (Hz), on a common grid.
+        amplitudes: Tone amplitudes, shape (K,).
+        phases: Shape (K,) or (D, K): D candidate designs.
+        full_scale: Peak excursion the DAC allows around its DC level
+            (0.5 for the normalized [0, 1] output at mid-scale).
+        oversample: Evaluation points per cycle of the highest tone. Peaks
+            between points are missed; for the highest tone alone by at
+            most 1 - cos(pi / oversample) (8: 7.6 %), in practice far less.
+
+    Returns:
+        CrestReport with fields of shape phases.shape[:-1].
+    """
+    bins, _ = tone_grid(frequencies)
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    phases = np.asarray(phases, dtype=float)
+    if phases.shape[-1:] != bins.shape or amplitudes.shape != bins.shape:
+        raise ValueError("amplitudes and the last axis of phases must match frequencies")
+    x = _waveforms(bins, amplitudes, phases, _period_samples(bins, oversample))
+    cf, peak, rms = _crest(x, amplitudes)
+    scale = full_scale / peak
+    return CrestReport(cf, peak, np.full_like(peak, rms), 20.0 * np.log10(scale), scale)
+
+
+# -----------------------------------------------------------------------------
+# 2. Phase designs
+# -----------------------------------------------------------------------------
+
+def schroeder_phases(amplitudes: Sequence[float]) -> np.ndarray:
+    """phi_k = -2 pi sum_{l<k} (k - l) p_l with p_l the power fraction of tone l."""
+    p = np.asarray(amplitudes, dtype=float) ** 2
+    p /= p.sum()
+    k = np.arange(p.size)
+    # sum_{l<k} (k - l) p_l = k * P(k) - sum_{l<k} l p_l, with P the prefix sums
+    prefix = np.concatenate(([0.0], np.cumsum(p)[:-1]))
+    prefix_l = np.concatenate(([0.0], np.cumsum(k * p)[:-1]))
+    return np.mod(-2.0 * np.pi * (k * prefix - prefix_l), 2.0 * np.pi)
+
+
+def newman_phases(n_tones: int) -> np.ndarray:
+    """phi_k = pi (k - 1)^2 / K, k = 1..K (for equal amplitudes)."""
+    k = np.arange(n_tones)
+    return np.mod(np.pi * k ** 2 / n_tones, 2.0 * np.pi)
+
+
+def clipping_phases(
+    bins: np.ndarray,
+    amplitudes: np.ndarray,
+    starts: np.ndarray,
+    n_iter: int = 200,
+    clip: float = 0.8,
+    oversample: int = 8,
+) -> tuple[np.ndarray, float]:
+    """
+    Iterative clipping from a batch of starting phase sets.
+
+    Each iteration clips every waveform at clip * its current peak, then
+    takes the clipped spectrum's phases at the tone bins with the original
+    amplitudes. All rows of starts (shape (D, K)) are iterated together;
+    returns the best phases seen and their crest factor.
+    """
+    n = _period_samples(bins, oversample)
+    phases = np.array(starts, dtype=float, ndmin=2)
+    best_phases, best_cf = phases[0], np.inf
+    for _ in range(n_iter + 1):
+        x = _waveforms(bins, amplitudes, phases, n)
+        cf, peak, _ = _crest(x, amplitudes)
+        i = int(np.argmin(cf))
+        if cf[i] < best_cf:
+            best_cf, best_phases = float(cf[i]), phases[i].copy()
+        level = (clip * peak)[:, None]
+        np.clip(x, -level, level, out=x)
+        phases = np.angle(np.fft.rfft(x, axis=-1)[:, bins]) + 0.5 * np.pi
+    return np.mod(best_phases, 2.0 * np.pi), best_cf
+
+
+# -----------------------------------------------------------------------------
+# 3. Designer with on-disk cache
+# -----------------------------------------------------------------------------
+
+def _cache_path(cache_dir: str | os.PathLike, key: tuple, amplitudes: np.ndarray) -> str:
+    h = hashlib.blake2b(repr(key).encode("ascii"), digest_size=16)
+    h.update(np.ascontiguousarray(amplitudes, dtype="<f8").tobytes())
+    return os.path.join(os.fspath(cache_dir), f"{DESIGN_CACHE_PREFIX}{h.hexdigest()}.npz")
+
+
+def _load_design(path: str, frequencies: np.ndarray, amplitudes: np.ndarray) -> Optional[MultisineDesign]:
+    try:
+        with np.load(path) as data:
+            if not (np.array_equal(data["frequencies"], frequencies) and np.array_equal(data["amplitudes"], amplitudes)):
+                return None
+            return MultisineDesign(frequencies, amplitudes, data["phases"], str(data["method"]),
+                                   float(data["crest_factor"]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_design(path: str, design: MultisineDesign) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **design._asdict())
+    os.replace(tmp_path, path)
+
+
+def design_multisine(
+    frequencies: Sequence[float],
+    amplitudes: Optional[Sequence[float]] = None,
+    method: str = "clipping",
+    n_iter: int = 200,
+    n_starts: int = 8,
+    seed: int = 0,
+    oversample: int = 8,
+    cache_dir: Optional[str | os.PathLike] = None,
+) -> MultisineDesign:
+    """
+    Phases minimizing the crest factor of a tone set.
+
+    Args:
+        frequencies: Tone frequencies (Hz), on a common grid.
+        amplitudes: Tone amplitudes; default all ones.
+        method: One of DESIGN_METHODS.
+        n_iter: Clipping iterations.
+        n_starts: Clipping starting points: Schroeder, Newman, zero, then random.
+        seed: Seed for the random starts.
+        oversample: Evaluation points per cycle of the highest tone.
+        cache_dir: If given, clipping designs are loaded from / saved to
+            an .npz file in this directory keyed by tone set and settings.
+
+    Returns:
+        MultisineDesign; its phases are referenced to t = 0, as used by
+        multifrequency_sine().
+    """
+    if method not in DESIGN_METHODS:
+        raise ValueError(f"method must be one of {DESIGN_METHODS}, got {method!r}")
+    frequencies = np.asarray(frequencies, dtype=float)
+    bins, f_res = tone_grid(frequencies)
+    k = bins.size
+    amplitudes = np.ones(k) if amplitudes is None else np.asarray(amplitudes, dtype=float)
+    if amplitudes.shape != (k,):
+        raise ValueError("amplitudes must match length of frequencies")
+
+    path = None
+    if method == "clipping" and cache_dir is not None:
+        key = (method, f_res, tuple(bins.tolist()), n_iter, n_starts, seed, oversample)
+        path = _cache_path(cache_dir, key, amplitudes)
+        cached = _load_design(path, frequencies, amplitudes)
+        if cached is not None:
+            return cached
+
+    # Closed forms run over the tones in frequency order
+    order = np.argsort(bins)
+    if method == "zero":
+        phases = np.zeros(k)
+    elif method in ("schroeder", "clipping"):
+        phases = np.empty(k)
+        phases[order] = schroeder_phases(amplitudes[order])
+    if method == "newman":
+        phases = np.empty(k)
+        phases[order] = newman_phases(k)
+
+    if method == "clipping":
+        starts = np.zeros((max(n_starts, 3), k))
+        starts[0] = phases
+        starts[1, order] = newman_phases(k)
+        starts[3:] = np.random.default_rng(seed).uniform(0.0, 2.0 * np.pi, (starts.shape[0] - 3, k))
+        phases, cf = clipping_phases(bins, amplitudes, starts, n_iter=n_iter, oversample=oversample)
+    else:
+        cf = float(evaluate_designs(frequencies, amplitudes, phases, oversample=oversample).crest_factor)
+
+    design = MultisineDesign(frequencies, amplitudes, phases, method, cf)
+    if path is not None:
+        _save_design(path, design)
+    return design
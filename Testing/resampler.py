@@ -0,0 +1,172 @@
+"""
+Streaming rational resampler between the DAC/analog and ADC rates.
+
+The DAC (and the analog stages after it) and the ADC run at different
+rates, e.g. 250 MSPS and 100 MSPS (up/down = 2/5). RationalResampler is a
+polyphase FIR: only the output samples are computed, each from one of `up`
+sub-filters, and the delay line carries over between blocks, so a stream
+resampled block by block equals one call on the whole signal. The
+anti-imaging/anti-aliasing filter is a Kaiser-windowed sinc like
+scipy.signal.resample_poly's, with its half length rounded up so the group
+delay is a whole number of output samples (`delay`). The defaults are
+longer and steeper than resample_poly's (half_width 16, beta 10 instead of
+10, 5): passband ripple stays ~1e-5 up to 0.8 x the output Nyquist rate,
+where resample_poly's ~1e-3 would show up as a carrier gain error in the
+lock-in output.
+"""
+
+from __future__ import annotations
+
+import math
+from fractions import Fraction
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin
+
+try:
+    from .generators import _float_dtype
+except ImportError:
+    from generators import _float_dtype
+
+
+def rational_ratio(in_rate_hz: float, out_rate_hz: float, max_denominator: int = 1000) -> Tuple[int, int]:
+    """(up, down) in lowest terms with out_rate_hz / in_rate_hz == up / down."""
+    if in_rate_hz <= 0 or out_rate_hz <= 0:
+        raise ValueError("sample rates must be positive")
+    ratio = Fraction(out_rate_hz / in_rate_hz).limit_denominator(max_denominator)
+    if not math.isclose(float(ratio), out_rate_hz / in_rate_hz, rel_tol=1e-12):
+        raise ValueError(
+            f"{out_rate_hz} / {in_rate_hz} Hz is not a ratio of integers up to {max_denominator}"
+        )
+    return ratio.numerator, ratio.denominator
+
+
+class RationalResampler:
+    """
+    Polyphase resampler by up/down with state kept across blocks.
+
+    Output sample m is sum_j h[(m*down) % up + j*up] * x[(m*down) // up - j]
+    (the causal upfirdn result, gain `up` so DC is preserved). Outputs
+    sharing a polyphase branch are strided windows of the input, so each
+    block costs `up` matrix-vector products.
+    """
+
+    def __init__(
+        self,
+        up: int,
+        down: int,
+        half_width: int = 16,
+        kaiser_beta: float = 10.0,
+        sample_rate_hz: Optional[float] = None,
+        dtype: DTypeLike = np.float64,
+    ):
+        """
+        Args:
+            up: Interpolation factor.
+            down: Decimation factor.
+            half_width: Filter half length in units of max(up, down) input
+                periods at the upsampled rate (resample_poly uses 10).
+            kaiser_beta: Kaiser window shape parameter.
+            sample_rate_hz: Input rate (Hz), for output_rate_hz and delay_s.
+            dtype: Working and output precision, float64 or float32.
+        """
+        if up < 1 or down < 1 or half_width < 1:
+            raise ValueError("up, down and half_width must be >= 1")
+        g = math.gcd(int(up), int(down))
+        self.up, self.down = int(up) // g, int(down) // g
+        self.sample_rate_hz = sample_rate_hz
+        self.dtype = _float_dtype(dtype)
+        max_rate = max(self.up, self.down)
+        if max_rate == 1:
+            half_len, self.taps = 0, np.ones(1)
+        else:
+            half_len = -(-half_width * max_rate // self.down) * self.down
+            self.taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", kaiser_beta)) * self.up
+        self.delay = half_len // self.down
+        n_phase = -(-self.taps.size // self.up)
+        padded = np.zeros(n_phase * self.up)
+        padded[: self.taps.size] = self.taps
+        # Row p: branch p's taps, reversed to line up with sliding windows
+        self._kernels = padded.reshape(n_phase, self.up).T[:, ::-1].astype(self.dtype)
+        self.reset()
+
+    @classmethod
+    def from_rates(
+        cls,
+        in_rate_hz: float,
+        out_rate_hz: float,
+        max_denominator: int = 1000,
+        **kwargs,
+    ) -> "RationalResampler":
+        """Resampler from in_rate_hz to out_rate_hz (must be a rational ratio)."""
+        up, down = rational_ratio(in_rate_hz, out_rate_hz, max_denominator)
+        return cls(up, down, sample_rate_hz=in_rate_hz, **kwargs)
+
+    @property
+    def output_rate_hz(self) -> Optional[float]:
+        return None if self.sample_rate_hz is None else self.sample_rate_hz * self.up / self.down
+
+    @property
+    def delay_s(self) -> Optional[float]:
+        """Group delay in seconds (delay output samples)."""
+        rate = self.output_rate_hz
+        return None if rate is None else self.delay / rate
+
+    def reset(self) -> None:
+        """Clear the delay line and restart at output sample 0."""
+        self._hist = np.zeros(self._kernels.shape[1] - 1, dtype=self.dtype)
+        self._n_in = 0
+        self._n_out = 0
+
+    def output_length(self, n_in: int) -> int:
+        """Outputs the next block of n_in samples produces."""
+        return -(-(self._n_in + n_in) * self.up // self.down) - self._n_out
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Resample one block, continuing from the previous block."""
+        x = np.asarray(x)
+        n_taps = self._kernels.shape[1]
+        buf = np.concatenate((self._hist, x.astype(self.dtype, copy=False)))
+        n_y = self.output_length(x.size)
+        y = np.empty(n_y, dtype=self.dtype)
+        if x.size == 0:
+            return y
+        windows = sliding_window_view(buf, n_taps)
+        for r in range(min(self.up, n_y)):
+            m = self._n_out + r
+            start = m * self.down // self.up - self._n_in
+            count = len(range(r, n_y, self.up))
+            branch = windows[start : start + (count - 1) * self.down + 1 : self.down]
+            y[r :: self.up] = branch @ self._kernels[m * self.down % self.up]
+        self._hist = buf[buf.size - self._hist.size :].copy()
+        self._n_in += x.size
+        self._n_out += n_y
+        return y
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        """Stage interface for SignalChain."""
+        return self.process(x)
+
+
+def resample(
+    x: np.ndarray,
+    in_rate_hz: float,
+    out_rate_hz: float,
+    **kwargs,
+) -> np.ndarray:
+    """
+    Resample a whole signal with the filter delay removed.
+
+    Returns ceil(len(x) * up / down) samples aligned with x (sample m at
+    t = m / out_rate_hz); the end is padded with zeros, as resample_poly
+    does. kwargs go to RationalResampler.
+    """
+    r = RationalResampler.from_rates(in_rate_hz, out_rate_hz, **kwargs)
+    x = np.asarray(x)
+    n_out = -(-x.size * r.up // r.down)
+    pad = -(-r.delay * r.down // r.up) + 1
+    y = r.process(np.concatenate((x, np.zeros(pad, dtype=x.dtype))))
+    return y[r.delay : r.delay + n_out]
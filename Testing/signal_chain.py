@@ -0,0 +1,269 @@
+"""
+Streaming signal chain for the impedance analyzer testbench.
+
+Runs DAC -> impedance -> TIA -> ADC (-> lock-in demodulator) over an
+iterator of sample blocks instead of whole-capture arrays. Every stage
+keeps its state between blocks (filter state, INL tables, jitter history,
+RNG streams), so peak memory is proportional to the block size rather than
+the capture length.
+Stages declare their input rate (sample_rate_hz); where consecutive stages
+disagree, e.g. a 250 MSPS analog domain feeding a 100 MSPS ADC, a streaming
+RationalResampler is inserted between them.
+"""
+
+from __future__ import annotations
+
+import math
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    from .generators import NCO, sine_wave
+    from .simulators import (
+        IMPEDANCE_METHODS,
+        AdmittanceFilter,
+        DACSimulator,
+        ImpedanceSimulator,
+        OpAmpSimulator,
+        ADCSimulator,
+    )
+    from .demodulator import DemodulatorBank, LockInDemodulator
+    from .instrumentation import Profiler
+    from .resampler import RationalResampler
+except ImportError:
+    from generators import NCO, sine_wave
+    from simulators import (
+        IMPEDANCE_METHODS,
+        AdmittanceFilter,
+        DACSimulator,
+        ImpedanceSimulator,
+        OpAmpSimulator,
+        ADCSimulator,
+    )
+    from demodulator import DemodulatorBank, LockInDemodulator
+    from instrumentation import Profiler
+    from resampler import RationalResampler
+
+
+# -----------------------------------------------------------------------------
+# Block sources
+# -----------------------------------------------------------------------------
+
+def iter_blocks(x: np.ndarray, block_size: int) -> Iterator[np.ndarray]:
+    """Yield consecutive views of x with at most block_size samples each."""
+    if block_size < 1:
+        raise ValueError("block_size must be >= 1")
+    for start in range(0, len(x), block_size):
+        yield x[start : start + block_size]
+
+
+def excitation_blocks(
+    n_samples: int,
+    block_size: int,
+    sample_rate_hz: float,
+    frequency_hz: float,
+    amplitude: float = 0.4,
+    dc_offset: float = 0.5,
+    nco: Optional[NCO] = None,
+) -> Iterator[np.ndarray]:
+    """
+    DDS excitation in [0, 1] for a unipolar DAC, generated block by block.
+
+    Equivalent to dc_offset + amplitude * sin(2*pi*f*t) over n_samples, but
+    only one block is ever held in memory. Pass an NCO tuned to
+    frequency_hz to model the FPGA DDS (phase accumulator + sine LUT).
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be >= 1")
+    for start in range(0, n_samples, block_size):
+        n = min(block_size, n_samples - start)
+        t = (start + np.arange(n, dtype=float)) / sample_rate_hz
+        yield sine_wave(t, frequency_hz, amplitude=amplitude, dc_offset=dc_offset, nco=nco)
+
+
+# -----------------------------------------------------------------------------
+# Stages
+# -----------------------------------------------------------------------------
+
+class ImpedanceStage:
+    """
+    Block-wise adapter for ImpedanceSimulator.current_from_voltage.
+
+    Tracks the running sample index so each block gets its own time base.
+    With method="broadband" the blocks go through a streaming
+    AdmittanceFilter instead, and the current lags the voltage by `delay`
+    samples (0 for single_tone).
+    """
+
+    def __init__(
+        self,
+        impedance: ImpedanceSimulator,
+        f_excitation_hz: float,
+        sample_rate_hz: float,
+        method: str = "single_tone",
+        half_taps: int = 256,
+    ):
+        if method not in IMPEDANCE_METHODS:
+            raise ValueError(f"method must be one of {IMPEDANCE_METHODS}, got {method!r}")
+        self.impedance = impedance
+        self.f_excitation_hz = f_excitation_hz
+        self.sample_rate_hz = sample_rate_hz
+        self.method = method
+        self.half_taps = half_taps
+        self._filter: Optional[AdmittanceFilter] = None
+        self._n = 0
+
+    @property
+    def delay(self) -> int:
+        return self.half_taps if self.method == "broadband" else 0
+
+    def reset(self) -> None:
+        self._n = 0
+        if self._filter is not None:
+            self._filter.reset()
+
+    def run(self, voltage: np.ndarray) -> np.ndarray:
+        if self.method == "broadband":
+            if self._filter is None:
+                dtype = np.float32 if np.asarray(voltage).dtype == np.float32 else np.float64
+                self._filter = AdmittanceFilter(
+                    self.impedance, self.sample_rate_hz, half_taps=self.half_taps, dtype=dtype
+                )
+            return self._filter.process(voltage)
+        t = (self._n + np.arange(len(voltage), dtype=float)) / self.sample_rate_hz
+        self._n += len(voltage)
+        return self.impedance.current_from_voltage(voltage, t, self.f_excitation_hz)
+
+
+def _insert_resamplers(stages: Sequence[Tuple[str, object]]) -> List[Tuple[str, object]]:
+    """Put a RationalResampler in front of each stage whose input rate changes."""
+    out: List[Tuple[str, object]] = []
+    rate = None
+    for name, stage in stages:
+        fs = getattr(stage, "sample_rate_hz", None)
+        if rate is not None and fs is not None and not math.isclose(rate, fs):
+            dtype = np.float32 if getattr(stage, "dtype", None) == np.float32 else np.float64
+            out.append((f"{name}_input", RationalResampler.from_rates(rate, fs, dtype=dtype)))
+        out.append((name, stage))
+        if fs is not None:
+            rate = getattr(stage, "output_rate_hz", None) or fs
+    return out
+
+
+class SignalChain:
+    """
+    Composable streaming pipeline of named stages.
+
+    Each stage is any object with run(block) -> block (all four simulators
+    qualify); an optional reset() is called by SignalChain.reset(). Blocks
+    flow through the stages in order and process() returns every stage's
+    output for that block, keyed by stage name.
+
+    A stage's sample_rate_hz attribute, if any, is the rate it expects at
+    its input; its output runs at output_rate_hz if it has one (decimators,
+    resamplers), else at the same rate. With resample=True a
+    RationalResampler named "<stage>_input" is inserted in front of every
+    stage whose rate differs from the rate arriving at it.
+
+    With a Profiler attached (constructor or .profiler), every stage call is
+    timed; sample_rate_hz gives the stage's real-time factor.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Tuple[str, object]],
+        profiler: Optional[Profiler] = None,
+        resample: bool = True,
+    ):
+        stages = _insert_resamplers(stages) if resample else list(stages)
+        names = [name for name, _ in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("stage names must be unique")
+        self.stages: List[Tuple[str, object]] = stages
+        self.profiler = profiler
+
+    @classmethod
+    def from_simulators(
+        cls,
+        dac: Optional[DACSimulator] = None,
+        impedance: Optional[ImpedanceSimulator] = None,
+        tia: Optional[OpAmpSimulator] = None,
+        adc: Optional[ADCSimulator] = None,
+        demodulator: Optional[Union[LockInDemodulator, DemodulatorBank]] = None,
+        f_excitation_hz: float = 1e6,
+        sample_rate_hz: Optional[float] = None,
+        impedance_method: str = "single_tone",
+    ) -> "SignalChain":
+        """
+        README chain: DAC -> impedance -> TIA -> ADC -> demodulator.
+
+        Stages given as None are skipped. Output keys are "dac_output",
+        "sensor_current", "tia_output", "adc_codes" and "demod" (the
+        demodulator's magnitude R, in ADC codes when it follows the ADC),
+        plus "<stage>_input" for a stage fed through a resampler, e.g.
+        "adc_codes_input" when the ADC runs at a different rate.
+        sample_rate_hz is the analog-domain rate; it defaults to the DAC's
+        (or TIA's) rate. impedance_method is the ImpedanceStage method;
+        "broadband" applies 1/Z(f) to every tone of a multifrequency
+        excitation.
+        """
+        if sample_rate_hz is None:
+            analog = dac if dac is not None else tia
+            if impedance is not None and analog is None:
+                raise ValueError("sample_rate_hz is required without a DAC or TIA")
+            sample_rate_hz = analog.sample_rate_hz if analog is not None else None
+        stages: List[Tuple[str, object]] = []
+        if dac is not None:
+            stages.append(("dac_output", dac))
+        if impedance is not None:
+            stage = ImpedanceStage(impedance, f_excitation_hz, sample_rate_hz, impedance_method)
+            stages.append(("sensor_current", stage))
+        if tia is not None:
+            stages.append(("tia_output", tia))
+        if adc is not None:
+            stages.append(("adc_codes", adc))
+        if demodulator is not None:
+            stages.append(("demod", demodulator))
+        return cls(stages)
+
+    def reset(self) -> None:
+        """Reset every stage that holds streaming state."""
+        for _, stage in self.stages:
+            reset = getattr(stage, "reset", None)
+            if reset is not None:
+                reset()
+
+    def process(
+        self,
+        block: np.ndarray,
+        keep: Optional[Iterable[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Push one block through all stages.
+
+        keep: stage names to return (default: all). Intermediate outputs
+        not kept are released as soon as the next stage has consumed them.
+        """
+        keep_set = None if keep is None else set(keep)
+        out: Dict[str, np.ndarray] = {}
+        x = block
+        profiler = self.profiler
+        for name, stage in self.stages:
+            if profiler is None:
+                x = stage.run(x)
+            else:
+                with profiler.stage(name, len(x), getattr(stage, "sample_rate_hz", None)):
+                    x = stage.run(x)
+            if keep_set is None or name in keep_set:
+                out[name] = x
+        return out
+
+    def run(
+        self,
+        blocks: Iterable[np.ndarray],
+        keep: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """Lazily process an iterator of blocks, yielding one dict per block."""
+        keep = None if keep is None else tuple(keep)
+        for block in blocks:
+            yield self.process(block, keep=keep)
@@ -8,11 +8,19 @@ time- and frequency-domain behavior based on real product specifications.
 
 from __future__ import annotations
 
+import os
 import numpy as np
-from typing import Optional, Tuple, Callable
+from typing import Optional, Tuple, Callable, Sequence
+from numpy.typing import ArrayLike, DTypeLike
 
 try:
     from .generators import (
+        ScratchBuffers,
+        SinglePoleLPF,
+        _float_dtype,
+        _uniform_step,
+        dac_inl_profile,
+        adc_inl_profile,
         dac_errors,
         opamp_errors,
         adc_errors,
@@ -20,8 +28,24 @@ try:
         sine_wave,
         cosine_wave,
     )
+    from .impedance_models import (
+        SingleShell,
+        cpe,
+        parallel_rc,
+        resistor,
+        series_rc,
+        series_rlc,
+        single_shell,
+    )
+    from .stage_cache import StageCache, array_key
 except ImportError:
     from generators import (
+        ScratchBuffers,
+        SinglePoleLPF,
+        _float_dtype,
+        _uniform_step,
+        dac_inl_profile,
+        adc_inl_profile,
         dac_errors,
         opamp_errors,
         adc_errors,
@@ -29,6 +53,162 @@ except ImportError:
         sine_wave,
         cosine_wave,
     )
+    from impedance_models import (
+        SingleShell,
+        cpe,
+        parallel_rc,
+        resistor,
+        series_rc,
+        series_rlc,
+        single_shell,
+    )
+    from stage_cache import StageCache, array_key
+
+
+# -----------------------------------------------------------------------------
+# Per-device INL tables (shared by DAC and ADC simulators)
+# -----------------------------------------------------------------------------
+# A simulated converter's nonlinearity is a property of the device, not of a
+# single conversion: the INL table is drawn once per instance and reused.
+# Assigning n_bits or inl_lsb discards it (it is drawn again on next use).
+# DNL is not part of the table yet: it is still a fresh draw per conversion.
+
+class _InlTableMixin:
+    """Lazily built, cached per-code INL table with save/load to .npz."""
+
+    _inl_kind = ""
+    _inl_profile_fn: Callable[..., np.ndarray]
+
+    @property
+    def n_bits(self) -> int:
+        """Resolution; assigning it discards the INL table."""
+        return self._n_bits
+
+    @n_bits.setter
+    def n_bits(self, n_bits: int) -> None:
+        n_bits = int(n_bits)
+        self._check_n_bits(n_bits)
+        if getattr(self, "_n_bits", None) != n_bits:
+            self._inl_table = None
+        self._n_bits = n_bits
+
+    @property
+    def inl_lsb(self) -> float:
+        """INL amplitude (LSB); assigning a new value discards the INL table."""
+        return self._inl_lsb
+
+    @inl_lsb.setter
+    def inl_lsb(self, inl_lsb: float) -> None:
+        if getattr(self, "_inl_lsb", None) != inl_lsb:
+            self._inl_table = None
+        self._inl_lsb = inl_lsb
+
+    def _check_n_bits(self, n_bits: int) -> None:
+        """Hook for subclasses that cannot represent every resolution."""
+
+    def _init_inl_table(self, inl_table: Optional[np.ndarray]) -> None:
+        self._inl_table = None
+        self._inl_cast: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        if inl_table is not None:
+            self.inl_table = inl_table
+
+    def _inl_table_as(self, dtype: np.dtype) -> np.ndarray:
+        """inl_table in the working precision (the cast is cached per table)."""
+        table = self.inl_table
+        if table.dtype == dtype:
+            return table
+        if self._inl_cast is None or self._inl_cast[0] is not table:
+            self._inl_cast = (table, table.astype(dtype))
+        return self._inl_cast[1]
+
+    @property
+    def inl_table(self) -> np.ndarray:
+        """Per-code INL table of shape (2^n_bits,), drawn on first use."""
+        if self._inl_table is None:
+            self._inl_table = self._inl_profile_fn(self.n_bits, self.inl_lsb, self._rng)
+        return self._inl_table
+
+    @inl_table.setter
+    def inl_table(self, table: np.ndarray) -> None:
+        table = np.asarray(table, dtype=float)
+        n_levels = 1 << self.n_bits
+        if table.shape != (n_levels,):
+            raise ValueError(f"inl_table must have shape ({n_levels},), got {table.shape}")
+        self._inl_table = table
+
+    def save_inl_table(self, path: str | os.PathLike) -> None:
+        """Save this device's INL table (and the settings it was drawn with) to .npz."""
+        np.savez(
+            path,
+            kind=self._inl_kind,
+            n_bits=self.n_bits,
+            inl_lsb=self.inl_lsb,
+            inl_table=self.inl_table,
+        )
+
+    def load_inl_table(self, path: str | os.PathLike) -> None:
+        """
+        Load an INL table saved by save_inl_table() into this device.
+
+        inl_lsb is restored with it, so the device reports the settings its
+        table was drawn with. The file must hold a table of this device's
+        kind and n_bits.
+        """
+        with np.load(path) as data:
+            self._restore_inl_table(data["kind"], data["n_bits"], data["inl_lsb"], data["inl_table"], path)
+
+    def _restore_inl_table(self, kind: str, n_bits: int, inl_lsb: float, table: np.ndarray, source) -> None:
+        """Install a saved table after checking it was drawn for this kind and n_bits."""
+        if str(kind) != self._inl_kind:
+            raise ValueError(f"{source} holds a {kind} table, not {self._inl_kind}")
+        if int(n_bits) != self.n_bits:
+            raise ValueError(f"{source} holds a {int(n_bits)}-bit table, this device has n_bits={self.n_bits}")
+        self.inl_table = table
+        self._inl_lsb = float(inl_lsb)  # not the setter, which would discard the table
+
+
+def save_inl_tables(path: str | os.PathLike, devices: Sequence[_InlTableMixin]) -> None:
+    """
+    Save the INL tables of a fleet of same-kind, same-resolution devices.
+
+    Tables are stacked into one array of shape (n_devices, 2^n_bits) so a
+    Monte-Carlo fleet can be rebuilt with load_inl_tables().
+    """
+    if not devices:
+        raise ValueError("devices must not be empty")
+    kinds = {d._inl_kind for d in devices}
+    n_bits = {d.n_bits for d in devices}
+    if len(kinds) != 1 or len(n_bits) != 1:
+        raise ValueError("all devices must be the same kind with the same n_bits")
+    np.savez(
+        path,
+        kind=kinds.pop(),
+        n_bits=n_bits.pop(),
+        inl_lsb=np.array([d.inl_lsb for d in devices], dtype=float),
+        inl_table=np.stack([d.inl_table for d in devices]),
+    )
+
+
+def load_inl_tables(
+    path: str | os.PathLike,
+    devices: Optional[Sequence[_InlTableMixin]] = None,
+) -> np.ndarray:
+    """
+    Load a fleet saved by save_inl_tables(); returns (n_devices, 2^n_bits).
+
+    With devices (one per saved table, in order), each device gets its
+    table and inl_lsb; they must match the kind and n_bits of the file,
+    so tables cannot end up in the wrong kind of device or resolution.
+    """
+    with np.load(path) as data:
+        tables = np.atleast_2d(data["inl_table"])
+        if devices is not None:
+            if len(devices) != tables.shape[0]:
+                raise ValueError(f"{path} holds {tables.shape[0]} tables, got {len(devices)} devices")
+            inl_lsb = np.broadcast_to(data["inl_lsb"], tables.shape[:1])
+            for device, table, lsb in zip(devices, tables, inl_lsb):
+                device._restore_inl_table(data["kind"], data["n_bits"], lsb, table, path)
+        return tables
 
 
 # -----------------------------------------------------------------------------
@@ -37,15 +217,22 @@ except ImportError:
 # Based on AD9142A (16-bit 1600 MSPS), AD9122 (16-bit 1230 MSPS) class.
 # README: DAC 16-bit+, 250 MSPS+; generates composite waveform (sum of sinusoids).
 
-class DACSimulator:
+class DACSimulator(_InlTableMixin):
     """
     High-speed DAC simulator: 16-bit, 250+ MSPS.
 
     Models time-domain: settling, full-scale output; frequency-domain: SFDR,
     INL/DNL, gain/offset. Output is analog voltage normalized to [0, 1] or
     configurable Vref.
+
+    The INL table is drawn once per instance (or passed as inl_table) and
+    reused by every conversion, so one instance behaves as one device.
+    dtype sets the working/output precision (float64 or float32).
     """
 
+    _inl_kind = "dac"
+    _inl_profile_fn = staticmethod(dac_inl_profile)
+
     def __init__(
         self,
         sample_rate_hz: float = 250e6,
@@ -58,8 +245,11 @@ class DACSimulator:
         glitch_energy_frac: float = 0.0,
         settling_time_sec: Optional[float] = None,
         seed: Optional[int] = None,
+        inl_table: Optional[np.ndarray] = None,
+        dtype: DTypeLike = np.float64,
     ):
         self.sample_rate_hz = sample_rate_hz
+        self.dtype = _float_dtype(dtype)
         self.n_bits = n_bits
         self.v_ref = v_ref
         self.inl_lsb = inl_lsb
@@ -69,22 +259,23 @@ class DACSimulator:
         self.glitch_energy_frac = glitch_energy_frac
         self.settling_time_sec = settling_time_sec or (1.0 / sample_rate_hz)
         self._rng = np.random.default_rng(seed)
-        self._max_code = (1 << n_bits) - 1
+        self._scratch = ScratchBuffers()
+        self._init_inl_table(inl_table)
 
-    def digital_to_analog(self, digital_codes: np.ndarray) -> np.ndarray:
+    def digital_to_analog(self, digital_codes: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Convert digital codes to analog voltage with DAC nonidealities.
 
-        digital_codes: integer [0, 2^n_bits - 1] or float [0, 1] normalized.
+        digital_codes: integer codes [0, 2^n_bits - 1], or floating point
+            normalized to [0, 1]. The dtype decides which, not the values,
+            so a block of integer codes that are all 0 or 1 stays near zero.
+        out: optional output array (same shape, dtype self.dtype); work
+            arrays are kept on the instance, so same-size blocks converted
+            into out allocate nothing of block length.
         Returns: analog voltage (same length).
         """
-        codes = np.asarray(digital_codes, dtype=float)
-        if codes.max() <= 1.0 and codes.min() >= 0.0:
-            codes = codes * self._max_code
-        codes = np.clip(codes, 0, self._max_code)
-
         analog = dac_errors(
-            codes,
+            digital_codes,
             n_bits=self.n_bits,
             inl_lsb=self.inl_lsb,
             dnl_lsb=self.dnl_lsb,
@@ -92,12 +283,17 @@ class DACSimulator:
             offset_error=self.offset_error,
             glitch_energy_frac=self.glitch_energy_frac,
             rng=self._rng,
+            inl_profile=self._inl_table_as(self.dtype),
+            dtype=self.dtype,
+            out=out,
+            scratch=self._scratch,
         )
-        return analog * self.v_ref
+        analog *= self.dtype.type(self.v_ref)
+        return analog
 
-    def run(self, digital_codes: np.ndarray) -> np.ndarray:
+    def run(self, digital_codes: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Alias for digital_to_analog."""
-        return self.digital_to_analog(digital_codes)
+        return self.digital_to_analog(digital_codes, out=out)
 
 
 # -----------------------------------------------------------------------------
@@ -109,48 +305,106 @@ class ImpedanceSimulator:
     """
     Impedance (real and imaginary) simulator.
 
-    Z(f) = R(f) + j*X(f). Supports parallel R||C, series R-C, or custom
-    frequency-dependent R, X. Used to simulate sensor/electrode response.
+    Z(f) = R(f) + j*X(f). Supports parallel R||C, series R-C, series R-L-C
+    and a single-shell cell suspension, optionally in series with an
+    electrode double layer (CPE). Used to simulate sensor/electrode response.
+
+    Parameters may be arrays: they broadcast to batch_shape and z_complex
+    returns batch_shape + f.shape, so many candidate circuits or cells are
+    evaluated in one call (see impedance_models). Results are memoized per
+    frequency grid and parameter values in a byte-bounded LRU (z_cache);
+    the arrays returned are shared and read-only.
     """
 
     def __init__(
         self,
-        resistance: float = 1e3,
-        capacitance: float = 1e-12,
-        inductance: float = 0.0,
+        resistance: ArrayLike = 1e3,
+        capacitance: ArrayLike = 1e-12,
+        inductance: ArrayLike = 0.0,
         model: str = "parallel_rc",
+        shell: Optional[SingleShell] = None,
+        cpe_q: Optional[ArrayLike] = None,
+        cpe_alpha: ArrayLike = 0.9,
+        cache_bytes: int = 64 * 1024 ** 2,
     ):
         """
         Args:
             resistance: R in ohms.
             capacitance: C in farads.
             inductance: L in henries (optional).
-            model: "parallel_rc" (R||C), "series_rc", or "series_rlc".
+            model: "parallel_rc" (R||C), "series_rc", "series_rlc" or
+                "single_shell" (uses shell, not R/C/L).
+            shell: Cell suspension parameters for "single_shell"
+                (default SingleShell()).
+            cpe_q: If given, an electrode double layer 1 / (Q (j w)^alpha)
+                is added in series; Q in F s^(alpha - 1).
+            cpe_alpha: CPE exponent (1 = ideal capacitor).
+            cache_bytes: Budget of the Z(f) LRU cache (0 disables it).
         """
         self.R = resistance
         self.C = capacitance
         self.L = inductance
         self.model = model
+        self.shell = SingleShell() if shell is None and model == "single_shell" else shell
+        self.cpe_q = cpe_q
+        self.cpe_alpha = cpe_alpha
+        self.z_cache = StageCache(max_bytes=cache_bytes)
+        self._admittance_filters: dict = {}
+
+    def _params(self) -> tuple:
+        """Every parameter the model reads, in a fixed order."""
+        if self.model == "single_shell":
+            params = tuple(self.shell)
+        elif self.model in ("parallel_rc", "series_rc"):
+            params = (self.R, self.C)
+        elif self.model == "series_rlc":
+            params = (self.R, self.C, self.L)
+        else:
+            params = (self.R,)
+        if self.cpe_q is not None:
+            params += (self.cpe_q, self.cpe_alpha)
+        return params
+
+    def _params_key(self) -> tuple:
+        return (self.model, self.cpe_q is not None) + tuple(
+            float(v) if np.ndim(v) == 0 else array_key(np.asarray(v, dtype=float)) for v in self._params()
+        )
+
+    @property
+    def batch_shape(self) -> tuple:
+        """Broadcast shape of the parameters; () for a single circuit."""
+        return np.broadcast_shapes(*(np.shape(v) for v in self._params()))
+
+    def _require_single(self, what: str) -> None:
+        if self.batch_shape != ():
+            raise ValueError(f"{what} needs scalar impedance parameters, got batch shape {self.batch_shape}")
 
     def z_complex(self, f_hz: np.ndarray) -> np.ndarray:
         """
         Complex impedance Z(f) = R(f) + j*X(f).
 
-        Returns array of shape (f_hz.size,) complex.
+        Returns array of shape batch_shape + f_hz.shape complex, i.e.
+        (f_hz.size,) for scalar parameters and (n_models, f_hz.size) for
+        parameter arrays of length n_models.
         """
         f = np.asarray(f_hz, dtype=float)
-        w = 2.0 * np.pi * np.where(np.abs(f) < 1e-30, 1e-30, f)
-        if self.model == "parallel_rc":
-            # Z = R || (1/(j*w*C)) = R / (1 + j*w*R*C)
-            z = self.R / (1.0 + 1j * w * self.R * self.C)
+        return self.z_cache.get("z", (array_key(f), self._params_key()), lambda: self._compute_z(f))
+
+    def _compute_z(self, f: np.ndarray) -> np.ndarray:
+        if self.model == "single_shell":
+            z = single_shell(f, self.shell)
+        elif self.model == "parallel_rc":
+            z = parallel_rc(f, self.R, self.C)
         elif self.model == "series_rc":
-            # Z = R + 1/(j*w*C); at DC (f=0) C is open -> R only
-            z = np.where(np.abs(f) < 1e-30, self.R + 0j, self.R + 1.0 / (1j * w * self.C))
+            z = series_rc(f, self.R, self.C)
         elif self.model == "series_rlc":
-            # Z = R + j*w*L + 1/(j*w*C); at DC C open, L short
-            z = np.where(np.abs(f) < 1e-30, self.R + 0j, self.R + 1j * w * self.L + 1.0 / (1j * w * self.C))
+            z = series_rlc(f, self.R, self.C, self.L)
         else:
-            z = np.full_like(f, self.R, dtype=complex)
+            z = resistor(f, self.R)
+        if self.cpe_q is not None:
+            z = z + cpe(f, self.cpe_q, self.cpe_alpha)
+        z = np.array(z, dtype=complex)  # own copy; keeps 0-d for a scalar f
+        z.setflags(write=False)
         return z
 
     def resistance_real(self, f_hz: np.ndarray) -> np.ndarray:
@@ -174,18 +428,169 @@ class ImpedanceSimulator:
         voltage: np.ndarray,
         t: np.ndarray,
         f_excitation_hz: float,
+        method: str = "single_tone",
     ) -> np.ndarray:
         """
-        Current through impedance for given voltage waveform (single-tone approx).
-
-        I = V / Z. For multifrequency, use superposition or FFT; here we use
-        single-tone Z at f_excitation_hz for simplicity.
+        Current through impedance for given voltage waveform.
+
+        I = V / Z. method selects how Z's frequency dependence is applied:
+            single_tone: Re(V / Z) with Z at f_excitation_hz for the whole
+                waveform; cheapest, but only the in-phase current of a tone
+                at f_excitation_hz.
+            broadband: 1/Z(f) at every frequency, by overlap-save FFT
+                convolution (AdmittanceFilter) with the filter delay
+                removed; t must be uniformly sampled and the waveform is
+                taken as zero outside it. f_excitation_hz is unused.
+        float32 voltages give float32 currents.
         """
+        if method not in IMPEDANCE_METHODS:
+            raise ValueError(f"method must be one of {IMPEDANCE_METHODS}, got {method!r}")
+        self._require_single("current_from_voltage")
+        voltage = np.asarray(voltage)
+        if method == "broadband":
+            step = _uniform_step(np.asarray(t))
+            if step is None:
+                raise ValueError("broadband method needs a uniformly sampled t")
+            return self._admittance_filter(1.0 / step, voltage.dtype).apply(voltage)
         z = self.z_complex(np.array([f_excitation_hz]))[0]
         if np.abs(z) < 1e-18:
             return np.zeros_like(voltage)
+        if voltage.dtype == np.float32:
+            # Real input: Re(V / Z) = V * Re(1 / Z), without a complex temporary
+            return voltage * np.float32((1.0 / z).real)
         return np.real(voltage / z)
 
+    def _admittance_filter(self, sample_rate_hz: float, dtype: DTypeLike) -> "AdmittanceFilter":
+        """Filter for one-shot broadband calls, rebuilt only when Z or the rate changes."""
+        dtype = np.float32 if dtype == np.float32 else np.float64
+        key = (sample_rate_hz, np.dtype(dtype).name) + self._params_key()
+        if key not in self._admittance_filters:
+            self._admittance_filters = {key: AdmittanceFilter(self, sample_rate_hz, dtype=dtype)}
+        return self._admittance_filters[key]
+
+
+# -----------------------------------------------------------------------------
+# Broadband admittance (overlap-save FFT convolution)
+# -----------------------------------------------------------------------------
+# A multifrequency excitation sees a different Z at each tone, so the single
+# complex division of current_from_voltage is only right for one of them.
+# AdmittanceFilter applies 1/Z(f) to any waveform as a linear-phase FIR.
+
+IMPEDANCE_METHODS = ("single_tone", "broadband")
+
+
+class AdmittanceFilter:
+    """
+    Streaming FIR with frequency response Y(f) = 1 / Z(f).
+
+    The taps are the impulse response of Y sampled on a dense frequency
+    grid, centred and truncated to 2*half_taps + 1 taps, so the output lags
+    the input by `delay` = half_taps samples. Y is used as is up to
+    passband x Nyquist and rolled off to zero at Nyquist with a raised
+    cosine: with no jump at Nyquist the impulse response decays as fast as
+    the model's own (a Kaiser window would smear Y near DC, which costs
+    series models their low-frequency accuracy). At DC, Y is the f -> 0
+    limit, so series capacitors block DC.
+
+    process() runs overlap-save blocks of fft_size samples; the spectrum of
+    the taps is cached per FFT size (the last, shorter segment of a block
+    uses the next power of two that fits). The history carries over between
+    calls, so a stream filtered block by block equals one call on the whole
+    signal.
+    """
+
+    def __init__(
+        self,
+        impedance: ImpedanceSimulator,
+        sample_rate_hz: float,
+        half_taps: int = 256,
+        passband: float = 0.8,
+        fft_size: Optional[int] = None,
+        dtype: DTypeLike = np.float64,
+    ):
+        """
+        Args:
+            impedance: ImpedanceSimulator whose z_complex(f) is applied.
+            sample_rate_hz: Sample rate of the voltage waveform (Hz).
+            half_taps: Filter half length; the response is kept to
+                +/- half_taps samples.
+            passband: Fraction of Nyquist up to which Y(f) is exact.
+            fft_size: Overlap-save FFT size (power of two); default is the
+                smallest one >= 8 x the filter length.
+            dtype: Working and output precision, float64 or float32.
+        """
+        impedance._require_single("AdmittanceFilter")
+        if half_taps < 1:
+            raise ValueError("half_taps must be >= 1")
+        if not 0.0 < passband <= 1.0:
+            raise ValueError("passband must be in (0, 1]")
+        self.sample_rate_hz = sample_rate_hz
+        self.dtype = _float_dtype(dtype)
+        self.delay = int(half_taps)
+        n_taps = 2 * self.delay + 1
+        if fft_size is None:
+            fft_size = 1 << (8 * n_taps - 1).bit_length()
+        if fft_size < 2 * n_taps or fft_size & (fft_size - 1):
+            raise ValueError("fft_size must be a power of two >= 2 x (2 * half_taps + 1)")
+        self.fft_size = fft_size
+        self.taps = self._design(impedance, n_taps, passband)
+        self._spectra: dict = {}
+        self.reset()
+
+    def _design(self, impedance: ImpedanceSimulator, n_taps: int, passband: float) -> np.ndarray:
+        n_grid = 1 << (16 * n_taps - 1).bit_length()
+        f = np.fft.rfftfreq(n_grid, 1.0 / self.sample_rate_hz)
+        f[0] = f[1] * 1e-9
+        z = impedance.z_complex(f)
+        short = np.abs(z) < 1e-18
+        y = 1.0 / np.where(short, 1.0, z)
+        y[short] = 0.0
+        if passband < 1.0:
+            x = np.clip((2.0 * f / self.sample_rate_hz - passband) / (1.0 - passband), 0.0, 1.0)
+            y *= 0.5 * (1.0 + np.cos(np.pi * x))
+        h = np.fft.irfft(y, n_grid)
+        return np.concatenate((h[-self.delay :], h[: self.delay + 1]))
+
+    def spectrum(self, fft_size: int) -> np.ndarray:
+        """rfft of the taps at fft_size points (cached)."""
+        spec = self._spectra.get(fft_size)
+        if spec is None:
+            spec = np.fft.rfft(self.taps, fft_size).astype(np.complex64 if self.dtype == np.float32 else np.complex128)
+            self._spectra[fft_size] = spec
+        return spec
+
+    def reset(self) -> None:
+        """Clear the history (the signal before the next block is zero)."""
+        self._hist = np.zeros(self.taps.size - 1, dtype=self.dtype)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Filter one block, continuing from the previous block."""
+        x = np.asarray(x)
+        n_hist = self._hist.size
+        buf = np.concatenate((self._hist, x.astype(self.dtype, copy=False)))
+        y = np.empty(x.size, dtype=self.dtype)
+        step = self.fft_size - n_hist
+        for start in range(0, x.size, step):
+            n = min(step, x.size - start)
+            n_fft = self.fft_size if n == step else 1 << (n + n_hist - 1).bit_length()
+            seg = np.fft.rfft(buf[start : start + n + n_hist], n_fft)
+            seg *= self.spectrum(n_fft)
+            y[start : start + n] = np.fft.irfft(seg, n_fft)[n_hist : n_hist + n]
+        self._hist = buf[buf.size - n_hist :].copy()
+        return y
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        """Filter a whole signal from a cleared state, with the delay removed."""
+        x = np.asarray(x)
+        self.reset()
+        y = self.process(np.concatenate((x, np.zeros(self.delay, dtype=x.dtype))))
+        self.reset()
+        return y[self.delay :]
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        """Stage interface for SignalChain."""
+        return self.process(x)
+
 
 # -----------------------------------------------------------------------------
 # Op-amp / Transimpedance Amplifier Simulator
@@ -200,6 +605,11 @@ class OpAmpSimulator:
 
     Vout = -Iin * Rf (ideal). Models bandwidth (single-pole), gain error,
     offset, and input-referred voltage/current noise. Time- and frequency-domain.
+
+    The bandwidth filter keeps its state between run() calls, so a long
+    capture can be fed as consecutive chunks and give the same output as a
+    single call. Use reset() to start a new, independent capture. dtype sets
+    the output precision (the filter state stays float64).
     """
 
     def __init__(
@@ -211,22 +621,54 @@ class OpAmpSimulator:
         offset_voltage: float = 0.0,
         noise_rms_voltage: float = 0.0,
         seed: Optional[int] = None,
+        dtype: DTypeLike = np.float64,
     ):
         self.Rf = transimpedance_ohms
-        self.sample_rate_hz = sample_rate_hz
+        self.dtype = _float_dtype(dtype)
+        self._sample_rate_hz = sample_rate_hz
         self.bandwidth_hz = bandwidth_hz
         self.gain_error = gain_error
         self.offset_voltage = offset_voltage
         self.noise_rms_voltage = noise_rms_voltage
         self._rng = np.random.default_rng(seed)
-
-    def run(self, current_in: np.ndarray) -> np.ndarray:
+        self._scratch = ScratchBuffers()
+
+    @property
+    def bandwidth_hz(self) -> float:
+        """-3 dB bandwidth; assigning it rebuilds the filter (state reset)."""
+        return self._bandwidth_hz
+
+    @bandwidth_hz.setter
+    def bandwidth_hz(self, bandwidth_hz: float) -> None:
+        self._lpf = SinglePoleLPF.from_bandwidth(bandwidth_hz, self._sample_rate_hz)
+        self._bandwidth_hz = bandwidth_hz
+
+    @property
+    def sample_rate_hz(self) -> float:
+        """Sample rate; assigning it rebuilds the filter (state reset)."""
+        return self._sample_rate_hz
+
+    @sample_rate_hz.setter
+    def sample_rate_hz(self, sample_rate_hz: float) -> None:
+        self._lpf = SinglePoleLPF.from_bandwidth(self._bandwidth_hz, sample_rate_hz)
+        self._sample_rate_hz = sample_rate_hz
+
+    def reset(self) -> None:
+        """Clear the bandwidth filter state."""
+        if self._lpf is not None:
+            self._lpf.reset()
+
+    def run(self, current_in: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Convert current to voltage with TIA nonidealities.
 
-        current_in: input current (A). Returns voltage (V).
+        current_in: input current (A). Returns voltage (V), written into out
+        (same shape, dtype self.dtype) when given.
         """
-        ideal_v = -current_in * self.Rf
+        if out is None:
+            out = np.empty(np.shape(current_in), dtype=self.dtype)
+        ideal_v = np.negative(current_in, out=out)
+        ideal_v *= self.dtype.type(self.Rf)
         return opamp_errors(
             ideal_v,
             sample_rate_hz=self.sample_rate_hz,
@@ -235,6 +677,10 @@ class OpAmpSimulator:
             bandwidth_hz=self.bandwidth_hz,
             noise_rms=self.noise_rms_voltage,
             rng=self._rng,
+            lpf=self._lpf,
+            dtype=self.dtype,
+            out=out,
+            scratch=self._scratch,
         )
 
 
@@ -244,14 +690,26 @@ class OpAmpSimulator:
 # README: ADC 16-bit 100 MSPS+; LVDS to PL. Based on 16-bit 100+ MSPS class
 # (e.g. AD9680-style specs scaled to 16-bit: INL ±2 LSB, aperture jitter).
 
-class ADCSimulator:
+class ADCSimulator(_InlTableMixin):
     """
     High-speed ADC simulator: 16-bit, 100+ MSPS.
 
     Models quantization, INL, DNL, gain/offset, aperture jitter. Output is
     integer codes in [0, 2^n_bits - 1].
+
+    The INL table is drawn once per instance (or passed as inl_table) and
+    reused by every conversion, so one instance behaves as one device. The
+    last input sample is remembered as the starting point of the (backward
+    difference) aperture-jitter slope, and jitter and DNL are drawn from
+    separate RNG streams, so converting a capture chunk by chunk gives the
+    same codes as one call on the whole capture; reset() forgets the sample.
+    dtype sets the working precision and code_dtype the integer type of the
+    returned codes (np.uint16 is enough for up to 16 bits).
     """
 
+    _inl_kind = "adc"
+    _inl_profile_fn = staticmethod(adc_inl_profile)
+
     def __init__(
         self,
         sample_rate_hz: float = 100e6,
@@ -263,8 +721,15 @@ class ADCSimulator:
         dnl_lsb: float = 0.5,
         aperture_jitter_sec: float = 0.1e-12,
         seed: Optional[int] = None,
+        inl_table: Optional[np.ndarray] = None,
+        dtype: DTypeLike = np.float64,
+        code_dtype: DTypeLike = np.int32,
     ):
+        if not np.issubdtype(code_dtype, np.integer):
+            raise ValueError(f"code_dtype {np.dtype(code_dtype)} is not an integer type")
         self.sample_rate_hz = sample_rate_hz
+        self.dtype = _float_dtype(dtype)
+        self.code_dtype = np.dtype(code_dtype)
         self.n_bits = n_bits
         self.v_ref = v_ref
         self.gain_error = gain_error
@@ -273,14 +738,28 @@ class ADCSimulator:
         self.dnl_lsb = dnl_lsb
         self.aperture_jitter_sec = aperture_jitter_sec
         self._rng = np.random.default_rng(seed)
+        self._jitter_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+        self._init_inl_table(inl_table)
+        self._prev_sample: Optional[float] = None
+        self._scratch = ScratchBuffers()
+
+    def _check_n_bits(self, n_bits: int) -> None:
+        if np.iinfo(self.code_dtype).max < (1 << n_bits) - 1:
+            raise ValueError(f"code_dtype {self.code_dtype} cannot hold {n_bits}-bit codes")
+
+    def reset(self) -> None:
+        """Forget the previous chunk (next conversion starts a new capture)."""
+        self._prev_sample = None
 
-    def analog_to_digital(self, analog_voltage: np.ndarray) -> np.ndarray:
+    def analog_to_digital(self, analog_voltage: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Convert analog voltage to digital codes with ADC nonidealities.
 
-        analog_voltage: voltage (V). Returns integer codes [0, 2^n_bits - 1].
+        analog_voltage: voltage (V). Returns integer codes [0, 2^n_bits - 1],
+        written into out (same shape, self.code_dtype) when given.
         """
-        return adc_errors(
+        analog_voltage = np.asarray(analog_voltage)
+        codes = adc_errors(
             analog_voltage,
             n_bits=self.n_bits,
             v_ref=self.v_ref,
@@ -291,8 +770,18 @@ class ADCSimulator:
             aperture_jitter_sec=self.aperture_jitter_sec,
             sample_rate_hz=self.sample_rate_hz,
             rng=self._rng,
+            inl_profile=self._inl_table_as(self.dtype),
+            prev_sample=self._prev_sample,
+            dtype=self.dtype,
+            code_dtype=self.code_dtype,
+            out=out,
+            scratch=self._scratch,
+            jitter_rng=self._jitter_rng,
         )
+        if analog_voltage.size:
+            self._prev_sample = float(self.dtype.type(analog_voltage[-1]))
+        return codes
 
-    def run(self, analog_voltage: np.ndarray) -> np.ndarray:
+    def run(self, analog_voltage: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Alias for analog_to_digital."""
-        return self.analog_to_digital(analog_voltage)
+        return self.analog_to_digital(analog_voltage, out=out)
@@ -0,0 +1,98 @@
+"""
+LRU memoization of signal chain stage outputs.
+
+Each stage result is cached under a key built from the stage name, the
+parameters it depends on and the keys of the stages feeding it, so a
+parameter change only invalidates the stages downstream of it. Entries are
+evicted least-recently-used once the total array size exceeds a byte
+budget; per-stage hit/miss counts are kept for diagnostics.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping
+
+
+def array_key(a: np.ndarray) -> tuple:
+    """Content key for an input array (shape, dtype and a 128-bit digest)."""
+    a = np.asarray(a)
+    data = np.ascontiguousarray(a).view(np.uint8).data  # 0-d arrays come back 1-d here
+    return (a.shape, a.dtype.str, hashlib.blake2b(data, digest_size=16).hexdigest())
+
+
+def params_key(params: Mapping[str, Any]) -> tuple:
+    """Hashable key for a flat parameter dict."""
+    return tuple(sorted(params.items()))
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, Mapping):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class StageCache:
+    """
+    Byte-bounded LRU cache of stage outputs with per-stage statistics.
+
+    Cached arrays are shared between callers; treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self.max_bytes = int(max_bytes)
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics."""
+        self._entries: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self.nbytes = 0
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, stage: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached output of stage for key, computing it on a miss."""
+        full_key = (stage, key)
+        entry = self._entries.get(full_key)
+        if entry is not None:
+            self._entries.move_to_end(full_key)
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+            return entry[0]
+        self.misses[stage] = self.misses.get(stage, 0) + 1
+        value = compute()
+        size = _nbytes(value)
+        if size <= self.max_bytes:
+            self._entries[full_key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self.nbytes -= old_size
+                self.evictions += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts per stage plus totals, entries, bytes and evictions."""
+        stages = sorted(set(self.hits) | set(self.misses))
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "stages": {s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)} for s in stages},
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,298 @@
+"""
+Headless Monte-Carlo / grid sweeps of the DLIA signal chain.
+
+Expands a parameter grid and/or random distributions into runs, executes
+run_signal_chain for each run on a process pool, and reduces each result
+to scalar envelope-recovery metrics (RMS error, max error, correlation,
+SNR). Every run gets a seed derived from (sweep seed, run_id) only, so
+results do not depend on the number of workers or completion order. Rows
+are appended to a CSV file as runs finish; re-running the same sweep with
+the same file skips the runs already recorded.
+"""
+
+from __future__ import annotations
+
+import os
+import csv
+import copy
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence
+
+try:
+    from .dlia_chain import DAC_SAMPLE_RATE_HZ, LPF_ENBW_HZ, run_signal_chain
+except ImportError:
+    from dlia_chain import DAC_SAMPLE_RATE_HZ, LPF_ENBW_HZ, run_signal_chain
+
+
+# Error-free chain, matching the GUI slider defaults (SI units)
+DEFAULT_CHAIN_PARAMS: Dict[str, object] = {
+    "carrier_vpp": 1.0,
+    "lpf_enbw_hz": LPF_ENBW_HZ,
+    "dac": {
+        "n_bits": 16, "v_ref": 1.0, "inl_lsb": 0.0, "dnl_lsb": 0.0,
+        "gain_error": 0.0, "offset_error": 0.0, "glitch_energy_frac": 0.0,
+    },
+    "adc": {
+        "n_bits": 16, "v_ref": 1.0, "inl_lsb": 0.0, "dnl_lsb": 0.0,
+        "gain_error": 0.0, "offset_error": 0.0, "aperture_jitter_sec": 0.0,
+    },
+    "opamp": {
+        "bandwidth_hz": 50e6, "noise_rms": 0.0, "offset_voltage": 0.0, "gain_error": 0.0,
+    },
+}
+
+METRICS = ("rms_error", "max_error", "correlation", "snr_db")
+
+
+# -----------------------------------------------------------------------------
+# 1. Run specification
+# -----------------------------------------------------------------------------
+
+class SweepRun(NamedTuple):
+    """One run: id, chain seed and the dotted parameters it overrides."""
+    run_id: int
+    seed: int
+    params: Dict[str, float]
+
+
+def _set_param(params: dict, name: str, value: float) -> None:
+    """Set a dotted parameter ("dac.inl_lsb", "carrier_vpp") in nested params."""
+    *groups, key = name.split(".")
+    target = params
+    for group in groups:
+        if group not in target:
+            raise ValueError(f"unknown parameter group '{group}' in '{name}'")
+        target = target[group]
+    if key not in target:
+        raise ValueError(f"unknown parameter '{name}'")
+    target[key] = value
+
+
+def sweep_runs(
+    grid: Optional[Mapping[str, Sequence[float]]] = None,
+    distributions: Optional[Mapping[str, Callable[[np.random.Generator], float]]] = None,
+    n_draws: int = 1,
+    seed: int = 0,
+) -> List[SweepRun]:
+    """
+    Expand a sweep into runs.
+
+    Every grid point (Cartesian product of grid values) is repeated n_draws
+    times; each repetition draws the distribution parameters and gets its
+    own chain seed. Run i uses SeedSequence(seed, spawn_key=(i,)), so any
+    run can be reproduced on its own.
+
+    Args:
+        grid: Dotted parameter name -> values, e.g. {"dac.inl_lsb": [0, 1, 2]}.
+        distributions: Dotted name -> f(rng) returning one sample,
+            e.g. {"adc.gain_error": lambda rng: rng.normal(0, 1e-3)}.
+        n_draws: Monte-Carlo repetitions per grid point.
+        seed: Sweep seed.
+    """
+    grid = dict(grid or {})
+    distributions = dict(distributions or {})
+    if n_draws < 1:
+        raise ValueError("n_draws must be >= 1")
+    names = list(grid)
+    probe = copy.deepcopy(DEFAULT_CHAIN_PARAMS)
+    for name in names + list(distributions):
+        _set_param(probe, name, 0.0)
+
+    runs: List[SweepRun] = []
+    points = itertools.product(*(grid[k] for k in names))
+    for run_id, point in enumerate(p for p in points for _ in range(n_draws)):
+        ss = np.random.SeedSequence(seed, spawn_key=(run_id,))
+        rng = np.random.default_rng(ss)
+        params = {k: float(v) for k, v in zip(names, point)}
+        for name, draw in distributions.items():
+            params[name] = float(draw(rng))
+        chain_seed = int(ss.generate_state(1)[0] & 0x7FFFFFFF)
+        runs.append(SweepRun(run_id, chain_seed, params))
+    return runs
+
+
+# -----------------------------------------------------------------------------
+# 2. Metrics
+# -----------------------------------------------------------------------------
+
+def envelope_recovery_metrics(result: dict, skip_frac: float = 0.1) -> Dict[str, float]:
+    """
+    Scalar metrics of the recovered envelope vs the applied envelope.
+
+    Uses the GUI's recovery: (R - baseline) / baseline with the theoretical
+    baseline carrier_amp_volts / 2 (or the median of R if they disagree by
+    more than 2x), skipping the first skip_frac of samples (LPF transient).
+    """
+    R = result["adc_demod"]
+    env = result["envelope_voltage_adc"]
+    skip = max(1, int(len(R) * skip_frac))
+    theoretical = result["carrier_amp_volts"] / 2.0
+    median = float(np.median(R[skip:]))
+    if theoretical > 1e-10 and 0.5 < median / theoretical < 2.0:
+        baseline = theoretical
+    else:
+        baseline = median if median > 1e-10 else 1.0
+    recovered = (R[skip:] - baseline) / baseline
+    env = env[skip:]
+    err = recovered - env
+    err_power = float(np.sum(err ** 2))
+    sig_power = float(np.sum(env ** 2))
+    if np.std(recovered) > 0 and np.std(env) > 0:
+        corr = float(np.corrcoef(recovered, env)[0, 1])
+    else:
+        corr = float("nan")
+    return {
+        "rms_error": float(np.sqrt(np.mean(err ** 2))),
+        "max_error": float(np.max(np.abs(err))),
+        "correlation": corr,
+        "snr_db": float(10.0 * np.log10(sig_power / err_power)) if err_power > 0 else float("inf"),
+    }
+
+
+# -----------------------------------------------------------------------------
+# 3. Execution
+# -----------------------------------------------------------------------------
+
+_WORKER_INPUT: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(envelope: np.ndarray, t_envelope: np.ndarray) -> None:
+    """Pool initializer: ship the envelope once per worker, not once per run."""
+    duration = t_envelope[-1] - t_envelope[0]
+    n = int(duration * DAC_SAMPLE_RATE_HZ)
+    _WORKER_INPUT["t"] = np.arange(n, dtype=float) / DAC_SAMPLE_RATE_HZ
+    _WORKER_INPUT["envelope"] = envelope
+    _WORKER_INPUT["t_envelope"] = t_envelope - t_envelope[0]
+
+
+def _run_one(run: SweepRun, base_params: dict, skip_frac: float) -> dict:
+    params = copy.deepcopy(base_params)
+    for name, value in run.params.items():
+        _set_param(params, name, value)
+    try:
+        result = run_signal_chain(
+            _WORKER_INPUT["t"], _WORKER_INPUT["envelope"], _WORKER_INPUT["t_envelope"],
+            params["carrier_vpp"], params["dac"], params["adc"], params["opamp"],
+            lpf_enbw_hz=params["lpf_enbw_hz"],
+            seed=run.seed,
+        )
+        metrics = envelope_recovery_metrics(result, skip_frac)
+        error = ""
+    except Exception as e:  # recorded, and retried when the sweep is resumed
+        metrics = {m: float("nan") for m in METRICS}
+        error = f"{type(e).__name__}: {e}"
+    return {"run_id": run.run_id, "seed": run.seed, **run.params, **metrics, "error": error}
+
+
+def _completed_run_ids(path: str) -> set:
+    """Runs recorded without an error (failed runs are retried)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    with open(path, newline="") as f:
+        return {int(row["run_id"]) for row in csv.DictReader(f) if row.get("run_id") and not row.get("error")}
+
+
+def iter_sweep(
+    runs: Sequence[SweepRun],
+    envelope: np.ndarray,
+    t_envelope: np.ndarray,
+    out_path: Optional[str] = None,
+    processes: Optional[int] = None,
+    base_params: Optional[dict] = None,
+    skip_frac: float = 0.1,
+) -> Iterator[dict]:
+    """
+    Execute runs and yield one row dict per run as it finishes.
+
+    With out_path, each row is appended to a CSV file (and flushed) as soon
+    as it arrives; runs already recorded successfully are skipped. processes=1
+    runs in this process; None uses one worker per CPU. A run whose chain
+    raises is recorded with NaN metrics and the exception in the "error"
+    column; a resumed sweep runs it again.
+    """
+    base_params = copy.deepcopy(base_params or DEFAULT_CHAIN_PARAMS)
+    envelope = np.asarray(envelope, dtype=float)
+    t_envelope = np.asarray(t_envelope, dtype=float)
+    done = _completed_run_ids(out_path) if out_path else set()
+    pending = [r for r in runs if r.run_id not in done]
+    columns = ["run_id", "seed", *sorted({k for r in runs for k in r.params}), *METRICS, "error"]
+
+    f = writer = None
+    if out_path:
+        new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        f = open(out_path, "a", newline="")
+        writer = csv.DictWriter(f, fieldnames=columns, restval="")
+        if new_file:
+            writer.writeheader()
+            f.flush()
+
+    def emit(row: dict) -> dict:
+        if writer is not None:
+            writer.writerow(row)
+            f.flush()
+        return row
+
+    try:
+        if processes == 1:
+            _init_worker(envelope, t_envelope)
+            for run in pending:
+                yield emit(_run_one(run, base_params, skip_frac))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker,
+                initargs=(envelope, t_envelope),
+            ) as pool:
+                futures = [pool.submit(_run_one, run, base_params, skip_frac) for run in pending]
+                for fut in as_completed(futures):
+                    yield emit(fut.result())
+    finally:
+        if f is not None:
+            f.close()
+
+
+def run_sweep(
+    runs: Sequence[SweepRun],
+    envelope: np.ndarray,
+    t_envelope: np.ndarray,
+    out_path: str,
+    processes: Optional[int] = None,
+    base_params: Optional[dict] = None,
+    skip_frac: float = 0.1,
+) -> np.ndarray:
+    """
+    Run a sweep to completion (streaming rows to out_path) and return the
+    table as a structured array sorted by run_id (see load_sweep_results).
+    """
+    for _ in iter_sweep(runs, envelope, t_envelope, out_path, processes, base_params, skip_frac):
+        pass
+    return load_sweep_results(out_path)
+
+
+def load_sweep_results(path: str) -> np.ndarray:
+    """
+    Read a sweep CSV into a structured array sorted by run_id.
+
+    Every column is float except "error" (the exception text, empty on
+    success). A run recorded more than once (failed, then retried on
+    resume) keeps its last row.
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = list(reader.fieldnames or [])
+        rows = {int(row["run_id"]): row for row in reader if row.get("run_id")}
+    rows = [rows[k] for k in sorted(rows)]
+    errors = [row.get("error") or "" for row in rows]
+    dtype = [
+        (name, f"U{max([1, *map(len, errors)])}") if name == "error" else (name, float)
+        for name in columns
+    ]
+    table = np.empty(len(rows), dtype=dtype)
+    for name in columns:
+        if name == "error":
+            table[name] = errors
+        else:
+            table[name] = [float(row[name]) if row[name] != "" else np.nan for row in rows]
+    return table
@@ -0,0 +1,83 @@
+"""
+Tests for the broadband (overlap-save) admittance of ImpedanceSimulator.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+from .signal_chain import ImpedanceStage, SignalChain, iter_blocks
+from .simulators import AdmittanceFilter, ImpedanceSimulator
+
+FS_HZ = 250e6
+TONES_HZ = np.array([1e5, 1e6, 3e6, 1e7, 5e7])
+AMPS = np.array([0.1, 0.2, 0.1, 0.05, 0.05])
+
+MODELS = [
+    dict(model="parallel_rc", resistance=2e3, capacitance=2e-12),
+    dict(model="series_rc", resistance=2e3, capacitance=2e-12),
+    dict(model="series_rlc", resistance=50.0, capacitance=1e-9, inductance=1e-6),
+]
+
+
+def _multitone(n: int):
+    t = np.arange(n) / FS_HZ
+    v = sum(a * np.sin(2 * np.pi * f * t) for a, f in zip(AMPS, TONES_HZ))
+    return t, v
+
+
+@pytest.mark.parametrize("kwargs", MODELS, ids=[m["model"] for m in MODELS])
+def test_every_tone_sees_its_own_impedance(kwargs):
+    z = ImpedanceSimulator(**kwargs)
+    t, v = _multitone(50_000)
+    y = 1.0 / z.z_complex(TONES_HZ)
+    ref = sum(a * np.abs(yk) * np.sin(2 * np.pi * f * t + np.angle(yk)) for a, f, yk in zip(AMPS, TONES_HZ, y))
+    i = z.current_from_voltage(v, t, 1e6, method="broadband")
+    # Edges see the zero signal outside t
+    assert np.max(np.abs(i - ref)[1000:-1000]) < 1e-5 * np.max(np.abs(ref))
+
+    single = z.current_from_voltage(v, t, 1e6)
+    assert np.max(np.abs(single - ref)[1000:-1000]) > 1e-2 * np.max(np.abs(ref))
+
+
+def test_streaming_blocks_match_one_call():
+    z = ImpedanceSimulator(model="series_rc", resistance=2e3, capacitance=2e-12)
+    _, v = _multitone(30_011)
+    whole = AdmittanceFilter(z, FS_HZ, half_taps=64).process(v)
+    streamed = AdmittanceFilter(z, FS_HZ, half_taps=64)
+    blocks = [streamed.process(b) for b in np.array_split(v, 23)] + [streamed.process(v[:0])]
+    assert_allclose(np.concatenate(blocks), whole, rtol=0, atol=1e-12 * np.max(np.abs(whole)))
+    assert set(streamed._spectra) >= {streamed.fft_size}
+
+
+def test_float32_and_errors():
+    z = ImpedanceSimulator()
+    t, v = _multitone(10_000)
+    i32 = z.current_from_voltage(v.astype(np.float32), t, 1e6, method="broadband")
+    i64 = z.current_from_voltage(v, t, 1e6, method="broadband")
+    assert i32.dtype == np.float32
+    assert np.max(np.abs(i32 - i64)) < 1e-5 * np.max(np.abs(i64))
+    with pytest.raises(ValueError):
+        z.current_from_voltage(v, t ** 1.5, 1e6, method="broadband")
+    with pytest.raises(ValueError):
+        z.current_from_voltage(v, t, 1e6, method="fft")
+    with pytest.raises(ValueError):
+        AdmittanceFilter(z, FS_HZ, half_taps=64, fft_size=1000)
+
+
+def test_broadband_chain_stage_is_delayed_and_block_invariant():
+    z = ImpedanceSimulator(resistance=2e3, capacitance=2e-12)
+    t, v = _multitone(20_000)
+    stage = ImpedanceStage(z, 1e6, FS_HZ, method="broadband", half_taps=128)
+    out = np.concatenate([stage.run(b) for b in iter_blocks(v, 1500)])
+    ref = z.current_from_voltage(v, t, 1e6, method="broadband")
+    assert stage.delay == 128
+    assert np.max(np.abs(out[stage.delay :] - ref[: -stage.delay])[1000:]) < 1e-5 * np.max(np.abs(ref))
+
+    chain = SignalChain.from_simulators(impedance=z, sample_rate_hz=FS_HZ, impedance_method="broadband")
+    whole = chain.process(v)["sensor_current"]
+    chain.reset()
+    streamed = np.concatenate([o["sensor_current"] for o in chain.run(iter_blocks(v, 4096))])
+    assert_allclose(streamed, whole, rtol=0, atol=1e-12 * np.max(np.abs(whole)))
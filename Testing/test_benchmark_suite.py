@@ -0,0 +1,51 @@
+"""
+Tests for the benchmark suite runner and baseline comparison.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from .benchmarks.suite import (
+    CASES,
+    run_suite,
+    save_baseline,
+    load_baseline,
+    compare_results,
+    main,
+    result_key,
+)
+
+
+def test_every_case_runs_at_small_size():
+    results = run_suite(sizes=[1000], dtypes=["float64", "float32", "uint16"], measure_memory=False)
+    assert {r["case"] for r in results.values()} == set(CASES)
+    assert all(r["samples_per_sec"] > 0 for r in results.values())
+
+
+def test_baseline_roundtrip_and_regression(tmp_path):
+    results = run_suite(["sine_wave"], sizes=[1000], dtypes=["float64"])
+    key = result_key("sine_wave", 1000, "float64")
+    assert results[key]["peak_bytes"] > 0
+    path = str(tmp_path / "baseline.json")
+    save_baseline(path, results)
+    baseline = load_baseline(path)
+    assert compare_results(results, baseline, margin=0.0) == []
+    slower = {key: dict(results[key], seconds=results[key]["seconds"] * 2)}
+    assert [k for k, _, _ in compare_results(slower, baseline, margin=0.5)] == [key]
+    assert compare_results(slower, baseline, margin=1.5) == []
+
+
+def test_unknown_case_rejected():
+    with pytest.raises(ValueError):
+        run_suite(["no_such_case"], sizes=[10])
+
+
+def test_main_exit_code(tmp_path, capsys):
+    path = str(tmp_path / "b.json")
+    assert main(["--cases", "cosine_wave", "--sizes", "1e3", "--save", path]) == 0
+    doc = load_baseline(path)
+    for row in doc.values():
+        row["seconds"] = 1e-12
+    save_baseline(path, doc)
+    assert main(["--cases", "cosine_wave", "--sizes", "1e3", "--compare", path]) == 1
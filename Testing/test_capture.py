@@ -0,0 +1,82 @@
+"""
+Tests for binary, memory-mapped capture storage.
+"""
+
+from __future__ import annotations
+
+import os
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from .capture import Capture, open_capture, ingest_text_capture, write_capture
+
+
+@pytest.fixture
+def text_capture(tmp_path):
+    x = np.sin(np.arange(2500) / 50.0) * 1e-3
+    path = tmp_path / "capture.txt"
+    np.savetxt(path, x, fmt="%.9e")
+    return path, np.loadtxt(path)
+
+
+def test_ingest_matches_loadtxt_across_chunks(text_capture):
+    path, expected = text_capture
+    cap = ingest_text_capture(path, 14e3, chunk_rows=700)
+    assert isinstance(cap.data, np.memmap)
+    assert_array_equal(cap.data, expected)
+    assert len(cap) == 2500
+    assert cap.sample_rate_hz == 14e3
+    assert cap.units == "V"
+    assert cap.source == "capture.txt"
+
+
+def test_segment_time_base(text_capture):
+    path, expected = text_capture
+    cap = ingest_text_capture(path, 14e3)
+    x, t = cap.segment(100, 200)
+    assert_array_equal(x, expected[100:200])
+    assert t[0] == pytest.approx(100 / 14e3)
+    assert t.size == 100
+
+
+def test_open_capture_reuses_cache(text_capture):
+    path, expected = text_capture
+    cap = open_capture(path, sample_rate_hz=14e3)
+    cache = cap.path
+    assert cache.endswith(".bin")
+    mtime = os.path.getmtime(cache)
+    cap2 = open_capture(path)  # no sample rate needed once cached
+    assert cap2.path == cache and os.path.getmtime(cache) == mtime
+    assert_array_equal(open_capture(cache).data, expected)
+
+
+def test_open_text_without_rate_raises(text_capture):
+    path, _ = text_capture
+    with pytest.raises(ValueError):
+        open_capture(path)
+
+
+def test_write_capture_float32(tmp_path):
+    x = np.arange(10, dtype=np.float32)
+    cap = write_capture(tmp_path / "x.bin", x, 1e6, units="A")
+    assert cap.dtype == np.float32 and cap.units == "A"
+    assert_array_equal(Capture(tmp_path / "x.bin").data, x)
+
+
+def test_open_capture_reingests_on_parameter_mismatch(text_capture):
+    path, expected = text_capture
+    assert open_capture(path, sample_rate_hz=14e3).sample_rate_hz == 14e3
+    cap = open_capture(path, sample_rate_hz=1e6, dtype="float32", units="A")
+    assert cap.sample_rate_hz == 1e6 and cap.dtype == np.float32 and cap.units == "A"
+    assert_array_equal(cap.data, expected.astype(np.float32))
+    # Unspecified parameters accept the cache as it is
+    assert open_capture(path).sample_rate_hz == 1e6
+
+
+def test_failed_ingest_leaves_no_files(tmp_path):
+    path = tmp_path / "bad.txt"
+    path.write_text("1.0\n2.0\nnot-a-number\n")
+    with pytest.raises(ValueError):
+        ingest_text_capture(path, 1e3)
+    assert sorted(os.listdir(tmp_path)) == ["bad.txt"]
@@ -0,0 +1,94 @@
+"""
+Tests for the sparse time-varying impedance of cell transits.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+from .cell_transits import CellEvents, TransitImpedance, cell_events_from_size, transit_profile
+from .simulators import ImpedanceSimulator
+
+FS_HZ = 10e6
+N = 100_000
+TONES_HZ = np.array([5e5, 2e6])
+AMPS = np.array([0.2, 0.1])
+PHASES = np.array([0.3, 1.0])
+
+
+def _events(seed: int = 0) -> CellEvents:
+    rng = np.random.default_rng(seed)
+    # Non-overlapping transits, one straddling t = 0 and one running past the end
+    arrival = np.concatenate(([2e-6], np.arange(1, 19) * 5.5e-4 + rng.uniform(0, 1e-4, 18), [N / FS_HZ]))
+    return cell_events_from_size(
+        arrival,
+        rng.uniform(10e-6, 40e-6, arrival.size),
+        rng.uniform(5e-6, 9e-6, arrival.size),
+        channel_resistance_ohm=2e3,
+        sensing_volume_m3=(40e-6) ** 3,
+    )
+
+
+def _dense_reference(channel: ImpedanceSimulator, events: CellEvents, dc_offset: float) -> np.ndarray:
+    t = np.arange(N) / FS_HZ
+
+    def y_of_t(f_hz):
+        dz = events.delta_z(f_hz) if f_hz else events.delta_r_ohm
+        z0 = channel.z_complex(np.array([f_hz or 1e-9]))[0]
+        p = transit_profile((t[:, None] - events.arrival_s) / events.transit_s)
+        return 1.0 / (z0 + p @ dz)
+
+    i = dc_offset * y_of_t(0.0).real
+    for f, a, ph in zip(TONES_HZ, AMPS, PHASES):
+        i += np.imag(y_of_t(f) * a * np.exp(1j * (2 * np.pi * f * t + ph)))
+    return i
+
+
+@pytest.mark.parametrize("model", ["parallel_rc", "series_rc"])
+def test_matches_dense_time_varying_impedance(model):
+    channel = ImpedanceSimulator(resistance=2e3, capacitance=2e-12 if model == "parallel_rc" else 1e-9, model=model)
+    events = _events()
+    ref = _dense_reference(channel, events, dc_offset=0.5)
+    i = TransitImpedance(channel, events, FS_HZ).current(0, N, TONES_HZ, AMPS, PHASES, dc_offset=0.5)
+    assert_allclose(i, ref, rtol=0, atol=1e-10 * np.max(np.abs(ref)))
+    # The transits are visible: a few tenths of a percent of the carrier current
+    empty = TransitImpedance(channel, CellEvents(*(f[:0] for f in events)), FS_HZ)
+    assert np.max(np.abs(i - empty.current(0, N, TONES_HZ, AMPS, PHASES, dc_offset=0.5))) > 1e-3 * np.max(np.abs(ref))
+
+
+def test_blocks_and_event_order_do_not_matter():
+    channel = ImpedanceSimulator(resistance=2e3, capacitance=2e-12)
+    events = _events(1)
+    whole = TransitImpedance(channel, events, FS_HZ).current(0, N, TONES_HZ, AMPS, PHASES, dc_offset=0.5)
+    shuffled = CellEvents(*(f[np.random.default_rng(2).permutation(events.count)] for f in events))
+    transits = TransitImpedance(channel, shuffled, FS_HZ, dtype=np.float32)
+    blocks = list(transits.current_blocks(N, 3001, TONES_HZ, AMPS, PHASES, dc_offset=0.5))
+    assert all(b.dtype == np.float32 for b in blocks)
+    assert_allclose(np.concatenate(blocks), whole, rtol=0, atol=1e-6 * np.max(np.abs(whole)))
+
+
+def test_admittance_is_sparse_and_peaks_at_the_cell_circuit():
+    channel = ImpedanceSimulator(resistance=2e3, capacitance=2e-12)
+    events = CellEvents(np.array([5e-4]), np.array([2e-5]), np.array([10.0]), np.array([8e-9]))
+    transits = TransitImpedance(channel, events, FS_HZ)
+    y = transits.admittance(1e6, 0, N)
+    y0 = 1.0 / channel.z_complex(np.array([1e6]))[0]
+    changed = np.flatnonzero(y != y0)
+    assert changed.min() > 4900 and changed.max() < 5100
+    assert y[5000] == pytest.approx(1.0 / (1.0 / y0 + events.delta_z(1e6)[0]), rel=1e-12)
+    assert transits.admittance(1e6, 6000, 1000) == pytest.approx(np.full(1000, y0))
+
+
+def test_cell_events_from_size():
+    ev = cell_events_from_size([1e-3, 2e-3], 2e-5, [6e-6, 12e-6], channel_resistance_ohm=1e4, sensing_volume_m3=1e-13)
+    phi = np.pi / 6 * np.array([6e-6, 12e-6]) ** 3 / 1e-13
+    assert_allclose(ev.delta_r_ohm, 1.5 * phi * 1e4)
+    assert_allclose(ev.transit_s, 2e-5)
+    # beta dispersion: lower for the larger cell, and the cell fades out above it
+    corner_hz = 1.0 / (2 * np.pi * ev.delta_r_ohm * ev.c_cell_f)
+    assert 1e5 < corner_hz[1] < corner_hz[0] < 1e7
+    assert np.all(np.abs(ev.delta_z(100 * corner_hz.max())) < 0.02 * ev.delta_r_ohm)
+    with pytest.raises(ValueError):
+        cell_events_from_size([0.0], 2e-5, -1e-6, channel_resistance_ohm=1e4, sensing_volume_m3=1e-13)
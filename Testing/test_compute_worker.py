@@ -0,0 +1,87 @@
+"""
+Tests for the debounced background ComputeWorker.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from .compute_worker import Cancelled, ComputeWorker
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+def test_debounce_collapses_burst(calls):
+    def fn(req, cancelled):
+        calls.append(req)
+        return req * 2
+
+    worker = ComputeWorker(fn, debounce_s=0.1)
+    for i in range(5):
+        worker.submit(i)
+    assert worker.wait(5)
+    done = worker.poll()
+    assert calls == [4]
+    assert done.request == 4 and done.result == 8 and done.error is None
+    assert worker.poll() is None
+    worker.close()
+
+
+def test_newer_request_supersedes_running_one(calls):
+    started = threading.Event()
+
+    def fn(req, cancelled):
+        calls.append(req)
+        if req == "slow":
+            started.set()
+            while not cancelled():
+                time.sleep(0.005)
+            raise Cancelled()
+        return req
+
+    worker = ComputeWorker(fn, debounce_s=0.0)
+    worker.submit("slow")
+    assert started.wait(5)
+    worker.submit("fast")
+    assert worker.wait(5)
+    assert worker.poll().result == "fast"
+    assert worker.superseded == 1 and worker.completed == 1
+    assert calls == ["slow", "fast"]
+    worker.close()
+
+
+def test_errors_are_delivered():
+    def fn(req, cancelled):
+        raise RuntimeError("boom")
+
+    worker = ComputeWorker(fn, debounce_s=0.0)
+    worker.submit(1)
+    assert worker.wait(5)
+    done = worker.poll()
+    assert isinstance(done.error, RuntimeError) and done.result is None
+    worker.close()
+    with pytest.raises(RuntimeError):
+        worker.submit(2)
+
+
+def test_cancel_wakes_waiter():
+    def fn(req, cancelled):
+        return req
+
+    worker = ComputeWorker(fn, debounce_s=10.0)
+    worker.submit(1)
+    idle = threading.Event()
+    waiter = threading.Thread(target=lambda: worker.wait() and idle.set(), daemon=True)
+    waiter.start()
+    time.sleep(0.05)
+    assert not idle.is_set()
+    worker.cancel()
+    assert idle.wait(2)
+    assert not worker.busy and worker.poll() is None
+    worker.close()
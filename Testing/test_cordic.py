@@ -0,0 +1,193 @@
+"""
+Tests for the fixed-point CORDIC model.
+"""
+
+from __future__ import annotations
+
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from .cordic import (
+    ROUND_MODES,
+    CordicConfig,
+    cordic_translate,
+    cordic_rotate,
+    cordic_magnitude_phase,
+    export_golden_vectors,
+)
+
+
+def _ref_round(v: int, shift: int, mode: str) -> int:
+    """Scalar Python-int rounding (>> on ints is an arithmetic shift)."""
+    if shift <= 0:
+        return v << -shift
+    half = 1 << (shift - 1)
+    q, rem = v >> shift, v & ((1 << shift) - 1)
+    if mode == "truncate":
+        return q
+    if mode == "round_pos_inf":
+        return q + (rem >= half)
+    if mode == "round_pos_neg_inf":
+        return q + (rem > half or (rem == half and v >= 0))
+    return q + (rem > half or (rem == half and q % 2 == 1))
+
+
+def _ref_atan(n: int, frac: int) -> list:
+    return [int(np.round(np.arctan(2.0 ** -i) * (1 << frac))) for i in range(n)]
+
+
+def _ref_rotate(phase: int, cfg: CordicConfig) -> tuple:
+    """One sample of rotate mode in plain integers, written out step by step."""
+    width = cfg.phase_width or cfg.input_width
+    g, n = cfg.guard_bits, cfg.n_iterations
+    zfrac = width - 3 + g
+    frac = cfg.output_width - 2 + g
+    z = phase * (1 << g)
+    x, y = int(round((1 << frac) / cfg.gain)), 0
+    flip = False
+    if cfg.coarse_rotation:
+        half_pi, pi = int(round(np.pi / 2 * (1 << zfrac))), int(round(np.pi * (1 << zfrac)))
+        if z > half_pi:
+            z, flip = z - pi, True
+        elif z < -half_pi:
+            z, flip = z + pi, True
+    for i, a in enumerate(_ref_atan(n, zfrac)):
+        if z >= 0:
+            x, y, z = x - (y >> i), y + (x >> i), z - a
+        else:
+            x, y, z = x + (y >> i), y - (x >> i), z + a
+    if flip:
+        x, y = -x, -y
+    shift = frac - (cfg.output_width - 2)
+    return _ref_round(x, shift, cfg.round_mode), _ref_round(y, shift, cfg.round_mode)
+
+
+def _ref_translate(x: int, y: int, cfg: CordicConfig) -> tuple:
+    """One sample of translate mode in plain integers."""
+    width = cfg.phase_width or cfg.output_width
+    g, n = cfg.guard_bits, cfg.n_iterations
+    frac_in = cfg.input_width - 2
+    frac = max(frac_in, cfg.output_width - 2) + g
+    zfrac = width - 3 + g
+    x, y, z = x << (frac - frac_in), y << (frac - frac_in), 0
+    if cfg.coarse_rotation and x < 0:
+        half_pi = int(round(np.pi / 2 * (1 << zfrac)))
+        x, y, z = (y, -x, half_pi) if y >= 0 else (-y, x, -half_pi)
+    for i, a in enumerate(_ref_atan(n, zfrac)):
+        if y >= 0:
+            x, y, z = x + (y >> i), y - (x >> i), z + a
+        else:
+            x, y, z = x - (y >> i), y + (x >> i), z - a
+    if cfg.scale_compensation:
+        x = _ref_round(x * int(round((1 << 18) / cfg.gain)), 18, cfg.round_mode)
+    return _ref_round(x, frac - (cfg.output_width - 2), cfg.round_mode), _ref_round(z, g, cfg.round_mode)
+
+
+@pytest.fixture
+def circle():
+    theta = np.linspace(-np.pi, np.pi, 2000, endpoint=False)
+    return theta, 0.7 * np.cos(theta), 0.7 * np.sin(theta)
+
+
+class TestTranslate:
+    def test_matches_hypot_and_arctan2(self, circle):
+        _, X, Y = circle
+        R, phi = cordic_magnitude_phase(X, Y)
+        assert_allclose(R, np.hypot(X, Y), atol=2e-3)
+        err = np.angle(np.exp(1j * (phi - np.arctan2(Y, X))))
+        assert np.max(np.abs(err)) < 2e-3
+
+    def test_gain_in_raw_magnitude(self):
+        cfg = CordicConfig()
+        one = 1 << (cfg.input_width - 2)
+        mag, phase = cordic_translate(np.array([one // 2]), np.array([0]), cfg)
+        assert mag[0] == pytest.approx(cfg.gain * one / 2, abs=4)
+        assert abs(phase[0]) <= 2
+
+    def test_scale_compensation(self, circle):
+        _, X, Y = circle
+        R, _ = cordic_magnitude_phase(X, Y, CordicConfig(scale_compensation=True))
+        assert_allclose(R, 0.7, atol=2e-3)
+
+    def test_coarse_rotation_needed_for_left_half_plane(self):
+        X, Y = np.array([-0.5]), np.array([0.1])
+        _, phi_on = cordic_magnitude_phase(X, Y)
+        _, phi_off = cordic_magnitude_phase(X, Y, CordicConfig(coarse_rotation=False))
+        assert phi_on[0] == pytest.approx(np.arctan2(0.1, -0.5), abs=2e-3)
+        assert abs(phi_off[0] - np.arctan2(0.1, -0.5)) > 0.5
+
+    def test_more_iterations_more_accurate(self, circle):
+        _, X, Y = circle
+        wide = dict(input_width=24, output_width=24)
+        errs = []
+        for n in (8, 20):
+            _, phi = cordic_magnitude_phase(X, Y, CordicConfig(n_iterations=n, **wide))
+            errs.append(np.max(np.abs(np.angle(np.exp(1j * (phi - np.arctan2(Y, X)))))))
+        assert errs[1] < errs[0] / 100
+
+    def test_rejects_out_of_range_codes(self):
+        with pytest.raises(ValueError):
+            cordic_translate(np.array([1 << 15]), np.array([0]))
+        with pytest.raises(ValueError):
+            cordic_translate(np.array([0.5]), np.array([0.0]))
+
+
+class TestRotate:
+    @pytest.mark.parametrize("round_mode", ["truncate", "round_pos_inf", "nearest_even"])
+    def test_matches_sin_cos(self, round_mode):
+        cfg = CordicConfig(round_mode=round_mode)
+        phase = np.arange(-25735, 25736, 37)  # +/-pi in 2Q13
+        cos, sin = cordic_rotate(phase, cfg)
+        theta = phase / 2.0 ** 13
+        scale = 2.0 ** 14
+        assert np.max(np.abs(cos / scale - np.cos(theta))) < 1e-3
+        assert np.max(np.abs(sin / scale - np.sin(theta))) < 1e-3
+
+
+def test_export_golden_vectors(tmp_path):
+    stim, resp = export_golden_vectors(tmp_path, mode="rotate", inputs=(np.array([0, 6434, -1]),))
+    assert open(stim).read().split() == ["0000", "1922", "FFFF"]
+    words = [int(w, 16) for w in open(resp).read().split()]
+    cos, sin = cordic_rotate(np.array([0, 6434, -1]))
+    assert [w & 0xFFFF for w in words] == [int(c) & 0xFFFF for c in cos]
+    assert [w >> 16 for w in words] == [int(s) & 0xFFFF for s in sin]
+
+    stim, resp = export_golden_vectors(tmp_path, mode="translate")
+    lines = open(stim).read().split()
+    assert len(lines) == 4096 and all(len(w) == 8 for w in lines)
+    assert len(open(resp).read().split()) == 4096
+
+
+class TestIntegerReference:
+    """The vectorized model equals a scalar integer reference, bit for bit."""
+
+    def test_rotate_every_phase_code_cordic_0(self):
+        cfg = CordicConfig()  # cordic_0: 16 bit, truncate, coarse rotation
+        phase = np.arange(-25735, 25736)  # every code in +/-pi (2Q13)
+        cos, sin = cordic_rotate(phase, cfg)
+        ref = np.array([_ref_rotate(int(p), cfg) for p in phase])
+        assert_array_equal(cos, ref[:, 0])
+        assert_array_equal(sin, ref[:, 1])
+
+    @pytest.mark.parametrize("round_mode", ROUND_MODES)
+    @pytest.mark.parametrize("coarse", [True, False])
+    def test_rotate_configs(self, round_mode, coarse):
+        cfg = CordicConfig(input_width=12, output_width=18, round_mode=round_mode, coarse_rotation=coarse)
+        phase = np.arange(-1608, 1609, 5)
+        cos, sin = cordic_rotate(phase, cfg)
+        ref = np.array([_ref_rotate(int(p), cfg) for p in phase])
+        assert_array_equal(np.stack((cos, sin), axis=-1), ref)
+
+    @pytest.mark.parametrize("round_mode", ROUND_MODES)
+    @pytest.mark.parametrize("compensate", [False, True])
+    def test_translate(self, round_mode, compensate):
+        cfg = CordicConfig(round_mode=round_mode, scale_compensation=compensate)
+        rng = np.random.default_rng(0)
+        edges = np.array([-32768, -32767, -1, 0, 1, 32767])
+        x = np.concatenate((rng.integers(-32768, 32768, 1500), np.repeat(edges, edges.size)))
+        y = np.concatenate((rng.integers(-32768, 32768, 1500), np.tile(edges, edges.size)))
+        mag, phase = cordic_translate(x, y, cfg)
+        ref = np.array([_ref_translate(int(a), int(b), cfg) for a, b in zip(x, y)])
+        assert_array_equal(mag, ref[:, 0])
+        assert_array_equal(phase, ref[:, 1])
@@ -0,0 +1,107 @@
+"""
+Tests for the CIC + compensating FIR decimator.
+"""
+
+from __future__ import annotations
+
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+from .decimator import CICDecimator, FIRDecimator, Decimator, cic_compensation_taps
+
+
+def hogenauer_reference(x, rate, order, diff_delay):
+    """Textbook CIC: N integrators at the input rate, decimate, N combs."""
+    acc = [0] * order
+    decimated = []
+    for i, v in enumerate(int(s) for s in x):
+        for k in range(order):
+            acc[k] += v if k == 0 else acc[k - 1]
+        if i % rate == 0:
+            decimated.append(acc[-1])
+    y = decimated
+    for _ in range(order):
+        y = [y[m] - (y[m - diff_delay] if m >= diff_delay else 0) for m in range(len(y))]
+    return np.array(y, dtype=np.int64)
+
+
+@pytest.fixture
+def codes():
+    rng = np.random.default_rng(3)
+    return rng.integers(-(1 << 15), 1 << 15, size=3000)
+
+
+class TestCICDecimator:
+    """Bit-true fixed-point and float CIC behavior."""
+
+    @pytest.mark.parametrize("rate,order,diff_delay", [(8, 4, 1), (5, 3, 2), (1, 2, 1)])
+    def test_fixed_point_matches_hogenauer(self, codes, rate, order, diff_delay):
+        cic = CICDecimator(rate, order, diff_delay, fixed_point=True, input_bits=16)
+        assert_array_equal(cic.process(codes), hogenauer_reference(codes, rate, order, diff_delay))
+
+    def test_output_truncation(self, codes):
+        full = CICDecimator(8, 4, fixed_point=True).process(codes)
+        cic = CICDecimator(8, 4, fixed_point=True, output_bits=18)
+        assert cic.full_output_bits == 16 + 12
+        assert_array_equal(cic.process(codes), full >> 10)
+
+    def test_blocks_match_single_call(self, codes):
+        whole = CICDecimator(10, 4, fixed_point=True).process(codes)
+        cic = CICDecimator(10, 4, fixed_point=True)
+        blocks = [cic.process(b) for b in np.array_split(codes, [1, 7, 1234, 1235])]
+        assert_array_equal(np.concatenate(blocks), whole)
+
+    def test_float_unity_dc_gain(self):
+        cic = CICDecimator(16, 5, sample_rate_hz=10e6)
+        y = cic.process(np.full(2000, 0.25))
+        assert cic.output_rate_hz == 10e6 / 16
+        assert_allclose(y[10:], 0.25, rtol=1e-12)
+        assert cic.frequency_response(np.array([0.0]))[0] == pytest.approx(1.0)
+
+    def test_fixed_point_rejects_float_input(self):
+        with pytest.raises(ValueError):
+            CICDecimator(4, fixed_point=True).process(np.zeros(8))
+
+
+class TestDecimator:
+    """CIC + compensation FIR chain."""
+
+    def test_compensated_passband_is_flat(self):
+        fs, cic_rate = 10e6, 25
+        dec = Decimator(fs, cic_rate, cic_order=4, fir_decimation=2, fir_taps=95)
+        t = np.arange(200_000) / fs
+        gains = []
+        for f in (1e3, 15e3, 35e3):  # passband: 0.4 x 100 kHz output Nyquist
+            y = dec.process(np.sin(2 * np.pi * f * t))
+            dec.reset()
+            settled = y[y.size // 2:]
+            gains.append(np.sqrt(2.0 * np.mean(settled ** 2)))
+        assert dec.output_rate_hz == fs / 50
+        assert_allclose(gains, 1.0, atol=0.01)
+        # Uncompensated CIC droop at 35 kHz is well over 1%
+        cic = CICDecimator(cic_rate, 4, sample_rate_hz=fs)
+        assert cic.frequency_response(np.array([35e3]))[0] < 0.96
+
+    def test_fixed_point_tracks_float(self, codes):
+        fixed = Decimator(1e6, 8, fixed_point=True, input_bits=16, cic_output_bits=20, output_bits=20)
+        flt = Decimator(1e6, 8)
+        y_fixed = fixed.process(codes)
+        y_float = flt.process(codes.astype(float))
+        assert np.issubdtype(y_fixed.dtype, np.integer)
+        scale = fixed.cic.dc_gain
+        assert_allclose(y_fixed / scale, y_float, atol=2.0 / scale + 1e-3 * np.abs(y_float).max())
+
+    def test_blocks_match_single_call(self, codes):
+        whole = Decimator(1e6, 4, fixed_point=True).process(codes)
+        dec = Decimator(1e6, 4, fixed_point=True)
+        blocks = [dec.process(b) for b in np.array_split(codes, [3, 100, 101, 2000])]
+        assert_array_equal(np.concatenate(blocks), whole)
+
+    def test_fir_decimator_matches_convolution(self):
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal(500)
+        taps = cic_compensation_taps(4, 10, n_taps=31)
+        y = FIRDecimator(taps, decimation=3).process(x)
+        ref = np.convolve(np.concatenate((np.zeros(30), x)), taps, mode="valid")[::3]
+        assert_allclose(y, ref, rtol=1e-12, atol=1e-14)
@@ -0,0 +1,107 @@
+"""
+Tests for the causal, stateful LockInDemodulator and DemodulatorBank.
+"""
+
+from __future__ import annotations
+
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+from scipy.signal import sosfilt
+
+from .demodulator import LockInDemodulator, DemodulatorBank, butterworth_lpf_sos
+
+
+FS_HZ = 10e6
+F_REF_HZ = 500e3
+
+
+@pytest.fixture
+def am_signal():
+    """500 kHz carrier with a slow amplitude modulation plus noise."""
+    rng = np.random.default_rng(7)
+    t = np.arange(50_000) / FS_HZ
+    env = 0.3 * (1.0 + 0.1 * np.sin(2 * np.pi * 1e3 * t))
+    return env * np.sin(2 * np.pi * F_REF_HZ * t) + 1e-3 * rng.standard_normal(t.size)
+
+
+class TestLockInDemodulator:
+    """Single-shot causal reference and block-wise equivalence."""
+
+    def test_matches_causal_reference(self, am_signal):
+        t = np.arange(am_signal.size) / FS_HZ
+        sos = butterworth_lpf_sos(FS_HZ, 10e3)
+        X = sosfilt(sos, am_signal * np.sin(2 * np.pi * F_REF_HZ * t))
+        Y = sosfilt(sos, am_signal * np.cos(2 * np.pi * F_REF_HZ * t))
+        out = LockInDemodulator(F_REF_HZ, FS_HZ, lpf_enbw_hz=10e3).process(am_signal)
+        assert_allclose(out.X, X, rtol=0, atol=1e-9)
+        assert_allclose(out.Y, Y, rtol=0, atol=1e-9)
+        assert_allclose(out.R, np.sqrt(X ** 2 + Y ** 2), rtol=0, atol=1e-9)
+
+    def test_blocks_match_single_call(self, am_signal):
+        whole = LockInDemodulator(F_REF_HZ, FS_HZ).process(am_signal)
+        demod = LockInDemodulator(F_REF_HZ, FS_HZ)
+        blocks = [demod.process(b) for b in np.array_split(am_signal, [0, 1, 999, 20_000, 20_001])]
+        for field in ("X", "Y", "R", "phase"):
+            assert_allclose(np.concatenate([getattr(b, field) for b in blocks]),
+                            getattr(whole, field), rtol=0, atol=1e-10)
+
+    def test_recovers_carrier_amplitude(self, am_signal):
+        R = LockInDemodulator(F_REF_HZ, FS_HZ).process(am_signal).R
+        # Settled R is half the carrier amplitude: 0.15 * (1 +/- 0.1)
+        settled = R[5_000:]
+        assert 0.13 < settled.min() and settled.max() < 0.17
+
+    def test_nco_reference_matches_float_reference(self, am_signal):
+        flt = LockInDemodulator(F_REF_HZ, FS_HZ).process(am_signal)
+        demod = LockInDemodulator(F_REF_HZ, FS_HZ, reference="nco")
+        nco = np.concatenate([demod.process(b).R for b in np.array_split(am_signal, 3)])
+        assert_allclose(nco[5_000:], flt.R[5_000:], rtol=1e-3)
+
+    def test_reset_restores_initial_state(self, am_signal):
+        demod = LockInDemodulator(F_REF_HZ, FS_HZ, phase=0.3)
+        first = demod.process(am_signal[:1000]).R
+        demod.process(am_signal[1000:2000])
+        demod.reset()
+        assert_allclose(demod.process(am_signal[:1000]).R, first)
+
+
+class TestDemodulatorBank:
+    """Multi-carrier bank against per-carrier LockInDemodulator runs."""
+
+    def test_matches_individual_demodulators(self, am_signal):
+        freqs = np.array([100e3, 500e3, 1.3e6])
+        phases = np.array([0.0, 0.5, -1.0])
+        bank = DemodulatorBank(freqs, FS_HZ, phases=phases).process(am_signal)
+        assert bank.R.shape == (3, am_signal.size)
+        for k, (f, ph) in enumerate(zip(freqs, phases)):
+            single = LockInDemodulator(f, FS_HZ, phase=ph).process(am_signal)
+            assert_allclose(bank.X[k], single.X, rtol=0, atol=1e-12)
+            assert_allclose(bank.R[k], single.R, rtol=0, atol=1e-12)
+
+    def test_separates_tones(self):
+        t = np.arange(40_000) / FS_HZ
+        amps = np.array([0.2, 0.1, 0.05])
+        freqs = np.array([300e3, 700e3, 1.1e6])
+        x = (amps[:, None] * np.sin(2 * np.pi * freqs[:, None] * t)).sum(axis=0)
+        R = DemodulatorBank(freqs, FS_HZ).process(x).R
+        assert_allclose(R[:, -1], amps / 2, rtol=0.02)
+
+    def test_decimated_blocks_match_single_call(self, am_signal):
+        freqs = np.linspace(100e3, 3e6, 32)
+        whole = DemodulatorBank(freqs, FS_HZ, decimation=10).process(am_signal)
+        bank = DemodulatorBank(freqs, FS_HZ, decimation=10)
+        blocks = [bank.process(b) for b in np.array_split(am_signal, [3, 4, 1237, 30_000])]
+        assert whole.R.shape == (32, am_signal.size // 10)
+        assert bank.output_rate_hz == FS_HZ / 10
+        assert_allclose(np.concatenate([b.R for b in blocks], axis=1), whole.R, rtol=0, atol=1e-10)
+
+    def test_nco_reference(self, am_signal):
+        freqs = np.array([250e3, 500e3])
+        flt = DemodulatorBank(freqs, FS_HZ).process(am_signal)
+        nco = DemodulatorBank(freqs, FS_HZ, reference="nco").process(am_signal)
+        assert_allclose(nco.R[:, 5_000:], flt.R[:, 5_000:], atol=1e-4)
+
+    def test_rejects_mismatched_phases(self):
+        with pytest.raises(ValueError):
+            DemodulatorBank([1e5, 2e5], FS_HZ, phases=[0.0])
@@ -0,0 +1,100 @@
+"""
+Tests for the vectorized, block-wise event detector.
+"""
+
+from __future__ import annotations
+
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from .events import EventDetector, detect_events
+
+
+def loop_reference(x, threshold, release, min_width=1, min_gap=0):
+    """Sample-by-sample hysteresis detector with gap merging and width filter."""
+    events, on, start = [], False, 0
+    for i, v in enumerate(np.abs(x)):
+        if not on and v >= threshold:
+            on, start = True, i
+        elif on and v < release:
+            on = False
+            events.append([start, i])
+    if on:
+        events.append([start, len(x)])
+    merged = []
+    for s, e in events:
+        if merged and s - merged[-1][1] < min_gap:
+            merged[-1][1] = e
+        else:
+            merged.append([s, e])
+    out = []
+    for s, e in merged:
+        if e - s >= min_width:
+            p = s + int(np.argmax(np.abs(x[s:e])))
+            out.append((s, e, p, x[p]))
+    return out
+
+
+def as_tuples(ev):
+    return list(zip(ev.start.tolist(), ev.end.tolist(), ev.peak.tolist(), ev.amplitude.tolist()))
+
+
+@pytest.fixture
+def pulses():
+    """Noisy baseline with Gaussian pulses of both signs, one at the very end."""
+    rng = np.random.default_rng(3)
+    n = 20_000
+    x = 0.02 * rng.standard_normal(n)
+    k = np.arange(n)
+    for c in rng.integers(50, n - 50, 60):
+        x += rng.choice([-1, 1]) * rng.uniform(0.3, 1.0) * np.exp(-0.5 * ((k - c) / 8.0) ** 2)
+    x[-5:] += 0.8
+    return x
+
+
+@pytest.mark.parametrize("min_width,min_gap", [(1, 0), (5, 0), (1, 30), (10, 30)])
+def test_matches_loop_reference(pulses, min_width, min_gap):
+    ev = detect_events(pulses, 0.2, release=0.1, min_width=min_width, min_gap=min_gap)
+    assert as_tuples(ev) == loop_reference(pulses, 0.2, 0.1, min_width, min_gap)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 333, 4096])
+def test_blocks_match_single_call(pulses, block_size):
+    whole = detect_events(pulses, 0.2, release=0.1, min_gap=30, block_size=pulses.size)
+    blocked = detect_events(pulses, 0.2, release=0.1, min_gap=30, block_size=block_size)
+    for a, b in zip(whole, blocked):
+        assert_array_equal(a, b)
+
+
+def test_event_spanning_blocks_reported_once():
+    x = np.zeros(100)
+    x[40:70] = 1.0
+    det = EventDetector(0.5)
+    first = det.process(x[:50])
+    assert first.start.size == 0
+    second = det.process(x[50:])
+    assert second.start.tolist() == [40] and second.end.tolist() == [70]
+    assert det.flush().start.size == 0
+
+
+def test_hysteresis_ignores_chatter():
+    x = np.array([0, 1, 0.6, 1, 0.6, 0.2, 0, 1, 0], dtype=float)
+    assert detect_events(x, 0.8, release=0.5).start.tolist() == [1, 7]
+    assert detect_events(x, 0.8).start.tolist() == [1, 3, 7]
+
+
+def test_polarity_and_baseline():
+    x = np.full(20, 1.0)
+    x[5] = 2.0
+    x[12] = 0.0
+    assert detect_events(x, 0.5, baseline=1.0, polarity="positive").peak.tolist() == [5]
+    neg = detect_events(x, 0.5, baseline=1.0, polarity="negative")
+    assert neg.peak.tolist() == [12] and neg.amplitude.tolist() == [-1.0]
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        EventDetector(0.1, release=0.2)
+    with pytest.raises(ValueError):
+        EventDetector(0.1, polarity="both")
@@ -10,17 +10,19 @@ from __future__ import annotations
 
 import pytest
 import numpy as np
-from numpy.testing import assert_allclose, assert_array_less
+from numpy.testing import assert_allclose, assert_array_equal, assert_array_less
 
 # Generators
 from .generators import (
     sine_wave,
     cosine_wave,
     multifrequency_sine,
+    NCO,
     noise_time_domain,
     noise_frequency_domain,
     NoiseType,
     apply_phase_delay,
+    SinglePoleLPF,
     dac_errors,
     opamp_errors,
     adc_errors,
@@ -31,7 +33,10 @@ from .simulators import (
     ImpedanceSimulator,
     OpAmpSimulator,
     ADCSimulator,
+    save_inl_tables,
+    load_inl_tables,
 )
+from .resampler import resample
 
 
 # -----------------------------------------------------------------------------
@@ -117,6 +122,44 @@ class TestSineCosineGenerators:
         assert_allclose(y, ref, rtol=1e-10)
 
 
+class TestNCO:
+    """Tests for the phase-accumulator NCO / DDS model."""
+
+    def test_tracks_float_sine(self, t_vec, sample_rate_dac_hz):
+        nco = NCO(1e6, sample_rate_dac_hz)
+        s, c = nco.sincos(t_vec.size)
+        f = nco.frequency_hz
+        # 16-bit phase truncation bounds the error to ~2*pi / 2^16
+        assert_allclose(s, np.sin(2 * np.pi * f * t_vec), atol=1e-4)
+        assert_allclose(c, np.cos(2 * np.pi * f * t_vec), atol=1e-4)
+        assert abs(f - 1e6) <= nco.resolution_hz
+
+    def test_continues_across_calls(self, sample_rate_dac_hz):
+        whole = NCO(3.3e6, sample_rate_dac_hz, dither=True, seed=1).sin(5000)
+        nco = NCO(3.3e6, sample_rate_dac_hz, dither=True, seed=1)
+        parts = np.concatenate([nco.sin(n) for n in (1, 999, 4000)])
+        assert_allclose(parts, whole, rtol=0, atol=0)
+
+    def test_phase_exact_on_long_capture(self):
+        # A float time vector loses phase precision as t grows; the integer
+        # accumulator after 10^7 samples is exactly n * tuning_word mod 2^48.
+        nco = NCO(1e6 + 0.123, 250e6)
+        for _ in range(100):
+            nco.phase_words(100_000)
+        expected = (int(nco.tuning_word) * 10_000_000 % (1 << 48)) >> 32
+        assert int(nco.phase_words(1)[0]) == expected
+
+    def test_multitone_shape(self, sample_rate_dac_hz):
+        nco = NCO(np.array([1e6, 2e6, 5e6]), sample_rate_dac_hz, phase=0.0)
+        assert nco.sin(100).shape == (3, 100)
+
+    def test_sine_wave_nco_source(self, t_vec, sample_rate_dac_hz):
+        y = sine_wave(t_vec, 1e6, amplitude=0.4, dc_offset=0.5, nco=NCO(1e6, sample_rate_dac_hz))
+        assert_allclose(y, sine_wave(t_vec, 1e6, amplitude=0.4, dc_offset=0.5), atol=1e-4)
+        with pytest.raises(ValueError):
+            sine_wave(t_vec, 2e6, nco=NCO(1e6, sample_rate_dac_hz))
+
+
 # -----------------------------------------------------------------------------
 # 2. Noise generator tests (time and frequency domain)
 # -----------------------------------------------------------------------------
@@ -177,6 +220,33 @@ class TestErrorGenerators:
         # High-freq tone should be attenuated
         assert np.max(np.abs(out)) < np.max(np.abs(sig)) * 1.1
 
+    def test_single_pole_lpf_matches_recursion(self, rng):
+        alpha = 0.2
+        x = rng.standard_normal(500)
+        y_ref = np.empty_like(x)
+        y_ref[0] = alpha * x[0]
+        for i in range(1, len(x)):
+            y_ref[i] = alpha * x[i] + (1.0 - alpha) * y_ref[i - 1]
+        assert_allclose(SinglePoleLPF(alpha).process(x), y_ref, rtol=1e-12, atol=1e-15)
+
+    def test_single_pole_lpf_chunked_equals_single_call(self, rng):
+        x = rng.standard_normal(1000)
+        whole = SinglePoleLPF(0.05).process(x)
+        lpf = SinglePoleLPF(0.05)
+        chunked = np.concatenate([lpf.process(c) for c in np.array_split(x, [1, 250, 251, 700])])
+        assert_allclose(chunked, whole, rtol=0, atol=1e-15)
+
+    def test_tia_bandwidth_assignment_rebuilds_filter(self, sample_rate_dac_hz, rng):
+        i_in = rng.standard_normal(2048) * 1e-6
+        kwargs = dict(transimpedance_ohms=10e3, sample_rate_hz=sample_rate_dac_hz, noise_rms_voltage=0.0)
+        opa = OpAmpSimulator(bandwidth_hz=50e6, **kwargs)
+        opa.run(i_in)
+        opa.bandwidth_hz = 5e6
+        assert_allclose(opa.run(i_in), OpAmpSimulator(bandwidth_hz=5e6, **kwargs).run(i_in), rtol=0, atol=1e-15)
+        opa.sample_rate_hz = sample_rate_dac_hz / 2
+        fresh = OpAmpSimulator(bandwidth_hz=5e6, **{**kwargs, "sample_rate_hz": sample_rate_dac_hz / 2})
+        assert_allclose(opa.run(i_in), fresh.run(i_in), rtol=0, atol=1e-15)
+
     def test_adc_errors_integer_codes(self, rng, sample_rate_adc_hz):
         n = 1024
         analog = 0.5 * np.sin(2 * np.pi * 1e6 * np.arange(n) / sample_rate_adc_hz) + 0.5
@@ -214,6 +284,87 @@ class TestDACSimulator:
         assert np.min(a2) >= -0.1 and np.max(a2) <= dac.v_ref + 0.1
         assert a2.dtype == a1.dtype
 
+    def test_dac_inl_table_fixed_per_device(self):
+        dac = DACSimulator(n_bits=12, inl_lsb=4.0, dnl_lsb=0.0, seed=2)
+        table = dac.inl_table
+        codes = np.arange(0, 4096, 7)
+        a1 = dac.digital_to_analog(codes)
+        a2 = dac.digital_to_analog(codes)
+        assert dac.inl_table is table
+        assert_allclose(a1, a2)
+        assert_allclose(a1, (codes / 4095 + table[codes]) * dac.v_ref)
+
+    def test_inl_table_redrawn_when_settings_change(self):
+        dac = DACSimulator(n_bits=10, inl_lsb=4.0, dnl_lsb=0.0, seed=3)
+        table = dac.inl_table
+        dac.inl_lsb = 4.0  # unchanged: same device
+        assert dac.inl_table is table
+        dac.inl_lsb = 1.0
+        assert dac.inl_table is not table and dac.inl_table.shape == (1024,)
+        assert np.max(np.abs(dac.inl_table)) < np.max(np.abs(table))
+        dac.n_bits = 12
+        assert dac.inl_table.shape == (4096,)
+        codes = np.arange(0, 4096, 7)
+        assert_allclose(dac.digital_to_analog(codes), (codes / 4095 + dac.inl_table[codes]) * dac.v_ref)
+
+        adc = ADCSimulator(n_bits=8, seed=3)
+        adc.n_bits = 10
+        assert adc.inl_table.shape == (1024,)
+        assert adc.analog_to_digital(np.array([0.999])).max() > 255
+        with pytest.raises(ValueError):
+            ADCSimulator(n_bits=12, code_dtype=np.int16).n_bits = 16
+        with pytest.raises(ValueError):
+            ADCSimulator(n_bits=16, code_dtype=np.int16)
+
+    def test_dac_input_mode_follows_dtype(self):
+        dac = DACSimulator(n_bits=12, inl_lsb=0.0, dnl_lsb=0.0, seed=6)
+        codes = np.array([0, 1, 2048, 4095, 1, 0, 1, 1])
+        whole = dac.digital_to_analog(codes)
+        assert_allclose(whole, codes / 4095)
+        # A block of integer codes that are all 0/1 is not full scale
+        assert_allclose(np.concatenate([dac.run(b) for b in np.split(codes, 4)]), whole)
+        assert_allclose(dac.run(np.array([0.0, 1.0])), [0.0, 1.0])
+
+    def test_dac_first_call_matches_dac_errors(self, t_vec):
+        digital = 0.5 + 0.5 * np.sin(2 * np.pi * 1e6 * t_vec)
+        expected = dac_errors(digital, rng=np.random.default_rng(4))
+        assert_allclose(DACSimulator(seed=4).run(digital), expected, rtol=1e-12)
+
+    def test_inl_table_save_load_roundtrip(self, tmp_path):
+        dac = DACSimulator(n_bits=10, seed=5)
+        dac.save_inl_table(tmp_path / "dac.npz")
+        clone = DACSimulator(n_bits=10, inl_lsb=1.0, seed=99)
+        clone.load_inl_table(tmp_path / "dac.npz")
+        assert_allclose(clone.inl_table, dac.inl_table)
+        assert clone.inl_lsb == dac.inl_lsb == 4.0
+        assert_allclose(clone.inl_table, dac.inl_table)  # restoring inl_lsb kept the table
+        with pytest.raises(ValueError):
+            ADCSimulator(n_bits=10).load_inl_table(tmp_path / "dac.npz")
+        with pytest.raises(ValueError):
+            DACSimulator(n_bits=12).load_inl_table(tmp_path / "dac.npz")
+
+    def test_inl_fleet_save_load(self, tmp_path):
+        fleet = [ADCSimulator(n_bits=8, seed=s) for s in range(5)]
+        save_inl_tables(tmp_path / "fleet.npz", fleet)
+        tables = load_inl_tables(tmp_path / "fleet.npz")
+        assert tables.shape == (5, 256)
+        rebuilt = ADCSimulator(n_bits=8, inl_table=tables[3])
+        assert_allclose(rebuilt.inl_table, fleet[3].inl_table)
+
+        fleet[2].inl_lsb = 0.5
+        save_inl_tables(tmp_path / "fleet.npz", fleet)
+        clones = [ADCSimulator(n_bits=8, inl_lsb=3.0) for _ in range(5)]
+        load_inl_tables(tmp_path / "fleet.npz", clones)
+        assert [c.inl_lsb for c in clones] == [2.0, 2.0, 0.5, 2.0, 2.0]
+        for clone, device in zip(clones, fleet):
+            assert_allclose(clone.inl_table, device.inl_table)
+        with pytest.raises(ValueError):
+            load_inl_tables(tmp_path / "fleet.npz", [DACSimulator(n_bits=8) for _ in range(5)])
+        with pytest.raises(ValueError):
+            load_inl_tables(tmp_path / "fleet.npz", [ADCSimulator(n_bits=10) for _ in range(5)])
+        with pytest.raises(ValueError):
+            load_inl_tables(tmp_path / "fleet.npz", clones[:4])
+
 
 # -----------------------------------------------------------------------------
 # 5. Impedance simulator tests (real + imaginary)
@@ -273,6 +424,15 @@ class TestOpAmpSimulator:
         # 20 MHz above 5 MHz BW -> attenuated
         assert np.max(np.abs(v_out)) < 5e3 * 1e-6 * 1.5
 
+    def test_tia_chunked_run_matches_single_run(self, sample_rate_dac_hz, rng):
+        i_in = rng.standard_normal(4096) * 1e-6
+        kwargs = dict(transimpedance_ohms=10e3, sample_rate_hz=sample_rate_dac_hz,
+                      bandwidth_hz=20e6, noise_rms_voltage=1e-4, seed=3)
+        whole = OpAmpSimulator(**kwargs).run(i_in)
+        opa = OpAmpSimulator(**kwargs)
+        chunked = np.concatenate([opa.run(c) for c in np.array_split(i_in, 7)])
+        assert_allclose(chunked, whole, rtol=0, atol=1e-15)
+
 
 # -----------------------------------------------------------------------------
 # 7. ADC simulator tests
@@ -289,6 +449,16 @@ class TestADCSimulator:
         assert np.all(codes >= 0) and np.all(codes <= 65535)
         assert codes.dtype in (np.int32, np.int64)
 
+    def test_adc_chunked_with_jitter_matches_single_call(self, sample_rate_adc_hz):
+        analog = 0.5 + 0.4 * np.sin(2 * np.pi * 7e6 * np.arange(5000) / sample_rate_adc_hz)
+        kwargs = dict(sample_rate_hz=sample_rate_adc_hz, aperture_jitter_sec=1e-9, seed=7)
+        whole = ADCSimulator(**kwargs).run(analog)
+        adc = ADCSimulator(**kwargs)
+        chunked = np.concatenate([adc.run(c) for c in np.array_split(analog, [1, 2, 600, 1300, 2600, 3900, 4999])])
+        assert_array_equal(chunked, whole)
+        no_jitter = ADCSimulator(**{**kwargs, "aperture_jitter_sec": 0.0}).run(analog)
+        assert np.mean(whole != no_jitter) > 0.9  # the jitter path is exercised
+
     def test_adc_specs_per_readme(self):
         adc = ADCSimulator(sample_rate_hz=100e6, n_bits=16)
         assert adc.sample_rate_hz >= 100e6
@@ -340,12 +510,11 @@ class TestImpedanceAnalyzerChain:
         # 4) TIA: current -> voltage
         v_tia = chain_tia.run(i_sensor)
 
-        # 5) ADC: voltage -> digital codes (may need resample if ADC rate != DAC rate)
-        # For simplicity use same length; in practice ADC might run at 100 MSPS and DAC at 250 MSPS
-        if len(v_tia) > 0:
-            codes = chain_adc.analog_to_digital(v_tia[: len(v_tia)])
-            assert codes.shape[0] == v_tia.shape[0]
-            assert np.all(codes >= 0) and np.all(codes <= 65535)
+        # 5) ADC: resample from the DAC rate (250 MSPS) to the ADC rate (100 MSPS), then digitize
+        v_adc = resample(v_tia, sample_rate_dac_hz, chain_adc.sample_rate_hz)
+        codes = chain_adc.analog_to_digital(v_adc)
+        assert codes.shape[0] == -(-v_tia.shape[0] * 2 // 5)
+        assert np.all(codes >= 0) and np.all(codes <= 65535)
 
     def test_chain_magnitude_phase_consistency(
         self,
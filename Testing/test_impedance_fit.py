@@ -0,0 +1,125 @@
+"""
+Tests for batch equivalent-circuit fitting.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from scipy.optimize import least_squares
+
+from . import impedance_fit
+from .impedance_fit import (
+    FIT_MODELS,
+    FIT_PARAMS,
+    SpectrumFitter,
+    fit_spectra,
+    initial_guess,
+    model_jacobian,
+    model_z,
+    z_from_polar,
+)
+
+TONES_HZ = np.array([1e5, 5e5, 2e6, 1e7])
+
+
+def _params(model: str, n: int, rng: np.random.Generator) -> np.ndarray:
+    scale = {"resistance": 5e3, "capacitance": 5e-12, "inductance": 5e-6}
+    return np.stack([scale[name] * rng.uniform(0.5, 2.0, n) for name in FIT_PARAMS[model]], axis=-1)
+
+
+def _noisy(z: np.ndarray, noise: float, rng: np.random.Generator) -> np.ndarray:
+    return z * (1.0 + noise * (rng.standard_normal(z.shape) + 1j * rng.standard_normal(z.shape)))
+
+
+@pytest.mark.parametrize("model", FIT_MODELS)
+def test_jacobian_matches_finite_differences(model):
+    params = _params(model, 5, np.random.default_rng(0))
+    z, dz = model_jacobian(model, TONES_HZ, params)
+    assert_allclose(z, model_z(model, TONES_HZ, params), rtol=1e-14)
+    h = 1e-7
+    for i in range(params.shape[1]):
+        up, down = params.copy(), params.copy()
+        up[:, i] *= np.exp(h)
+        down[:, i] *= np.exp(-h)
+        numeric = (model_z(model, TONES_HZ, up) - model_z(model, TONES_HZ, down)) / (2 * h)
+        assert_allclose(dz[..., i], numeric, rtol=1e-6, atol=1e-8 * np.abs(z).max())
+
+
+@pytest.mark.parametrize("model", FIT_MODELS)
+def test_noise_free_spectra_are_recovered_exactly(model):
+    params = _params(model, 500, np.random.default_rng(1))
+    z = model_z(model, TONES_HZ, params)
+    assert_allclose(initial_guess(model, TONES_HZ, z), params, rtol=1e-9)
+    result = fit_spectra(TONES_HZ, z_from_polar(np.abs(z), np.angle(z)), model)
+    assert result.converged.all()
+    assert_allclose(result.params, params, rtol=1e-9)
+    assert_allclose(result.param("resistance"), params[:, 0], rtol=1e-9)
+
+
+@pytest.mark.parametrize("model", FIT_MODELS)
+def test_noisy_fits_match_scipy_least_squares(model):
+    rng = np.random.default_rng(2)
+    params = _params(model, 20, rng)
+    z = _noisy(model_z(model, TONES_HZ, params), 0.02, rng)
+    result = fit_spectra(TONES_HZ, z, model)
+    assert result.converged.all()
+    for k in range(z.shape[0]):
+
+        def residuals(theta):
+            d = (model_z(model, TONES_HZ, np.exp(theta)[None])[0] - z[k]) / np.abs(z[k])
+            return np.concatenate((d.real, d.imag))
+
+        ref = least_squares(residuals, np.log(params[k]), method="lm", xtol=1e-14, ftol=1e-14)
+        assert result.cost[k] <= ref.cost * (1 + 1e-6) + 1e-20
+        # Compare spectra: a term the noise pushes to zero (L -> 0) has no
+        # well-defined value, only a negligible contribution
+        fitted = model_z(model, TONES_HZ, result.params[k : k + 1])
+        assert_allclose(fitted, model_z(model, TONES_HZ, np.exp(ref.x)[None]), rtol=1e-5)
+
+
+def test_bad_starting_point_still_converges(monkeypatch):
+    rng = np.random.default_rng(3)
+    params = _params("parallel_rc", 200, rng)
+    z = model_z("parallel_rc", TONES_HZ, params)
+    # Far-off x0 is ignored where the algebraic estimate is better ...
+    assert_allclose(fit_spectra(TONES_HZ, z, x0=[1.0, 1e-3]).params, params, rtol=1e-9)
+    # ... and LM walks in from a far-off start where it is all there is
+    far = params * [30.0, 0.05]
+    monkeypatch.setattr(impedance_fit, "initial_guess", lambda model, f_hz, z: far)
+    result = fit_spectra(TONES_HZ, z)
+    assert result.converged.all()
+    assert (result.iterations > 0).all()
+    assert_allclose(result.params, params, rtol=1e-6)
+
+
+def test_spectrum_fitter_warm_start_and_stats():
+    rng = np.random.default_rng(4)
+    cell = np.array([4e3, 3e-12])
+    params = cell * rng.uniform(0.98, 1.02, (3000, 2))
+    z = _noisy(model_z("parallel_rc", TONES_HZ, params), 0.01, rng)
+
+    fitter = SpectrumFitter(TONES_HZ)
+    results = [fitter.fit(batch) for batch in np.array_split(z, 3)]
+    stats = fitter.stats
+    assert stats.fits == 3000 and stats.converged == sum(int(r.converged.sum()) for r in results)
+    assert stats.converged_fraction == 1.0 and stats.fits_per_sec > 0
+    assert stats.max_iterations == max(int(r.iterations.max()) for r in results)
+    assert_allclose(np.concatenate([r.params for r in results]), fit_spectra(TONES_HZ, z).params, rtol=1e-5)
+
+    fitter.reset()
+    assert fitter.stats.fits == 0
+
+
+def test_validation():
+    z = model_z("parallel_rc", TONES_HZ, np.array([[1e3, 1e-12]]))
+    with pytest.raises(ValueError):
+        fit_spectra(TONES_HZ, z, "cpe")
+    with pytest.raises(ValueError):
+        fit_spectra(np.array([0.0, 1e5, 1e6, 1e7]), z)
+    with pytest.raises(ValueError):
+        fit_spectra(TONES_HZ[:3], z)
+    with pytest.raises(ValueError):
+        SpectrumFitter(TONES_HZ, "single_shell")
+    assert fit_spectra(TONES_HZ, z[0]).params.shape == (1, 2)
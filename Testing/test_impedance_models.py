@@ -0,0 +1,97 @@
+"""
+Tests for batched impedance models and the Z(f) cache.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+from . import impedance_models as im
+from .simulators import ImpedanceSimulator
+
+F_HZ = np.concatenate(([0.0], np.geomspace(1e3, 1e8, 31)))
+N_MODELS = 50
+
+
+def _batch(seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        "resistance": rng.uniform(1e2, 1e4, N_MODELS),
+        "capacitance": rng.uniform(1e-12, 1e-9, N_MODELS),
+        "inductance": rng.uniform(1e-9, 1e-6, N_MODELS),
+        "cpe_q": rng.uniform(1e-9, 1e-7, N_MODELS),
+    }
+
+
+@pytest.mark.parametrize("model", ["parallel_rc", "series_rc", "series_rlc", "single_shell"])
+@pytest.mark.parametrize("with_cpe", [False, True])
+def test_batched_matches_one_model_at_a_time(model, with_cpe):
+    p = _batch()
+    shell = im.SingleShell(
+        volume_fraction=np.linspace(0.001, 0.2, N_MODELS), cell_radius_m=np.linspace(2e-6, 8e-6, N_MODELS)
+    )
+    cpe = dict(cpe_q=p["cpe_q"], cpe_alpha=0.85) if with_cpe else {}
+    batched = ImpedanceSimulator(p["resistance"], p["capacitance"], p["inductance"], model, shell, **cpe)
+    z = batched.z_complex(F_HZ)
+    assert batched.batch_shape == (N_MODELS,) and z.shape == (N_MODELS, F_HZ.size)
+    for i in (0, 17, N_MODELS - 1):
+        one = ImpedanceSimulator(
+            p["resistance"][i], p["capacitance"][i], p["inductance"][i], model,
+            im.SingleShell(*(np.asarray(v)[i] if np.ndim(v) else v for v in shell)),
+            **({k: (v[i] if np.ndim(v) else v) for k, v in cpe.items()}),
+        )
+        assert one.batch_shape == ()
+        assert_allclose(z[i], one.z_complex(F_HZ), rtol=1e-13)
+
+
+def test_legacy_shapes_and_dc():
+    z = ImpedanceSimulator(resistance=1e3, capacitance=1e-9, model="series_rc")
+    assert z.z_complex(np.array([0.0, 1e6])).shape == (2,)
+    assert z.z_complex(np.array([0.0]))[0] == 1e3
+    assert z.z_complex(np.ones((3, 4))).shape == (3, 4)
+    assert z.z_complex(5e5).shape == z.magnitude(5e5).shape == z.phase_rad(5e5).shape == ()
+    assert z.z_complex(5e5) == z.z_complex(np.array([5e5]))[0]
+    assert im.parallel_rc(np.ones((3, 4)), np.ones(5), 1e-9).shape == (5, 3, 4)
+
+
+def test_single_shell_limits():
+    shell = im.SingleShell(volume_fraction=0.05)
+    medium = im.single_shell(F_HZ[1:], shell._replace(volume_fraction=0.0))
+    kappa, sig_m, eps_m = shell.cell_constant_per_m, shell.medium_s_per_m, shell.medium_permittivity
+    assert_allclose(medium, kappa / (sig_m + 2j * np.pi * F_HZ[1:] * im.EPSILON_0 * eps_m), rtol=1e-12)
+    # Below the beta dispersion the membrane insulates: f_CM = -1/2
+    ratio = im.single_shell(np.array([1e3]), shell) / medium[0]
+    assert ratio[0] == pytest.approx((1 + 0.05 / 2) / (1 - 0.05), rel=1e-4)
+    # Well above it the cell interior (less conductive than the medium) shows
+    high = im.single_shell(np.array([5e7]), shell) / im.single_shell(np.array([5e7]), shell._replace(volume_fraction=0.0))
+    assert 1.0 < abs(high[0]) < abs(ratio[0])
+
+
+def test_cpe():
+    w = 2 * np.pi * F_HZ[1:]
+    assert_allclose(im.cpe(F_HZ[1:], 1e-9, 1.0), 1 / (1j * w * 1e-9), rtol=1e-12)
+    assert_allclose(np.angle(im.cpe(F_HZ[1:], 1e-9, 0.8)), -0.4 * np.pi, rtol=1e-12)
+
+
+def test_z_cache():
+    p = _batch()
+    sim = ImpedanceSimulator(p["resistance"], p["capacitance"])
+    z = sim.z_complex(F_HZ)
+    assert sim.z_complex(F_HZ.copy()) is z
+    assert sim.z_cache.stats()["hits"] == 1
+    assert not z.flags.writeable
+    sim.R = p["resistance"] * 2
+    assert_allclose(sim.z_complex(F_HZ)[:, 0], 2 * z[:, 0])
+    sim.R[0] = 1.0  # in-place edits change the key too
+    assert sim.z_complex(F_HZ)[0, 0] == pytest.approx(1.0)
+    uncached = ImpedanceSimulator(p["resistance"], p["capacitance"], cache_bytes=0)
+    assert uncached.z_complex(F_HZ) is not uncached.z_complex(F_HZ)
+
+
+def test_batched_simulator_rejects_waveform_methods():
+    sim = ImpedanceSimulator(resistance=np.array([1e3, 2e3]))
+    t = np.arange(100) / 1e6
+    with pytest.raises(ValueError):
+        sim.current_from_voltage(np.sin(t), t, 1e5)
@@ -0,0 +1,77 @@
+"""
+Tests for per-stage chain instrumentation.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .instrumentation import Profiler
+from .signal_chain import SignalChain, iter_blocks
+from .simulators import DACSimulator, ADCSimulator
+from .stage_cache import StageCache
+from .sweep import DEFAULT_CHAIN_PARAMS
+from .dlia_chain import ADC_SAMPLE_RATE_HZ, DAC_SAMPLE_RATE_HZ, run_signal_chain
+
+CHAIN_STAGES = ["carrier", "dac", "modulation", "opamp", "adc", "demod_adc", "demod_dac", "demod_dac_ideal"]
+
+
+def _chain_inputs(n: int = 20_000):
+    t = np.arange(n) / DAC_SAMPLE_RATE_HZ
+    t_env = np.linspace(0.0, t[-1], 50)
+    env = 5e-3 * np.sin(2 * np.pi * 1e3 * t_env)
+    p = DEFAULT_CHAIN_PARAMS
+    return (t, env, t_env, 0.9, p["dac"], p["adc"], p["opamp"])
+
+
+def test_profiler_records_each_stage():
+    args = _chain_inputs()
+    profiler = Profiler(track_memory=True)
+    result = run_signal_chain(*args, profiler=profiler)
+    assert [r.stage for r in profiler.records] == CHAIN_STAGES
+    for r in profiler.records:
+        if r.stage == "demod_adc":
+            assert r.samples == len(result["t_adc"]) and r.sample_rate_hz == ADC_SAMPLE_RATE_HZ
+        else:
+            assert r.samples == len(args[0]) and r.sample_rate_hz == DAC_SAMPLE_RATE_HZ
+        assert r.wall_s >= 0 and r.cpu_s >= 0 and not r.cached
+        assert r.peak_bytes is not None
+    dac = profiler.records[1]
+    assert dac.peak_bytes >= result["dac_output"].nbytes
+    assert dac.realtime_factor == dac.samples / DAC_SAMPLE_RATE_HZ / dac.wall_s
+
+    # Disabled profiling gives the same output
+    plain = run_signal_chain(*args)
+    np.testing.assert_array_equal(plain["adc_demod"], result["adc_demod"])
+
+
+def test_cached_stages_are_flagged():
+    args = _chain_inputs()
+    cache = StageCache()
+    run_signal_chain(*args, cache=cache)
+    profiler = Profiler()
+    adc = dict(args[5], gain_error=1e-3)
+    run_signal_chain(*args[:5], adc, args[6], cache=cache, profiler=profiler)
+    cached = {r.stage: r.cached for r in profiler.records}
+    assert cached["dac"] and cached["modulation"] and cached["opamp"] and cached["demod_dac"]
+    assert not cached["adc"] and not cached["demod_adc"]
+    assert profiler.records[0].peak_bytes is None
+
+
+def test_signal_chain_profiler_and_summary():
+    profiler = Profiler()
+    chain = SignalChain(
+        [("dac_output", DACSimulator(sample_rate_hz=1e6, seed=1)),
+         ("adc_codes", ADCSimulator(sample_rate_hz=1e6, seed=2))],
+        profiler=profiler,
+    )
+    x = 0.5 + 0.4 * np.sin(np.arange(4000) * 0.01)
+    for block in iter_blocks(x, 1000):
+        chain.process(block)
+    totals = profiler.totals()
+    assert list(totals) == ["dac_output", "adc_codes"]
+    assert totals["dac_output"]["calls"] == 4 and totals["dac_output"]["samples"] == 4000
+    table = profiler.summary()
+    assert "dac_output" in table and "RT factor" in table
+    profiler.reset()
+    assert profiler.records == [] and profiler.summary().count("\n") == 1
@@ -0,0 +1,46 @@
+"""
+Tests for min/max level-of-detail plotting.
+"""
+
+from __future__ import annotations
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from .lod_plot import minmax_decimate, lod_plot
+
+
+def test_bounded_size_and_spikes_kept():
+    x = np.arange(1_000_003, dtype=float)
+    y = np.zeros_like(x)
+    y[123_457] = 5.0
+    y[800_001] = -3.0
+    xs, ys = minmax_decimate(x, y, 500)
+    assert xs.size <= 1000
+    assert ys.max() == 5.0 and ys.min() == -3.0
+    assert xs[0] == 0 and xs[-1] == x[-1]
+    assert np.all(np.diff(xs) >= 0)
+
+
+def test_small_range_returns_raw_samples():
+    x = np.arange(100, dtype=float)
+    y = np.sin(x)
+    xs, ys = minmax_decimate(x, y, 500, x_range=(10.5, 20.5))
+    assert_array_equal(xs, x[10:22])
+    assert_array_equal(ys, y[10:22])
+
+
+def test_zoom_refetches_detail():
+    fig, ax = plt.subplots()
+    x = np.arange(200_000, dtype=float)
+    y = np.sin(x / 7.0)
+    lod = lod_plot(ax, x, y, n_bins=100)
+    assert lod.line.get_xdata().size <= 200
+    ax.set_xlim(1000, 1050)
+    xs = lod.line.get_xdata()
+    assert xs.size == 53 and xs[0] == 999
+    assert_array_equal(lod.line.get_ydata(), y[999:1052])
+    plt.close(fig)
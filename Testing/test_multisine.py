@@ -0,0 +1,75 @@
+"""
+Fast multifrequency_sine methods against the direct per-tone sum.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from . import generators as gen
+
+FS_HZ = 250e6
+
+
+def _t(n: int, start: int = 0) -> np.ndarray:
+    return (start + np.arange(n)) / FS_HZ
+
+
+def _tones(k: int, on_bin: bool, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    if on_bin:
+        freqs = FS_HZ / 1000 * rng.choice(np.arange(1, 500), k, replace=False)
+    else:
+        freqs = rng.uniform(1e5, 1e8, k)
+    return freqs, rng.uniform(0.01, 0.1, k), rng.uniform(0, 2 * np.pi, k)
+
+
+def _bound(t: np.ndarray, freqs: np.ndarray, amps: np.ndarray) -> float:
+    return (1e-9 + 2 * np.pi * np.max(np.abs(freqs)) * np.spacing(np.max(np.abs(t)))) * np.sum(np.abs(amps))
+
+
+@pytest.mark.parametrize("method", ["auto", "rotation", "ifft", "tile"])
+@pytest.mark.parametrize("on_bin", [True, False])
+@pytest.mark.parametrize("n", [999, 200_000, 65_536 + 37])
+def test_fast_methods_match_direct(method, on_bin, n):
+    t = _t(n, start=12_345)
+    freqs, amps, phases = _tones(24, on_bin)
+    ref = gen.multifrequency_sine(t, freqs, amps, phases, dc_offset=0.3, method="direct")
+    out = gen.multifrequency_sine(t, freqs, amps, phases, dc_offset=0.3, method=method)
+    assert np.max(np.abs(out - ref)) <= _bound(t, freqs, amps)
+
+
+def test_ifft_handles_dc_nyquist_and_aliased_bins():
+    t = _t(4000)
+    freqs = np.array([0.0, FS_HZ / 2, 0.7 * FS_HZ, -3 * FS_HZ / 1000, 1.5 * FS_HZ / 100])
+    amps, phases = np.full(5, 0.2), np.linspace(0.1, 2.0, 5)
+    ref = gen.multifrequency_sine(t, freqs, amps, phases, method="direct")
+    out = gen.multifrequency_sine(t, freqs, amps, phases, method="ifft")
+    assert np.max(np.abs(out - ref)) <= _bound(t, freqs, amps)
+
+
+def test_unusable_fast_method_falls_back_to_direct():
+    freqs, amps, phases = _tones(6, on_bin=False)
+    t = _t(5000)
+    ref = gen.multifrequency_sine(t, freqs, amps, phases, method="direct")
+    np.testing.assert_array_equal(gen.multifrequency_sine(t, freqs, amps, phases, method="ifft"), ref)
+    t_jittered = t + np.random.default_rng(1).normal(0, 1e-12, t.size)
+    ref = gen.multifrequency_sine(t_jittered, freqs, amps, phases, method="direct")
+    np.testing.assert_array_equal(gen.multifrequency_sine(t_jittered, freqs, amps, phases, method="rotation"), ref)
+
+
+def test_float32_and_reused_scratch():
+    scratch = gen.ScratchBuffers()
+    t = _t(100_000)
+    for on_bin in (True, False):
+        freqs, amps, phases = _tones(32, on_bin)
+        ref = gen.multifrequency_sine(t, freqs, amps, phases, method="direct")
+        out = gen.multifrequency_sine(t, freqs, amps, phases, dtype=np.float32, scratch=scratch)
+        assert out.dtype == np.float32
+        assert np.max(np.abs(out - ref)) < 1e-6 * np.sum(amps)
+
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        gen.multifrequency_sine(_t(10), [1e6], [1.0], method="fft")
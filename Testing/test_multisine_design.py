@@ -0,0 +1,79 @@
+"""
+Tests for crest-factor optimized multisine design.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+from . import multisine_design as msd
+
+F0_HZ = 250e3
+FREQS = F0_HZ * np.array([1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233])
+
+
+def _time_domain_crest(design: msd.MultisineDesign) -> float:
+    # Ten periods of the 250 kHz grid at 4 GS/s
+    t = np.arange(160_000) / 4e9
+    x = design.waveform(t)
+    return np.max(np.abs(x)) / np.sqrt(np.mean(x ** 2))
+
+
+def test_tone_grid():
+    bins, f_res = msd.tone_grid(FREQS)
+    assert f_res == F0_HZ and bins.tolist() == (FREQS / F0_HZ).astype(int).tolist()
+    assert msd.tone_grid([1.5e3, 2.25e3])[1] == 750.0
+    with pytest.raises(ValueError):
+        msd.tone_grid([1e6, 1e6])
+    with pytest.raises(ValueError):
+        msd.tone_grid([1e6, 1e6 + 1e-3 / 3], resolution_hz=1e-3)
+
+
+@pytest.mark.parametrize("freqs", [F0_HZ * np.arange(1, 25), FREQS])
+def test_designs_lower_crest_factor(freqs):
+    amps = np.linspace(1.0, 0.5, freqs.size)
+    cf = {m: msd.design_multisine(freqs, amps, method=m, n_iter=100).crest_factor for m in msd.DESIGN_METHODS}
+    assert cf["clipping"] <= min(cf.values())
+    if freqs.size == 24:
+        # The closed forms assume consecutive harmonics
+        assert cf["schroeder"] < 0.5 * cf["zero"] and cf["newman"] < 0.5 * cf["zero"]
+    design = msd.design_multisine(freqs, amps, n_iter=100)
+    assert _time_domain_crest(design) == pytest.approx(design.crest_factor, rel=0.02)
+
+
+def test_schroeder_flat_spectrum_closed_form():
+    k = np.arange(1, 11)
+    np.testing.assert_allclose(
+        np.exp(1j * msd.schroeder_phases(np.ones(10))), np.exp(-1j * np.pi * k * (k - 1) / 10), atol=1e-12
+    )
+
+
+def test_evaluate_designs_batch_and_headroom():
+    amps = np.full(FREQS.size, 0.02)
+    phases = np.random.default_rng(0).uniform(0, 2 * np.pi, (5, FREQS.size))
+    report = msd.evaluate_designs(FREQS, amps, phases, full_scale=0.5)
+    assert report.crest_factor.shape == (5,)
+    for i in range(5):
+        single = msd.evaluate_designs(FREQS, amps, phases[i], full_scale=0.5)
+        assert single.crest_factor == pytest.approx(report.crest_factor[i])
+    np.testing.assert_allclose(report.headroom_db, 20 * np.log10(0.5 / report.peak))
+    scaled = msd.evaluate_designs(FREQS, amps * report.scale[0], phases[0], full_scale=0.5)
+    assert scaled.peak == pytest.approx(0.5) and scaled.headroom_db == pytest.approx(0.0, abs=1e-9)
+
+
+def test_designs_are_cached_on_disk(tmp_path, monkeypatch):
+    first = msd.design_multisine(FREQS, n_iter=20, cache_dir=tmp_path)
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].startswith(msd.DESIGN_CACHE_PREFIX)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("optimization ran despite a cached design")
+    monkeypatch.setattr(msd, "clipping_phases", fail)
+    again = msd.design_multisine(FREQS, n_iter=20, cache_dir=tmp_path)
+    np.testing.assert_array_equal(again.phases, first.phases)
+    assert again.crest_factor == first.crest_factor
+    with pytest.raises(AssertionError):
+        msd.design_multisine(FREQS, n_iter=21, cache_dir=tmp_path)
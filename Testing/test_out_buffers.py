@@ -0,0 +1,117 @@
+"""
+Tests for the out=/scratch= buffer API of the hot-path generators and
+error models.
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from . import generators as gen
+from .simulators import DACSimulator, OpAmpSimulator, ADCSimulator
+
+FS_HZ = 250e6
+BLOCK = 1 << 18
+
+
+def _t(n: int, start: int = 0) -> np.ndarray:
+    return (start + np.arange(n)) / FS_HZ
+
+
+def test_scratch_buffers_reuse_memory():
+    scratch = gen.ScratchBuffers()
+    a = scratch.get("x", 100, np.float64)
+    assert np.shares_memory(a, scratch.get("x", 100, np.float64))
+    assert np.shares_memory(a, scratch.get("x", (10, 5), np.float64))
+    assert not np.shares_memory(a, scratch.get("x", 100, np.float32))
+    assert scratch.nbytes == 400
+    scratch.clear()
+    assert scratch.nbytes == 0
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_out_matches_allocating_path(dtype):
+    t = _t(5000)
+    x = gen.sine_wave(t, 1e6, 0.4, dc_offset=0.5, dtype=dtype)
+    out = np.empty_like(x)
+    assert gen.sine_wave(t, 1e6, 0.4, dc_offset=0.5, dtype=dtype, out=out) is out
+    np.testing.assert_array_equal(out, x)
+
+    freqs, amps = [1e6, 3e6], [0.2, 0.1]
+    ref = gen.multifrequency_sine(t, freqs, amps, dtype=dtype)
+    np.testing.assert_array_equal(
+        gen.multifrequency_sine(t, freqs, amps, dtype=dtype, out=out, scratch=gen.ScratchBuffers()), ref
+    )
+
+    scratch = gen.ScratchBuffers()
+    table = gen.dac_inl_profile(16, 4.0, np.random.default_rng(0))
+    ref = gen.dac_errors(x, rng=np.random.default_rng(1), inl_profile=table, dtype=dtype)
+    got = gen.dac_errors(x, rng=np.random.default_rng(1), inl_profile=table, dtype=dtype,
+                         out=out, scratch=scratch)
+    np.testing.assert_array_equal(got, ref)
+
+    lpf_a = gen.SinglePoleLPF.from_bandwidth(20e6, FS_HZ)
+    lpf_b = gen.SinglePoleLPF.from_bandwidth(20e6, FS_HZ)
+    ref = gen.opamp_errors(x, FS_HZ, 1e-3, 1e-3, noise_rms=1e-4, rng=np.random.default_rng(2),
+                           lpf=lpf_a, dtype=dtype)
+    got = gen.opamp_errors(x, FS_HZ, 1e-3, 1e-3, noise_rms=1e-4, rng=np.random.default_rng(2),
+                           lpf=lpf_b, dtype=dtype, out=np.empty_like(x), scratch=scratch)
+    np.testing.assert_array_equal(got, ref)
+
+    codes = np.empty(x.shape, np.int32)
+    kw = dict(aperture_jitter_sec=1e-10, sample_rate_hz=FS_HZ, prev_sample=0.5, dtype=dtype)
+    ref = gen.adc_errors(x, rng=np.random.default_rng(3), **kw)
+    got = gen.adc_errors(x, rng=np.random.default_rng(3), out=codes, scratch=scratch, **kw)
+    np.testing.assert_array_equal(got, ref)
+
+
+def test_out_is_validated():
+    t = _t(10)
+    with pytest.raises(ValueError):
+        gen.sine_wave(t, 1e6, out=np.empty(9))
+    with pytest.raises(ValueError):
+        gen.dac_errors(np.zeros(10), out=np.empty(10, np.float32))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_streaming_blocks_do_not_allocate(dtype):
+    rng = np.random.default_rng(0)
+    scratch = gen.ScratchBuffers()
+    dac_table = gen.dac_inl_profile(16, 4.0, rng).astype(dtype)
+    adc_table = gen.adc_inl_profile(16, 2.0, rng).astype(dtype)
+    lpf = gen.SinglePoleLPF.from_bandwidth(50e6, FS_HZ)
+    dac = DACSimulator(FS_HZ, seed=1, dtype=dtype)
+    tia = OpAmpSimulator(sample_rate_hz=FS_HZ, bandwidth_hz=50e6, noise_rms_voltage=1e-4, seed=2, dtype=dtype)
+    adc = ADCSimulator(FS_HZ, seed=3, dtype=dtype, code_dtype=np.uint16)
+
+    t = _t(BLOCK)
+    x, m, y, v = (np.empty(BLOCK, dtype) for _ in range(4))
+    codes = np.empty(BLOCK, np.uint16)
+
+    def process_block() -> None:
+        gen.sine_wave(t, 1e6, 0.4, dc_offset=0.5, dtype=dtype, out=x)
+        gen.multifrequency_sine(t, [1e6, 2e6, 3e6], [0.1, 0.1, 0.1], dtype=dtype, out=m, scratch=scratch)
+        gen.dac_errors(x, rng=rng, inl_profile=dac_table, dtype=dtype, out=y, scratch=scratch)
+        gen.opamp_errors(y, FS_HZ, 1e-3, 1e-3, noise_rms=1e-4, rng=rng, lpf=lpf, dtype=dtype,
+                         out=v, scratch=scratch)
+        gen.adc_errors(v, aperture_jitter_sec=1e-12, sample_rate_hz=FS_HZ, rng=rng, inl_profile=adc_table,
+                       prev_sample=0.5, dtype=dtype, code_dtype=np.uint16, out=codes, scratch=scratch)
+        dac.run(x, out=y)
+        tia.run(y, out=v)
+        adc.run(v, out=codes)
+
+    process_block()  # warm-up: scratch buffers are sized here
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(3):
+            process_block()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Only fixed-size chunk temporaries remain, far below one block
+    assert peak - base < x.nbytes // 4
+    assert 0 <= codes.min() and codes.max() <= 65535
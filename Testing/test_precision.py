@@ -0,0 +1,154 @@
+"""
+Accuracy bounds for the float32 precision mode.
+
+Each float32 path is compared against the float64 reference on the same
+input; random draws differ between precisions, so the error models are
+checked with their random terms switched off.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from . import generators as gen
+from .simulators import DACSimulator, ImpedanceSimulator, OpAmpSimulator, ADCSimulator
+from .demodulator import LockInDemodulator, DemodulatorBank
+
+FS_HZ = 250e6
+F_HZ = 1e6
+N = 200_000
+
+
+def _t(n: int = N) -> np.ndarray:
+    return np.arange(n) / FS_HZ
+
+
+def _unit_sine(n: int = N) -> np.ndarray:
+    return gen.sine_wave(_t(n), F_HZ, amplitude=0.4, dc_offset=0.5)
+
+
+class TestGenerators:
+
+    @pytest.mark.parametrize("wave", [gen.sine_wave, gen.cosine_wave])
+    def test_waves_on_long_time_base(self, wave):
+        # t up to 0.8 s: the phase argument reaches ~5e6 rad
+        t = _t() * 1000
+        ref = wave(t, F_HZ, amplitude=0.4, phase=0.3, dc_offset=0.5)
+        out = wave(t, F_HZ, amplitude=0.4, phase=0.3, dc_offset=0.5, dtype=np.float32)
+        assert out.dtype == np.float32
+        assert np.max(np.abs(out - ref)) < 1e-7
+
+    def test_multifrequency_sine(self):
+        freqs, amps, phases = F_HZ * np.arange(1, 5), np.full(4, 0.1), np.linspace(0, 1, 4)
+        ref = gen.multifrequency_sine(_t(), freqs, amps, phases, dc_offset=0.2)
+        out = gen.multifrequency_sine(_t(), freqs, amps, phases, dc_offset=0.2, dtype="float32")
+        assert out.dtype == np.float32
+        assert np.max(np.abs(out - ref)) < 2e-7
+
+    @pytest.mark.parametrize("kind", ["white", "pink", "bandlimited_white"])
+    def test_noise_dtype_and_scale(self, kind):
+        x = gen.noise_time_domain(N, kind, scale=2.0, rng=np.random.default_rng(0), dtype=np.float32)
+        assert x.dtype == np.float32
+        assert np.sqrt(np.mean(x.astype(float) ** 2)) == pytest.approx(2.0, rel=0.02)
+        spec = gen.noise_frequency_domain(64, kind, rng=np.random.default_rng(0), dtype=np.float32)
+        assert spec.dtype == np.complex64
+
+    def test_float64_default_unchanged(self):
+        x = gen.noise_time_domain(100, "white", rng=np.random.default_rng(0))
+        np.testing.assert_array_equal(x, np.random.default_rng(0).standard_normal(100))
+
+    def test_invalid_dtype(self):
+        with pytest.raises(ValueError):
+            gen.sine_wave(_t(10), F_HZ, dtype=np.float16)
+        with pytest.raises(ValueError):
+            DACSimulator(dtype=np.int32)
+
+
+class TestErrorModelsAndSimulators:
+
+    def test_dac(self):
+        table = gen.dac_inl_profile(16, 4.0, np.random.default_rng(0))
+        codes = np.round(_unit_sine() * 65535).astype(np.uint16)
+        ref = DACSimulator(FS_HZ, dnl_lsb=0.0, gain_error=1e-3, inl_table=table).run(codes)
+        dac = DACSimulator(FS_HZ, dnl_lsb=0.0, gain_error=1e-3, inl_table=table, dtype=np.float32)
+        out = dac.run(codes)
+        assert out.dtype == np.float32
+        assert np.max(np.abs(out - ref)) < 1e-7
+
+    def test_adc_codes(self):
+        table = gen.adc_inl_profile(16, 2.0, np.random.default_rng(0))
+        x = _unit_sine()
+        kw = dict(dnl_lsb=0.0, aperture_jitter_sec=0.0, gain_error=1e-3, inl_table=table)
+        ref = ADCSimulator(FS_HZ, **kw).run(x)
+        out = ADCSimulator(FS_HZ, dtype=np.float32, code_dtype=np.uint16, **kw).run(x)
+        assert ref.dtype == np.int32 and out.dtype == np.uint16
+        diff = np.abs(out.astype(int) - ref)
+        assert diff.max() <= 1 and np.mean(diff) < 1e-3
+
+    def test_adc_code_dtype_too_small(self):
+        with pytest.raises(ValueError):
+            ADCSimulator(n_bits=18, code_dtype=np.uint16)
+
+    def test_adc_jitter_path(self):
+        x = _unit_sine()
+        codes = ADCSimulator(FS_HZ, aperture_jitter_sec=1e-12, seed=1, dtype=np.float32).run(x)
+        assert codes.dtype == np.int32 and 0 <= codes.min() and codes.max() <= 65535
+
+    def test_opamp(self):
+        i = _unit_sine() * 1e-5
+        ref = OpAmpSimulator(sample_rate_hz=FS_HZ, bandwidth_hz=20e6).run(i)
+        out = OpAmpSimulator(sample_rate_hz=FS_HZ, bandwidth_hz=20e6, dtype=np.float32).run(i)
+        assert out.dtype == np.float32
+        assert np.max(np.abs(out - ref)) < 2e-7 * np.max(np.abs(ref))
+
+    def test_impedance_keeps_float32(self):
+        v = _unit_sine()
+        z = ImpedanceSimulator(resistance=2e3, capacitance=2e-12)
+        ref = z.current_from_voltage(v, _t(), F_HZ)
+        out = z.current_from_voltage(v.astype(np.float32), _t(), F_HZ)
+        assert out.dtype == np.float32
+        assert np.max(np.abs(out - ref)) < 2e-7 * np.max(np.abs(ref))
+
+    def test_streaming_chain_float32(self, analog_chain):
+        def chain(dtype, code_dtype):
+            return analog_chain(
+                FS_HZ, f_excitation_hz=F_HZ, dtype=dtype,
+                dac_kwargs=dict(dnl_lsb=0.0),
+                tia_kwargs=dict(noise_rms_voltage=0.0),
+                adc_kwargs=dict(dnl_lsb=0.0, aperture_jitter_sec=0.0, code_dtype=code_dtype),
+            )
+        x = _unit_sine()
+        ref = chain(np.float64, np.int32).process(x)
+        out = chain(np.float32, np.uint16).process(x)
+        for key in ("dac_output", "sensor_current", "tia_output"):
+            assert out[key].dtype == np.float32
+        assert out["adc_codes"].dtype == np.uint16
+        assert np.ptp(ref["adc_codes"][100:]) > 40000
+        assert np.max(np.abs(out["adc_codes"].astype(int) - ref["adc_codes"])) <= 1
+
+
+class TestDemodulator:
+
+    @pytest.mark.parametrize("reference", ["float", "nco"])
+    def test_lockin(self, reference):
+        x = _unit_sine()
+        ref = LockInDemodulator(F_HZ, FS_HZ, reference=reference).process(x)
+        out = LockInDemodulator(F_HZ, FS_HZ, reference=reference, dtype=np.float32).process(x)
+        assert out.R.dtype == np.float32 and out.phase.dtype == np.float32
+        assert np.max(np.abs(out.R - ref.R)) < 1e-6 * np.max(ref.R)
+
+    def test_lockin_blocks_match_whole(self):
+        x = _unit_sine()
+        whole = LockInDemodulator(F_HZ, FS_HZ, dtype=np.float32).process(x).R
+        demod = LockInDemodulator(F_HZ, FS_HZ, dtype=np.float32)
+        blocks = np.concatenate([demod.process(b).R for b in np.array_split(x, 7)])
+        np.testing.assert_allclose(blocks, whole, rtol=1e-6, atol=1e-9)
+
+    def test_bank(self):
+        x = _unit_sine()
+        f_refs = [F_HZ, 2 * F_HZ, 3 * F_HZ]
+        ref = DemodulatorBank(f_refs, FS_HZ, decimation=4).process(x)
+        out = DemodulatorBank(f_refs, FS_HZ, decimation=4, dtype=np.float32).process(x)
+        assert out.X.dtype == np.float32 and out.X.shape == ref.X.shape
+        assert np.max(np.abs(out.R - ref.R)) < 1e-6 * np.max(ref.R)
@@ -0,0 +1,73 @@
+"""
+Tests for the streaming rational resampler and multi-rate SignalChain.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+from scipy.signal import resample_poly, upfirdn
+
+from .resampler import RationalResampler, rational_ratio, resample
+from .signal_chain import SignalChain, excitation_blocks, iter_blocks
+
+DAC_HZ = 250e6
+ADC_HZ = 100e6
+
+
+def test_rational_ratio():
+    assert rational_ratio(DAC_HZ, ADC_HZ) == (2, 5)
+    assert rational_ratio(10e6, 4e6) == (2, 5)
+    assert rational_ratio(100e6, 250e6) == (5, 2)
+    with pytest.raises(ValueError):
+        rational_ratio(250e6, 100e6 * np.sqrt(2))
+
+
+@pytest.mark.parametrize("up, down", [(2, 5), (5, 2), (1, 3), (3, 1), (1, 1), (7, 11)])
+def test_polyphase_matches_upfirdn_in_any_blocks(up, down):
+    x = np.random.default_rng(0).standard_normal(5003)
+    whole = RationalResampler(up, down)
+    y = whole.process(x)
+    assert y.size == -(-x.size * whole.up // whole.down)
+    assert_allclose(y, upfirdn(whole.taps, x, up, down)[: y.size], rtol=0, atol=1e-12)
+
+    streamed = RationalResampler(up, down)
+    blocks = [streamed.process(b) for b in np.array_split(x, 17)] + [streamed.process(x[:0])]
+    assert_array_equal(np.concatenate(blocks), y)
+
+
+def test_resample_is_aligned_and_accurate():
+    x = np.random.default_rng(1).standard_normal(4000)
+    # resample_poly's filter gives resample_poly's result
+    assert_allclose(resample(x, DAC_HZ, ADC_HZ, half_width=10, kaiser_beta=5.0), resample_poly(x, 2, 5), atol=1e-12)
+
+    t = np.arange(25_000) / DAC_HZ
+    y = resample(np.sin(2 * np.pi * 7e6 * t), DAC_HZ, ADC_HZ)
+    t_adc = np.arange(y.size) / ADC_HZ
+    assert y.size == 10_000
+    assert np.max(np.abs(y - np.sin(2 * np.pi * 7e6 * t_adc))[50:-50]) < 2e-5
+
+
+def test_float32_and_delay():
+    r = RationalResampler.from_rates(DAC_HZ, ADC_HZ, dtype=np.float32)
+    assert r.output_rate_hz == ADC_HZ and r.delay_s == r.delay / ADC_HZ
+    y = r.process(np.ones(2000))
+    assert y.dtype == np.float32
+    assert_allclose(y[2 * r.delay:], 1.0, atol=1e-5)
+
+
+def test_chain_inserts_resampler_at_rate_change(analog_chain):
+    chain = analog_chain(DAC_HZ, adc_sample_rate_hz=ADC_HZ)
+    names = [name for name, _ in chain.stages]
+    assert names == ["dac_output", "sensor_current", "tia_output", "adc_codes_input", "adc_codes"]
+    assert SignalChain(chain.stages[:3] + chain.stages[4:], resample=False).stages[-1][0] == "adc_codes"
+
+    x = np.concatenate(list(excitation_blocks(5000, 5000, DAC_HZ, 1e6)))
+    single = analog_chain(DAC_HZ, adc_sample_rate_hz=ADC_HZ).process(x)
+    assert single["tia_output"].size == 5000 and single["adc_codes"].size == 2000
+    # Past the resampler's start-up, the codes follow the 0.1-0.9 V sine
+    codes = single["adc_codes"][100:]
+    assert codes.min() < 8000 and codes.max() > 57000
+    outs = list(analog_chain(DAC_HZ, adc_sample_rate_hz=ADC_HZ).run(iter_blocks(x, 613)))
+    assert_array_equal(np.concatenate([o["adc_codes"] for o in outs]), single["adc_codes"])
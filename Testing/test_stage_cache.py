@@ -0,0 +1,55 @@
+"""
+Tests for the LRU stage cache.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .stage_cache import StageCache, array_key, params_key
+
+
+def test_hit_returns_cached_value_without_recompute():
+    cache = StageCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.ones(10)
+
+    a = cache.get("dac", ("k", 1), compute)
+    b = cache.get("dac", ("k", 1), compute)
+    assert a is b and len(calls) == 1
+    cache.get("dac", ("k", 2), compute)
+    stats = cache.stats()
+    assert stats["stages"]["dac"] == {"hits": 1, "misses": 2}
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_lru_eviction_respects_budget():
+    cache = StageCache(max_bytes=3 * 800)
+    for k in range(3):
+        cache.get("s", k, lambda: np.zeros(100))
+    cache.get("s", 0, lambda: np.zeros(100))  # touch 0 so 1 is least recent
+    cache.get("s", 3, lambda: np.zeros(100))
+    assert cache.nbytes <= cache.max_bytes and len(cache) == 3
+    assert cache.evictions == 1
+    misses = cache.misses["s"]
+    cache.get("s", 0, lambda: np.zeros(100))
+    assert cache.misses["s"] == misses
+    cache.get("s", 1, lambda: np.zeros(100))
+    assert cache.misses["s"] == misses + 1
+
+
+def test_oversized_values_are_not_stored():
+    cache = StageCache(max_bytes=0)
+    cache.get("s", 0, lambda: np.zeros(10))
+    cache.get("s", 0, lambda: np.zeros(10))
+    assert len(cache) == 0 and cache.misses["s"] == 2
+
+
+def test_keys():
+    x = np.arange(5.0)
+    assert array_key(x) == array_key(x.copy())
+    assert array_key(x) != array_key(x + 1)
+    assert params_key({"b": 2, "a": 1}) == params_key({"a": 1, "b": 2})
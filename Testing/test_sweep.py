@@ -0,0 +1,73 @@
+"""
+Tests for the headless Monte-Carlo sweep engine.
+"""
+
+from __future__ import annotations
+
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from .sweep import sweep_runs, iter_sweep, run_sweep, load_sweep_results
+
+
+@pytest.fixture
+def envelope():
+    """2 ms Gaussian transit sampled at 14 kHz (a few mV)."""
+    t = np.arange(29) / 14e3
+    return 5e-3 * np.exp(-0.5 * ((t - 1e-3) / 2e-4) ** 2), t
+
+
+def test_runs_are_deterministic_and_expand_grid():
+    dist = {"adc.gain_error": lambda rng: rng.normal(0, 1e-3)}
+    a = sweep_runs({"dac.inl_lsb": [0, 1], "opamp.noise_rms": [0, 1e-5, 2e-5]}, dist, n_draws=2, seed=5)
+    b = sweep_runs({"dac.inl_lsb": [0, 1], "opamp.noise_rms": [0, 1e-5, 2e-5]}, dist, n_draws=2, seed=5)
+    assert len(a) == 12
+    assert a == b
+    assert len({r.seed for r in a}) == 12
+    assert a[0].params["adc.gain_error"] != a[1].params["adc.gain_error"]
+
+
+def test_unknown_parameter_rejected():
+    with pytest.raises(ValueError):
+        sweep_runs({"dac.no_such_thing": [1.0]})
+
+
+def test_pool_matches_serial(envelope, tmp_path):
+    runs = sweep_runs({"opamp.noise_rms": [0.0, 2e-3]}, n_draws=2, seed=1)
+    serial = run_sweep(runs, *envelope, str(tmp_path / "serial.csv"), processes=1)
+    pooled = run_sweep(runs, *envelope, str(tmp_path / "pool.csv"), processes=2)
+    assert_array_equal(serial, pooled)
+    assert serial.dtype.names[:3] == ("run_id", "seed", "opamp.noise_rms")
+    clean = serial[serial["opamp.noise_rms"] == 0.0]
+    noisy = serial[serial["opamp.noise_rms"] > 0.0]
+    assert np.all(clean["correlation"] > 0.9)
+    assert noisy["snr_db"].max() < clean["snr_db"].min()
+    assert noisy["rms_error"][0] != noisy["rms_error"][1]  # different seeds
+
+
+def test_resume_skips_completed_runs(envelope, tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    runs = sweep_runs({"dac.dnl_lsb": [0.0, 0.5, 1.0]})
+    first = iter_sweep(runs, *envelope, path, processes=1)
+    next(first)
+    first.close()  # simulate an interrupted sweep after one row
+    assert len(load_sweep_results(path)) == 1
+    rows = list(iter_sweep(runs, *envelope, path, processes=1))
+    assert sorted(r["run_id"] for r in rows) == [1, 2]
+    assert load_sweep_results(path)["run_id"].tolist() == [0, 1, 2]
+
+
+def test_failed_runs_record_error_and_are_retried(envelope, tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    runs = sweep_runs({"opamp.bandwidth_hz": [50e6, -1.0]})  # a negative bandwidth raises
+    rows = {r["run_id"]: r for r in iter_sweep(runs, *envelope, path, processes=1)}
+    assert rows[0]["error"] == ""
+    assert rows[1]["error"].startswith("ValueError") and np.isnan(rows[1]["rms_error"])
+    table = load_sweep_results(path)
+    assert table["error"].tolist() == ["", rows[1]["error"]]
+
+    # Resuming retries only the failed run; its latest row wins
+    retried = list(iter_sweep(runs, *envelope, path, processes=1))
+    assert [r["run_id"] for r in retried] == [1]
+    assert len(load_sweep_results(path)) == 2